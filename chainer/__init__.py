@@ -49,6 +49,7 @@ from chainer.function_node import FunctionNode  # NOQA
 from chainer.function_node import grad  # NOQA
 from chainer.functions import array  # NOQA
 from chainer.functions.math import basic_math  # NOQA
+from chainer.graph_optimizations.graph_capture import capture_graph  # NOQA
 from chainer.graph_optimizations.static_graph import static_graph  # NOQA
 from chainer.graph_optimizations.static_graph_utilities import static_code  # NOQA
 from chainer.initializer import Initializer  # NOQA
@@ -216,6 +217,7 @@ global_config.type_check = bool(int(os.environ.get('CHAINER_TYPE_CHECK', '1')))
 global_config.use_cudnn = os.environ.get('CHAINER_USE_CUDNN', 'auto')
 global_config.use_cudnn_tensor_core = 'auto'
 global_config.autotune = False
+global_config.backward_num_threads = 1
 global_config.schedule_func = None
 global_config.use_static_graph = True
 global_config.use_ideep = os.environ.get('CHAINER_USE_IDEEP', 'never')
@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 import collections
+import contextlib
 import heapq
+import threading
 import warnings
 
 import six
@@ -12,6 +14,57 @@ from chainer.utils import argument
 import chainerx
 
 
+_thread_local = threading.local()
+
+
+@contextlib.contextmanager
+def leaf_grad_callback(callback):
+    """Calls a function as soon as the gradient of each leaf is computed.
+
+    Within this context, :meth:`chainer.Variable.backward` sets the gradient
+    of a leaf variable once all the functions that take the variable as an
+    input have been backpropagated, and then calls ``callback`` with the
+    variable, while the rest of the graph is still to be backpropagated. This
+    lets the caller start processing the gradients, e.g. communicating them,
+    before the whole backprop finishes. The gradients of the leaves that are
+    not ready before the end are set and passed to ``callback`` at the end as
+    usual.
+
+    Args:
+        callback (callable): Function called with each leaf
+            :class:`~chainer.Variable` whose gradient is set.
+
+    """
+    old = getattr(_thread_local, 'leaf_grad_callback', None)
+    _thread_local.leaf_grad_callback = callback
+    try:
+        yield
+    finally:
+        _thread_local.leaf_grad_callback = old
+
+
+def _count_leaf_consumers(outputs):
+    # Returns the number of the functions that take each leaf requiring the
+    # gradient as an input.
+    counts = {}
+    seen = set()
+    stack = [y.creator_node for y, _ in outputs if y.creator_node is not None]
+    while stack:
+        func = stack.pop()
+        if func in seen:
+            continue
+        seen.add(func)
+        for x in set(func.inputs):
+            if not x.requires_grad:
+                continue
+            creator = x.creator_node
+            if creator is None:
+                counts[x] = counts.get(x, 0) + 1
+            elif creator not in seen:
+                stack.append(creator)
+    return counts
+
+
 def backward(outputs, grad_outputs=None, **kwargs):
     """backward(outputs, grad_outputs=None, *, enable_double_backprop=False)
 
@@ -153,6 +206,11 @@ def _backprop_to_all(outputs, retain_grad, loss_scale):
         loss_scale (float): see docstring of Variable.backward
 
     """
+    with _backprop_utils.setting_leaf_grads(True, loss_scale):
+        _backprop_to_all_leaves(outputs, retain_grad, loss_scale)
+
+
+def _backprop_to_all_leaves(outputs, retain_grad, loss_scale):
     OrderedDict = chainer.utils._collections.OrderedDict  # fix py2 memory leak
 
     cand_funcs = []
@@ -168,6 +226,51 @@ def _backprop_to_all(outputs, retain_grad, loss_scale):
 
     leaf_nodes = set()
 
+    callback = getattr(_thread_local, 'leaf_grad_callback', None)
+    if callback is not None:
+        leaf_counts = _count_leaf_consumers(outputs)
+
+    def set_leaf_grad(x):
+        x_var = x.get_variable_or_none()
+        gx = grads.pop(x)
+        if x_var is not None:
+            x_var._set_grad_var_without_check(gx)
+            x_var._loss_scale = loss_scale
+            if callback is not None:
+                callback(x_var)
+
+    def release_leaves(func):
+        # The gradients of the leaves are final once all the functions that
+        # take them have been backpropagated.
+        for x in set(func.inputs):
+            if x not in leaf_counts:
+                continue
+            leaf_counts[x] -= 1
+            if leaf_counts[x] == 0 and x in leaf_nodes:
+                leaf_nodes.discard(x)
+                set_leaf_grad(x)
+
+    def collect_grad_outputs(func):
+        outputs = [y() for y in func.outputs]  # access via weak ref
+        out_grad = tuple([grads.pop(y)
+                          if y is not None and y.creator_node is not None
+                          else None
+                          for y in outputs])
+        if retain_grad:
+            for y, gy in six.moves.zip(outputs, out_grad):
+                if y is not None:
+                    y._set_grad_var_if_available(gy)
+        return out_grad
+
+    def requires_grad(x):
+        return x.requires_grad
+
+    def add_input(x):
+        if x.creator_node is None:  # leaf
+            leaf_nodes.add(x)
+        else:
+            add_cand(x.creator_node)
+
     for y, gy in outputs:
         grads.accumulate(y, gy)
 
@@ -183,8 +286,28 @@ def _backprop_to_all(outputs, retain_grad, loss_scale):
 
     is_debug = chainer.is_debug()
     base_hooks = chainer.get_function_hooks().values()
+    n_threads = chainer.config.backward_num_threads
     while cand_funcs:
         _, _, func = heapq.heappop(cand_funcs)
+        if (n_threads > 1 and cand_funcs and cand_funcs[0][0] == -func.rank
+                and not base_hooks):
+            # Functions of the same rank do not depend on each other.
+            entries = []
+            while cand_funcs and cand_funcs[0][0] == -func.rank:
+                entries.append(heapq.heappop(cand_funcs))
+            level = [func] + [entry[2] for entry in entries]
+            if all([f._n_local_function_hooks == 0 for f in level]):
+                _backprop_utils.backprop_level(
+                    level, collect_grad_outputs, requires_grad, grads,
+                    add_input, is_debug, n_threads)
+                if callback is not None:
+                    for f in level:
+                        release_leaves(f)
+                continue
+            # Fall back to the serial execution to run the local hooks.
+            for entry in entries:
+                heapq.heappush(cand_funcs, entry)
+
         inputs = func.inputs
         target_input_indexes = tuple([
             i for i, x in enumerate(inputs) if x.requires_grad
@@ -254,10 +377,9 @@ def _backprop_to_all(outputs, retain_grad, loss_scale):
                 add_cand(x.creator_node)
         del gx, in_grad  # to reduce memory usage
 
+        if callback is not None:
+            release_leaves(func)
+
     for x in leaf_nodes:
-        x_var = x.get_variable_or_none()
-        gx = grads.pop(x)
-        if x_var is not None:
-            x_var._set_grad_var_without_check(gx)
-            x_var._loss_scale = loss_scale
+        set_leaf_grad(x)
     grads.assert_no_grads()
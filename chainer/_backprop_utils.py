@@ -1,11 +1,52 @@
+import atexit
+import contextlib
+from multiprocessing import pool
 import os
 import shutil
 import sys
+import threading
 import traceback
 
 import six
 
 import chainer
+from chainer import configuration
+
+
+_thread_local = threading.local()
+
+
+@contextlib.contextmanager
+def setting_leaf_grads(enabled, loss_scale=None):
+    """Tells functions whether the running backprop sets all leaf gradients.
+
+    :meth:`chainer.Variable.backward` sets the gradients of all the leaf
+    variables reachable from the outputs, while :func:`chainer.grad` only
+    returns the gradients w.r.t. the given inputs. Functions may accumulate
+    gradients w.r.t. leaf parameters directly into them (e.g.
+    :func:`~chainer.functions.embed_id` with ``sparse_grad=True``) only in
+    the former case, which they check by :func:`sets_leaf_grads`. Such
+    functions also record ``loss_scale``, the loss scale of the backprop,
+    on the parameters (see :func:`leaf_grads_loss_scale`), as the gradients
+    of the other leaves do.
+
+    """
+    old = getattr(_thread_local, 'leaf_grads', (False, None))
+    _thread_local.leaf_grads = enabled, loss_scale
+    try:
+        yield
+    finally:
+        _thread_local.leaf_grads = old
+
+
+def sets_leaf_grads():
+    """Returns ``True`` if the running backprop sets all leaf gradients."""
+    return getattr(_thread_local, 'leaf_grads', (False, None))[0]
+
+
+def leaf_grads_loss_scale():
+    """Returns the loss scale of the backprop setting all leaf gradients."""
+    return getattr(_thread_local, 'leaf_grads', (False, None))[1]
 
 
 def _reduce(grad_list):
@@ -212,6 +253,171 @@ def backprop_step(
             _reduce(gx)
 
 
+_thread_pool = None
+_thread_pool_size = 0
+_thread_pool_lock = threading.Lock()
+
+
+def _get_thread_pool(n_threads):
+    global _thread_pool, _thread_pool_size
+    with _thread_pool_lock:
+        if _thread_pool_size != n_threads:
+            if _thread_pool is not None:
+                _thread_pool.close()
+                _thread_pool.join()
+            _thread_pool = pool.ThreadPool(n_threads)
+            _thread_pool_size = n_threads
+        return _thread_pool
+
+
+@atexit.register
+def _terminate_thread_pool():
+    global _thread_pool, _thread_pool_size
+    with _thread_pool_lock:
+        if _thread_pool is not None:
+            _thread_pool.terminate()
+            _thread_pool.join()
+        _thread_pool = None
+        _thread_pool_size = 0
+
+
+def _backprop_step_in_thread(args):
+    local_config, leaf_grads, device, func, target_input_indexes, \
+        grad_outputs, grad_inputs, is_debug = args
+    # Configuration is thread-local. Run with that of the caller, but never
+    # parallelize a nested backprop so as not to exhaust the pool.
+    local = configuration.config._local
+    local.__dict__.update(local_config)
+    local.backward_num_threads = 1
+    try:
+        with chainer.using_device(device), setting_leaf_grads(*leaf_grads):
+            backprop_step(
+                func, target_input_indexes, grad_outputs, grad_inputs,
+                is_debug)
+    finally:
+        local.__dict__.clear()
+
+
+def backprop_steps_parallel(steps, is_debug, n_threads):
+    """Runs :func:`backprop_step` of independent functions in parallel.
+
+    The functions must not depend on each other, e.g., they have the same
+    rank. Each step must have its own references of the gradients w.r.t. the
+    inputs, which the caller merges into the gradient table in a fixed order
+    afterwards so that the result does not depend on the scheduling.
+
+    Args:
+        steps (list of tuple): Each tuple consists of the device to run the
+            step on and the ``func``, ``target_input_indexes``,
+            ``grad_outputs`` and ``grad_inputs`` arguments of
+            :func:`backprop_step`.
+        is_debug (bool): ``True`` if the debug mode is enabled.
+        n_threads (int): Number of threads.
+
+    """
+    local_config = configuration.config._local.__dict__.copy()
+    leaf_grads = getattr(_thread_local, 'leaf_grads', (False, None))
+    _get_thread_pool(n_threads).map(
+        _backprop_step_in_thread,
+        [(local_config, leaf_grads) + step + (is_debug,) for step in steps],
+        chunksize=1)
+
+
+def _accumulates_grads(func):
+    return (func.backward_accumulate.__code__
+            is not chainer.FunctionNode.backward_accumulate.__code__)
+
+
+def backprop_level(funcs, collect_grad_outputs, requires_grad, grads,
+                   add_input, is_debug, n_threads):
+    """Runs backward of the functions of the same rank in parallel.
+
+    This routine is used by :meth:`chainer.Variable.backward` and
+    :func:`chainer.grad`. Each function accumulates the gradients w.r.t.
+    its inputs into its own lists, which are merged into ``grads`` in the
+    order of ``funcs`` to keep the result deterministic. The functions
+    overriding :meth:`~chainer.FunctionNode.backward_accumulate` take the
+    gradients accumulated so far, so they run serially in that order.
+
+    Args:
+        funcs (list of ~chainer.FunctionNode): Functions of the same rank.
+        collect_grad_outputs (callable): Takes a function and returns the
+            gradients w.r.t. its outputs, which it pops from ``grads``.
+        requires_grad (callable): Takes an input node and returns ``True``
+            if the gradient w.r.t. it is computed.
+        grads (GradTable): The gradient table.
+        add_input (callable): Called with each input node whose gradient is
+            updated.
+        is_debug (bool): ``True`` if the debug mode is enabled.
+        n_threads (int): Number of threads.
+
+    """
+    OrderedDict = chainer.utils._collections.OrderedDict  # fix py2 memory leak
+
+    steps = []
+    for func in funcs:
+        grad_outputs = collect_grad_outputs(func)
+        inputs = func.inputs
+        target_input_indexes = tuple([
+            i for i, x in enumerate(inputs) if requires_grad(x)
+        ])
+        if not target_input_indexes:
+            continue
+
+        in_data = [x.data for x in inputs]
+        out_grad_array = [
+            None if g is None else g.raw_array for g in grad_outputs]
+        device = chainer.backend.get_device_from_array(
+            *(in_data + out_grad_array))
+        grad_inputs = OrderedDict()
+        for i in target_input_indexes:
+            grad_inputs[inputs[i]] = []
+        steps.append(
+            (device, func, target_input_indexes, grad_outputs, grad_inputs))
+
+    backprop_steps_parallel(
+        [step for step in steps if not _accumulates_grads(step[1])],
+        is_debug, n_threads)
+
+    for device, func, target_input_indexes, grad_outputs, grad_inputs \
+            in steps:
+        accumulates = _accumulates_grads(func)
+        if accumulates:
+            for x in grad_inputs:
+                grad_inputs[x] = grads.get_as_list(x)
+            with chainer.using_device(device):
+                backprop_step(
+                    func, target_input_indexes, grad_outputs, grad_inputs,
+                    is_debug)
+
+        for x, gx in grad_inputs.items():
+            if not gx:  # gradient == None
+                continue
+
+            for gx_elem in gx:
+                if gx_elem is not None:
+                    chainer.variable._check_grad_type(
+                        func, x, True, gx_elem.raw_array)
+            if not accumulates:
+                merge_grads(grads.get_as_list(x), gx, func.lazy_grad_sum)
+            add_input(x)
+
+
+def merge_grads(grad_list, new_grads, lazy_grad_sum):
+    """Merges gradients computed by a step into the gradient table.
+
+    Args:
+        grad_list (list): References of the gradients in the gradient table.
+        new_grads (list): References of the gradients computed by a step.
+        lazy_grad_sum (bool): ``lazy_grad_sum`` flag of the function of the
+            step.
+
+    """
+    grad_list.extend(new_grads)
+    if not lazy_grad_sum:
+        _reduce(grad_list)
+
+
 def _get_columns():
     # Returns the terminal column width.
     if sys.version_info >= (3, 3):
@@ -23,6 +23,7 @@ class GlobalConfig(object):
     use_cudnn = None  # type: str
     use_cudnn_tensor_core = None  # type: str
     autotune = None  # type: bool
+    backward_num_threads = None  # type: int
     schedule_func = None  # type: tp.Optional[static_graph.StaticScheduleFunction] # NOQA
     use_ideep = None  # type: str
     lazy_grad_sum = None  # type: bool
@@ -1,6 +1,7 @@
 # import classes and functions
 from chainer.dataset.convert import concat_examples  # NOQA
 from chainer.dataset.convert import ConcatWithAsyncTransfer  # NOQA
+from chainer.dataset.convert import ConcatWithBuffers  # NOQA
 from chainer.dataset.convert import converter  # NOQA
 from chainer.dataset.convert import Converter  # NOQA
 from chainer.dataset.convert import to_device  # NOQA
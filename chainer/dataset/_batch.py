@@ -0,0 +1,196 @@
+import numpy
+import six
+
+from chainer.backends import cuda
+
+
+class StackedBatch(list):
+
+    """List of examples that also holds them as stacked columns.
+
+    Iterators return this list when they fetch a batch from a dataset that
+    can serve many examples at once (see :func:`get_examples`). It behaves as
+    a plain list of examples, while :func:`~chainer.dataset.concat_examples`
+    uses :attr:`columns` as they are instead of stacking the examples again.
+    Modifying the list in place sets :attr:`columns` to :obj:`None`, so that
+    the examples are stacked again.
+
+    Args:
+        columns (tuple): Lists/arrays of the elements of the examples, one
+            for each position (or key) of the examples.
+        mode: :class:`tuple`, :class:`dict` or :obj:`None`, in the same way
+            as :attr:`chainer.dataset.TabularDataset.mode`.
+        keys (tuple of str): Keys of the columns. It is used when ``mode`` is
+            :class:`dict`.
+
+    """
+
+    def __init__(self, columns, mode, keys=None):
+        if mode is tuple:
+            examples = six.moves.zip(*columns)
+        elif mode is dict:
+            examples = (dict(six.moves.zip(keys, example))
+                        for example in six.moves.zip(*columns))
+        else:
+            examples = columns[0]
+        super(StackedBatch, self).__init__(examples)
+        self.columns = columns
+        self.mode = mode
+        self.keys = keys
+
+
+def _invalidating_columns(name):
+    method = getattr(list, name)
+
+    def invalidating(self, *args, **kwargs):
+        self.columns = None
+        return method(self, *args, **kwargs)
+
+    invalidating.__name__ = name
+    return invalidating
+
+
+for _name in ('__setitem__', '__delitem__', '__setslice__', '__delslice__',
+              '__iadd__', '__imul__', 'append', 'clear', 'extend', 'insert',
+              'pop', 'remove', 'reverse', 'sort'):
+    if hasattr(list, _name):
+        setattr(StackedBatch, _name, _invalidating_columns(_name))
+del _name
+
+
+def _is_array(data):
+    return isinstance(data, numpy.ndarray) or isinstance(data, cuda.ndarray)
+
+
+def _layout(dataset):
+    # Returns the mode and the keys of the examples if the dataset can fetch
+    # a batch by one call, or None otherwise.
+    from chainer.dataset.tabular import tabular_dataset
+    from chainer.datasets import dict_dataset
+    from chainer.datasets import tuple_dataset
+
+    if isinstance(dataset, tabular_dataset.TabularDataset):
+        return dataset.mode, dataset.keys
+    elif isinstance(dataset, tuple_dataset.TupleDataset):
+        if all(_is_array(d) for d in dataset._datasets):
+            return tuple, None
+    elif isinstance(dataset, dict_dataset.DictDataset):
+        if all(_is_array(d) for d in six.itervalues(dataset._datasets)):
+            return dict, tuple(dataset._datasets)
+    return None
+
+
+def supports_batch(dataset):
+    """Checks if a dataset can fetch a batch of examples by one call.
+
+    :class:`~chainer.dataset.TabularDataset` and
+    :class:`~chainer.datasets.TupleDataset` or
+    :class:`~chainer.datasets.DictDataset` of arrays are supported.
+
+    """
+    return _layout(dataset) is not None
+
+
+def get_columns(dataset, indices):
+    """Fetches the examples of the given indices as columns.
+
+    ``dataset`` must be supported by :func:`supports_batch`.
+
+    """
+    from chainer.dataset.tabular import tabular_dataset
+    from chainer.datasets import dict_dataset
+
+    indices = numpy.asarray(indices, dtype=numpy.intp)
+    if isinstance(dataset, tabular_dataset.TabularDataset):
+        return dataset.get_examples(indices, None)
+    elif isinstance(dataset, dict_dataset.DictDataset):
+        return tuple(dataset._datasets[key][indices]
+                     for key in _layout(dataset)[1])
+    else:
+        return tuple(d[indices] for d in dataset._datasets)
+
+
+def concat_columns(chunks):
+    """Concatenates the columns of the chunks of a batch.
+
+    Each chunk is the columns returned by :func:`get_columns` for a part of
+    the indices of the batch.
+
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = []
+    for column_chunks in six.moves.zip(*chunks):
+        if _is_array(column_chunks[0]):
+            xp = cuda.get_array_module(column_chunks[0])
+            columns.append(xp.concatenate(column_chunks))
+        else:
+            columns.append(
+                [data for chunk in column_chunks for data in chunk])
+    return tuple(columns)
+
+
+def make_batch(dataset, columns):
+    """Makes a :class:`StackedBatch` from columns of ``dataset``."""
+    mode, keys = _layout(dataset)
+    return StackedBatch(columns, mode, keys)
+
+
+def _supports_list_indexing(dataset):
+    # Checks if indexing the dataset with a list of indices is known to
+    # return the list of the examples. Subclasses of DatasetMixin may override
+    # __getitem__ for integer indices only, so only the implementations in
+    # Chainer are trusted. They use get_example for each example when it is
+    # overridden.
+    from chainer.dataset import dataset_mixin
+    from chainer.datasets import concatenated_dataset
+    from chainer.datasets import sub_dataset
+    from chainer.datasets import text_dataset
+    from chainer.datasets import transform_dataset
+
+    if not isinstance(dataset, dataset_mixin.DatasetMixin):
+        return False
+    return type(dataset).__getitem__ in (
+        dataset_mixin.DatasetMixin.__getitem__,
+        concatenated_dataset.ConcatenatedDataset.__getitem__,
+        sub_dataset.SubDataset.__getitem__,
+        text_dataset.TextDataset.__getitem__,
+        transform_dataset.TransformDataset.__getitem__,
+    )
+
+
+def _get_example_list(dataset, indices):
+    # Fetches examples by one call from the datasets known to support it.
+    if _supports_list_indexing(dataset):
+        if not isinstance(indices, (list, numpy.ndarray)):
+            indices = list(indices)
+        return dataset[indices]
+    elif _is_array(dataset):
+        return list(dataset[numpy.asarray(indices, dtype=numpy.intp)])
+    elif isinstance(dataset, (list, tuple)) and len(indices) > 0:
+        # Contiguous indices are fetched by a slice.
+        indices = numpy.asarray(indices)
+        start = int(indices[0])
+        stop = start + len(indices)
+        if (0 <= start and stop <= len(dataset)
+                and (numpy.diff(indices) == 1).all()):
+            return list(dataset[start:stop])
+    return [dataset[index] for index in indices]
+
+
+def get_examples(dataset, indices):
+    """Fetches a batch of examples.
+
+    If ``dataset`` is supported by :func:`supports_batch`, the examples are
+    fetched by one call and returned as a :class:`StackedBatch`. Otherwise,
+    they are returned as a list. The examples of a
+    :class:`~chainer.dataset.DatasetMixin` are fetched by indexing it with
+    the list of indices if it does not override :meth:`__getitem__` or is
+    one of the datasets of Chainer that serve a batch at once. Contiguous
+    indices of a list are fetched by a slice. The examples of other datasets
+    are fetched one by one.
+
+    """
+    if supports_batch(dataset):
+        return make_batch(dataset, get_columns(dataset, indices))
+    return _get_example_list(dataset, indices)
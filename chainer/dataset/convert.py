@@ -6,6 +6,7 @@ import six
 import chainer
 from chainer import backend
 from chainer.backends import cuda
+from chainer.dataset import _batch
 
 
 class Converter(object):
@@ -205,6 +206,12 @@ def concat_examples(batch, device=None, padding=None):
     contents of all arrays can be substituted to. The padding value is then
     used to the extra elements of the resulting arrays.
 
+    If the batch is fetched by an iterator from a dataset that can serve many
+    examples at once, e.g., :class:`~chainer.dataset.TabularDataset` or
+    :class:`~chainer.datasets.TupleDataset` of arrays, the iterator returns
+    the elements already stacked into arrays, and this function uses them
+    without stacking the examples again.
+
     .. admonition:: Example
 
        >>> import numpy as np
@@ -263,6 +270,10 @@ def concat_examples(batch, device=None, padding=None):
     if not batch:
         raise ValueError('batch is empty')
 
+    if (isinstance(batch, _batch.StackedBatch)
+            and batch.columns is not None):
+        return _concat_columns(batch, device, padding)
+
     first_elem = batch[0]
 
     if isinstance(first_elem, tuple):
@@ -291,6 +302,33 @@ def concat_examples(batch, device=None, padding=None):
         return to_device(device, _concat_arrays(batch, padding))
 
 
+def _concat_columns(batch, device, padding):
+    columns = batch.columns
+    if batch.mode is tuple:
+        if not isinstance(padding, tuple):
+            padding = [padding] * len(columns)
+        return tuple(
+            to_device(device, _concat_column(column, pad))
+            for column, pad in six.moves.zip(columns, padding))
+    elif batch.mode is dict:
+        if not isinstance(padding, dict):
+            padding = {key: padding for key in batch.keys}
+        return {
+            key: to_device(device, _concat_column(column, padding[key]))
+            for key, column in six.moves.zip(batch.keys, columns)}
+    else:
+        return to_device(device, _concat_column(columns[0], padding))
+
+
+def _concat_column(column, padding):
+    # A column of an array type is already stacked unless the examples are
+    # objects such as variable-length arrays.
+    if isinstance(column, chainer.get_array_types()) \
+            and column.dtype != numpy.object_:
+        return column
+    return _concat_arrays(list(column), padding)
+
+
 def _concat_arrays(arrays, padding):
     # Convert `arrays` to numpy.ndarray if `arrays` consists of the built-in
     # types such as int, float or list.
@@ -539,3 +577,172 @@ class Conveyor(object):
             if sync:
                 cuda.cupy.cuda.runtime.deviceSynchronize()
         return self._ret_array.pop(0)
+
+
+class ConcatWithBuffers(Converter):
+
+    """Converter that concatenates examples into reusable buffers.
+
+    This converter works in the same way as
+    :func:`~chainer.dataset.concat_examples`, except that the arrays of each
+    position (or key) of the examples are written into output buffers kept
+    by the converter instead of newly allocated arrays. A buffer is
+    reallocated only when a batch does not fit in it, e.g., when the arrays
+    are padded to a longer length than before. Padding is also done in place.
+
+    The buffers of each position rotate among ``n_buffers`` buffers, so that
+    the arrays returned by the last ``n_buffers - 1`` calls stay valid while
+    the next batch is being converted. The arrays returned before them are
+    overwritten. Hence ``n_buffers`` should be larger than the number of
+    batches used at the same time, e.g., by a prefetching pipeline.
+
+    Buffers are used for arrays of NumPy and CuPy. Examples of other types,
+    such as Python scalars, are converted by
+    :func:`~chainer.dataset.concat_examples` as usual.
+
+    .. doctest::
+
+        from chainer.dataset import convert
+        ...
+        updater = chainer.training.updaters.StandardUpdater(
+                       ...,
+                       converter=convert.ConcatWithBuffers(),
+                       ...)
+
+    Args:
+        n_buffers (int): Number of buffers of each position of the examples.
+
+    """
+
+    def __init__(self, n_buffers=2):
+        if n_buffers < 1:
+            raise ValueError('n_buffers must be positive')
+        self.n_buffers = n_buffers
+        self._buffers = {}
+        self._n_allocations = 0
+        self._n_reuses = 0
+
+    @property
+    def n_allocations(self):
+        """Number of times a buffer is allocated."""
+        return self._n_allocations
+
+    @property
+    def n_reuses(self):
+        """Number of times a buffer is reused."""
+        return self._n_reuses
+
+    @property
+    def total_bytes(self):
+        """Total number of bytes of the buffers."""
+        return sum(buf.nbytes for ring in six.itervalues(self._buffers)
+                   for buf in ring)
+
+    def free_buffers(self):
+        """Releases all the buffers."""
+        self._buffers.clear()
+
+    def __call__(self, batch, device=None, padding=None):
+        """Concatenates examples into the buffers.
+
+        See also :func:`chainer.dataset.concat_examples`.
+
+        Args:
+            batch (list): A list of examples.
+            device (device specifier): A device to which each array is sent.
+            padding: Scalar value for extra elements.
+
+        Returns:
+            Array, a tuple of arrays, or a dictionary of arrays.
+            The type depends on the type of each example in the batch.
+
+        """
+        device = _get_device(device)
+        if not batch:
+            raise ValueError('batch is empty')
+
+        if (isinstance(batch, _batch.StackedBatch)
+                and batch.columns is not None):
+            # The examples are already stacked.
+            return _concat_columns(batch, device, padding)
+
+        first_elem = batch[0]
+
+        if isinstance(first_elem, tuple):
+            if not isinstance(padding, tuple):
+                padding = [padding] * len(first_elem)
+            return tuple(
+                to_device(device, self._concat(
+                    i, [example[i] for example in batch], padding[i]))
+                for i in six.moves.range(len(first_elem)))
+
+        elif isinstance(first_elem, dict):
+            if not isinstance(padding, dict):
+                padding = {key: padding for key in first_elem}
+            return {
+                key: to_device(device, self._concat(
+                    key, [example[key] for example in batch], padding[key]))
+                for key in first_elem}
+
+        else:
+            return to_device(device, self._concat(None, batch, padding))
+
+    def _concat(self, key, arrays, padding):
+        first = arrays[0]
+        if not (isinstance(first, numpy.ndarray)
+                or isinstance(first, cuda.ndarray)):
+            return _concat_arrays(arrays, padding)
+
+        shape = first.shape
+        dtype = first.dtype
+        for array in arrays[1:]:
+            if array.shape != shape:
+                if padding is None:
+                    raise ValueError(
+                        'all the arrays must have the same shape unless '
+                        'padding is given')
+                if len(array.shape) != len(shape):
+                    raise ValueError(
+                        'all the arrays must have the same number of '
+                        'dimensions')
+                shape = tuple(max(a, b) for a, b in zip(shape, array.shape))
+            if padding is None and array.dtype != dtype:
+                dtype = numpy.promote_types(dtype, array.dtype)
+
+        device = backend.get_device_from_array(first)
+        shape = (len(arrays),) + shape
+        with chainer.using_device(device):
+            out = self._get_buffer(key, device, shape, dtype)
+            if padding is None:
+                for i, array in enumerate(arrays):
+                    out[i] = array
+            else:
+                out.fill(padding)
+                for i, array in enumerate(arrays):
+                    out[(i,) + tuple(slice(dim) for dim in array.shape)] = \
+                        array
+        return out
+
+    def _get_buffer(self, key, device, shape, dtype):
+        # Returns a view of the next buffer of the position ``key``. The
+        # buffers are flat arrays grown on demand, so that batches of
+        # different shapes share them.
+        size = 1
+        for dim in shape:
+            size *= dim
+
+        ring = self._buffers.setdefault(
+            (key, device, dtype), collections.deque())
+        if len(ring) < self.n_buffers:
+            buf = None
+        else:
+            buf = ring.popleft()
+            if buf.size < size:
+                buf = None
+        if buf is None:
+            buf = device.xp.empty(size, dtype=dtype)
+            self._n_allocations += 1
+        else:
+            self._n_reuses += 1
+        ring.append(buf)
+        return buf[:size].reshape(shape)
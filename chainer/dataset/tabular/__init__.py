@@ -5,5 +5,7 @@ from chainer.dataset.tabular import _slice  # NOQA
 from chainer.dataset.tabular import _transform  # NOQA
 from chainer.dataset.tabular import _with_converter  # NOQA
 
+from chainer.dataset.tabular.columnar_dataset import ColumnarDataset  # NOQA
+from chainer.dataset.tabular.columnar_dataset import save_columnar  # NOQA
 from chainer.dataset.tabular.delegate_dataset import DelegateDataset  # NOQA
 from chainer.dataset.tabular.from_data import from_data  # NOQA
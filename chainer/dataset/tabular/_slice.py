@@ -76,6 +76,23 @@ def _as_indices(indices, len_):
     if isinstance(indices, slice) or len(indices) == 0:
         return indices
 
+    if isinstance(indices, np.ndarray):
+        # Validate an index array as a whole and keep it as an array, so
+        # that the underlying dataset can gather the rows at once.
+        if indices.dtype.kind == 'b':
+            if not len(indices) == len_:
+                raise ValueError('The number of booleans is '
+                                 'different from the length of dataset')
+            return np.flatnonzero(indices)
+        indices = indices.astype(np.intp)
+        indices = np.where(indices < 0, indices + len_, indices)
+        out_of_bounds = (indices < 0) | (len_ <= indices)
+        if out_of_bounds.any():
+            raise IndexError(
+                'index {} is out of bounds for dataset with size {}'
+                .format(indices[out_of_bounds][0], len_))
+        return indices
+
     if all(isinstance(index, (bool, np.bool_)) for index in indices):
         if not len(indices) == len_:
             raise ValueError('The number of booleans is '
@@ -141,9 +158,13 @@ def _merge_indices(a, b, len_a, len_b):
         return slice(start, stop, step)
     elif isinstance(a, slice):
         a_start, _, a_step = a.indices(len_a)
+        if isinstance(b, np.ndarray):
+            return a_start + a_step * b
         return [a_start + a_step * index for index in b]
     elif isinstance(b, slice):
         return a[b]
+    elif isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.asarray(a, dtype=np.intp)[np.asarray(b, dtype=np.intp)]
     else:
         return [a[index] for index in b]
 
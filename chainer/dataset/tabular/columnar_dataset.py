@@ -0,0 +1,161 @@
+import json
+import os
+
+import numpy
+import six
+
+from chainer import backend
+from chainer.dataset.tabular import tabular_dataset
+
+
+_META_FILE = 'columns.json'
+
+
+def _column_file(dirname, key_index):
+    return os.path.join(dirname, '{}.npy'.format(key_index))
+
+
+class ColumnarDataset(tabular_dataset.TabularDataset):
+
+    """A TabularDataset backed by memory-mapped ``.npy`` files.
+
+    This dataset reads a directory written by :func:`save_columnar`, which
+    stores each column as an ``.npy`` file. The files are opened with
+    :func:`numpy.load` in memory-map mode, so that the data are not loaded
+    until they are accessed.
+
+    Since each column is an array, :meth:`get_examples` gathers the requested
+    rows by indexing each column once instead of visiting the rows one by
+    one. Combined with :meth:`~chainer.dataset.TabularDataset.slice` and
+    :meth:`~chainer.dataset.TabularDataset.transform_batch`, a whole batch is
+    fetched by a single fancy-indexing per column.
+
+    >>> import tempfile
+    >>> from chainer.dataset import tabular
+    >>>
+    >>> dirname = tempfile.mkdtemp()
+    >>> tabular.save_columnar(dirname, tabular.from_data(
+    ...     (('a', np.arange(10)), ('b', np.arange(10) * 2))))
+    >>> dataset = tabular.ColumnarDataset(dirname)
+    >>> dataset.keys
+    ('a', 'b')
+    >>> dataset.slice[np.array([1, 3])].fetch()
+    (array([1, 3]), array([2, 6]))
+
+    Args:
+        dirname (str): Path to the directory written by
+            :func:`save_columnar`.
+        mmap_mode (str): Memory-map mode passed to :func:`numpy.load`.
+            If this argument is :obj:`None`, the whole columns are loaded
+            into memory.
+
+    """
+
+    def __init__(self, dirname, mmap_mode='r'):
+        with open(os.path.join(dirname, _META_FILE)) as f:
+            meta = json.load(f)
+
+        self._dirname = dirname
+        self._mmap_mode = mmap_mode
+        self._len = meta['length']
+        self._keys = tuple(meta['keys'])
+        self._mode = {'tuple': tuple, 'dict': dict, None: None}[meta['mode']]
+        self._open()
+
+    def _open(self):
+        self._columns = tuple(
+            numpy.load(_column_file(self._dirname, key_index),
+                       mmap_mode=self._mmap_mode)
+            for key_index in six.moves.range(len(self._keys)))
+
+    def __getstate__(self):
+        # Memory maps are reopened instead of being pickled with their
+        # contents, e.g., when the dataset is sent to worker processes.
+        state = self.__dict__.copy()
+        del state['_columns']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def keys(self):
+        return self._keys
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def get_examples(self, indices, key_indices):
+        if key_indices is None:
+            key_indices = six.moves.range(len(self._keys))
+
+        if indices is None:
+            return tuple(self._columns[key_index]
+                         for key_index in key_indices)
+        elif isinstance(indices, slice):
+            return tuple(self._columns[key_index][indices]
+                         for key_index in key_indices)
+        else:
+            indices = numpy.asarray(indices, dtype=numpy.intp)
+            return tuple(numpy.asarray(self._columns[key_index][indices])
+                         for key_index in key_indices)
+
+
+def save_columnar(dirname, dataset, batch_size=1024):
+    """Save a TabularDataset as columnar ``.npy`` files.
+
+    This function writes each column of ``dataset`` into an ``.npy`` file
+    under ``dirname``, which can be read by :class:`ColumnarDataset`.
+    The rows are fetched ``batch_size`` rows at a time, so that the dataset
+    does not have to fit in memory. All values of a column must be arrays
+    (or scalars) of the same shape.
+
+    Args:
+        dirname (str): Path to the output directory. It is created if it
+            does not exist.
+        dataset (~chainer.dataset.TabularDataset): Dataset to save.
+        batch_size (int): Number of rows fetched at a time.
+
+    """
+    if batch_size <= 0:
+        raise ValueError('batch_size must be positive')
+    if len(dataset) == 0:
+        raise ValueError('Cannot save an empty dataset')
+
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    columns = None
+    for start in six.moves.range(0, len(dataset), batch_size):
+        stop = min(start + batch_size, len(dataset))
+        examples = dataset.get_examples(slice(start, stop), None)
+        examples = [backend.CpuDevice().send(tabular_dataset._as_array(data))
+                    for data in examples]
+        if columns is None:
+            columns = [
+                numpy.lib.format.open_memmap(
+                    _column_file(dirname, key_index), mode='w+',
+                    dtype=data.dtype, shape=(len(dataset),) + data.shape[1:])
+                for key_index, data in enumerate(examples)]
+        for column, data in six.moves.zip(columns, examples):
+            if not data.shape[1:] == column.shape[1:]:
+                raise ValueError(
+                    'All values of a column must have the same shape')
+            column[start:stop] = data
+
+    for column in columns:
+        column.flush()
+    del columns
+
+    # The metadata is written last so that a partially written directory
+    # is not recognized as a dataset.
+    mode = {tuple: 'tuple', dict: 'dict', None: None}[dataset.mode]
+    with open(os.path.join(dirname, _META_FILE), 'w') as f:
+        json.dump(
+            {'length': len(dataset), 'keys': list(dataset.keys),
+             'mode': mode}, f)
@@ -101,8 +101,8 @@ class TabularDataset(dataset_mixin.DatasetMixin):
         """Return a part of data.
 
         Args:
-            indices (list of ints or slice): Indices of requested rows.
-                If this argument is :obj:`None`, it indicates all rows.
+            indices (list/array of ints or slice): Indices of requested
+                rows. If this argument is :obj:`None`, it indicates all rows.
             key_indices (tuple of ints): Indices of requested columns.
                 If this argument is :obj:`None`, it indicates all columns.
 
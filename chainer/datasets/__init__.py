@@ -5,6 +5,7 @@ from chainer.datasets.concatenated_dataset import ConcatenatedDataset  # NOQA
 from chainer.datasets.dict_dataset import DictDataset  # NOQA
 from chainer.datasets.fashion_mnist import get_fashion_mnist  # NOQA
 from chainer.datasets.fashion_mnist import get_fashion_mnist_labels  # NOQA
+from chainer.datasets.image_dataset import CachedImageDataset  # NOQA
 from chainer.datasets.image_dataset import ImageDataset  # NOQA
 from chainer.datasets.image_dataset import LabeledImageDataset  # NOQA
 from chainer.datasets.image_dataset import LabeledZippedImageDataset  # NOQA
@@ -1,3 +1,9 @@
+import bisect
+
+import numpy
+import six
+
+from chainer.dataset import _batch
 from chainer.dataset import dataset_mixin
 
 
@@ -10,6 +16,15 @@ class ConcatenatedDataset(dataset_mixin.DatasetMixin):
     another base dataset with 20 samples are given, this dataset works as
     a dataset which has 30 samples.
 
+    The offsets of the base datasets are computed in the constructor, and the
+    base dataset of an example is found by binary search. When a slice, a
+    list or an array of indices is given, the indices are grouped by the base
+    datasets, and each base dataset is indexed at once.
+
+    .. note::
+        The lengths of the base datasets must not change after this dataset
+        is created.
+
     Args:
         datasets: The underlying datasets. Each dataset has to support
             :meth:`__len__` and :meth:`__getitem__`.
@@ -18,15 +33,60 @@ class ConcatenatedDataset(dataset_mixin.DatasetMixin):
 
     def __init__(self, *datasets):
         self._datasets = datasets
+        # The k-th dataset starts at `offsets[k]`, and the last element is
+        # the total length.
+        offsets = [0]
+        for dataset in datasets:
+            offsets.append(offsets[-1] + len(dataset))
+        self._offsets = offsets
+        self._offsets_array = numpy.array(offsets, dtype=numpy.int64)
 
     def __len__(self):
-        return sum(len(dataset) for dataset in self._datasets)
+        return self._offsets[-1]
+
+    def __getitem__(self, index):
+        if type(self).get_example is not ConcatenatedDataset.get_example:
+            # get_example is overridden, so it is used for each example.
+            return super(ConcatenatedDataset, self).__getitem__(index)
+        if isinstance(index, slice):
+            current, stop, step = index.indices(len(self))
+            return self._get_examples(numpy.arange(current, stop, step))
+        elif isinstance(index, list) or isinstance(index, numpy.ndarray):
+            return self._get_examples(numpy.asarray(index, dtype=numpy.int64))
+        else:
+            return self.get_example(index)
 
     def get_example(self, i):
-        if i < 0:
+        if i < 0 or len(self) <= i:
             raise IndexError
-        for dataset in self._datasets:
-            if i < len(dataset):
-                return dataset[i]
-            i -= len(dataset)
-        raise IndexError
+        # Empty datasets are skipped by finding the last one that starts at
+        # or before `i`.
+        k = bisect.bisect_right(self._offsets, i) - 1
+        return self._datasets[k][i - self._offsets[k]]
+
+    def _get_examples(self, indices):
+        if len(indices) == 0:
+            return []
+        if indices.min() < 0 or len(self) <= indices.max():
+            raise IndexError
+
+        offsets = self._offsets_array
+        ks = numpy.searchsorted(offsets, indices, side='right') - 1
+        # The stable sort keeps the order of indices in each group, so that
+        # contiguous indices can be fetched by a slice.
+        order = numpy.argsort(ks, kind='stable')
+        groups = numpy.split(
+            order, numpy.flatnonzero(numpy.diff(ks[order])) + 1)
+
+        examples = [None] * len(indices)
+        for group in groups:
+            k = ks[group[0]]
+            if len(group) == 1:
+                i = group[0]
+                examples[i] = self._datasets[k][int(indices[i] - offsets[k])]
+                continue
+            batch = _batch.get_examples(
+                self._datasets[k], indices[group] - offsets[k])
+            for position, example in six.moves.zip(group.tolist(), batch):
+                examples[position] = example
+        return examples
@@ -1,4 +1,6 @@
 import bisect
+import collections
+import hashlib
 import io
 import os
 import threading
@@ -17,10 +19,14 @@ import chainer
 from chainer.dataset import dataset_mixin
 
 
-def _read_image_as_array(path, dtype):
+def _read_image_as_array(path, dtype, size=None):
     f = Image.open(path)
     try:
-        image = numpy.asarray(f, dtype=dtype)
+        if size is None:
+            image = numpy.asarray(f, dtype=dtype)
+        else:
+            image = numpy.asarray(
+                f.resize((size[1], size[0]), Image.BILINEAR), dtype=dtype)
     finally:
         # Only pillow >= 3.0 has 'close' method
         if hasattr(f, 'close'):
@@ -303,6 +309,172 @@ class ZippedImageDataset(dataset_mixin.DatasetMixin):
         return _postprocess_image(image)
 
 
+class CachedImageDataset(dataset_mixin.DatasetMixin):
+
+    """Dataset that caches decoded images of another dataset on disk.
+
+    This dataset wraps :class:`ImageDataset` or :class:`LabeledImageDataset`
+    and returns the same examples. On the first access to each example, the
+    decoded (and optionally resized) image is stored into a memory-mapped
+    file of fixed-size records in ``cache_dir``. Later accesses read the
+    image from the file instead of decoding it, so that epochs after the
+    first one are not bound by image decoding. Each record is keyed by the
+    path and the modification time of the image file, so modified images are
+    decoded again. The cache file is reused by datasets with the same
+    ``cache_dir`` in other processes and in later runs.
+
+    The most recently used images can also be kept in memory by giving
+    ``memory_cache_size``.
+
+    Since the records have a fixed size, all the images must have the same
+    shape after resizing. Give ``size`` unless they do.
+
+    Args:
+        dataset (ImageDataset or LabeledImageDataset): Dataset to wrap.
+        cache_dir (str): Directory to store the cache file in. It is created
+            if it does not exist.
+        size (tuple of ints): Height and width to resize images to. If it is
+            ``None``, images are not resized.
+        memory_cache_size (int): Maximum number of images kept in memory.
+
+    """
+
+    def __init__(self, dataset, cache_dir, size=None, memory_cache_size=0):
+        if isinstance(dataset, ImageDataset):
+            self._paths = dataset._paths
+            self._labels = None
+        elif isinstance(dataset, LabeledImageDataset):
+            self._paths = [path for path, _ in dataset._pairs]
+            self._labels = [label for _, label in dataset._pairs]
+            self._label_dtype = dataset._label_dtype
+        else:
+            raise TypeError(
+                'dataset must be ImageDataset or LabeledImageDataset, not '
+                '{}'.format(type(dataset)))
+        self._root = dataset._root
+        self._dtype = dataset._dtype
+        self._size = None if size is None else tuple(size)
+        self._memory_cache_size = memory_cache_size
+
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        self._images_path = os.path.join(cache_dir, 'images.npy')
+        self._keys_path = os.path.join(cache_dir, 'keys.npy')
+        self._images = None
+        self._keys = None
+        self._memory_cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        if not self._open():
+            self._create()
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d['_images'] = None
+        d['_keys'] = None
+        d['_memory_cache'] = None
+        d['_lock'] = None
+        return d
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        self._memory_cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # Opens the existing cache file if it is compatible with the dataset.
+        try:
+            images = numpy.load(self._images_path, mmap_mode='r+')
+            keys = numpy.load(self._keys_path, mmap_mode='r+')
+        except (IOError, ValueError):
+            return False
+        if (images.dtype != self._dtype or len(images) != len(self)
+                or images.ndim != 4
+                or (self._size is not None
+                    and images.shape[2:] != self._size)
+                or keys.shape != (len(self),)):
+            return False
+        self._images = images
+        self._keys = keys
+        return True
+
+    def _create(self):
+        # The shape of the records is determined by the first image.
+        key, image = self._read(0)
+        self._images = numpy.lib.format.open_memmap(
+            self._images_path, mode='w+', dtype=self._dtype,
+            shape=(len(self),) + image.shape)
+        self._keys = numpy.lib.format.open_memmap(
+            self._keys_path, mode='w+', dtype=numpy.uint64,
+            shape=(len(self),))
+        self._store(0, key, image)
+
+    def _key(self, path):
+        # Nonzero hash of the path and the modification time.
+        mtime = os.stat(path).st_mtime_ns
+        digest = hashlib.sha1(
+            '{}\0{}'.format(path, mtime).encode('utf-8')).digest()
+        key = numpy.frombuffer(digest[:8], numpy.uint64)[0]
+        return key | numpy.uint64(1)
+
+    def _read(self, i):
+        path = os.path.join(self._root, self._paths[i])
+        key = self._key(path)
+        image = _postprocess_image(
+            _read_image_as_array(path, self._dtype, self._size))
+        return key, image
+
+    def _store(self, i, key, image):
+        if image.shape != self._images.shape[1:]:
+            raise ValueError(
+                'shape of image {} is {}, which differs from the shape of '
+                'cached images {}; give size to resize images'.format(
+                    self._paths[i], image.shape, self._images.shape[1:]))
+        # Write the key after the image so that the record becomes valid
+        # only after it is completely written.
+        self._images[i] = image
+        self._keys[i] = key
+
+    def _get_image(self, i):
+        if self._images is None:
+            with self._lock:
+                if self._images is None and not self._open():
+                    self._create()
+
+        path = os.path.join(self._root, self._paths[i])
+        key = self._key(path)
+        if self._memory_cache_size > 0:
+            with self._lock:
+                entry = self._memory_cache.get(i)
+                if entry is not None and entry[0] == key:
+                    self._memory_cache.move_to_end(i)
+                    return entry[1].copy()
+
+        if self._keys[i] == key:
+            image = numpy.array(self._images[i])
+        else:
+            key, image = self._read(i)
+            self._store(i, key, image)
+
+        if self._memory_cache_size > 0:
+            with self._lock:
+                self._memory_cache[i] = key, image
+                self._memory_cache.move_to_end(i)
+                while len(self._memory_cache) > self._memory_cache_size:
+                    self._memory_cache.popitem(last=False)
+            image = image.copy()
+        return image
+
+    def get_example(self, i):
+        image = self._get_image(i)
+        if self._labels is None:
+            return image
+        label = numpy.array(self._labels[i], dtype=self._label_dtype)
+        return image, label
+
+
 def _check_pillow_availability():
     if not available:
         raise ImportError('PIL cannot be loaded. Install Pillow!\n'
@@ -1,13 +1,41 @@
+import importlib
 import io
 import multiprocessing.util
+import os
 import threading
+import warnings
 
+import numpy
 import six
 import six.moves.cPickle as pickle
 
 from chainer.dataset import dataset_mixin
 
 
+_INDEX_VERSION = 1
+
+# Modules of the supported compression methods. The index stores the position
+# in this tuple plus one, and zero means no compression.
+_COMPRESSIONS = ('zlib', 'bz2', 'lzma')
+
+
+def _index_path(path):
+    return path + '.index'
+
+
+def _read_index(index):
+    # Returns the index array, or None if it is not a valid index.
+    try:
+        data = numpy.load(index)
+    except (ValueError, EOFError, OSError):
+        return None
+    if (data.dtype != numpy.int64 or data.ndim != 1 or len(data) < 4
+            or data[0] != _INDEX_VERSION
+            or not 0 <= data[1] <= len(_COMPRESSIONS)):
+        return None
+    return data
+
+
 class PickleDatasetWriter(object):
 
     """Writer class that makes PickleDataset.
@@ -15,22 +43,64 @@ class PickleDatasetWriter(object):
     To make :class:`PickleDataset`, a user needs to prepare data using
     :class:`PickleDatasetWriter`.
 
+    If ``index_writer`` is given, the offsets of the records are written to
+    it as an index when the writer is closed. :class:`PickleDataset` opens
+    the data with the index without unpickling all the records. The data
+    itself is in the same format as that written without the index unless
+    ``compression`` is specified.
+
     Args:
         writer: File like object that supports ``write`` and ``tell`` methods.
         protocol (int): Valid protocol for :mod:`pickle`.
+        index_writer: File like object to write the index to. It is closed
+            when this writer is closed.
+        compression (str): Name of the method to compress each record with,
+            which is one of ``'zlib'``, ``'bz2'`` and ``'lzma'``. If it is
+            :obj:`None`, records are not compressed. Compressed records can
+            only be read with the index, so ``index_writer`` is required.
 
     .. seealso: chainer.datasets.PickleDataset
 
     """
 
-    def __init__(self, writer, protocol=pickle.HIGHEST_PROTOCOL):
+    def __init__(self, writer, protocol=pickle.HIGHEST_PROTOCOL,
+                 index_writer=None, compression=None):
+        if compression is not None:
+            if compression not in _COMPRESSIONS:
+                raise ValueError(
+                    'unsupported compression: {}'.format(compression))
+            if index_writer is None:
+                raise ValueError('compression requires index_writer')
+            self._compression = _COMPRESSIONS.index(compression) + 1
+            self._compressor = importlib.import_module(compression)
+        else:
+            self._compression = 0
+            self._compressor = None
+
         self._positions = []
         self._writer = writer
         self._protocol = protocol
+        self._index_writer = index_writer
 
     def close(self):
+        index_writer = self._index_writer
+        if index_writer is not None:
+            self._index_writer = None
+            try:
+                self._write_index(index_writer)
+            finally:
+                index_writer.close()
         self._writer.close()
 
+    def _write_index(self, index_writer):
+        # The index is an int64 array of the version, the compression method,
+        # the size of the data, and the offsets of the records followed by
+        # the end of the last record.
+        end = self._writer.tell()
+        header = [_INDEX_VERSION, self._compression, end]
+        numpy.save(index_writer, numpy.array(
+            header + self._positions + [end], dtype=numpy.int64))
+
     def __enter__(self):
         return self
 
@@ -39,7 +109,11 @@ class PickleDatasetWriter(object):
 
     def write(self, x):
         position = self._writer.tell()
-        pickle.dump(x, self._writer, protocol=self._protocol)
+        if self._compressor is None:
+            pickle.dump(x, self._writer, protocol=self._protocol)
+        else:
+            self._writer.write(self._compressor.compress(
+                pickle.dumps(x, protocol=self._protocol)))
         self._positions.append(position)
 
     def flush(self):
@@ -75,31 +149,72 @@ class PickleDataset(dataset_mixin.DatasetMixin):
         import os
         os.close(fs)
 
+    If ``index`` is not given, all the records are unpickled in the
+    constructor to find their offsets. Give the index written by
+    :class:`PickleDatasetWriter` to skip it.
+
+    Records are read with a lock that serializes the access to ``reader``.
+    If ``reader`` has a ``pread(size, offset)`` method, which reads bytes at
+    the offset without changing the file position, it is called without the
+    lock instead, so that many threads can read records concurrently.
+    The reader made by :func:`open_pickle_dataset` has the method on
+    platforms that support :func:`os.pread`.
+
     Args:
         reader: File like object. `reader` must support random access.
+        index: File like object to read the index written by
+            :class:`PickleDatasetWriter` from. It is read in the constructor.
 
     """
 
-    def __init__(self, reader):
+    def __init__(self, reader, index=None):
         # Only py3 supports `seekable` method
         if six.PY3 and not reader.seekable():
             raise ValueError('reader must support random access')
         self._reader = reader
-        self._positions = []
+        self._lock = threading.RLock()
+
+        # `offsets` is an int64 array of the offsets of the records followed
+        # by the end of the last record.
+        if index is None:
+            self._decompressor = None
+            self._offsets = self._scan()
+        else:
+            self._load_index(index)
+
+        # TODO: Avoid using undocumented feature
+        multiprocessing.util.register_after_fork(
+            self, PickleDataset._after_fork)
+
+    def _scan(self):
+        reader = self._reader
+        positions = []
         reader.seek(0)
         while True:
             position = reader.tell()
+            positions.append(position)
             try:
                 pickle.load(reader)
             except EOFError:
                 break
-            self._positions.append(position)
+        return numpy.array(positions, dtype=numpy.int64)
 
-        self._lock = threading.RLock()
+    def _load_index(self, index):
+        data = _read_index(index)
+        if data is None:
+            raise ValueError('invalid index of PickleDataset')
+        compression, size = int(data[1]), int(data[2])
 
-        # TODO: Avoid using undocumented feature
-        multiprocessing.util.register_after_fork(
-            self, PickleDataset._after_fork)
+        self._reader.seek(0, io.SEEK_END)
+        if self._reader.tell() != size:
+            raise ValueError('index does not match the data')
+
+        if compression == 0:
+            self._decompressor = None
+        else:
+            self._decompressor = importlib.import_module(
+                _COMPRESSIONS[compression - 1])
+        self._offsets = data[3:]
 
     def _after_fork(self):
         if callable(getattr(self._reader, 'after_fork', None)):
@@ -121,12 +236,28 @@ class PickleDataset(dataset_mixin.DatasetMixin):
         self.close()
 
     def __len__(self):
-        return len(self._positions)
+        return len(self._offsets) - 1
 
-    def get_example(self, index):
+    def _read(self, offset, size):
+        pread = getattr(self._reader, 'pread', None)
+        if callable(pread):
+            return pread(size, offset)
         with self._lock:
-            self._reader.seek(self._positions[index])
-            return pickle.load(self._reader)
+            self._reader.seek(offset)
+            return self._reader.read(size)
+
+    def get_example(self, index):
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('index out of range')
+
+        offset = int(self._offsets[index])
+        data = self._read(offset, int(self._offsets[index + 1]) - offset)
+        if self._decompressor is not None:
+            data = self._decompressor.decompress(data)
+        return pickle.loads(data)
 
 
 class _FileReader(io.RawIOBase):
@@ -175,6 +306,36 @@ class _FileReader(io.RawIOBase):
     def readinto(self, b):
         return self._fp.readinto(b)
 
+    if hasattr(os, 'pread'):
+        def pread(self, size, offset):
+            """Reads bytes at the offset without changing the position."""
+            return os.pread(self.fileno(), size, offset)
+
+
+class _IndexFileWriter(object):
+
+    # Writes the index to a temporary file, which is renamed to the path
+    # when it is closed, so that a writer that is not closed does not leave
+    # an incomplete index.
+
+    def __init__(self, path):
+        self._path = path
+        self._temp_path = path + '.tmp'
+        self._fp = open(self._temp_path, 'wb')
+
+    def write(self, data):
+        return self._fp.write(data)
+
+    def close(self):
+        if self._fp.closed:
+            return
+        self._fp.close()
+        os.replace(self._temp_path, self._path)
+
+    def discard(self):
+        self._fp.close()
+        os.remove(self._temp_path)
+
 
 def open_pickle_dataset(path):
     """Opens a dataset stored in a given path.
@@ -182,6 +343,11 @@ def open_pickle_dataset(path):
     This is a helper function to open :class:`PickleDataset`. It opens a given
     file in binary mode, and creates a :class:`PickleDataset` instance.
 
+    If the index written by :func:`open_pickle_dataset_writer` exists next
+    to the file, it is used to open the dataset. If the index is invalid or
+    does not match the data, the records are found by unpickling all of
+    them instead, unless they are compressed.
+
     This method does not close the opened file. A user needs to call
     :func:`PickleDataset.close` or use `with`:
 
@@ -200,15 +366,35 @@ def open_pickle_dataset(path):
 
     """
     reader = _FileReader(path)
-    return PickleDataset(reader)
-
-
-def open_pickle_dataset_writer(path, protocol=pickle.HIGHEST_PROTOCOL):
+    index_path = _index_path(path)
+    try:
+        if not os.path.exists(index_path):
+            return PickleDataset(reader)
+        with open(index_path, 'rb') as index:
+            data = _read_index(index)
+            # Compressed records can only be read with the index.
+            if data is not None and (
+                    data[1] != 0 or data[2] == os.path.getsize(path)):
+                index.seek(0)
+                return PickleDataset(reader, index=index)
+        warnings.warn(
+            'The index of PickleDataset {} is invalid or does not match the '
+            'data. It is ignored.'.format(index_path))
+        return PickleDataset(reader)
+    except Exception:
+        reader.close()
+        raise
+
+
+def open_pickle_dataset_writer(path, protocol=pickle.HIGHEST_PROTOCOL,
+                               compression=None):
     """Opens a writer to make a PickleDataset.
 
     This is a helper function to open :class:`PickleDatasetWriter`. It opens a
     given file in binary mode and creates a :class:`PickleDatasetWriter`
-    instance.
+    instance. The index of the records is written to the file of the path
+    with the suffix ``.index`` when the writer is closed. An existing index
+    is removed when the writer is opened.
 
     This method does not close the opened file. A user needs to call
     :func:`PickleDatasetWriter.close` or use `with`:
@@ -221,6 +407,8 @@ def open_pickle_dataset_writer(path, protocol=pickle.HIGHEST_PROTOCOL):
     Args:
         path (str): Path to a dataset.
         protocol (int): Valid protocol for :mod:`pickle`.
+        compression (str): Name of the method to compress each record with.
+            See :class:`PickleDatasetWriter` for the details.
 
     Returns:
         chainer.datasets.PickleDatasetWriter: Opened writer.
@@ -228,5 +416,20 @@ def open_pickle_dataset_writer(path, protocol=pickle.HIGHEST_PROTOCOL):
     .. seealso: chainer.datasets.PickleDataset
 
     """
+    index_path = _index_path(path)
+    if os.path.exists(index_path):
+        os.remove(index_path)
     writer = open(path, 'wb')
-    return PickleDatasetWriter(writer, protocol=protocol)
+    try:
+        index_writer = _IndexFileWriter(index_path)
+    except Exception:
+        writer.close()
+        raise
+    try:
+        return PickleDatasetWriter(
+            writer, protocol=protocol, index_writer=index_writer,
+            compression=compression)
+    except Exception:
+        writer.close()
+        index_writer.discard()
+        raise
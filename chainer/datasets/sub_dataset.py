@@ -1,6 +1,7 @@
 import numpy
 import six
 import warnings
+from chainer.dataset import _batch
 from chainer.dataset import dataset_mixin
 
 
@@ -61,6 +62,32 @@ class SubDataset(dataset_mixin.DatasetMixin):
     def __len__(self):
         return self._size
 
+    def __getitem__(self, index):
+        if type(self).get_example is not SubDataset.get_example:
+            # get_example is overridden, so it is used for each example.
+            return super(SubDataset, self).__getitem__(index)
+        # The indices are mapped to those of the base dataset at once, which
+        # is then indexed by one call if possible.
+        if isinstance(index, slice):
+            current, stop, step = index.indices(len(self))
+            indices = numpy.arange(current, stop, step)
+        elif isinstance(index, list) or isinstance(index, numpy.ndarray):
+            indices = numpy.asarray(index, dtype=numpy.int64)
+        else:
+            return self.get_example(index)
+
+        if len(indices) == 0:
+            return []
+        if indices.min() < -self._size or self._size <= indices.max():
+            raise IndexError('dataset index out of range')
+        indices = numpy.where(
+            indices >= 0, self._start + indices, self._finish + indices)
+        if isinstance(self._order, numpy.ndarray):
+            indices = self._order[indices]
+        elif self._order is not None:
+            indices = [self._order[i] for i in indices.tolist()]
+        return _batch.get_examples(self._dataset, indices)
+
     def get_example(self, i):
         if i >= 0:
             if i >= self._size:
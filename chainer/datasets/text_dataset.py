@@ -1,12 +1,106 @@
+import codecs
+import hashlib
 import io
+import locale
+import mmap
+import os
 import sys
+import tempfile
 import threading
 
+import numpy
 import six
 
 from chainer.dataset import dataset_mixin
 
 
+_INDEX_VERSION = 1
+
+# Number of bytes scanned at a time to find line boundaries.
+_SCAN_CHUNK_SIZE = 1 << 24
+
+
+def _is_ascii_compatible(encoding):
+    # Line boundaries can be found in bytes if the newline characters are
+    # encoded as the ASCII bytes and never appear in multi-byte sequences.
+    try:
+        encoded = codecs.encode('a\r\n', encoding)
+        decoded = codecs.decode(b'\r\n', encoding)
+    except (LookupError, UnicodeError):
+        return False
+    return encoded.endswith(b'a\r\n') and decoded == '\r\n'
+
+
+def _find_line_bounds(path, newline):
+    # Returns the byte offsets of the line boundaries of the file as an int64
+    # array, i.e., i-th line starts at `bounds[i]` and ends at `bounds[i+1]`.
+    size = os.path.getsize(path)
+    if size == 0:
+        return numpy.zeros(1, dtype=numpy.int64)
+
+    data = numpy.memmap(path, dtype=numpy.uint8, mode='r')
+    ends = [numpy.zeros(1, dtype=numpy.int64)]
+    for start in six.moves.range(0, size, _SCAN_CHUNK_SIZE):
+        stop = min(start + _SCAN_CHUNK_SIZE, size)
+        # One byte beyond the chunk is looked at to find CRLF.
+        chunk = data[start:min(stop + 1, size)]
+        lf = numpy.flatnonzero(chunk[:stop - start] == 0x0a)
+        cr = numpy.flatnonzero(chunk[:stop - start] == 0x0d)
+        if newline == '\n':
+            found = lf
+        elif newline == '\r':
+            found = cr
+        else:
+            # CR followed by LF ends a line at LF.
+            cr_lf = cr[cr + 1 < len(chunk)]
+            cr_lf = cr_lf[chunk[cr_lf + 1] == 0x0a]
+            if newline == '\r\n':
+                found = cr_lf + 1
+            else:
+                found = numpy.union1d(lf, numpy.setdiff1d(cr, cr_lf))
+        ends.append(found.astype(numpy.int64) + (start + 1))
+    del data
+
+    bounds = numpy.concatenate(ends)
+    if bounds[-1] != size:
+        # The last line does not end with a newline.
+        bounds = numpy.append(bounds, size)
+    return bounds
+
+
+def _load_line_bounds(path, newline, cache_dir):
+    # Loads the line boundaries from the index file in `cache_dir`, or builds
+    # and writes it if it does not exist or the text file has been modified.
+    stat = os.stat(path)
+    header = numpy.array(
+        [_INDEX_VERSION, stat.st_size, stat.st_mtime_ns], dtype=numpy.int64)
+    digest = hashlib.sha1('{}\0{!r}'.format(
+        os.path.abspath(path), newline).encode('utf-8')).hexdigest()
+    index_path = os.path.join(cache_dir, '{}.npy'.format(digest))
+
+    try:
+        index = numpy.load(index_path, mmap_mode='r')
+    except (IOError, ValueError):
+        index = None
+    if (index is not None and index.dtype == numpy.int64
+            and index.ndim == 1 and len(index) > len(header)
+            and (index[:len(header)] == header).all()):
+        return index[len(header):]
+
+    bounds = _find_line_bounds(path, newline)
+    # The index is written to a temporary file and then renamed so that other
+    # processes never read a partially written index.
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.npy')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            numpy.save(f, numpy.concatenate([header, bounds]))
+        os.replace(temp_path, index_path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return bounds
+
+
 class TextDataset(dataset_mixin.DatasetMixin):
 
     """Dataset of a line-oriented text file.
@@ -16,11 +110,22 @@ class TextDataset(dataset_mixin.DatasetMixin):
     Positions of line boundaries are cached so that you can quickliy
     random access the text file by the line number.
 
+    If the encoding of a file encodes the newline characters as the ASCII
+    bytes (e.g., ASCII, UTF-8 and its variants, and Latin-1), the line
+    boundaries are found by scanning the raw bytes in chunks, and the file
+    is memory-mapped so that lines are read without any lock, which makes
+    concurrent access from many threads scalable. Other files are read by the
+    text file objects as in :func:`open`.
+
     .. note::
         Cache will be built in the constructor.
         You can pickle and unpickle the dataset to reuse the cache, but in
         that case you are responsible to guarantee that files are not
         modified after the cache has built.
+        If ``cache_dir`` is given, the line boundaries are also stored there
+        as files of ``int64`` arrays and reused in later constructions, e.g.,
+        in other processes, as long as the size and the modification time
+        of the text files are unchanged.
 
     Args:
         paths (str or list of str):
@@ -54,12 +159,16 @@ class TextDataset(dataset_mixin.DatasetMixin):
             the number of files. Arguments are lines loaded from each file.
             The filter function must return True to accept the line, or
             return False to skip the line.
+        cache_dir (str):
+            Directory to store the line boundaries of the text files in.
+            It is created if it does not exist. If it is :obj:`None`, the
+            line boundaries are not stored.
 
     """
 
     def __init__(
             self, paths, encoding=None, errors=None, newline=None,
-            filter_func=None):
+            filter_func=None, cache_dir=None):
         if isinstance(paths, six.string_types):
             paths = [paths]
         elif not paths:
@@ -77,41 +186,51 @@ class TextDataset(dataset_mixin.DatasetMixin):
                 'length of each option must match with the number of '
                 'text files to read')
 
+        if cache_dir is not None and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
         self._paths = paths
         self._encoding = encoding
         self._errors = errors
         self._newline = newline
         self._fps = None
+        self._lock = threading.Lock()
+
+        # Files that can be memory-mapped; see `_open`.
+        self._mapped = [
+            _is_ascii_compatible(
+                enc if enc is not None else locale.getpreferredencoding(False))
+            for enc in encoding]
 
         self._open()
 
         # Line number is 0-origin.
-        # `lines` is a list of line numbers not filtered; if no filter_func is
-        # given, it is range(linenum)).
         # `bounds` is a list of cursor positions of line boundaries for each
-        # file, i.e. i-th line of k-th file starts at `bounds[k][i]`.
-        linenum = 0
-        lines = []
-        bounds = tuple([[0] for _ in self._fps])
-        while True:
-            data = [fp.readline() for fp in self._fps]
-            if not all(data):  # any of files reached EOF
-                if any(data):  # not all files reached EOF
-                    raise ValueError(
-                        'number of lines in files does not match')
-                break
-            for i, fp in enumerate(self._fps):
-                bounds[i].append(fp.tell())
-            if filter_func is not None and filter_func(*data):
-                lines.append(linenum)
-            linenum += 1
+        # file, i.e. i-th line of k-th file starts at `bounds[k][i]`. It is an
+        # int64 array of byte offsets for memory-mapped files.
+        bounds = []
+        for k, path in enumerate(paths):
+            if not self._mapped[k]:
+                bounds.append(self._scan_line_bounds(k))
+            elif cache_dir is None:
+                bounds.append(_find_line_bounds(path, newline[k]))
+            else:
+                bounds.append(
+                    _load_line_bounds(path, newline[k], cache_dir))
+        linenum = len(bounds[0]) - 1
+        if any(len(b) - 1 != linenum for b in bounds):
+            raise ValueError('number of lines in files does not match')
+        self._bounds = tuple(bounds)
 
+        # `lines` is an array of line numbers not filtered; if no filter_func
+        # is given, it is range(linenum)).
         if filter_func is None:
-            lines = six.moves.range(linenum)
-
-        self._bounds = bounds
-        self._lines = lines
-        self._lock = threading.Lock()
+            self._lines = six.moves.range(linenum)
+        else:
+            self._lines = numpy.array(
+                [i for i in six.moves.range(linenum)
+                 if filter_func(*self._read_lines(i))],
+                dtype=numpy.int64)
 
     def __getstate__(self):
         state = self.__dict__.copy()
@@ -127,18 +246,45 @@ class TextDataset(dataset_mixin.DatasetMixin):
     def __len__(self):
         return len(self._lines)
 
+    def __getitem__(self, index):
+        if type(self).get_example is not TextDataset.get_example:
+            # get_example is overridden, so it is used for each example.
+            return super(TextDataset, self).__getitem__(index)
+        if isinstance(index, slice):
+            current, stop, step = index.indices(len(self))
+            return self.get_examples(
+                numpy.arange(current, stop, step, dtype=numpy.int64))
+        elif isinstance(index, list) or isinstance(index, numpy.ndarray):
+            return self.get_examples(index)
+        else:
+            return self.get_example(index)
+
     def _open(self):
-        self._fps = [
-            io.open(
-                path,
-                mode='rt',
-                encoding=encoding,
-                errors=errors,
-                newline=newline,
-            ) for path, encoding, errors, newline in
-            six.moves.zip(self._paths, self._encoding, self._errors,
-                          self._newline)
-        ]
+        # Memory-mapped files are held by mmap objects, and others are held
+        # by text file objects. Empty files cannot be memory-mapped, but no
+        # line is read from them.
+        fps = []
+        for k, path in enumerate(self._paths):
+            if self._mapped[k] and os.path.getsize(path) > 0:
+                with io.open(path, 'rb') as f:
+                    fps.append(
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                fps.append(io.open(
+                    path,
+                    mode='rt',
+                    encoding=self._encoding[k],
+                    errors=self._errors[k],
+                    newline=self._newline[k],
+                ))
+        self._fps = fps
+
+    def _scan_line_bounds(self, k):
+        fp = self._fps[k]
+        bounds = [0]
+        while fp.readline():
+            bounds.append(fp.tell())
+        return bounds
 
     def close(self):
         """Manually closes all text files.
@@ -155,18 +301,71 @@ class TextDataset(dataset_mixin.DatasetMixin):
         if exc is not None:
             six.reraise(*exc)
 
+    def _decode(self, k, data):
+        encoding = self._encoding[k]
+        if encoding is None:
+            encoding = locale.getpreferredencoding(False)
+        line = data.decode(encoding, self._errors[k] or 'strict')
+        if self._newline[k] is None:
+            line = line.replace('\r\n', '\n').replace('\r', '\n')
+        return line
+
+    def _read_file_lines(self, k, linenums):
+        fp = self._fps[k]
+        bounds = self._bounds[k]
+        if self._mapped[k]:
+            # Slicing mmap does not move its file position, so that lines are
+            # read without any lock.
+            starts = bounds[linenums].tolist()
+            stops = bounds[linenums + 1].tolist()
+            return [self._decode(k, fp[start:stop])
+                    for start, stop in six.moves.zip(starts, stops)]
+
+        with self._lock:
+            lines = []
+            for linenum in linenums.tolist():
+                fp.seek(bounds[linenum])
+                lines.append(fp.readline())
+            return lines
+
+    def _read_lines(self, linenum):
+        linenums = numpy.array([linenum], dtype=numpy.int64)
+        return [self._read_file_lines(k, linenums)[0]
+                for k in six.moves.range(len(self._fps))]
+
     def get_example(self, idx):
         if idx < 0 or len(self._lines) <= idx:
             raise IndexError
-        linenum = self._lines[idx]
-
-        self._lock.acquire()
-        try:
-            for k, fp in enumerate(self._fps):
-                fp.seek(self._bounds[k][linenum])
-            lines = [fp.readline() for fp in self._fps]
-            if len(lines) == 1:
-                return lines[0]
-            return tuple(lines)
-        finally:
-            self._lock.release()
+        lines = self._read_lines(self._lines[idx])
+        if len(lines) == 1:
+            return lines[0]
+        return tuple(lines)
+
+    def get_examples(self, indices):
+        """Returns a list of examples of the given indices.
+
+        This method reads the lines of each file at once, and is used by the
+        :meth:`__getitem__` operator for slices, lists and arrays.
+
+        Args:
+            indices (list or numpy.ndarray): Indices of the examples.
+
+        Returns:
+            list of examples, each of which is the same as that returned by
+            :meth:`get_example`.
+
+        """
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        if indices.size and (indices.min() < 0
+                             or len(self._lines) <= indices.max()):
+            raise IndexError
+        if isinstance(self._lines, numpy.ndarray):
+            linenums = self._lines[indices]
+        else:
+            linenums = indices
+
+        lines = [self._read_file_lines(k, linenums)
+                 for k in six.moves.range(len(self._fps))]
+        if len(lines) == 1:
+            return lines[0]
+        return list(six.moves.zip(*lines))
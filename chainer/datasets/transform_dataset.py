@@ -1,3 +1,6 @@
+import numpy
+
+from chainer.dataset import _batch
 from chainer.dataset import dataset_mixin
 
 
@@ -47,6 +50,19 @@ class TransformDataset(dataset_mixin.DatasetMixin):
     def __len__(self):
         return len(self._dataset)
 
+    def __getitem__(self, index):
+        if type(self).get_example is not TransformDataset.get_example:
+            # get_example is overridden, so it is used for each example.
+            return super(TransformDataset, self).__getitem__(index)
+        # The base dataset is indexed by one call if possible.
+        if isinstance(index, slice):
+            current, stop, step = index.indices(len(self))
+            index = numpy.arange(current, stop, step)
+        elif not (isinstance(index, list) or isinstance(index, numpy.ndarray)):
+            return self.get_example(index)
+        return [self._transform(in_data)
+                for in_data in _batch.get_examples(self._dataset, index)]
+
     def get_example(self, i):
         in_data = self._dataset[i]
         return self._transform(in_data)
@@ -0,0 +1,330 @@
+import json
+import os
+import random
+import time
+import weakref
+
+import numpy
+
+import chainer
+from chainer.backends import cuda
+from chainer import function_hook
+from chainer import link_hook
+
+
+# Select the best-resolution timer function
+try:
+    _get_time = time.perf_counter
+except AttributeError:
+    if os.name == 'nt':
+        _get_time = time.clock
+    else:
+        _get_time = time.time
+
+
+# Kinds of spans
+_FORWARD = 0
+_BACKWARD = 1
+_LINK = 2
+_CATEGORIES = ('forward', 'backward', 'link')
+
+# Strings (names, link paths and descriptions of inputs) are stored as
+# indices to the string table of the hook.
+_event_dtype = numpy.dtype([
+    ('kind', numpy.uint8),
+    ('name', numpy.int32),
+    ('link', numpy.int32),
+    ('inputs', numpy.int32),
+    ('start', numpy.float64),
+    ('duration', numpy.float64),
+    ('nbytes', numpy.int64),
+])
+
+_UNSAMPLED = (False, None, None, None, 0)
+
+
+class _LinkTraceHook(link_hook.LinkHook):
+
+    # Link hook that records the forward calls of links into a TraceHook.
+
+    name = 'TraceHook'
+
+    def __init__(self, trace):
+        self._trace = trace
+
+    def forward_preprocess(self, args):
+        self._trace._link_preprocess(args)
+
+    def forward_postprocess(self, args):
+        self._trace._link_postprocess(args)
+
+
+class TraceHook(function_hook.FunctionHook):
+    """Function hook for recording a trace of functions and links.
+
+    This hook records a span for each forward and backward computation of a
+    function, and for each forward call of a link when it is used with the
+    ``with`` statement. Each span holds the elapsed time, the shapes and the
+    dtypes of the inputs, the path of the link that calls the function, and
+    the bytes allocated from the CuPy memory pool. The spans are stored in a
+    preallocated array of records; when it is full, the oldest spans are
+    overwritten. The trace can be exported in the Chrome trace event format,
+    which can be viewed with ``chrome://tracing`` or Perfetto.
+
+    Example:
+        Code example::
+
+            from chainer.function_hooks import TraceHook
+            hook = TraceHook(sampling_rate=0.01)
+            with hook:
+                trainer.run()
+            hook.save_chrome_trace('trace.json')
+
+    With ``sampling_rate``, each outermost span, e.g., a forward call of the
+    model or a backward computation of a function, is recorded with that
+    probability together with all the spans in it. The other spans cost only
+    a few operations, so that the hook can be kept enabled during training.
+
+    .. note::
+       Spans of functions and links that raise exceptions are not recorded.
+       They are discarded when the enclosing span ends or the hook exits.
+
+    .. note::
+       The time is measured on the host. Since kernels run asynchronously on
+       GPU, the spans of GPU computation show the time to launch them.
+
+    Args:
+        max_events (int): Number of spans to keep.
+        sampling_rate (float): Probability to record each outermost span.
+        trace_links (bool): If ``True``, the forward calls of links are
+            recorded when the hook is used with the ``with`` statement.
+        seed (int): Seed of the random numbers for sampling.
+
+    """
+
+    name = 'TraceHook'
+
+    def __init__(self, max_events=1000000, sampling_rate=1.0,
+                 trace_links=True, seed=None):
+        if max_events <= 0:
+            raise ValueError('max_events must be positive')
+        if not 0 < sampling_rate <= 1:
+            raise ValueError('sampling_rate must be in (0, 1]')
+
+        self._events = numpy.zeros(max_events, dtype=_event_dtype)
+        self._n_events = 0
+        self._strings = []
+        self._string_ids = {}
+        self._descriptions = {}
+        self._sampling_rate = sampling_rate
+        self._random = random.Random(seed)
+        self._origin = _get_time()
+        if cuda.available:
+            self._memory_pool = cuda.cupy.get_default_memory_pool()
+        else:
+            self._memory_pool = None
+        self._link_hook = _LinkTraceHook(self) if trace_links else None
+
+        # `stack` holds (sampled, start time, used bytes, owner, number of
+        # link paths) of the running spans, where the owner is the function
+        # or the link of the span, and `link_paths` holds the path ids of the
+        # running links (or the links of the running backward computations).
+        self._stack = []
+        self._link_paths = []
+        self._function_links = weakref.WeakKeyDictionary()
+
+    def __enter__(self):
+        super(TraceHook, self).__enter__()
+        if self._link_hook is not None:
+            try:
+                self._link_hook.__enter__()
+            except Exception:
+                super(TraceHook, self).__exit__()
+                raise
+        return self
+
+    def __exit__(self, *args):
+        if self._link_hook is not None:
+            self._link_hook.__exit__(*args)
+        super(TraceHook, self).__exit__(*args)
+        self._discard_spans()
+
+    def added(self, function):
+        self._discard_spans()
+
+    def _discard_spans(self):
+        # Spans left by exceptions are discarded.
+        del self._stack[:]
+        del self._link_paths[:]
+
+    @property
+    def n_events(self):
+        """Number of spans recorded so far, including overwritten ones."""
+        return self._n_events
+
+    @property
+    def n_dropped(self):
+        """Number of spans overwritten by newer ones."""
+        return max(0, self._n_events - len(self._events))
+
+    def clear(self):
+        """Discards all the recorded spans."""
+        self._n_events = 0
+
+    def _intern(self, string):
+        i = self._string_ids.get(string)
+        if i is None:
+            i = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = i
+        return i
+
+    def _describe(self, arrays):
+        key = tuple([None if x is None else (x.shape, x.dtype)
+                     for x in arrays])
+        i = self._descriptions.get(key)
+        if i is None:
+            i = self._intern(', '.join(
+                'None' if k is None else '{}{}'.format(k[1], list(k[0]))
+                for k in key))
+            self._descriptions[key] = i
+        return i
+
+    def _push(self, owner):
+        stack = self._stack
+        if stack:
+            sampled = stack[-1][0]
+        else:
+            sampled = (self._sampling_rate >= 1
+                       or self._random.random() < self._sampling_rate)
+        n_link_paths = len(self._link_paths)
+        if not sampled:
+            stack.append((False, None, None, owner, n_link_paths))
+            return False
+
+        pool = self._memory_pool
+        used_bytes = -1 if pool is None else pool.used_bytes()
+        stack.append((True, _get_time(), used_bytes, owner, n_link_paths))
+        return True
+
+    def _pop(self, owner):
+        # Pops the span of the owner and returns it with the link path
+        # pushed in it. Spans left above it by exceptions raised in a
+        # function or a link are discarded with their link paths.
+        stack = self._stack
+        while stack:
+            span = stack.pop()
+            if span[3] is owner:
+                break
+        else:
+            # The hook was added while the owner was running.
+            return _UNSAMPLED, -1
+        link_paths = self._link_paths
+        n_link_paths = span[4]
+        path = link_paths[n_link_paths] \
+            if len(link_paths) > n_link_paths else -1
+        del link_paths[n_link_paths:]
+        return span, path
+
+    def _record(self, span, kind, name, link, arrays):
+        _, start, used_bytes = span[:3]
+        stop = _get_time()
+
+        if used_bytes >= 0:
+            used_bytes = self._memory_pool.used_bytes() - used_bytes
+        events = self._events
+        events[self._n_events % len(events)] = (
+            kind, self._intern(name), link, self._describe(arrays),
+            (start - self._origin) * 1e6, (stop - start) * 1e6, used_bytes)
+        self._n_events += 1
+
+    def forward_preprocess(self, function, in_data):
+        self._push(function)
+
+    def forward_postprocess(self, function, in_data):
+        span, _ = self._pop(function)
+        if not span[0]:
+            return
+        link = self._link_paths[-1] if self._link_paths else -1
+        self._record(span, _FORWARD, function._impl_name, link, in_data)
+        # The link is also attributed to the backward computation.
+        self._function_links[function] = link
+
+    def backward_preprocess(self, function, in_data, out_grad):
+        if self._push(function):
+            # Functions called in the backward computation are attributed to
+            # the link of the function.
+            self._link_paths.append(self._function_links.get(function, -1))
+
+    def backward_postprocess(self, function, in_data, out_grad):
+        span, link = self._pop(function)
+        if span[0]:
+            self._record(span, _BACKWARD, function._impl_name, link, in_data)
+
+    def _link_preprocess(self, args):
+        link = args.link
+        if not self._push(link):
+            return
+        if self._link_paths and self._link_paths[-1] >= 0:
+            parent = self._strings[self._link_paths[-1]]
+        else:
+            parent = ''
+        name = link.name if link.name is not None else type(link).__name__
+        self._link_paths.append(self._intern(parent + '/' + name))
+
+    def _link_postprocess(self, args):
+        span, path = self._pop(args.link)
+        if not span[0]:
+            return
+        arrays = [x.array if isinstance(x, chainer.Variable) else x
+                  for x in args.args
+                  if isinstance(x, chainer.Variable)
+                  or isinstance(x, chainer.get_array_types())]
+        self._record(span, _LINK, type(args.link).__name__, path, arrays)
+
+    def _ordered_events(self):
+        n = self._n_events
+        size = len(self._events)
+        if n <= size:
+            return self._events[:n]
+        i = n % size
+        return numpy.concatenate((self._events[i:], self._events[:i]))
+
+    def chrome_trace(self):
+        """Returns the trace in the Chrome trace event format.
+
+        Each span is a complete event (``'ph': 'X'``) whose category is
+        ``'forward'``, ``'backward'`` or ``'link'``. Its ``args`` holds the
+        description of the inputs (``'inputs'``), the path of the link
+        (``'link'``) and the bytes allocated from the CuPy memory pool
+        (``'bytes'``) if they are available.
+
+        Returns:
+            dict: Trace that can be serialized to JSON.
+
+        """
+        strings = self._strings
+        pid = os.getpid()
+        events = []
+        for kind, name, link, inputs, start, duration, nbytes in \
+                self._ordered_events().tolist():
+            args = {'inputs': strings[inputs]}
+            if link >= 0:
+                args['link'] = strings[link]
+            if nbytes >= 0:
+                args['bytes'] = nbytes
+            events.append({
+                'name': strings[name], 'cat': _CATEGORIES[kind], 'ph': 'X',
+                'ts': start, 'dur': duration, 'pid': pid, 'tid': 0,
+                'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save_chrome_trace(self, filename):
+        """Saves the trace in the Chrome trace event format.
+
+        Args:
+            filename (str): Path to the output JSON file.
+
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.chrome_trace(), f)
@@ -1207,7 +1207,8 @@ def grad(outputs, inputs, grad_outputs=None, grad_inputs=None, set_grad=False,
 
     # Backprop implementation. It edits grads which will only contain the
     # gradients w.r.t. the inputs.
-    with chainer.using_config('enable_backprop', enable_double_backprop):
+    with chainer.using_config('enable_backprop', enable_double_backprop), \
+            _backprop_utils.setting_leaf_grads(False):
         ret_dict = _backprop(
             outputs, inputs, grad_required, retain_grad, grads, loss_scale)
 
@@ -1231,12 +1232,7 @@ def _backprop(outputs, inputs, grad_required, retain_grad, grads, loss_scale):
     input_nodes = set(x.node for x in inputs)
     ret_dict = {}
 
-    is_debug = chainer.is_debug()
-    base_hooks = chainer.get_function_hooks().values()
-    while candidate_funcs:
-        func = pop_candidate()
-
-        # Collect the gradients w.r.t. the outputs
+    def collect_grad_outputs(func):
         ys = [y() for y in func.outputs]  # access via weak ref
         gys = tuple([grads.pop(y)
                      if y is not None and y.creator_node is not None else None
@@ -1252,6 +1248,39 @@ def _backprop(outputs, inputs, grad_required, retain_grad, grads, loss_scale):
                     if y is not None:
                         y.grad_var = gy
                         y._loss_scale = loss_scale
+        return gys
+
+    def requires_grad(x):
+        return x in grad_required
+
+    def add_input(x):
+        creator = x.creator_node
+        if creator is not None:
+            push_candidate(creator)
+
+    is_debug = chainer.is_debug()
+    base_hooks = chainer.get_function_hooks().values()
+    n_threads = chainer.config.backward_num_threads
+    while candidate_funcs:
+        func = pop_candidate()
+        if (n_threads > 1 and candidate_funcs
+                and candidate_funcs[0][0] == -func.rank and not base_hooks):
+            # Functions of the same rank do not depend on each other.
+            entries = []
+            while candidate_funcs and candidate_funcs[0][0] == -func.rank:
+                entries.append(heapq.heappop(candidate_funcs))
+            level = [func] + [entry[2] for entry in entries]
+            if all([f._n_local_function_hooks == 0 for f in level]):
+                _backprop_utils.backprop_level(
+                    level, collect_grad_outputs, requires_grad, grads,
+                    add_input, is_debug, n_threads)
+                continue
+            # Fall back to the serial execution to run the local hooks.
+            for entry in entries:
+                heapq.heappush(candidate_funcs, entry)
+
+        # Collect the gradients w.r.t. the outputs
+        gys = collect_grad_outputs(func)
 
         # Collect the gradients w.r.t. the inputs
         input_indexes = []
@@ -92,7 +92,9 @@ from chainer.functions.loss.absolute_error import absolute_error  # NOQA
 from chainer.functions.loss.black_out import black_out  # NOQA
 from chainer.functions.loss.contrastive import contrastive  # NOQA
 from chainer.functions.loss.crf1d import argmax_crf1d  # NOQA
+from chainer.functions.loss.crf1d import argmax_padded_crf1d  # NOQA
 from chainer.functions.loss.crf1d import crf1d  # NOQA
+from chainer.functions.loss.crf1d import padded_crf1d  # NOQA
 from chainer.functions.loss.cross_covariance import cross_covariance  # NOQA
 from chainer.functions.loss.ctc import connectionist_temporal_classification  # NOQA
 from chainer.functions.loss.decov import decov  # NOQA
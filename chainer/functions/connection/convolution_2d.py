@@ -1,5 +1,3 @@
-import numpy
-
 import chainer
 from chainer import backend
 from chainer.backends import cuda
@@ -10,6 +8,7 @@ import chainer.functions
 from chainer import memory_layouts
 from chainer.utils import argument
 from chainer.utils import conv
+from chainer.utils import conv_nd
 from chainer.utils import type_check
 import chainerx
 
@@ -162,15 +161,11 @@ class Convolution2DFunction(function_node.FunctionNode):
         if self._use_ideep:
             return self._forward_ideep(x, W, b)
 
-        kh, kw = W.shape[2:]
-        col = conv.im2col_cpu(
-            x, kh, kw, self.sy, self.sx, self.ph, self.pw,
-            cover_all=self.cover_all, dy=self.dy, dx=self.dx)
-        y = numpy.tensordot(
-            col, W, ((1, 2, 3), (1, 2, 3))).astype(x.dtype, copy=False)
+        y = conv_nd.convolution_nd_cpu(
+            x, W, (self.sy, self.sx), (self.ph, self.pw),
+            cover_all=self.cover_all, dilate=(self.dy, self.dx))
         if b is not None:
-            y += b
-        y = numpy.rollaxis(y, 3, 1)
+            y += b.reshape((1, b.size, 1, 1))
         return y,
 
     def _forward_ideep(self, x, W, b):
@@ -367,18 +362,10 @@ class Convolution2DGradW(function_node.FunctionNode):
         if self._use_ideep:
             return self._forward_ideep(x, gy)
 
-        # NumPy raises an error when the array is not contiguous.
-        # See: https://github.com/chainer/chainer/issues/2744
-        # TODO(niboshi): Remove this code when NumPy is fixed.
-        if (not (gy.flags.c_contiguous or gy.flags.f_contiguous) and
-                1 in gy.shape):
-            gy = numpy.ascontiguousarray(gy)
-
-        col = conv.im2col_cpu(
-            x, self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
-            cover_all=self.cover_all, dy=self.dy, dx=self.dx)
-        gW = numpy.tensordot(gy, col, ((0, 2, 3), (0, 4, 5))
-                             ).astype(self.W_dtype, copy=False)
+        gW = conv_nd.convolution_nd_grad_w_cpu(
+            x, gy, (self.kh, self.kw), (self.sy, self.sx),
+            (self.ph, self.pw), cover_all=self.cover_all,
+            dilate=(self.dy, self.dx)).astype(self.W_dtype, copy=False)
         return gW,
 
     def _forward_ideep(self, x, gy):
@@ -133,13 +133,17 @@ class ConvolutionND(function_node.FunctionNode):
         pad = self.pad
         dilate = self.dilate
 
-        # Make patch array.
         if xp is numpy:
-            col = conv_nd.im2col_nd_cpu(
-                x, ksize, stride, pad, cover_all=self.cover_all, dilate=dilate)
-        else:
-            col = conv_nd.im2col_nd_gpu(
-                x, ksize, stride, pad, cover_all=self.cover_all, dilate=dilate)
+            # Compute correlation by tile-wise GEMM on a strided view.
+            y = conv_nd.convolution_nd_cpu(
+                x, W, stride, pad, cover_all=self.cover_all, dilate=dilate)
+            if b is not None:
+                y += b.reshape((1, -1) + (1,) * ndim)
+            return y,
+
+        # Make patch array.
+        col = conv_nd.im2col_nd_gpu(
+            x, ksize, stride, pad, cover_all=self.cover_all, dilate=dilate)
 
         # Compute correlation.
         axes = tuple(moves.range(1, ndim + 2))  # (1, 2, ..., N+1)
@@ -291,27 +295,21 @@ class ConvolutionNDGradW(function_node.FunctionNode):
 
     def _forward_xp_core(self, x, gy, xp):
         # Compute filter weight gradient.
+        if xp is numpy:
+            gW = conv_nd.convolution_nd_grad_w_cpu(
+                x, gy, self.ksize, self.stride, self.pad,
+                cover_all=self.cover_all, dilate=self.dilate).astype(
+                    self.W_dtype, copy=False)
+            return gW,
+
         # (n, _, out_1, out_2, ..., out_N)
         out_axes = (0,) + tuple(moves.range(2, self.ndim + 2))
         # (n, _, _, ..., _, out_1, out_2, ..., out_N)
         col_axes = (0,) + tuple(moves.range(self.ndim + 2, self.ndim * 2 + 2))
 
-        # NumPy raises an error when the array is not contiguous.
-        # See: https://github.com/chainer/chainer/issues/2744
-        # TODO(niboshi): Remove this code when NumPy is fixed.
-        if (xp is numpy and
-                not (gy.flags.c_contiguous or gy.flags.f_contiguous) and
-                1 in gy.shape):
-            gy = numpy.ascontiguousarray(gy)
-
-        if xp is numpy:
-            col = conv_nd.im2col_nd_cpu(
-                x, self.ksize, self.stride, self.pad,
-                cover_all=self.cover_all, dilate=self.dilate)
-        else:
-            col = conv_nd.im2col_nd_gpu(
-                x, self.ksize, self.stride, self.pad,
-                cover_all=self.cover_all, dilate=self.dilate)
+        col = conv_nd.im2col_nd_gpu(
+            x, self.ksize, self.stride, self.pad,
+            cover_all=self.cover_all, dilate=self.dilate)
         gW = xp.tensordot(gy, col, (out_axes, col_axes)).astype(
             self.W_dtype, copy=False)
         return gW,
@@ -127,16 +127,15 @@ class DeconvolutionND(function_node.FunctionNode):
         pad = self.pad
         dilate = self.dilate
 
-        # gcol: C_O, k_1, ..., k_N, n, d_1, ..., d_N
-        gcol = xp.tensordot(W, x, (0, 1)).astype(x.dtype, copy=False)
-        # Roll n, which is batch size, before the first.
-        gcol = xp.rollaxis(gcol, ndim + 1)
-
         # y: n, C_O, d_1, d_2, ..., d_N
         if xp is numpy:
-            y = conv_nd.col2im_nd_cpu(
-                gcol, stride, pad, self.outs, dilate=dilate)
+            y = conv_nd.deconvolution_nd_cpu(
+                x, W, stride, pad, self.outs, dilate=dilate)
         else:
+            # gcol: C_O, k_1, ..., k_N, n, d_1, ..., d_N
+            gcol = xp.tensordot(W, x, (0, 1)).astype(x.dtype, copy=False)
+            # Roll n, which is batch size, before the first.
+            gcol = xp.rollaxis(gcol, ndim + 1)
             y = conv_nd.col2im_nd_gpu(
                 gcol, stride, pad, self.outs, dilate=dilate)
         if b is not None:
@@ -2,17 +2,20 @@ import numpy
 import six
 
 import chainer
+from chainer import _backprop_utils
 from chainer import backend
 from chainer.backends import cuda
 from chainer import function_node
 from chainer import utils
 from chainer.utils import type_check
+from chainer import variable
 
 
 class EmbedIDFunction(function_node.FunctionNode):
 
-    def __init__(self, ignore_label=None):
+    def __init__(self, ignore_label=None, sparse_grad=False):
         self.ignore_label = ignore_label
+        self.sparse_grad = sparse_grad
 
     def check_type_forward(self, in_types):
         type_check.expect(in_types.size() == 2)
@@ -48,6 +51,26 @@ class EmbedIDFunction(function_node.FunctionNode):
 
     def backward(self, indexes, grad_outputs):
         inputs = self.get_retained_inputs()
+        if self.sparse_grad and _backprop_utils.sets_leaf_grads():
+            W = self.inputs[1].get_variable_or_none()
+            if isinstance(W, variable.Parameter):
+                # Accumulates the gradient of the looked-up rows directly
+                # into the parameter instead of returning a dense gradient.
+                # It is only done when the backprop sets the gradients of all
+                # the leaves (i.e. Variable.backward), since otherwise the
+                # gradient w.r.t. W is either not requested or returned to
+                # the caller (i.e. chainer.grad).
+                x = inputs[0].array.ravel()
+                gy = grad_outputs[0].array.reshape(x.size, -1)
+                if self.ignore_label is not None:
+                    mask = x != self.ignore_label
+                    x = x[mask]
+                    gy = gy[mask]
+                W._add_sparse_grad(x, gy)
+                # The update rule unscales the gradient by the loss scale
+                # recorded on W, as it does for the other leaves.
+                W._loss_scale = _backprop_utils.leaf_grads_loss_scale()
+                return None, None
         gW = EmbedIDGrad(
             self._w_shape, self.ignore_label).apply(inputs + grad_outputs)[0]
         return None, gW
@@ -118,7 +141,7 @@ class EmbedIDGrad(function_node.FunctionNode):
         return None, ggy
 
 
-def embed_id(x, W, ignore_label=None):
+def embed_id(x, W, ignore_label=None, sparse_grad=False):
     """Efficient linear function for one-hot input.
 
     This function implements so called *word embeddings*. It takes two
@@ -137,6 +160,17 @@ def embed_id(x, W, ignore_label=None):
         ignore_label (:class:`int` or :class:`None`):
             If ``ignore_label`` is an int value, ``i``-th row of return
             value is filled with ``0``.
+        sparse_grad (bool): If ``True`` and ``W`` is a
+            :class:`~chainer.Parameter`, the gradient w.r.t. ``W`` is
+            accumulated into :attr:`~chainer.Parameter.sparse_grad` as a
+            row-sparse gradient instead of :attr:`~chainer.Variable.grad`.
+            It avoids computing and updating the gradient of the whole
+            embedding matrix on each iteration. The row-sparse gradient is
+            only used by :meth:`~chainer.Variable.backward` and
+            :func:`chainer.backward`, which set the gradients of all the
+            leaf variables. :func:`chainer.grad` computes the dense gradient
+            as usual and never modifies ``W``. Higher order derivatives
+            w.r.t. ``W`` are not supported by the row-sparse gradient.
 
     Returns:
         ~chainer.Variable: Output variable.
@@ -165,4 +199,5 @@ def embed_id(x, W, ignore_label=None):
                [0., 0., 0.]], dtype=float32)
 
     """
-    return EmbedIDFunction(ignore_label=ignore_label).apply((x, W))[0]
+    return EmbedIDFunction(
+        ignore_label=ignore_label, sparse_grad=sparse_grad).apply((x, W))[0]
@@ -1,12 +1,20 @@
+import numpy
+import six
+
+import chainer
+from chainer import backend
+from chainer import function_node
 from chainer.functions.array import broadcast
 from chainer.functions.array import concat
 from chainer.functions.array import reshape
 from chainer.functions.array import select_item
 from chainer.functions.array import split_axis
+from chainer.functions.array import where
 from chainer.functions.connection import embed_id
 from chainer.functions.math import logsumexp
 from chainer.functions.math import minmax
 from chainer.functions.math import sum as _sum
+from chainer.utils import type_check
 
 
 def crf1d(cost, xs, ys, reduce='mean'):
@@ -209,3 +217,283 @@ def argmax_crf1d(cost, xs):
         score = concat.concat([score, minmax.max(a, axis=1)], axis=0)
 
     return score, path
+
+
+def _logsumexp(a, xp, axis):
+    vmax = xp.amax(a, axis=axis, keepdims=True)
+    y = xp.log(xp.sum(xp.exp(a - vmax), axis=axis, keepdims=True))
+    y += vmax
+    return xp.squeeze(y, axis=axis)
+
+
+def _padded_mask(lengths, length, xp):
+    # ``mask[b, t]`` is ``True`` iff ``t`` is within the ``b``-th sequence.
+    return xp.arange(length)[None, :] < lengths[:, None]
+
+
+class PaddedCRF1d(function_node.FunctionNode):
+
+    """Negative log-likelihood of linear-chain CRF on a padded batch.
+
+    The backward algorithm computing the gradients is not differentiable.
+    When the gradients are computed with ``enable_backprop``, the graph of
+    the forward algorithm is built from the inputs and differentiated
+    instead, so that higher order derivatives are available.
+
+    """
+
+    def __init__(self, reduce='mean'):
+        self.reduce = reduce
+
+    def check_type_forward(self, in_types):
+        type_check._argname(in_types, ('cost', 'x', 'y', 'lengths'))
+        cost_type, x_type, y_type, lengths_type = in_types
+        type_check.expect(
+            cost_type.dtype.kind == 'f',
+            cost_type.ndim == 2,
+            cost_type.shape[0] == cost_type.shape[1],
+            x_type.dtype == cost_type.dtype,
+            x_type.ndim == 3,
+            x_type.shape[2] == cost_type.shape[0],
+            y_type.dtype == numpy.int32,
+            y_type.ndim == 2,
+            y_type.shape[0] == x_type.shape[0],
+            y_type.shape[1] == x_type.shape[1],
+            lengths_type.dtype == numpy.int32,
+            lengths_type.ndim == 1,
+            lengths_type.shape[0] == x_type.shape[0],
+        )
+
+    def forward(self, inputs):
+        self.retain_inputs((0, 1))
+        cost, x, y, lengths = inputs
+        xp = backend.get_array_module(x)
+        n_batch, length, n_label = x.shape
+        mask = _padded_mask(lengths, length, xp)
+        y = xp.where(mask, y, 0)
+
+        # Forward algorithm. A finished sequence keeps its last ``alpha``.
+        alphas = xp.empty((length, n_batch, n_label), dtype=x.dtype)
+        alpha = alphas[0] = x[:, 0]
+        for t in six.moves.range(1, length):
+            next_alpha = _logsumexp(
+                alpha[:, :, None] + cost, xp, axis=1) + x[:, t]
+            alpha = alphas[t] = xp.where(mask[:, t, None], next_alpha, alpha)
+        logz = _logsumexp(alpha, xp, axis=1)
+
+        index = xp.arange(n_batch * length) * n_label + y.ravel()
+        score = xp.where(mask, x.ravel()[index].reshape(y.shape), 0)
+        trans = cost.ravel()[y[:, :-1] * n_label + y[:, 1:]]
+        score = score.sum(axis=1) + xp.where(mask[:, 1:], trans, 0).sum(
+            axis=1)
+
+        self.alphas = alphas
+        self.logz = logz
+        self.mask = mask
+        self.y = y
+        loss = logz - score
+        if self.reduce == 'mean':
+            return xp.asarray(loss.sum() / n_batch, dtype=x.dtype),
+        return loss.astype(x.dtype, copy=False),
+
+    def backward(self, indexes, grad_outputs):
+        inputs = self.get_retained_inputs()
+        if chainer.config.enable_backprop:
+            return self._backward_through_graph(indexes, inputs, grad_outputs)
+        grads = self._backward_arrays(
+            inputs[0].array, inputs[1].array, grad_outputs[0].array)
+        return tuple(chainer.Variable(grads[i]) for i in indexes)
+
+    def _backward_through_graph(self, indexes, inputs, grad_outputs):
+        cost, x = inputs
+        xp = backend.get_array_module(x)
+        n_batch, length, n_label = x.shape
+        mask = self.mask
+
+        alpha = x[:, 0]
+        for t in six.moves.range(1, length):
+            b_alpha, b_cost = broadcast.broadcast(alpha[:, :, None], cost)
+            next_alpha = logsumexp.logsumexp(b_alpha + b_cost, axis=1)
+            next_alpha += x[:, t]
+            alpha = where.where(
+                xp.broadcast_to(mask[:, t, None], alpha.shape),
+                next_alpha, alpha)
+        logz = logsumexp.logsumexp(alpha, axis=1)
+
+        y = self.y
+        score = select_item.select_item(
+            reshape.reshape(x, (n_batch * length, n_label)), y.ravel())
+        score = reshape.reshape(score, (n_batch, length))
+        if length > 1:
+            trans = embed_id.embed_id(
+                y[:, :-1] * n_label + y[:, 1:],
+                reshape.reshape(cost, (n_label * n_label, 1)))
+            trans = reshape.reshape(trans, (n_batch, length - 1))
+            score = concat.concat(
+                (score[:, :1], score[:, 1:] + trans), axis=1)
+        score = _sum.sum(score * mask.astype(x.dtype), axis=1)
+
+        loss = logz - score
+        if self.reduce == 'mean':
+            loss = _sum.sum(loss) / n_batch
+        grads = chainer.grad(
+            [loss], [inputs[i] for i in indexes], grad_outputs,
+            enable_double_backprop=True)
+        # The cost is not used when all the sequences have length one.
+        return tuple(
+            chainer.Variable(xp.zeros_like(inputs[i].array)) if g is None
+            else g for i, g in six.moves.zip(indexes, grads))
+
+    def _backward_arrays(self, cost, x, gloss):
+        xp = backend.get_array_module(x)
+        n_batch, length, n_label = x.shape
+        alphas, logz, mask = self.alphas, self.logz, self.mask
+        if self.reduce == 'mean':
+            gloss = xp.full((n_batch,), gloss / n_batch, dtype=x.dtype)
+
+        # Backward algorithm accumulating the marginal probabilities of
+        # labels and label transitions. ``beta`` stays zero after the end
+        # of each sequence.
+        gx = xp.empty_like(x)
+        gcost = xp.zeros_like(cost)
+        beta = xp.zeros((n_batch, n_label), dtype=x.dtype)
+        for t in six.moves.range(length - 1, 0, -1):
+            gx[:, t] = xp.exp(alphas[t] + beta - logz[:, None])
+            s = cost + (x[:, t] + beta)[:, None, :]
+            w = gloss * mask[:, t]
+            gcost += xp.tensordot(
+                w, xp.exp(alphas[t - 1][:, :, None] + s - logz[:, None, None]),
+                axes=1)
+            beta = xp.where(mask[:, t, None], _logsumexp(s, xp, axis=2), beta)
+        gx[:, 0] = xp.exp(alphas[0] + beta - logz[:, None])
+
+        one_hot = (self.y[:, :, None] == xp.arange(n_label)).astype(x.dtype)
+        w = gloss[:, None] * mask
+        gx -= one_hot
+        gx *= w[:, :, None]
+        prev = one_hot[:, :-1] * w[:, 1:, None]
+        gcost -= xp.tensordot(prev, one_hot[:, 1:], axes=((0, 1), (0, 1)))
+        return gcost, gx
+
+
+def padded_crf1d(cost, x, y, lengths, reduce='mean'):
+    """Calculates negative log-likelihood of linear-chain CRF on padded input.
+
+    This function computes the same loss as :func:`~chainer.functions.crf1d`,
+    but takes a mini-batch of sequences as a single padded array instead of a
+    transposed list of arrays. The sequences do not need to be sorted by
+    their lengths, and the forward and backward algorithms run inside a
+    single function node, so the computational graph does not grow with the
+    length of the sequences. Higher order derivatives are computed through
+    the graph of the forward algorithm built in the backward computation.
+
+    Args:
+        cost (:class:`~chainer.Variable` or :ref:`ndarray`):
+            A :math:`K \\times K` matrix which holds transition
+            cost between two labels, where :math:`K` is the number of labels.
+        x (:class:`~chainer.Variable` or :ref:`ndarray`): Input costs of
+            labels. Its shape is :math:`(B, T, K)`, where :math:`B` is the
+            mini-batch size, :math:`T` is the maximum length of the
+            sequences and :math:`K` is the number of labels. Values after
+            the end of each sequence are ignored.
+        y (:ref:`ndarray`): Expected output labels of shape :math:`(B, T)`.
+            Values after the end of each sequence are ignored.
+        lengths (:ref:`ndarray` of int32): Lengths of the sequences. Its
+            shape is :math:`(B,)`. All lengths must be positive and at most
+            :math:`T`.
+        reduce (str): Reduction option. Its value must be either
+            ``'mean'`` or ``'no'``. Otherwise, :class:`ValueError` is raised.
+
+    Returns:
+        ~chainer.Variable: A variable holding the average negative
+        log-likelihood of the input sequences if ``reduce`` is ``'mean'``,
+        or the negative log-likelihood of each sequence if ``reduce`` is
+        ``'no'``.
+
+    .. admonition:: Example
+
+        >>> cost = np.random.uniform(-1, 1, (3, 3)).astype(np.float32)
+        >>> x = np.random.uniform(-1, 1, (2, 4, 3)).astype(np.float32)
+        >>> y = np.array([[0, 1, 2, 0], [2, 1, -1, -1]], np.int32)
+        >>> lengths = np.array([4, 2], np.int32)
+        >>> F.padded_crf1d(cost, x, y, lengths).shape
+        ()
+
+    .. seealso:: :func:`~chainer.functions.crf1d`
+
+    """
+    if reduce not in ('mean', 'no'):
+        raise ValueError(
+            'only \'mean\' and \'no\' are valid for \'reduce\', but \'%s\' is '
+            'given' % reduce)
+    loss, = PaddedCRF1d(reduce).apply((cost, x, y, lengths))
+    return loss
+
+
+def argmax_padded_crf1d(cost, x, lengths):
+    """Computes states that maximize joint probabilities of padded CRF input.
+
+    This is the counterpart of :func:`~chainer.functions.argmax_crf1d` for
+    the padded input of :func:`~chainer.functions.padded_crf1d`. The Viterbi
+    algorithm runs over the whole mini-batch at once.
+
+    Args:
+        cost (:class:`~chainer.Variable` or :ref:`ndarray`):
+            A :math:`K \\times K` matrix which holds transition
+            cost between two labels, where :math:`K` is the number of labels.
+        x (:class:`~chainer.Variable` or :ref:`ndarray`): Input costs of
+            labels of shape :math:`(B, T, K)`.
+        lengths (:ref:`ndarray` of int32): Lengths of the sequences of shape
+            :math:`(B,)`.
+
+    Returns:
+        tuple: A tuple of :class:`~chainer.Variable` object ``s`` and an
+        :ref:`ndarray` ``ps``.
+        The shape of ``s`` is ``(B,)``, and ``s[i]`` represents the score of
+        the best path of the ``i``-th sequence.
+        ``ps`` is an int32 array of shape ``(B, T)`` holding the best paths.
+        Values after the end of each sequence are ``-1``.
+
+    """
+    cost = chainer.as_variable(cost)
+    x = chainer.as_variable(x)
+    xp = backend.get_array_module(x)
+    n_batch, length, n_label = x.shape
+    mask = _padded_mask(xp.asarray(lengths), length, xp)
+    cost_array = cost.array
+    x_array = x.array
+
+    # Viterbi algorithm. After the end of a sequence, the back pointers
+    # are the identity so that back tracking passes through the padding.
+    identity = xp.broadcast_to(
+        xp.arange(n_label, dtype=numpy.int32), (n_batch, n_label))
+    max_inds = xp.empty((length, n_batch, n_label), dtype=numpy.int32)
+    alpha = x_array[:, 0]
+    for t in six.moves.range(1, length):
+        scores = alpha[:, :, None] + cost_array
+        max_ind = scores.argmax(axis=1)
+        next_alpha = scores.max(axis=1) + x_array[:, t]
+        alpha = xp.where(mask[:, t, None], next_alpha, alpha)
+        max_inds[t] = xp.where(mask[:, t, None], max_ind, identity)
+
+    path = xp.empty((n_batch, length), dtype=numpy.int32)
+    inds = path[:, -1] = alpha.argmax(axis=1)
+    batch_index = xp.arange(n_batch)
+    for t in six.moves.range(length - 1, 0, -1):
+        inds = path[:, t - 1] = max_inds[t, batch_index, inds]
+
+    # Computes the score with differentiable functions.
+    flat_path = path.ravel()
+    score = select_item.select_item(
+        reshape.reshape(x, (n_batch * length, n_label)), flat_path)
+    score = reshape.reshape(score, (n_batch, length))
+    if length > 1:
+        trans = embed_id.embed_id(
+            path[:, :-1] * n_label + path[:, 1:],
+            reshape.reshape(cost, (n_label * n_label, 1)))
+        trans = reshape.reshape(trans, (n_batch, length - 1))
+        score = concat.concat((score[:, :1], score[:, 1:] + trans), axis=1)
+    score = _sum.sum(score * mask.astype(x.dtype), axis=1)
+
+    path[~mask] = -1
+    return score, path
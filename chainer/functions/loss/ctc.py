@@ -24,6 +24,19 @@ def _logsumexp(a, xp, axis=None):
     return xp.squeeze(vmax, axis=axis)
 
 
+def _log_softmax(x):
+    x = x - numpy.amax(x, axis=2, keepdims=True)
+    x -= numpy.log(numpy.sum(numpy.exp(x), axis=2, keepdims=True))
+    return x
+
+
+def _logsumexp3(a, b, c):
+    # Element-wise log(exp(a) + exp(b) + exp(c)).
+    m = numpy.maximum(numpy.maximum(a, b), c)
+    return m + numpy.log(numpy.exp(a - m) + numpy.exp(b - m) +
+                         numpy.exp(c - m))
+
+
 def _softmax(x, xp):
     val = xp.exp(x - xp.amax(x, axis=2, keepdims=True))
     val /= xp.sum(val, axis=2, keepdims=True)
@@ -274,7 +287,118 @@ class ConnectionistTemporalClassification(function.Function):
 
         return _flip_path_probability(prob, input_length, path_length, xp)
 
-    def forward(self, inputs):
+    def forward_cpu(self, inputs):
+        input_length, label_length, t, xs = inputs
+
+        # The probabilities are accumulated in float32 for float16 inputs.
+        dtype = numpy.promote_types(xs.dtype, numpy.float32)
+        zero = dtype.type(-10000000000.0)
+        max_input_length, n_batch, n_unit = xs.shape
+
+        if chainer.is_debug():
+            assert max_input_length >= numpy.max(input_length)
+            assert t.shape[1] >= numpy.max(label_length)
+
+        # Sequences are sorted in the descending order of their lengths so
+        # that the sequences having the i-th frame are the first
+        # `n_active[i]` ones. The frames after the end of each sequence are
+        # not computed.
+        order = numpy.argsort(-input_length, kind='mergesort')
+        n_active = numpy.searchsorted(
+            -input_length[order], -numpy.arange(max_input_length), 'left')
+        path_length = 2 * label_length[order] + 1
+        path = _label_to_path(t[order], self.blank_symbol, numpy)
+        max_path_length = path.shape[1]
+        log_y = _log_softmax(xs[:, order].astype(dtype, copy=False))
+        log_y_flat = log_y.reshape(max_input_length, n_batch * n_unit)
+        path_index = numpy.arange(n_batch)[:, None] * n_unit + path
+
+        outside = numpy.arange(max_path_length) >= path_length[:, None]
+        # The transition skipping the label in between is disabled between
+        # the same symbols (including blank-to-blank) by the penalty.
+        skip_penalty = numpy.zeros((n_batch, max_path_length), dtype=dtype)
+        skip_penalty[:, :2] = zero
+        skip_penalty[:, 2:][path[:, 2:] == path[:, :-2]] = zero
+
+        # prob[i, b, s] holds the forward variable of the i-th frame, to
+        # which the backward variable without the emission of the frame is
+        # added later. It makes the log of the posterior probability of the
+        # label of the path.
+        prob = numpy.full(
+            (max_input_length, n_batch, max_path_length), zero, dtype=dtype)
+
+        # The variables of the previous frame are stored with two padding
+        # columns so that the transitions are computed by slicing.
+        buf = numpy.full((n_batch, max_path_length + 2), zero, dtype=dtype)
+        buf[:, 2] = 0
+        for i in six.moves.range(max_input_length):
+            n = n_active[i]
+            if n == 0:
+                break
+            a = buf[:n]
+            cur = _logsumexp3(
+                a[:, 2:], a[:, 1:-1], a[:, :-2] + skip_penalty[:n])
+            numpy.copyto(cur, zero, where=outside[:n])
+            cur += log_y_flat[i][path_index[:n]]
+            prob[i, :n] = cur
+            a[:, 2:] = cur
+
+        # The backward computation starts from the last frame of each
+        # sequence, at which the sequence gets active.
+        skip_penalty[:, :-2] = skip_penalty[:, 2:]
+        skip_penalty[:, -2:] = zero
+        buf = numpy.full((n_batch, max_path_length + 2), zero, dtype=dtype)
+        buf[numpy.arange(n_batch), path_length - 1] = 0
+        for i in six.moves.range(max_input_length - 1, -1, -1):
+            n = n_active[i]
+            if n == 0:
+                continue
+            b = buf[:n]
+            cur = _logsumexp3(
+                b[:, :-2], b[:, 1:-1], b[:, 2:] + skip_penalty[:n])
+            numpy.copyto(cur, zero, where=outside[:n])
+            prob[i, :n] += cur
+            cur += log_y_flat[i][path_index[:n]]
+            b[:, :-2] = cur
+
+        total = _logsumexp(prob[0], numpy, axis=1)
+        self.order = order
+        self.path = path
+        self.log_y = log_y
+        self.prob = prob
+        self.total = total
+
+        loss = numpy.empty((n_batch,), dtype=xs.dtype)
+        loss[order] = -total
+        if self.reduce == 'mean':
+            loss = utils.force_array(numpy.mean(loss))
+        return loss,
+
+    def backward_cpu(self, inputs, grad_output):
+        input_length, _, _, xs = inputs
+        n_batch = xs.shape[1]
+
+        # The gradient w.r.t. the inputs is the softmax minus the posterior
+        # of each label, which is the sum of those of the positions of the
+        # path having the label.
+        posterior = self.prob
+        posterior -= self.total[:, None]
+        numpy.exp(posterior, out=posterior)
+        gx_sorted = numpy.exp(self.log_y)
+        numpy.subtract.at(
+            gx_sorted, (slice(None), numpy.arange(n_batch)[:, None],
+                        self.path), posterior)
+        gx = numpy.empty_like(gx_sorted)
+        gx[:, self.order] = gx_sorted
+
+        if self.reduce == 'mean':
+            gx *= grad_output[0] / n_batch
+        else:
+            gx *= grad_output[0][..., None]
+        gx *= (numpy.arange(len(gx))[:, None] < input_length)[..., None]
+        return None, None, None, gx.astype(xs.dtype, copy=False)
+
+    def forward_gpu(self, inputs):
         xp = backend.get_array_module(inputs[0])
         self.input_length, label_length, t, xs = inputs
 
@@ -302,7 +426,7 @@ class ConnectionistTemporalClassification(function.Function):
             loss = utils.force_array(xp.mean(loss))
         return loss,
 
-    def backward(self, inputs, grad_output):
+    def backward_gpu(self, inputs, grad_output):
         xp = backend.get_array_module(inputs[0])
         batch_size = len(inputs[2])
 
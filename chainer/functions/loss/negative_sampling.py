@@ -152,30 +152,38 @@ class NegativeSamplingFunctionGrad(function_node.FunctionNode):
         self.retain_inputs((0, 1, 2))
         x, W, gloss = inputs
 
-        samples = self.samples
-        gx = numpy.zeros_like(x)
-        gW = numpy.zeros_like(W)
-
-        for i in numpy.arange(len(self.ignore_mask))[self.ignore_mask]:
-            ix = x[i]
+        mask = self.ignore_mask
+        samples = self.samples[mask]
+        ix = x[mask]
+        if self.reduce == 'sum':
+            igy = gloss
+        else:
+            igy = gloss[mask][:, None]
 
-            k = samples[i]
-            if self.reduce == 'sum':
-                igy = gloss
-            else:
-                igy = gloss[i]
+        w = W[samples]
+        f = numpy.einsum('ij,ikj->ik', ix, w)
 
-            w = W[k]
-            f = w.dot(ix)
+        # g == -y * gloss / (1 + exp(yf))
+        f[:, 0] *= -1
+        g = igy / (1 + numpy.exp(-f))
+        g[:, 0] *= -1
+        g = g.astype(x.dtype, copy=False)
 
-            # g == -y * gloss / (1 + exp(yf))
-            f[0] *= -1
-            g = igy / (1 + numpy.exp(-f))
-            g[0] *= -1
+        gx = numpy.zeros_like(x)
+        gx[mask] = numpy.einsum('ik,ikj->ij', g, w)
 
-            gx[i] = g.dot(w)
-            for ik, ig in six.moves.zip(k, g):
-                gW[ik] += ig * ix
+        # Sorts the samples so that the gradients w.r.t. the same row of W
+        # are summed up and written to it once, as the same IDs are often
+        # sampled many times in a mini-batch.
+        gW = numpy.zeros_like(W)
+        k = samples.ravel()
+        if len(k):
+            order = numpy.argsort(k, kind='mergesort')
+            k = k[order]
+            starts = numpy.flatnonzero(
+                numpy.concatenate(([True], k[1:] != k[:-1])))
+            rows = (g[:, :, None] * ix[:, None, :]).reshape(len(k), -1)
+            gW[k[starts]] = numpy.add.reduceat(rows[order], starts, axis=0)
         return gx, None, gW
 
     def forward_gpu(self, inputs):
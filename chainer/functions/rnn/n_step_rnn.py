@@ -10,6 +10,7 @@ from chainer import variable
 from chainer.backends import cuda
 from chainer import configuration
 from chainer import function
+from chainer import function_node
 from chainer.functions.activation import relu
 from chainer.functions.activation import tanh
 from chainer.functions.array import concat
@@ -772,22 +773,32 @@ use_bi_direction)
         ys = chainer.functions.split_axis(ys, sections, 0)
         return hy, ys
 
-    else:
+    elif xp is numpy:
+        hy, _, ys = n_step_rnn_cpu(
+            'rnn_%s' % activation, n_layers, dropout_ratio, hx, None, ws, bs,
+            xs, use_bi_direction)
+        return hy, ys
 
-        def f(x, h, c, w, b):
-            xw, hw = w
-            xb, hb = b
-            rnn_in = linear.linear(x, xw, xb) + linear.linear(h, hw, hb)
-            if activation == 'tanh':
-                return tanh.tanh(rnn_in), None
-            elif activation == 'relu':
-                return relu.relu(rnn_in), None
+    else:
+        if activation == 'tanh':
+            f = _rnn_cell(tanh.tanh)
+        elif activation == 'relu':
+            f = _rnn_cell(relu.relu)
 
         hy, _, ys = n_step_rnn_impl(
             f, n_layers, dropout_ratio, hx, None, ws, bs, xs, use_bi_direction)
         return hy, ys
 
 
+def _rnn_cell(activation):
+    def f(x, h, c, w, b):
+        xw, hw = w
+        xb, hb = b
+        rnn_in = linear.linear(x, xw, xb) + linear.linear(h, hw, hb)
+        return activation(rnn_in), None
+    return f
+
+
 def n_step_rnn_impl(
         f, n_layers, dropout_ratio, hx, cx, ws, bs, xs, use_bi_direction):
     direction = 2 if use_bi_direction else 1
@@ -864,3 +875,338 @@ def _one_directional_loop(f, xs, h, c, w, b):
 
 def _dropout_sequence(xs, dropout_ratio):
     return [dropout.dropout(x, ratio=dropout_ratio) for x in xs]
+
+
+_cpu_rnn_n_gates = {
+    'rnn_tanh': 1,
+    'rnn_relu': 1,
+    'gru': 3,
+    'lstm': 4,
+}
+
+
+def _sigmoid(x):
+    return numpy.tanh(x * 0.5) * 0.5 + 0.5
+
+
+class OneDirectionalRNNCPU(function_node.FunctionNode):
+
+    """Fused CPU implementation of a layer of an RNN in one direction.
+
+    This function runs the recurrence of a whole sequence in a single
+    function instead of building the graph of each time step. The inputs
+    are the sequence ``x`` concatenated along the batch axis, the initial
+    hidden state ``h``, the initial cell state ``c`` for LSTM, the weights
+    and the biases of the layer. The projection of the inputs is computed
+    for all time steps at once, and the intermediate values of the
+    recurrence are kept in buffers for backpropagation through time.
+
+    The fused backward computation is not differentiable. When the
+    gradients are computed with ``enable_backprop``, the graph of each time
+    step is built again from the inputs and differentiated instead, so that
+    higher order derivatives are available.
+
+    """
+
+    def __init__(self, rnn_mode, lengths, reverse):
+        if rnn_mode not in _cpu_rnn_n_gates:
+            candidate_list = ','.join(_cpu_rnn_n_gates.keys())
+            raise ValueError('Invalid rnn_mode: "%s". Please select from [%s]'
+                             % (rnn_mode, candidate_list))
+        self.rnn_mode = rnn_mode
+        self.n_gates = _cpu_rnn_n_gates[rnn_mode]
+        self.use_cell = rnn_mode == 'lstm'
+        self.lengths = lengths
+        self.sections = numpy.cumsum([0] + list(lengths))
+        self.reverse = reverse
+
+    def check_type_forward(self, in_types):
+        n_in = 2 + self.use_cell + self.n_gates * 4
+        type_check.expect(in_types.size() == n_in)
+        x_type, h_type = in_types[:2]
+        type_check.expect(
+            x_type.dtype.kind == 'f',
+            x_type.ndim == 2,
+            x_type.shape[0] == self.sections[-1],
+            h_type.dtype == x_type.dtype,
+            h_type.ndim == 2,
+        )
+        if self.use_cell:
+            c_type = in_types[2]
+            type_check.expect(
+                c_type.dtype == x_type.dtype,
+                c_type.ndim == 2,
+                c_type.shape[0] == h_type.shape[0],
+                c_type.shape[1] == h_type.shape[1],
+            )
+
+    def _steps(self):
+        steps = six.moves.range(len(self.lengths))
+        if self.reverse:
+            steps = reversed(steps)
+        return steps
+
+    def _split_inputs(self, inputs):
+        n_gates = self.n_gates
+        x, h = inputs[:2]
+        c = inputs[2] if self.use_cell else None
+        params = inputs[2 + self.use_cell:]
+        ws, bs = params[:n_gates * 2], params[n_gates * 2:]
+        return x, h, c, ws, bs
+
+    def _cell(self):
+        # The modules of GRU and LSTM import this module.
+        if self.rnn_mode == 'gru':
+            from chainer.functions.rnn import n_step_gru
+            return n_step_gru._gru
+        elif self.rnn_mode == 'lstm':
+            from chainer.functions.rnn import n_step_lstm
+            return n_step_lstm._lstm
+        elif self.rnn_mode == 'rnn_tanh':
+            return _rnn_cell(tanh.tanh)
+        else:
+            return _rnn_cell(relu.relu)
+
+    def forward_cpu(self, inputs):
+        self.retain_inputs(tuple(six.moves.range(len(inputs))))
+        x, h, c, ws, bs = self._split_inputs(inputs)
+        n_gates = self.n_gates
+        mode = self.rnn_mode
+        n_units = h.shape[1]
+
+        w_x = numpy.concatenate(ws[:n_gates], axis=0)
+        w_h = numpy.concatenate(ws[n_gates:], axis=0)
+        b_x = numpy.concatenate(bs[:n_gates], axis=0)
+        b_h = numpy.concatenate(bs[n_gates:], axis=0)
+        self.w_x = w_x
+        self.w_h = w_h
+
+        # The projection of the inputs of all the time steps.
+        x_proj = x.dot(w_x.T)
+        x_proj += b_x
+        if mode != 'gru':
+            # The bias of the hidden state can be folded except for GRU,
+            # where the reset gate is applied to the projection with it.
+            x_proj += b_h
+
+        h = h.copy()
+        if self.use_cell:
+            c = c.copy()
+        ys = numpy.empty((len(x), n_units), dtype=x.dtype)
+        # Buffers kept for backpropagation through time.
+        self.h_prev = numpy.empty_like(ys)
+        self.gates = x_proj
+        if self.use_cell:
+            self.c_prev = numpy.empty_like(ys)
+            self.tanh_c = numpy.empty_like(ys)
+        elif mode == 'gru':
+            self.h_proj_n = numpy.empty_like(ys)
+
+        sections = self.sections
+        for t in self._steps():
+            start, end = sections[t], sections[t + 1]
+            batch = end - start
+            h_t = h[:batch]
+            self.h_prev[start:end] = h_t
+            a = self.gates[start:end]
+            h_proj = h_t.dot(w_h.T)
+            if mode == 'rnn_tanh':
+                a += h_proj
+                numpy.tanh(a, out=a)
+                h_new = a
+            elif mode == 'rnn_relu':
+                a += h_proj
+                numpy.maximum(a, 0, out=a)
+                h_new = a
+            elif mode == 'lstm':
+                a += h_proj
+                c_t = c[:batch]
+                self.c_prev[start:end] = c_t
+                i = _sigmoid(a[:, :n_units])
+                f = _sigmoid(a[:, n_units:2 * n_units])
+                g = numpy.tanh(a[:, 2 * n_units:3 * n_units])
+                o = _sigmoid(a[:, 3 * n_units:])
+                a[:, :n_units] = i
+                a[:, n_units:2 * n_units] = f
+                a[:, 2 * n_units:3 * n_units] = g
+                a[:, 3 * n_units:] = o
+                c_new = f * c_t + i * g
+                tanh_c = numpy.tanh(c_new)
+                self.tanh_c[start:end] = tanh_c
+                h_new = o * tanh_c
+                c[:batch] = c_new
+            else:
+                h_proj += b_h
+                h_proj_n = h_proj[:, 2 * n_units:]
+                self.h_proj_n[start:end] = h_proj_n
+                r = _sigmoid(a[:, :n_units] + h_proj[:, :n_units])
+                z = _sigmoid(
+                    a[:, n_units:2 * n_units] + h_proj[:, n_units:2 * n_units])
+                n = numpy.tanh(a[:, 2 * n_units:] + r * h_proj_n)
+                a[:, :n_units] = r
+                a[:, n_units:2 * n_units] = z
+                a[:, 2 * n_units:] = n
+                h_new = (1 - z) * n + z * h_t
+            ys[start:end] = h_new
+            h[:batch] = h_new
+
+        if self.use_cell:
+            return ys, h, c
+        return ys, h
+
+    def backward(self, indexes, grad_outputs):
+        inputs = self.get_retained_inputs()
+        if chainer.config.enable_backprop:
+            return self._backward_through_graph(indexes, inputs, grad_outputs)
+        grads = self._backward_cpu(
+            [x.array for x in inputs],
+            [None if gy is None else gy.array for gy in grad_outputs])
+        return tuple(chainer.Variable(grads[i]) for i in indexes)
+
+    def _backward_through_graph(self, indexes, inputs, grad_outputs):
+        x, h, c, ws, bs = self._split_inputs(inputs)
+        xs = split_axis.split_axis(x, self.sections[1:-1], 0)
+        if self.reverse:
+            xs = xs[::-1]
+        h, c, ys = _one_directional_loop(self._cell(), xs, h, c, ws, bs)
+        if self.reverse:
+            ys.reverse()
+        outputs = [concat.concat(ys, axis=0), h]
+        if self.use_cell:
+            outputs.append(c)
+        outputs, grad_outputs = zip(*[
+            (y, gy) for y, gy in zip(outputs, grad_outputs)
+            if gy is not None])
+        return chainer.grad(
+            outputs, [inputs[i] for i in indexes], grad_outputs,
+            enable_double_backprop=True)
+
+    def _backward_cpu(self, inputs, grads):
+        x, h, c, ws, bs = self._split_inputs(inputs)
+        n_gates = self.n_gates
+        mode = self.rnn_mode
+        n_units = h.shape[1]
+        gys, gh = grads[:2]
+        gc = grads[2] if self.use_cell else None
+
+        gh = numpy.zeros_like(h) if gh is None else gh.copy()
+        if self.use_cell:
+            gc = numpy.zeros_like(c) if gc is None else gc.copy()
+
+        # Gradients w.r.t. the projections of the inputs and the hidden
+        # states of all the time steps.
+        ga_x = numpy.empty_like(self.gates)
+        ga_h = ga_x if mode != 'gru' else numpy.empty_like(self.gates)
+        w_h = self.w_h
+        sections = self.sections
+        for t in reversed(list(self._steps())):
+            start, end = sections[t], sections[t + 1]
+            batch = end - start
+            gh_t = gh[:batch]
+            if gys is not None:
+                gh_t += gys[start:end]
+            a = self.gates[start:end]
+            ga = ga_x[start:end]
+            if mode == 'rnn_tanh':
+                numpy.multiply(gh_t, 1 - a * a, out=ga)
+            elif mode == 'rnn_relu':
+                numpy.multiply(gh_t, a > 0, out=ga)
+            elif mode == 'lstm':
+                i = a[:, :n_units]
+                f = a[:, n_units:2 * n_units]
+                g = a[:, 2 * n_units:3 * n_units]
+                o = a[:, 3 * n_units:]
+                tanh_c = self.tanh_c[start:end]
+                gc_t = gc[:batch]
+                gc_t += gh_t * o * (1 - tanh_c * tanh_c)
+                ga[:, :n_units] = gc_t * g * i * (1 - i)
+                ga[:, n_units:2 * n_units] = \
+                    gc_t * self.c_prev[start:end] * f * (1 - f)
+                ga[:, 2 * n_units:3 * n_units] = gc_t * i * (1 - g * g)
+                ga[:, 3 * n_units:] = gh_t * tanh_c * o * (1 - o)
+                gc_t *= f
+            else:
+                r = a[:, :n_units]
+                z = a[:, n_units:2 * n_units]
+                n = a[:, 2 * n_units:]
+                gn = gh_t * (1 - z) * (1 - n * n)
+                gr = gn * self.h_proj_n[start:end] * r * (1 - r)
+                gz = gh_t * (self.h_prev[start:end] - n) * z * (1 - z)
+                ga[:, :n_units] = gr
+                ga[:, n_units:2 * n_units] = gz
+                ga[:, 2 * n_units:] = gn
+                ga_h_t = ga_h[start:end]
+                ga_h_t[:, :2 * n_units] = ga[:, :2 * n_units]
+                ga_h_t[:, 2 * n_units:] = gn * r
+                gh_t *= z
+            if mode == 'gru':
+                gh_t += ga_h[start:end].dot(w_h)
+            else:
+                gh_t[...] = ga.dot(w_h)
+
+        gx = ga_x.dot(self.w_x)
+        gw_x = ga_x.T.dot(x)
+        gw_h = ga_h.T.dot(self.h_prev)
+        gb_x = ga_x.sum(axis=0)
+        gb_h = ga_h.sum(axis=0)
+        gws = (numpy.split(gw_x, n_gates, axis=0)
+               + numpy.split(gw_h, n_gates, axis=0))
+        gbs = (numpy.split(gb_x, n_gates, axis=0)
+               + numpy.split(gb_h, n_gates, axis=0))
+
+        ret = (gx, gh)
+        if self.use_cell:
+            ret += (gc,)
+        return ret + tuple(gws) + tuple(gbs)
+
+
+def n_step_rnn_cpu(rnn_mode, n_layers, dropout_ratio, hx, cx, ws, bs, xs,
+                   use_bi_direction):
+    """Runs a stacked RNN on CPU with :class:`OneDirectionalRNNCPU`.
+
+    The arguments and the return values are the same as those of
+    :func:`n_step_rnn_impl` except that ``rnn_mode`` selects the kind of the
+    recurrent cell from ``'rnn_tanh'``, ``'rnn_relu'``, ``'gru'`` and
+    ``'lstm'`` instead of the function of each time step.
+
+    """
+    direction = 2 if use_bi_direction else 1
+    lengths = [len(x) for x in xs]
+    hx = chainer.functions.separate(hx)
+    use_cell = cx is not None
+    if use_cell:
+        cx = chainer.functions.separate(cx)
+
+    x_next = concat.concat(xs, axis=0)
+    hy = []
+    cy = []
+    for layer in six.moves.range(n_layers):
+        ys = []
+        for d in six.moves.range(direction):
+            idx = direction * layer + d
+            if layer == 0:
+                x = x_next
+            else:
+                x = dropout.dropout(x_next, ratio=dropout_ratio)
+            inputs = [x, hx[idx]]
+            if use_cell:
+                inputs.append(cx[idx])
+            inputs += list(ws[idx]) + list(bs[idx])
+            outputs = OneDirectionalRNNCPU(
+                rnn_mode, lengths, d == 1).apply(inputs)
+            ys.append(outputs[0])
+            hy.append(outputs[1])
+            if use_cell:
+                cy.append(outputs[2])
+        if use_bi_direction:
+            x_next = concat.concat(ys, axis=1)
+        else:
+            x_next = ys[0]
+
+    ys = split_axis.split_axis(x_next, numpy.cumsum(lengths[:-1]), 0)
+    hy = stack.stack(hy)
+    if use_cell:
+        cy = stack.stack(cy)
+    else:
+        cy = None
+    return hy, cy, tuple(ys)
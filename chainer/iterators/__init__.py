@@ -1,6 +1,8 @@
 # import classes and functions
+from chainer.iterators.bucket_iterator import BucketIterator  # NOQA
 from chainer.iterators.multiprocess_iterator import MultiprocessIterator  # NOQA
 from chainer.iterators.multithread_iterator import MultithreadIterator  # NOQA
+from chainer.iterators.prefetch_iterator import PrefetchIterator  # NOQA
 from chainer.iterators.serial_iterator import SerialIterator  # NOQA
 
 from chainer.iterators.dali_iterator import DaliIterator  # NOQA
@@ -0,0 +1,200 @@
+import collections
+import multiprocessing
+from multiprocessing import sharedctypes  # type: ignore
+import threading
+
+import numpy
+import six
+
+
+_ALIGNMENT = 16
+
+
+def _aligned(nbytes):
+    return (nbytes + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _is_packable(x):
+    return type(x) is numpy.ndarray and not x.dtype.hasobject
+
+
+def measure(data):
+    """Returns the number of bytes required to store arrays in ``data``.
+
+    ``data`` can be an ndarray or nested tuples, lists and dicts of them.
+    Other objects do not consume the shared memory.
+
+    """
+    t = type(data)
+    if t is tuple or t is list:
+        return sum([measure(v) for v in data])
+    elif t is dict:
+        return sum([measure(v) for v in six.itervalues(data)])
+    elif _is_packable(data):
+        return _aligned(data.nbytes)
+    return 0
+
+
+class _SharedNdarray(object):
+
+    # Picklable descriptor of an array placed in the shared memory.
+
+    __slots__ = ('shape', 'dtype', 'offset')
+
+    def __init__(self, shape, dtype, offset):
+        self.shape = shape
+        self.dtype = dtype
+        self.offset = offset
+
+    def __getstate__(self):
+        return self.shape, self.dtype, self.offset
+
+    def __setstate__(self, state):
+        self.shape, self.dtype, self.offset = state
+
+
+class SharedRingBuffer(object):
+
+    """Ring of shared memory slots with variable-size allocation.
+
+    The buffer consists of ``n_slots`` slots of ``slot_size`` bytes each.
+    The owner process acquires a free slot, lets worker processes pack
+    arbitrary nested tuples, lists and dicts of ndarrays into it, unpacks
+    the results, and finally releases the slot. Each worker allocates
+    exactly the number of bytes needed by its arrays from the slot, so
+    variable-size examples share the slot without fixed per-example
+    partitions.
+
+    The object can be passed to worker processes as an argument of the
+    initializer of :class:`multiprocessing.Pool`. Only :meth:`pack` is
+    available in the workers.
+
+    Args:
+        n_slots (int): Number of slots.
+        slot_size (int): Size of each slot in bytes.
+
+    """
+
+    def __init__(self, n_slots, slot_size):
+        self.n_slots = n_slots
+        self.slot_size = _aligned(slot_size)
+        self.mem = sharedctypes.RawArray('b', n_slots * self.slot_size)
+        # Number of bytes used in each slot.
+        self._used = sharedctypes.RawArray('q', n_slots)
+        self._alloc_lock = multiprocessing.Lock()
+
+        self._free_cond = threading.Condition(threading.Lock())
+        self._free = collections.deque(six.moves.range(n_slots))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_free_cond']
+        del state['_free']
+        return state
+
+    # called from the owner process
+    def acquire(self, timeout=None):
+        """Acquires a free slot.
+
+        Args:
+            timeout (float): Timeout in seconds. ``None`` to wait forever.
+
+        Returns:
+            int: Index of the acquired slot, or ``None`` if timed out.
+
+        """
+        with self._free_cond:
+            if not self._free:
+                self._free_cond.wait(timeout)
+                if not self._free:
+                    return None
+            slot = self._free.popleft()
+        self._used[slot] = 0
+        return slot
+
+    # called from the owner process
+    def release(self, slot):
+        """Returns a slot to the ring.
+
+        Arrays unpacked from the slot without copying must not be used after
+        the slot is released.
+
+        """
+        with self._free_cond:
+            self._free.append(slot)
+            self._free_cond.notify()
+
+    def _allocate(self, slot, nbytes):
+        with self._alloc_lock:
+            used = self._used[slot]
+            if used + nbytes > self.slot_size:
+                return None
+            self._used[slot] = used + nbytes
+        return slot * self.slot_size + used
+
+    # called from worker processes
+    def pack(self, data, slot):
+        """Copies arrays in ``data`` to a slot.
+
+        Arrays that do not fit in the rest of the slot are left as they are,
+        in which case they are sent by pickling.
+
+        Args:
+            data: An ndarray or nested tuples, lists and dicts of them.
+            slot (int): Index of the slot.
+
+        Returns:
+            A tuple of the packed data and a bool indicating whether all the
+            arrays are packed into the slot.
+
+        """
+        t = type(data)
+        if t is tuple or t is list:
+            packed = [self.pack(v, slot) for v in data]
+            return (t([v for v, _ in packed]),
+                    all([ok for _, ok in packed]))
+        elif t is dict:
+            packed = {}
+            ok = True
+            for k, v in six.iteritems(data):
+                packed[k], v_ok = self.pack(v, slot)
+                ok = ok and v_ok
+            return packed, ok
+        elif _is_packable(data):
+            offset = self._allocate(slot, _aligned(data.nbytes))
+            if offset is None:
+                return data, False
+            target = numpy.frombuffer(
+                self.mem, data.dtype, data.size, offset)
+            target[...] = data.ravel()
+            return _SharedNdarray(data.shape, data.dtype, offset), True
+        return data, True
+
+    # called from the owner process
+    def unpack(self, data, copy=True):
+        """Restores data packed by :meth:`pack`.
+
+        Args:
+            data: Data returned by :meth:`pack`.
+            copy (bool): If ``False``, arrays are returned as views of the
+                shared memory, which are valid until the slot is released.
+
+        Returns:
+            The restored data.
+
+        """
+        t = type(data)
+        if t is tuple or t is list:
+            return t([self.unpack(v, copy) for v in data])
+        elif t is dict:
+            return {k: self.unpack(v, copy) for k, v in six.iteritems(data)}
+        elif t is _SharedNdarray:
+            size = 1
+            for d in data.shape:
+                size *= d
+            ret = numpy.frombuffer(
+                self.mem, data.dtype, size, data.offset).reshape(data.shape)
+            if copy:
+                ret = ret.copy()
+            return ret
+        return data
@@ -0,0 +1,234 @@
+from __future__ import division
+
+import collections
+
+import numpy
+import six
+
+from chainer.dataset import _batch
+from chainer.dataset import iterator
+
+
+_BucketIteratorState = collections.namedtuple('_BucketIteratorState', (
+    'current_position', 'epoch', 'is_new_epoch', 'order', 'batch_ends'))
+
+
+def _has_length(x):
+    # Scalars such as labels, including 0-dim arrays, have no length.
+    return hasattr(x, '__len__') and getattr(x, 'ndim', None) != 0
+
+
+def _default_length(example):
+    if isinstance(example, tuple):
+        lengths = [len(x) for x in example if _has_length(x)]
+        if not lengths:
+            raise TypeError(
+                'BucketIterator cannot compute the length of an example '
+                'without sequences. Please specify lengths.')
+        return max(lengths)
+    return len(example)
+
+
+def _bucket_iterator_statemachine(state, repeat, plan):
+    # Unlike `_statemachine.iterator_statemachine`, a batch never spans two
+    # epochs since the batches of each epoch are planned in advance.
+    i, epoch, _, order, batch_ends = state
+
+    if not repeat and epoch > 0:
+        return state, None
+
+    n = len(order)
+    if n == 0:
+        if repeat:
+            raise ValueError('Epoch size must be positive for an iterator '
+                             'that repeats.')
+        return _BucketIteratorState(0, 1, True, order, batch_ends), order
+
+    i_end = int(batch_ends[i])
+    indices = order[i:i_end]
+    is_new_epoch = False
+    if i_end == n:
+        epoch += 1
+        is_new_epoch = True
+        i_end = 0
+        if repeat:
+            order, batch_ends = plan()
+
+    state = _BucketIteratorState(i_end, epoch, is_new_epoch, order, batch_ends)
+    return state, indices
+
+
+class BucketIterator(iterator.Iterator):
+
+    """Dataset iterator that makes batches of examples of similar lengths.
+
+    This iterator is designed for datasets of variable-length sequences.
+    At the beginning of each epoch, it sorts the examples by their lengths
+    and splits them into batches of consecutive examples, so that each batch
+    consists of examples of similar lengths and padding them to the longest
+    one wastes less computation. Examples are grouped into buckets of
+    ``bucket_width`` lengths, and the order of the examples within each
+    bucket and the order of the batches are shuffled.
+
+    The size of each batch is limited by ``batch_size``, ``max_tokens`` or
+    both of them. ``max_tokens`` limits the number of elements of a batch
+    after padding, i.e. the number of examples multiplied by the length of
+    the longest one. An example longer than ``max_tokens`` forms a batch by
+    itself. A batch never contains examples of two epochs.
+
+    Args:
+        dataset: Dataset to iterate.
+        batch_size (int): Maximum number of examples within each batch.
+        max_tokens (int): Maximum number of elements within each batch after
+            padding.
+        lengths: Lengths of the examples. If it is a callable, it is called
+            with each example and should return its length. If it is
+            ``None``, the length of an example is its ``len``. If the
+            example is a tuple, the maximum ``len`` of its elements is used,
+            ignoring scalar elements such as labels.
+            Otherwise, it is a sequence of the lengths.
+        bucket_width (int): Width of the range of lengths of each bucket.
+            A larger width gives more randomness in exchange for more
+            padding.
+        repeat (bool): If ``True``, it infinitely loops over the dataset.
+            Otherwise, it stops iteration at the end of the first epoch.
+        shuffle (bool): If ``True``, the examples within each bucket and the
+            batches are shuffled at the beginning of each epoch. Otherwise,
+            examples are sorted by their lengths and then by their indexes.
+        random_state (numpy.random.RandomState): Pseudo-random number
+            generator.
+
+    """
+
+    def __init__(self, dataset, batch_size=None, max_tokens=None,
+                 lengths=None, bucket_width=1, repeat=True, shuffle=True,
+                 random_state=None):
+        if batch_size is None and max_tokens is None:
+            raise ValueError(
+                'Either batch_size or max_tokens must be specified.')
+        if bucket_width < 1:
+            raise ValueError('bucket_width must be positive.')
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.bucket_width = bucket_width
+        self._repeat = repeat
+        self._shuffle = shuffle
+        if random_state is None:
+            random_state = numpy.random.random.__self__
+        self._random = random_state
+
+        if lengths is None:
+            lengths = _default_length
+        if callable(lengths):
+            lengths = [lengths(dataset[i])
+                       for i in six.moves.range(len(dataset))]
+        lengths = numpy.asarray(lengths, dtype=numpy.int64)
+        if lengths.shape != (len(dataset),):
+            raise ValueError(
+                'The number of lengths does not match the size of the '
+                'dataset.')
+        self._lengths = lengths
+
+        self.reset()
+
+    def __next__(self):
+        self._previous_epoch_detail = self.epoch_detail
+        self._state, indices = _bucket_iterator_statemachine(
+            self._state, self.repeat, self._plan)
+        if indices is None:
+            raise StopIteration
+
+        batch = _batch.get_examples(self.dataset, indices)
+        return batch
+
+    next = __next__
+
+    def _plan(self):
+        # Returns the order of the examples in the next epoch and the end
+        # position of the batch starting at each position.
+        n = len(self._lengths)
+        buckets = self._lengths // self.bucket_width
+        if self._shuffle:
+            perm = self._random.permutation(n)
+            order = perm[numpy.argsort(buckets[perm], kind='mergesort')]
+        else:
+            order = numpy.argsort(buckets, kind='mergesort')
+        lengths = self._lengths[order]
+
+        starts = []
+        i = 0
+        while i < n:
+            starts.append(i)
+            i_end = n if self.batch_size is None else min(
+                i + self.batch_size, n)
+            if self.max_tokens is not None:
+                # Each example has at least one element unless all of them
+                # are empty, so max_tokens also bounds the number of them.
+                i_end = min(i_end, i + self.max_tokens)
+                max_lengths = numpy.maximum.accumulate(lengths[i:i_end])
+                sizes = max_lengths * numpy.arange(1, len(max_lengths) + 1)
+                i_end = i + max(int(numpy.searchsorted(
+                    sizes, self.max_tokens, side='right')), 1)
+            i = i_end
+        starts = numpy.array(starts, dtype=numpy.intp)
+        ends = numpy.append(starts[1:], n).astype(numpy.intp)
+
+        if self._shuffle and n > 0:
+            perm = self._random.permutation(len(starts))
+            order = numpy.concatenate(
+                [order[starts[k]:ends[k]] for k in perm])
+            sizes = (ends - starts)[perm]
+            ends = numpy.cumsum(sizes)
+            starts = ends - sizes
+
+        batch_ends = numpy.zeros(n, dtype=numpy.intp)
+        batch_ends[starts] = ends
+        return order, batch_ends
+
+    @property
+    def current_position(self):
+        return self._state.current_position
+
+    @property
+    def epoch(self):
+        return self._state.epoch
+
+    @property
+    def is_new_epoch(self):
+        return self._state.is_new_epoch
+
+    @property
+    def epoch_detail(self):
+        n = len(self._state.order)
+        if n == 0:
+            return self.epoch
+        return self.epoch + self.current_position / n
+
+    @property
+    def previous_epoch_detail(self):
+        # use -1 instead of None internally.
+        if self._previous_epoch_detail < 0:
+            return None
+        return self._previous_epoch_detail
+
+    def serialize(self, serializer):
+        current_position = serializer('current_position',
+                                      self.current_position)
+        epoch = serializer('epoch', self.epoch)
+        is_new_epoch = serializer('is_new_epoch', self.is_new_epoch)
+        order = serializer('order', self._state.order)
+        batch_ends = serializer('batch_ends', self._state.batch_ends)
+        self._state = _BucketIteratorState(
+            current_position, epoch, is_new_epoch, order, batch_ends)
+        self._previous_epoch_detail = serializer(
+            'previous_epoch_detail', self._previous_epoch_detail)
+
+    def reset(self):
+        order, batch_ends = self._plan()
+        self._state = _BucketIteratorState(0, 0, False, order, batch_ends)
+        self._previous_epoch_detail = -1.
+
+    @property
+    def repeat(self):
+        return self._repeat
@@ -1,16 +1,16 @@
 from __future__ import division
 import datetime
 import multiprocessing
-from multiprocessing import sharedctypes  # type: ignore
 import signal
 import sys
 import threading
 import warnings
 
 import numpy
-import six
 
+from chainer.dataset import _batch
 from chainer.dataset import iterator
+from chainer.iterators import _shared_memory
 from chainer.iterators import _statemachine
 from chainer.iterators.order_samplers import ShuffleOrderSampler
 
@@ -39,6 +39,14 @@ class MultiprocessIterator(iterator.Iterator):
     Note that this iterator effectively prefetches the examples for the next
     batch asynchronously after the current batch is returned.
 
+    NumPy arrays in the examples, including ones nested in tuples, lists and
+    dicts, are sent from the worker processes through a ring buffer on shared
+    memory instead of pickling. Each slot of the ring is shared by all examples
+    in a batch, so examples of variable sizes can be sent as long as the
+    total size of a batch fits in ``batch_size * shared_mem`` bytes. The ring
+    has a single slot, or ``n_prefetch + 2`` slots if ``zero_copy`` is
+    ``True`` since the returned batches keep using their slots.
+
     This iterator saves ``-1`` instead of ``None`` in snapshots since some
     serializers do not support ``None``.
 
@@ -68,7 +76,14 @@ class MultiprocessIterator(iterator.Iterator):
             used by default.
         n_prefetch (int): Number of prefetch batches.
         shared_mem (int): The size of using shared memory per data.
-            If ``None``, size is adjusted automatically.
+            If ``None``, size is adjusted automatically to the size of the
+            largest example in the first batch, or twice the size if
+            ``zero_copy`` is ``True``.
+        zero_copy (bool): If ``True``, arrays in each batch are returned as
+            views of the shared memory without copying. They are only valid
+            until the next call of :meth:`next`, after which the memory is
+            reused for a subsequent batch; copy the arrays if you need to
+            keep them longer.
         dataset_timeout (float): :class:`MultiprocessIterator.TimeoutWarning`
             will be issued after this time in seconds elapsed in each dataset
             realization. ``None`` to disable the warning. You can turn this
@@ -99,11 +114,12 @@ class MultiprocessIterator(iterator.Iterator):
     _finalized = False
     _prefetch_loop = None
     _comm = None
+    _held_slot = None
 
     def __init__(self, dataset, batch_size, repeat=True, shuffle=None,
                  n_processes=None, n_prefetch=1, shared_mem=None,
                  order_sampler=None, dataset_timeout=30.0,
-                 maxtasksperchild=None):
+                 maxtasksperchild=None, zero_copy=False):
         self.dataset = dataset
         self.batch_size = batch_size
         self.repeat = repeat
@@ -111,6 +127,7 @@ class MultiprocessIterator(iterator.Iterator):
         self.n_processes = n_processes or multiprocessing.cpu_count()
         self.n_prefetch = max(n_prefetch, 1)
         self.shared_mem = shared_mem
+        self.zero_copy = zero_copy
         self.dataset_timeout = dataset_timeout
         self._maxtasksperchild = maxtasksperchild
 
@@ -132,17 +149,23 @@ class MultiprocessIterator(iterator.Iterator):
 
     def _initialize_loop(self):
         self._comm = _Communicator(self.n_prefetch, self.dataset_timeout)
+        self._held_slot = None
         self.reset()
 
         self._prefetch_loop = _PrefetchLoop(
             self.dataset, self.batch_size, self.repeat,
             self.n_processes, self.n_prefetch, self.shared_mem,
             self._comm, self.order_sampler,
-            self._interruption_testing, self._maxtasksperchild)
+            self._interruption_testing, self._maxtasksperchild,
+            self.zero_copy)
         # defer launching prefetch thread until creating the worker pool,
         # not to leave a background thread in forked processes.
 
     def __next__(self):
+        # Arrays of the previous batch may be views of this slot.
+        self._release_slots([self._held_slot])
+        self._held_slot = None
+
         measure_mode = False
         if self._prefetch_loop.thread is None:
             if self._prefetch_loop.measure_required():
@@ -152,7 +175,7 @@ class MultiprocessIterator(iterator.Iterator):
             self._prefetch_loop.launch_thread()
 
         if not measure_mode:
-            batch, state = self._comm.get()
+            batch, state, self._held_slot = self._comm.get()
 
         self._previous_epoch_detail = self.epoch_detail
         self._state = state
@@ -184,7 +207,8 @@ class MultiprocessIterator(iterator.Iterator):
         other = MultiprocessIterator(
             self.dataset, self.batch_size, self.repeat, shuffle=None,
             n_processes=self.n_processes, n_prefetch=self.n_prefetch,
-            shared_mem=self.shared_mem, order_sampler=self.order_sampler)
+            shared_mem=self.shared_mem, order_sampler=self.order_sampler,
+            zero_copy=self.zero_copy)
 
         other._reset_state(self.current_position, self.epoch,
                            self.is_new_epoch, self._state.order)
@@ -252,7 +276,12 @@ class MultiprocessIterator(iterator.Iterator):
                 'supported.')
         self._state = _statemachine.IteratorState(
             current_position, epoch, is_new_epoch, order)
-        self._comm.reset(self._state)
+        self._release_slots(self._comm.reset(self._state))
+
+    def _release_slots(self, slots):
+        for slot in slots:
+            if slot is not None:
+                self._prefetch_loop.ring.release(slot)
 
     @property
     def _epoch_size(self):
@@ -268,7 +297,9 @@ class MultiprocessIterator(iterator.Iterator):
         # this allows us to use the same code for both
         # chainer and pickle serializers
         state = {}
-        self.serialize(lambda k, v: state.__setitem__(k, v))
+        # The values are returned so that the state is not reset to `None`
+        # while the prefetch thread is running.
+        self.serialize(lambda k, v: state.setdefault(k, v))
         self._reset_state(self.current_position, self.epoch,
                           self.is_new_epoch, state['order'])
 
@@ -279,6 +310,7 @@ class MultiprocessIterator(iterator.Iterator):
         del init['_comm']
         del init['_state']
         del init['_prefetch_loop']
+        del init['_held_slot']
 
         # TODO(ecastill): When pickling this object there is the risk to copy
         # the entire dataset. If the dataset is entirely in memory
@@ -331,18 +363,21 @@ class _Communicator(object):
                         and dt > datetime.timedelta(
                             seconds=self.dataset_timeout)):
                     _raise_timeout_warning()
-            batch, prefetch_state = self._batch_queue.pop(0)
+            batch, prefetch_state, slot = self._batch_queue.pop(0)
             self._not_full_cond.notify()
-            return batch, prefetch_state
+            return batch, prefetch_state, slot
 
     # called from iterator
     def reset(self, prefetch_state):
+        # Returns the shared memory slots of the discarded batches.
         with self._lock:
             self._status = _Communicator.STATUS_RESET
             self._prefetch_state = prefetch_state
+            slots = [slot for _, _, slot in self._batch_queue]
             self._batch_queue = []
             self._not_full_cond.notify()
             self._reset_count += 1
+            return slots
 
     # called from iterator
     def terminate(self):
@@ -363,13 +398,16 @@ class _Communicator(object):
             return status, prefetch_state, self._reset_count
 
     # called from thread
-    def put(self, batch, prefetch_state, reset_count):
+    def put(self, batch, prefetch_state, reset_count, slot=None):
+        # Returns False if the batch is discarded due to reset.
         with self._lock:
             if len(self._batch_queue) == self.n_prefetch:
                 self._not_full_cond.wait()
             if reset_count == self._reset_count:
-                self._batch_queue.append((batch, prefetch_state))
+                self._batch_queue.append((batch, prefetch_state, slot))
                 self._not_empty_cond.notify()
+                return True
+            return False
 
 
 class _PrefetchLoop(object):
@@ -381,15 +419,18 @@ class _PrefetchLoop(object):
     def __init__(self, dataset, batch_size, repeat,
                  n_processes, n_prefetch, mem_size, comm,
                  order_sampler,
-                 _interruption_testing, maxtasksperchild):
+                 _interruption_testing, maxtasksperchild, zero_copy=False):
         self.dataset = dataset
         self.batch_size = batch_size
         self.repeat = repeat
         self.n_processes = n_processes
+        self.n_prefetch = n_prefetch
         self.mem_size = mem_size
+        self.zero_copy = zero_copy
         self._comm = comm
         self.order_sampler = order_sampler
         self.maxtasksperchild = maxtasksperchild
+        self._batched = _batch.supports_batch(dataset)
 
         self._allocate_shared_memory()
 
@@ -432,7 +473,7 @@ class _PrefetchLoop(object):
             batch_ret = [None]
 
             def fetch_batch():
-                batch_ret[0] = [self.dataset[idx] for idx in indices]
+                batch_ret[0] = _batch.get_examples(self.dataset, indices)
 
             if dataset_timeout is None:
                 # Timeout is not set: fetch synchronously
@@ -448,23 +489,34 @@ class _PrefetchLoop(object):
                 thr.join()
 
             batch = batch_ret[0]
-            self.mem_size = max(map(_measure, batch))
+            self.mem_size = max(map(_shared_memory.measure, batch))
+            if self.zero_copy:
+                # Leave room for examples larger than the ones in the first
+                # batch, as is common in variable-length datasets.
+                self.mem_size *= 2
             self._allocate_shared_memory()
 
         return batch, self.prefetch_state
 
     def _allocate_shared_memory(self):
-        if self.measure_required():
-            self.mem_bulk = None
+        if self.measure_required() or self.mem_size == 0:
+            self.ring = None
         else:
-            self.mem_bulk = \
-                sharedctypes.RawArray('b', self.batch_size * self.mem_size)
+            if self.zero_copy:
+                # A slot for each prefetched batch, one for the batch being
+                # fetched, and one for the batch held by the iterator.
+                n_slots = self.n_prefetch + 2
+            else:
+                # The slot is released as soon as the batch is unpacked.
+                n_slots = 1
+            self.ring = _shared_memory.SharedRingBuffer(
+                n_slots, self.batch_size * self.mem_size)
 
     def launch_thread(self):
         self._pool = multiprocessing.Pool(
             processes=self.n_processes,
             initializer=_fetch_setup,
-            initargs=(self.dataset, self.mem_size, self.mem_bulk),
+            initargs=(self.dataset, self.mem_size, self.ring),
             maxtasksperchild=self.maxtasksperchild)
         if self._interruption_testing:
             pids = self._pool.map(_report_pid, range(self.n_processes))
@@ -503,10 +555,31 @@ class _PrefetchLoop(object):
         self.prefetch_state, indices = _statemachine.iterator_statemachine(
             self.prefetch_state, self.batch_size, self.repeat,
             self.order_sampler, len(self.dataset))
+        slot = None
         if indices is None:  # stop iteration
             batch = None
         else:
-            future = self._pool.map_async(_fetch_run, enumerate(indices))
+            ring = self.ring
+            if ring is not None:
+                while slot is None:
+                    if self._comm.is_terminated:
+                        return False
+                    slot = ring.acquire(_response_time)
+            # The chunk size is given explicitly since the default one is
+            # computed from the number of live workers, which can be zero
+            # while the workers are replaced when maxtasksperchild is set.
+            if self._batched:
+                # Each worker fetches a chunk of the batch by one call.
+                chunks = [chunk for chunk in numpy.array_split(
+                    indices, self.n_processes) if len(chunk) > 0]
+                future = self._pool.map_async(
+                    _fetch_run_columns, [(slot, chunk) for chunk in chunks],
+                    chunksize=1)
+            else:
+                chunksize = -(-len(indices) // (self.n_processes * 4))
+                future = self._pool.map_async(
+                    _fetch_run, [(slot, index) for index in indices],
+                    chunksize=chunksize)
             while True:
                 try:
                     data_all = future.get(_response_time)
@@ -515,9 +588,21 @@ class _PrefetchLoop(object):
                         return False
                 else:
                     break
-            batch = [_unpack(data, self.mem_bulk) for data in data_all]
-
-        self._comm.put(batch, self.prefetch_state, reset_count)
+            if ring is None:
+                batch = data_all
+            else:
+                batch = [ring.unpack(data, copy=not self.zero_copy)
+                         for data in data_all]
+                if not self.zero_copy:
+                    ring.release(slot)
+                    slot = None
+            if self._batched:
+                batch = _batch.make_batch(
+                    self.dataset, _batch.concat_columns(batch))
+
+        if (not self._comm.put(batch, self.prefetch_state, reset_count, slot)
+                and slot is not None):
+            self.ring.release(slot)
         return True
 
 
@@ -529,125 +614,46 @@ class _PrefetchLoop(object):
 # To make static linter happy, we first initialize global variables.
 _fetch_dataset = None
 _fetch_mem_size = None
-_fetch_mem_bulk = None
+_fetch_ring = None
 
 
-def _fetch_setup(dataset, mem_size, mem_bulk):
-    global _fetch_dataset, _fetch_mem_size, _fetch_mem_bulk
+def _fetch_setup(dataset, mem_size, ring):
+    global _fetch_dataset, _fetch_mem_size, _fetch_ring
     signal.signal(signal.SIGINT, signal.SIG_IGN)
     _fetch_dataset = dataset
     _fetch_mem_size = mem_size
-    _fetch_mem_bulk = mem_bulk
+    _fetch_ring = ring
 
 
 def _fetch_run(inputs):
-    i, index = inputs
-    data = _fetch_dataset[index]
-    if _fetch_mem_bulk is not None:
-        offset = i * _fetch_mem_size
-        limit = offset + _fetch_mem_size
-        data = _pack(data, _fetch_mem_bulk, offset, limit)
+    slot, index = inputs
+    return _pack(_fetch_dataset[index], slot, 1)
+
+
+def _fetch_run_columns(inputs):
+    slot, indices = inputs
+    return _pack(
+        tuple(_batch.get_columns(_fetch_dataset, indices)), slot,
+        len(indices))
+
+
+def _pack(data, slot, n_examples):
+    # n_examples: number of examples in data
+    if _fetch_ring is not None:
+        nbytes = _shared_memory.measure(data)
+        data, packed = _fetch_ring.pack(data, slot)
+        if not packed:
+            warnings.warn(
+                'Shared memory size is too small.\n' +
+                'Please set shared_mem option for MultiprocessIterator.\n' +
+                'Expect shared memory size: {} bytes per example.\n'.format(
+                    -(-nbytes // n_examples)) +
+                'Actual shared memory size: {} bytes per example '
+                '({} bytes per batch).'.format(
+                    _fetch_mem_size, _fetch_ring.slot_size),
+                UserWarning)
     return data
 
 
 def _report_pid(_):  # for testing
     return multiprocessing.current_process().pid
-
-
-class _PackedNdarray(object):
-
-    def __init__(self, array, mem, offset):
-        self.shape = array.shape
-        self.dtype = array.dtype
-        self.nbytes = array.nbytes
-        self.size = array.size
-        self.offset = offset
-        total = self.offset + self.nbytes
-        if total > len(mem):
-            raise ValueError(
-                'Shared memory size is too small. expect:{}, actual:{}'.format(
-                    total, len(mem)))
-        target = numpy.frombuffer(mem, self.dtype, self.size, self.offset)
-        target[...] = array.ravel()
-
-    def unpack(self, mem):
-        ret = numpy.frombuffer(mem, self.dtype, self.size, self.offset)
-        ret = ret.reshape(self.shape).copy()
-        return ret
-
-
-def _measure(data):
-    expect = 0
-    t = type(data)
-    if t is tuple or t is list or t is dict:
-        for v in data:
-            if isinstance(v, numpy.ndarray):
-                expect += v.nbytes
-    return expect
-
-
-def _pack(data, mem, offset, limit):
-    if len(mem) == 0:
-        return data
-    t = type(data)
-    over = False
-    if t is tuple or t is list:
-        ret = []
-        for v in data:
-            if isinstance(v, numpy.ndarray):
-                if v.nbytes + offset > limit:
-                    over = True
-                else:
-                    v = _PackedNdarray(v, mem, offset)
-                    offset += v.nbytes
-            ret.append(v)
-        data = t(ret)
-    elif t is dict:
-        ret = {}
-        for k, v in six.iteritems(data):
-            if isinstance(v, numpy.ndarray):
-                if v.nbytes + offset > limit:
-                    over = True
-                else:
-                    v = _PackedNdarray(v, mem, offset)
-                    offset += v.nbytes
-            ret[k] = v
-        data = ret
-    elif t is numpy.ndarray:
-        if data.nbytes + offset > limit:
-            over = True
-        else:
-            data = _PackedNdarray(data, mem, offset)
-            offset += data.nbytes
-    if over:
-        expect = _measure(data)
-        warnings.warn(
-            'Shared memory size is too small.\n' +
-            'Please set shared_mem option for MultiprocessIterator.\n' +
-            'Expect shared memory size: {} bytes.\n'.format(expect) +
-            'Actual shared memory size: {} bytes.'.format(limit - offset),
-            UserWarning)
-    return data
-
-
-def _unpack(data, mem):
-    if len(mem) == 0:
-        return data
-    t = type(data)
-    if t is tuple or t is list:
-        ret = []
-        for v in data:
-            if isinstance(v, _PackedNdarray):
-                v = v.unpack(mem)
-            ret.append(v)
-        data = t(ret)
-    elif t is dict:
-        ret = {}
-        for k, v in six.iteritems(data):
-            if isinstance(v, _PackedNdarray):
-                v = v.unpack(mem)
-            ret[k] = v
-        data = ret
-    elif t is _PackedNdarray:
-        data = data.unpack(mem)
-    return data
@@ -3,6 +3,7 @@ from multiprocessing import pool
 
 import numpy
 
+from chainer.dataset import _batch
 from chainer.dataset import iterator
 from chainer.iterators import _statemachine
 from chainer.iterators.order_samplers import ShuffleOrderSampler
@@ -65,6 +66,7 @@ class MultithreadIterator(iterator.Iterator):
 
         self.n_threads = n_threads
         self._pool = None
+        self._batched = _batch.supports_batch(dataset)
 
         self.reset()
 
@@ -141,6 +143,11 @@ class MultithreadIterator(iterator.Iterator):
         dataset, index = args
         return dataset[index]
 
+    @staticmethod
+    def _read_columns(args):
+        dataset, indices = args
+        return _batch.get_columns(dataset, indices)
+
     def _invoke_prefetch(self):
         assert self._next is None
         self._next_state, indices = _statemachine.iterator_statemachine(
@@ -152,8 +159,16 @@ class MultithreadIterator(iterator.Iterator):
         else:
             if self._pool is None:
                 self._pool = pool.ThreadPool(self.n_threads)
-            args = [(self.dataset, index) for index in indices]
-            self._next = self._pool.map_async(MultithreadIterator._read, args)
+            if self._batched:
+                # Each worker thread fetches a chunk of the batch by one call.
+                args = [(self.dataset, chunk) for chunk in numpy.array_split(
+                    indices, self.n_threads) if len(chunk) > 0]
+                self._next = self._pool.map_async(
+                    MultithreadIterator._read_columns, args, chunksize=1)
+            else:
+                args = [(self.dataset, index) for index in indices]
+                self._next = self._pool.map_async(
+                    MultithreadIterator._read, args)
 
     def _get(self):
         self._previous_epoch_detail = self.epoch_detail
@@ -167,7 +182,10 @@ class MultithreadIterator(iterator.Iterator):
         while not next.ready():
             next.wait(0.5)  # To avoid interruption bug in Python2
 
-        batch = [data for data in next.get()]
+        batch = next.get()
+        if self._batched:
+            batch = _batch.make_batch(
+                self.dataset, _batch.concat_columns(batch))
         return batch
 
     @property
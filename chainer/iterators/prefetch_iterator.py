@@ -0,0 +1,193 @@
+from multiprocessing import pool
+
+from chainer import configuration
+from chainer.dataset import convert
+from chainer.dataset import iterator
+from chainer import serializers
+
+
+class PrefetchIterator(iterator.Iterator):
+
+    """Iterator that fetches and converts the next batch in background.
+
+    This iterator wraps another iterator and a converter. Each call of
+    :meth:`next` returns the batch converted by the converter, and then
+    starts fetching and converting the next batch in a worker thread, so
+    that the data preparation, including stacking, padding and device
+    transfer, overlaps the computation using the current batch.
+
+    Unlike the other iterators, this iterator returns converted batches, e.g.,
+    tuples of arrays. :class:`~chainer.training.updaters.StandardUpdater`
+    and :class:`~chainer.training.extensions.Evaluator` use them as they are
+    without calling their own converters.
+    :class:`~chainer.training.updaters.ParallelUpdater` and
+    :class:`~chainer.training.updaters.MultiprocessParallelUpdater`, which
+    convert the batch of each device separately, do not accept this iterator.
+
+    .. doctest::
+
+        from chainer import iterators
+        ...
+        updater = chainer.training.updaters.StandardUpdater(
+                       iterators.PrefetchIterator(
+                           iterators.SerialIterator(...),
+                           device=device),
+                       ...,
+                       device=device)
+
+    The epoch attributes reflect the batch returned last. The state written by
+    :meth:`serialize` is that of the wrapped iterator as if the batch being
+    prefetched had not been fetched, so that a snapshot taken with this
+    iterator can be resumed with or without it. In order to do so, the
+    prefetched batch is discarded on serialization and fetched again.
+
+    .. note::
+       The converter is called in the worker thread. If it returns arrays
+       that it reuses later, such as
+       :class:`~chainer.dataset.ConcatWithBuffers`, it must keep at least
+       two batches valid.
+
+    Args:
+        iterator (~chainer.dataset.Iterator): Iterator to wrap.
+        converter: Converter function to build input arrays.
+            :func:`chainer.dataset.concat_examples` is used by default.
+        device (device specifier): Device to which the arrays are sent.
+
+    """
+
+    def __init__(self, iterator, converter=convert.concat_examples,
+                 device=None):
+        self.iterator = iterator
+        self.converter = converter
+        self.device = convert._get_device(device)
+
+        self._pool = None
+        self._next = None
+        self._snapshot = None
+        self._current = None
+
+    @property
+    def batch_size(self):
+        return self.iterator.batch_size
+
+    @property
+    def repeat(self):
+        return self.iterator.repeat
+
+    @property
+    def epoch(self):
+        return self._attribute('epoch')
+
+    @property
+    def epoch_detail(self):
+        return self._attribute('epoch_detail')
+
+    @property
+    def previous_epoch_detail(self):
+        return self._attribute('previous_epoch_detail')
+
+    @property
+    def is_new_epoch(self):
+        return self._attribute('is_new_epoch')
+
+    def _attribute(self, name):
+        if self._current is None:
+            return getattr(self.iterator, name)
+        return self._current[name]
+
+    def __next__(self):
+        if self._next is None:
+            self._invoke_prefetch()
+
+        result = self._next.get()
+        self._next = None
+        if result is None:
+            raise StopIteration
+        batch, self._current = result
+
+        self._invoke_prefetch()  # prefetch for the next iteration
+        return batch
+
+    next = __next__
+
+    def _invoke_prefetch(self):
+        assert self._next is None
+        self._snapshot = _take_snapshot(self.iterator)
+        if self._pool is None:
+            self._pool = pool.ThreadPool(1)
+        local_config = configuration.config._local.__dict__.copy()
+        self._next = self._pool.apply_async(self._fetch, (local_config,))
+
+    def _fetch(self, local_config):
+        # Configuration is thread-local. Run with that of the caller.
+        local = configuration.config._local
+        local.__dict__.update(local_config)
+        try:
+            try:
+                batch = self.iterator.next()
+            except StopIteration:
+                return None
+            attributes = {
+                name: getattr(self.iterator, name)
+                for name in ('epoch', 'epoch_detail',
+                             'previous_epoch_detail', 'is_new_epoch')}
+            return convert._call_converter(
+                self.converter, batch, self.device), attributes
+        finally:
+            local.__dict__.clear()
+
+    def _discard_prefetch(self):
+        # Waits for the prefetch and rewinds the wrapped iterator to the state
+        # before it.
+        next = self._next
+        if next is None:
+            return
+        self._next = None
+        next.wait()
+        _restore_snapshot(self.iterator, self._snapshot)
+        self._snapshot = None
+
+    def serialize(self, serializer):
+        self._discard_prefetch()
+        self._current = None
+        self.iterator.serialize(serializer)
+
+    def reset(self):
+        self._discard_prefetch()
+        self._current = None
+        self.iterator.reset()
+
+    def finalize(self):
+        pool = self._pool
+
+        self._next = None
+        self._pool = None
+        if pool is not None:
+            pool.close()
+            pool.join()
+        self.iterator.finalize()
+
+
+def _take_snapshot(iterator):
+    # Iterators in this package keep their state in immutable objects, while
+    # some of them restart their own prefetching on serialization. Their
+    # states are referred to directly. The states of other iterators are
+    # taken by serialization.
+    if hasattr(iterator, '_state') \
+            and hasattr(iterator, '_previous_epoch_detail'):
+        return iterator._state, iterator._previous_epoch_detail
+    target = {}
+    iterator.serialize(serializers.DictionarySerializer(target))
+    return target
+
+
+def _restore_snapshot(iterator, snapshot):
+    if isinstance(snapshot, tuple):
+        state, previous_epoch_detail = snapshot
+        iterator._state = state
+        iterator._previous_epoch_detail = previous_epoch_detail
+        # Serialization makes the iterator consistent with the state, e.g.,
+        # discards its own prefetched batches.
+        iterator.serialize(lambda key, value: value)
+    else:
+        iterator.serialize(serializers.NpzDeserializer(snapshot))
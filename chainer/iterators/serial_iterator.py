@@ -2,6 +2,7 @@ from __future__ import division
 
 import numpy
 
+from chainer.dataset import _batch
 from chainer.dataset import iterator
 from chainer.iterators import _statemachine
 from chainer.iterators.order_samplers import ShuffleOrderSampler
@@ -74,7 +75,7 @@ class SerialIterator(iterator.Iterator):
         if indices is None:
             raise StopIteration
 
-        batch = [self.dataset[index] for index in indices]
+        batch = _batch.get_examples(self.dataset, indices)
         return batch
 
     next = __next__
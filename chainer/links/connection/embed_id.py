@@ -20,6 +20,10 @@ class EmbedID(link.Link):
             its ``ndim`` should be 2.
         ignore_label (int or None): If ``ignore_label`` is an int value,
             ``i``-th row of return value is filled with ``0``.
+        sparse_grad (bool): If ``True``, the gradient w.r.t. ``W`` is
+            accumulated as a row-sparse gradient, and optimizers update only
+            the rows of the IDs in the mini-batch. See
+            :func:`~chainer.functions.embed_id` for details.
 
     .. seealso:: :func:`~chainer.functions.embed_id`
 
@@ -47,10 +51,13 @@ class EmbedID(link.Link):
     """
 
     ignore_label = None
+    sparse_grad = False
 
-    def __init__(self, in_size, out_size, initialW=None, ignore_label=None):
+    def __init__(self, in_size, out_size, initialW=None, ignore_label=None,
+                 sparse_grad=False):
         super(EmbedID, self).__init__()
         self.ignore_label = ignore_label
+        self.sparse_grad = sparse_grad
 
         with self.init_scope():
             if initialW is None:
@@ -58,7 +65,7 @@ class EmbedID(link.Link):
             self.W = variable.Parameter(initialW, (in_size, out_size))
 
     @classmethod
-    def from_params(cls, W, ignore_label=None):
+    def from_params(cls, W, ignore_label=None, sparse_grad=False):
         """Initialize `~chainer.links.EmbedID` with the given parameter.
 
         Args:
@@ -66,12 +73,15 @@ class EmbedID(link.Link):
                 The weight parameter.
             ignore_label (int or None): If ``ignore_label`` is an int value,
                 ``i``-th column of return value is filled with ``0``.
+            sparse_grad (bool): If ``True``, the gradient w.r.t. ``W`` is
+                accumulated as a row-sparse gradient.
         """
         in_size, out_size = W.shape
         link = cls(
             in_size, out_size,
             initialW=variable.as_array(W),
-            ignore_label=ignore_label
+            ignore_label=ignore_label,
+            sparse_grad=sparse_grad
         )
         return link
 
@@ -85,4 +95,6 @@ class EmbedID(link.Link):
             ~chainer.Variable: Batch of corresponding embeddings.
 
         """
-        return embed_id.embed_id(x, self.W, ignore_label=self.ignore_label)
+        return embed_id.embed_id(
+            x, self.W, ignore_label=self.ignore_label,
+            sparse_grad=self.sparse_grad)
@@ -102,6 +102,16 @@ class BinaryHierarchicalSoftmaxFunction(
             begins[i + 1] = begins[i] + length
         self.begins = begins
 
+        # Indexes of the paths and the codes of each word padded to the
+        # longest path, which the CPU implementation uses to process the
+        # examples of a mini-batch at once.
+        lengths = numpy.diff(begins)
+        max_length = int(lengths.max()) if n_vocab > 0 else 0
+        offsets = numpy.arange(max_length, dtype=numpy.int32)
+        self.padded_index = numpy.minimum(
+            begins[:-1, None] + offsets, max(len(self.paths) - 1, 0))
+        self.padded_mask = offsets < lengths[:, None]
+
         self.parser_size = parser.size()
 
     def check_type_forward(self, in_types):
@@ -126,46 +136,53 @@ class BinaryHierarchicalSoftmaxFunction(
         self.paths = visitor.visit_array(self.paths)
         self.codes = visitor.visit_array(self.codes)
         self.begins = visitor.visit_array(self.begins)
+        self.padded_index = visitor.visit_array(self.padded_index)
+        self.padded_mask = visitor.visit_array(self.padded_mask)
 
     def forward_cpu(self, inputs):
         x, t, W = inputs
+        paths, codes = self._padded_paths_and_codes(t)
 
-        loss = x.dtype.type(0.0)
-        for ix, it in six.moves.zip(x, t):
-            loss += self._forward_cpu_one(ix, it, W)
-        return numpy.array(loss),
-
-    def _forward_cpu_one(self, x, t, W):
-        begin = self.begins[t]
-        end = self.begins[t + 1]
-
-        w = W[self.paths[begin:end]]
-        wxy = w.dot(x) * self.codes[begin:end]
+        w = W[paths]
+        wxy = numpy.einsum('ij,ikj->ik', x, w) * codes
         loss = numpy.logaddexp(0.0, -wxy)  # == log(1 + exp(-wxy))
-        return numpy.sum(loss)
+        # Padded elements of the paths have zero codes.
+        loss[codes == 0] = 0
+        self.wxy = wxy
+        return numpy.array(loss.sum(), dtype=x.dtype),
+
+    def _padded_paths_and_codes(self, t):
+        # Returns the paths and the codes of the examples padded to the
+        # longest path in the tree. The codes of the padding are zero.
+        index = self.padded_index[t]
+        mask = self.padded_mask[t]
+        return self.paths[index], self.codes[index] * mask
 
     def backward_cpu(self, inputs, grad_outputs):
         x, t, W = inputs
         gloss, = grad_outputs
-        gx = numpy.empty_like(x)
+        paths, codes = self._padded_paths_and_codes(t)
+
+        w = W[paths]
+        g = -gloss * codes / (1.0 + numpy.exp(self.wxy))
+        gx = numpy.einsum('ik,ikj->ij', g, w).astype(x.dtype, copy=False)
+        # Scatter-adds the gradients of the nodes, which is same as
+        # numpy.add.at but much faster. The gradients are sorted by the nodes
+        # and summed up for each of them.
         gW = numpy.zeros_like(W)
-        for i, (ix, it) in enumerate(six.moves.zip(x, t)):
-            gx[i] = self._backward_cpu_one(ix, it, W, gloss, gW)
+        examples, positions = numpy.nonzero(codes)
+        nodes = paths[examples, positions]
+        order = numpy.argsort(nodes, kind='mergesort')
+        nodes = nodes[order]
+        examples = examples[order]
+        positions = positions[order]
+        gw = g[examples, positions, None] * x[examples]
+        if len(nodes) > 0:
+            starts = numpy.flatnonzero(numpy.concatenate(
+                ([True], nodes[1:] != nodes[:-1])))
+            gW[nodes[starts]] = numpy.add.reduceat(gw, starts, axis=0)
         return gx, None, gW
 
-    def _backward_cpu_one(self, x, t, W, gloss, gW):
-        begin = self.begins[t]
-        end = self.begins[t + 1]
-
-        path = self.paths[begin:end]
-        w = W[path]
-        wxy = w.dot(x) * self.codes[begin:end]
-        g = -gloss * self.codes[begin:end] / (1.0 + numpy.exp(wxy))
-        gx = g.dot(w)
-        gw = g.reshape((g.shape[0], 1)).dot(x.reshape(1, x.shape[0]))
-        gW[path] += gw
-        return gx
-
     def forward_gpu(self, inputs):
         x, t, W = inputs
         max_length = cuda.reduce(
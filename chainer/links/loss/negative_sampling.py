@@ -1,3 +1,5 @@
+import time
+
 import numpy
 
 import chainer
@@ -22,6 +24,15 @@ class NegativeSampling(link.Link):
         sample_size (int): Number of negative samples.
         power (float): Power factor :math:`\\alpha`.
         dtype (numpy.dtype): Type to use in computing.
+        sample_buffer_size (int): If it is given, negative samples are drawn
+            ahead for at least this number of samples by one vectorized call
+            of the sampler (see :class:`~chainer.utils.WalkerAlias`). A
+            multiple of ``batch_size * sample_size`` is recommended.
+
+    On each call, the throughput of the sampler, i.e. the number of samples
+    drawn per second in total, is reported as ``sampler_throughput`` to the
+    current reporter. On GPU, it only measures the time to launch the
+    sampling kernels.
 
     .. seealso:: :func:`~chainer.functions.negative_sampling` for more detail.
 
@@ -30,7 +41,11 @@ class NegativeSampling(link.Link):
 
     """
 
-    def __init__(self, in_size, counts, sample_size, power=0.75, dtype=None):
+    _n_samples = 0
+    _sample_time = 0.
+
+    def __init__(self, in_size, counts, sample_size, power=0.75, dtype=None,
+                 sample_buffer_size=None):
         super(NegativeSampling, self).__init__()
         dtype = chainer.get_dtype(dtype)
         vocab_size = len(counts)
@@ -38,7 +53,8 @@ class NegativeSampling(link.Link):
         power = dtype.type(power)
         p = numpy.array(counts, dtype)
         numpy.power(p, power, p)
-        self.sampler = walker_alias.WalkerAlias(p)
+        self.sampler = walker_alias.WalkerAlias(
+            p, buffer_size=sample_buffer_size)
 
         with self.init_scope():
             self.W = variable.Parameter(0, (vocab_size, in_size))
@@ -81,6 +97,27 @@ class NegativeSampling(link.Link):
                 kwargs, ('return_samples', return_samples))
 
         ret = negative_sampling.negative_sampling(
-            x, t, self.W, self.sampler.sample, self.sample_size,
+            x, t, self.W, self._sample, self.sample_size,
             reduce=reduce, return_samples=return_samples)
+        throughput = self.sampler_throughput
+        if throughput is not None:
+            chainer.report({'sampler_throughput': throughput}, self)
         return ret
+
+    @property
+    def sampler_throughput(self):
+        """Number of negative samples drawn per second in total.
+
+        It is ``None`` until the sampler is called.
+
+        """
+        if self._sample_time == 0:
+            return None
+        return self._n_samples / self._sample_time
+
+    def _sample(self, shape):
+        start = time.time()
+        samples = self.sampler.sample(shape)
+        self._sample_time += time.time() - start
+        self._n_samples += samples.size
+        return samples
@@ -8,6 +8,7 @@ import numpy
 import six
 
 import chainer
+from chainer.backends import cuda
 from chainer import link as link_module
 from chainer import optimizer_hooks
 from chainer import serializer as serializer_module
@@ -247,8 +248,62 @@ class UpdateRule(object):
 
         with chainer.using_device(param.device):
             with variable._AllowArrayAccessWithNonstandardLayout():
+                if getattr(param, '_sparse_grad', None) is None:
+                    self.__update(param)
+                    return
+                if self._can_update_rows(param):
+                    # The states are gathered row by row, so they are
+                    # initialized in advance.
+                    self._init_states(param)
+                    if self._has_row_states(param):
+                        self.__update_rows(param)
+                        return
+                param._densify_sparse_grad()
                 self.__update(param)
 
+    def _can_update_rows(self, param):
+        # Returns True if the rows of the row-sparse gradient can be updated
+        # independently of the other rows, provided that the states are
+        # arrays of the same shape as the parameter.
+        if (not self.is_elementwise
+                or self._use_fp32_update
+                or param.layout is not None
+                or param.grad is not None
+                or not _is_row_sparse_hooks(
+                    self._hookable._pre_update_hooks)
+                or not _is_row_sparse_hooks(
+                    self._hookable._post_update_hooks)):
+            return False
+        return type(param.array) in (numpy.ndarray, cuda.ndarray)
+
+    def _has_row_states(self, param):
+        # Returns True if all the states can be indexed by the rows of the
+        # parameter.
+        array = param.array
+        for value in six.itervalues(self.state):
+            if type(value) is not type(array) or value.shape != array.shape:
+                return False
+        return True
+
+    def __update_rows(self, param):
+        # Lazily updates only the rows of the row-sparse gradient, by
+        # applying the elementwise update rule to the gathered rows of the
+        # parameter and the state. The other rows, including the state of
+        # them, are left unchanged.
+        sparse_grad = param._sparse_grad
+        indices = sparse_grad.indices
+        rows = _gather_rows(param, sparse_grad)
+        state = self._state
+        self._state = dict([
+            (key, value[indices]) for key, value in six.iteritems(state)])
+        try:
+            self.__update(rows)
+        finally:
+            for key, value in six.iteritems(self._state):
+                state[key][indices] = value
+            self._state = state
+        param.array[indices] = rows.array
+
     def __update(self, param):
         try:
             param_dtype = param.dtype
@@ -500,6 +555,39 @@ class UpdateRule(object):
         self._use_fp32_update = flag
 
 
+def _is_row_sparse_hooks(hooks):
+    # Returns True if the hooks can be applied to rows of a parameter.
+    return all([getattr(hook, 'is_elementwise', False)
+                for hook in six.itervalues(hooks)])
+
+
+def _gather_rows(param, sparse_grad):
+    # Returns a variable of the rows of a parameter whose gradient is the
+    # values of the row-sparse gradient.
+    rows = variable.Variable._init_unchecked(
+        param.array[sparse_grad.indices], device=param.device,
+        is_chainerx_array=False)
+    rows._set_grad_without_check(sparse_grad.values)
+    rows._loss_scale = param._loss_scale
+    return rows
+
+
+def _call_hook_for_param(hook, param):
+    sparse_grad = getattr(param, '_sparse_grad', None)
+    if sparse_grad is None:
+        hook(param.update_rule, param)
+    elif (getattr(hook, 'is_elementwise', False) and param.grad is None
+            and param.array is not None):
+        # Applies the hook only to the rows of the row-sparse gradient.
+        rows = _gather_rows(param, sparse_grad)
+        hook(param.update_rule, rows)
+        if rows.grad is not sparse_grad.values:
+            sparse_grad.values[...] = rows.grad
+    else:
+        param._densify_sparse_grad()
+        hook(param.update_rule, param)
+
+
 class _OptimizerHookable(_Hookable):
     def __init__(self, optimizer):
         super(_OptimizerHookable, self).__init__(
@@ -703,7 +791,7 @@ class Optimizer(object):
     def call_hook(self, hook):
         if getattr(hook, 'call_for_each_param', False):
             for param in self.target.params():
-                hook(param.update_rule, param)
+                _call_hook_for_param(hook, param)
         else:
             hook(self)
 
@@ -764,7 +852,10 @@ class Optimizer(object):
             return
         for name, param in self.target.namedparams():
             xp = param.device.xp
-            if not xp.all(xp.isfinite(param.grad)):
+            grad = param.grad
+            if grad is None and param._sparse_grad is not None:
+                grad = param._sparse_grad.values
+            if not xp.all(xp.isfinite(grad)):
                 self._loss_scaling_isnan = True
                 self._loss_scaling_isnan_ever = True
                 warnings.warn(
@@ -788,6 +879,128 @@ class Optimizer(object):
                                       self._loss_scale * multiplier))
 
 
+def _foreach_key(param):
+    # Returns the key to group the parameter for the foreach update, or
+    # ``None`` if the parameter must be updated individually.
+    rule = param.update_rule
+    if (rule is None
+            or not rule.enabled
+            or not rule.is_elementwise
+            or rule._use_fp32_update
+            or rule._hookable._pre_update_hooks
+            or rule._hookable._post_update_hooks
+            # The rule must not have its own hyperparameter values.
+            or len(rule.hyperparam.__dict__) != 1
+            or param.layout is not None
+            or getattr(param, '_sparse_grad', None) is not None):
+        return None
+    array = param.array
+    if type(array) is not numpy.ndarray and type(array) is not cuda.ndarray:
+        return None
+    state = rule.state
+    if state is not None:
+        for value in six.itervalues(state):
+            if type(value) is not type(array) or value.shape != array.shape:
+                return None
+        state = tuple(sorted(state))
+    return (type(rule), param.device.name, array.dtype, rule.t,
+            id(rule.hyperparam.parent), state)
+
+
+class _ForeachGroup(object):
+
+    """Parameters updated together by a single call of an update rule.
+
+    The arrays of the parameters and the states of their update rules are
+    replaced with views of contiguous buffers, so that a copy of the update
+    rule can update all of them at once. Gradients are gathered into a
+    contiguous buffer on each update.
+
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.rules = [param.update_rule for param in params]
+        self.device = params[0].device
+        self.shapes = [param.shape for param in params]
+        offsets = numpy.cumsum([0] + [param.size for param in params])
+        self.ranges = list(zip(offsets[:-1].tolist(), offsets[1:].tolist()))
+
+        rule = self.rules[0]
+        keys = sorted(rule.state)
+        with chainer.using_device(self.device):
+            self.data, self.views = self._flatten(
+                [param.array for param in params])
+            for param, view in zip(params, self.views):
+                param.array = view
+            self.state = {}
+            self.state_views = []
+            for key in keys:
+                self.state[key], views = self._flatten(
+                    [r.state[key] for r in self.rules])
+                for r, view in zip(self.rules, views):
+                    r.state[key] = view
+                self.state_views.append((key, views))
+        self.grad = None
+        self.grad_views = [None] * len(params)
+
+        self.rule = copy.copy(rule)
+        self.rule._state = dict(self.state)
+        self.rule._hookable = _Hookable()
+        self.param = variable.Variable(self.data)
+
+    def _flatten(self, arrays):
+        xp = self.device.xp
+        flat = xp.concatenate([a.ravel() for a in arrays])
+        views = [flat[begin:end].reshape(shape) for (begin, end), shape
+                 in zip(self.ranges, self.shapes)]
+        return flat, views
+
+    def is_valid(self):
+        t = self.rule.t
+        for param, rule, i in zip(
+                self.params, self.rules, six.moves.range(len(self.params))):
+            if (param.array is not self.views[i]
+                    or param.update_rule is not rule
+                    or rule.t != t
+                    or _foreach_key(param) is None):
+                return False
+            state = rule.state
+            if state is None:
+                return False
+            for key, views in self.state_views:
+                if state.get(key) is not views[i]:
+                    return False
+        return True
+
+    def gather_grads(self):
+        grads = [param.grad for param in self.params]
+        if not all([g is v for g, v in zip(grads, self.grad_views)]):
+            with chainer.using_device(self.device):
+                self.grad, self.grad_views = self._flatten(grads)
+            for param, view in zip(self.params, self.grad_views):
+                param._set_grad_without_check(view)
+        self.param._set_grad_without_check(self.grad)
+        self.param._loss_scale = self.params[0]._loss_scale
+
+    def update(self):
+        rule = self.rule
+        rule.update(self.param)
+        # Copy back the arrays in case the update rule does not update them
+        # in place.
+        if self.param.array is not self.data:
+            self.data[...] = self.param.array
+            self.param.array = self.data
+        state = rule.state
+        for key, flat in six.iteritems(self.state):
+            if state[key] is not flat:
+                flat[...] = state[key]
+                state[key] = flat
+        t = rule.t
+        for r in self.rules:
+            r.t = t
+
+
 class GradientMethod(Optimizer):
     """Base class of all single gradient-based optimizers.
 
@@ -815,6 +1028,10 @@ class GradientMethod(Optimizer):
 
     """
 
+    _use_foreach_update = False
+    _foreach_groups = None
+    _foreach_params = None
+
     def __init__(self):
         super(GradientMethod, self).__init__()
         self.hyperparam = Hyperparameter()
@@ -822,6 +1039,7 @@ class GradientMethod(Optimizer):
 
     def setup(self, link):
         super(GradientMethod, self).setup(link)
+        self._foreach_groups = None
         for param in link.params():
             param.update_rule = self.create_update_rule()
             if self._use_fp32_update:
@@ -840,6 +1058,12 @@ class GradientMethod(Optimizer):
         for name, param in self.target.namedparams(False):
             with variable._AllowArrayAccessWithNonstandardLayout():
                 has_grad = param.grad is not None
+            if param._sparse_grad is not None:
+                # A row-sparse gradient does not need a dense one unless
+                # the parameter also has a dense gradient.
+                if has_grad:
+                    param._densify_sparse_grad()
+                continue
             if not has_grad:
                 device = param.device
                 with chainer.using_device(device):
@@ -848,7 +1072,16 @@ class GradientMethod(Optimizer):
                         layout_check=False)
 
     def call_hook(self, hook):
-        super(GradientMethod, self).call_hook(hook)
+        if (self._foreach_params is not None
+                and getattr(hook, 'call_for_each_param', False)
+                and getattr(hook, 'is_elementwise', False)):
+            # Call the hook once for each group of the foreach update.
+            for group in self._foreach_groups:
+                hook(group.rule, group.param)
+            for param in self._foreach_rest:
+                _call_hook_for_param(hook, param)
+        else:
+            super(GradientMethod, self).call_hook(hook)
         self.reallocate_cleared_grads()
 
     def update(self, lossfun=None, *args, **kwds):
@@ -877,18 +1110,66 @@ class GradientMethod(Optimizer):
             del loss
 
         self.reallocate_cleared_grads()
+        if self._use_foreach_update:
+            self._prepare_foreach_update()
         self.check_nan_in_grads()
         self.call_hooks('pre')
 
         self.t += 1
         if self.is_safe_to_update():
-            for param in self.target.params():
-                param.update()
+            if self._foreach_params is not None:
+                for group in self._foreach_groups:
+                    group.update()
+                for param in self._foreach_rest:
+                    param.update()
+            else:
+                for param in self.target.params():
+                    param.update()
 
         self.reallocate_cleared_grads()
 
         self.call_hooks('post')
         self.update_loss_scale()
+        self._foreach_params = None
+
+    def _prepare_foreach_update(self):
+        params = list(self.target.params())
+        groups = self._foreach_groups
+        if groups is not None:
+            grouped = set([id(p) for group in groups for p in group.params])
+            rest = [p for p in params if id(p) not in grouped]
+            if (len(grouped) + len(rest) != len(params)
+                    or not all([group.is_valid() for group in groups])
+                    or any([_foreach_key(p) is not None for p in rest])):
+                groups = None
+        if groups is None:
+            groups, rest = self._build_foreach_groups(params)
+            self._foreach_groups = groups
+
+        for group in groups:
+            group.gather_grads()
+        self._foreach_rest = rest
+        self._foreach_params = [group.param for group in groups] + [
+            p for p in rest if p.array is not None]
+
+    def _build_foreach_groups(self, params):
+        grouped = collections.OrderedDict()
+        rest = []
+        for param in params:
+            if _foreach_key(param) is not None:
+                param.update_rule._init_states(param)
+            key = _foreach_key(param)
+            if key is None:
+                rest.append(param)
+            else:
+                grouped.setdefault(key, []).append(param)
+        groups = []
+        for group_params in six.itervalues(grouped):
+            if len(group_params) == 1:
+                rest += group_params
+            else:
+                groups.append(_ForeachGroup(group_params))
+        return groups, rest
 
     def use_cleargrads(self, use=True):
         """Enables or disables use of :func:`~chainer.Link.cleargrads` in `update`.
@@ -934,6 +1215,37 @@ class GradientMethod(Optimizer):
             for param in link.params():
                 param.update_rule.use_fp32_update()
 
+    def use_foreach_update(self, flag=True):
+        """Enables or disables the foreach update.
+
+        When it is enabled, parameters whose update rules are elementwise
+        (see :attr:`UpdateRule.is_elementwise`) are grouped by the update
+        rule type, device, dtype, state and hyperparameter, and each group is
+        updated by a single call of the update rule on contiguous buffers,
+        instead of calling :meth:`UpdateRule.update` for each parameter. It
+        reduces the Python overhead of models with many small parameters.
+
+        To this end, the arrays of the grouped parameters and the states of
+        their update rules are replaced with views of the contiguous buffers
+        at the first update, and the gradients are gathered into another
+        buffer on each update. Optimizer hooks with ``call_for_each_param``
+        and ``is_elementwise`` attributes set to ``True`` (e.g.
+        :class:`~chainer.optimizer_hooks.WeightDecay`) are also called once
+        for each group, and
+        :class:`~chainer.optimizer_hooks.GradientClipping` computes the norm
+        from the gathered gradients.
+
+        Parameters whose update rules have their own hooks, hyperparameter
+        values overriding the ones of the optimizer, or fp32 update enabled
+        are updated individually as usual.
+
+        Args:
+            flag (bool): If ``True``, the foreach update is enabled.
+
+        """
+        self._use_foreach_update = flag
+        self._foreach_groups = None
+
 
 class HyperparameterProxy(object):
 
@@ -7,6 +7,15 @@ import chainer
 from chainer import backend
 
 
+def _get_grad(param):
+    # Returns the gradient array of a parameter. For a row-sparse gradient,
+    # the values of the non-zero rows are returned.
+    sparse_grad = getattr(param, '_sparse_grad', None)
+    if param.grad is None and sparse_grad is not None:
+        return sparse_grad.values
+    return param.grad
+
+
 def _sum_sqnorm_grads(params):
     # Calculates sum of squares of gradients.
 
@@ -36,7 +45,7 @@ def _sum_sqnorm_grads(params):
         with chainer.using_device(device):
             dots = []
             for param in paramlist:
-                g = param.grad
+                g = _get_grad(param)
                 g = g.ravel()
                 dots.append(g.dot(g))
             sq_sums.append(sum(dots))
@@ -82,7 +91,12 @@ class GradientClipping(object):
         self.threshold = threshold
 
     def __call__(self, opt):
-        sqnorm, device = _sum_sqnorm_grads(list(opt.target.params(False)))
+        # In the foreach update, gradients of the grouped parameters are
+        # gathered into contiguous arrays.
+        params = getattr(opt, '_foreach_params', None)
+        if params is None:
+            params = list(opt.target.params(False))
+        sqnorm, device = _sum_sqnorm_grads(params)
         if device is None:
             # Assign a dummy device for using_device.
             device = backend.CpuDevice()
@@ -100,7 +114,7 @@ class GradientClipping(object):
             else:
                 rate = rate.clip(None, 1)
 
-        for param in opt.target.params(False):
-            grad = param.grad
+        for param in params:
+            grad = _get_grad(param)
             with chainer.using_device(param.device):
                 grad *= rate
@@ -29,6 +29,11 @@ class GradientHardClipping(object):
                          which this hook is registered. This function does
                          not expect users to switch the value from default one,
                          which is `True`.
+        ~optimizer_hooks.GradientHardClipping.is_elementwise (bool): Specifies
+                         if this hook only applies elementwise operations, in
+                         which case it can be called once for a group of
+                         parameters flattened into a single array (see
+                         :meth:`~chainer.GradientMethod.use_foreach_update`).
 
     .. versionadded:: 4.0.0
        The *timing* parameter.
@@ -36,6 +41,7 @@ class GradientHardClipping(object):
     """
     name = 'GradientHardClipping'
     call_for_each_param = True
+    is_elementwise = True
     timing = 'pre'
 
     def __init__(self, lower_bound, upper_bound):
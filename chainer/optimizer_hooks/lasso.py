@@ -23,6 +23,11 @@ class Lasso(object):
                          which this hook is registered. This function does
                          not expect users to switch the value from default one,
                          which is `True`.
+        ~optimizer_hooks.Lasso.is_elementwise (bool): Specifies
+                         if this hook only applies elementwise operations, in
+                         which case it can be called once for a group of
+                         parameters flattened into a single array (see
+                         :meth:`~chainer.GradientMethod.use_foreach_update`).
 
     .. versionadded:: 4.0.0
        The *timing* parameter.
@@ -30,6 +35,7 @@ class Lasso(object):
     """
     name = 'Lasso'
     call_for_each_param = True
+    is_elementwise = True
     timing = 'pre'
 
     def __init__(self, rate):
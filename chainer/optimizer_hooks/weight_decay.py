@@ -25,6 +25,15 @@ class WeightDecay(object):
                          which this hook is registered. This function does
                          not expect users to switch the value from default one,
                          which is `True`.
+        ~optimizer_hooks.WeightDecay.is_elementwise (bool): Specifies
+                         if this hook only applies elementwise operations, in
+                         which case it can be called once for a group of
+                         parameters flattened into a single array (see
+                         :meth:`~chainer.GradientMethod.use_foreach_update`).
+
+    For a parameter with a row-sparse gradient (see
+    :attr:`~chainer.Parameter.sparse_grad`), only the rows in the gradient
+    are decayed.
 
     .. versionadded:: 4.0.0
        The *timing* parameter.
@@ -32,6 +41,7 @@ class WeightDecay(object):
     """
     name = 'WeightDecay'
     call_for_each_param = True
+    is_elementwise = True
     timing = 'pre'
 
     def __init__(self, rate):
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 import collections
 import contextlib
 import copy
+import functools
 import json
 import threading
 import typing as tp  # NOQA
@@ -269,13 +270,32 @@ class Summary(object):
 
     Summary computes the statistics of given scalars online.
 
+    If ``buffer_size`` is given, :meth:`add` only stores the value and the
+    weight in a buffer of that size. The buffered values are reduced by a few
+    vectorized operations when the buffer is full or the statistics are
+    requested, e.g., when a :class:`~chainer.training.extensions.LogReport`
+    outputs the summary. It avoids switching the current device and
+    launching small kernels for every value.
+
+    Args:
+        buffer_size (int): Number of values to buffer before reducing them.
+            If it is :obj:`None`, each value is accumulated on :meth:`add`.
+
     """
 
-    def __init__(self):
+    def __init__(self, buffer_size=None):
+        if buffer_size is not None and buffer_size <= 0:
+            raise ValueError('buffer_size must be positive')
         self._x = 0.0
         self._x2 = 0.0
         self._n = 0
 
+        self._buffer_size = buffer_size
+        self._n_buffered = 0
+        if buffer_size is not None:
+            self._values = [None] * buffer_size
+            self._weights = [None] * buffer_size
+
     def add(self, value, weight=1):
         """Adds a scalar value.
 
@@ -292,13 +312,77 @@ class Summary(object):
             # connected to the backprop graph.
             value = value.as_grad_stopped()
 
+        if self._buffer_size is None:
+            self._accumulate(value, weight)
+            return
+
+        i = self._n_buffered
+        self._values[i] = value
+        self._weights[i] = weight
+        self._n_buffered = i + 1
+        if self._n_buffered == self._buffer_size:
+            self._flush()
+
+    def _accumulate(self, value, weight):
         with chainer.using_device(backend.get_device_from_array(value)):
             self._x += weight * value
             self._x2 += weight * value * value
             self._n += weight
 
+    def _flush(self):
+        # Reduces the buffered values. Values on each device are stacked and
+        # reduced at once.
+        n_buffered = self._n_buffered
+        if n_buffered == 0:
+            return
+        values = self._values[:n_buffered]
+        weights = self._weights[:n_buffered]
+        self._values[:n_buffered] = [None] * n_buffered
+        self._weights[:n_buffered] = [None] * n_buffered
+        self._n_buffered = 0
+
+        groups = collections.OrderedDict()
+        for value, weight in six.moves.zip(values, weights):
+            device = backend.get_device_from_array(value)
+            groups.setdefault(device, []).append((value, weight))
+
+        array_types = chainer.get_array_types()
+        for device, items in six.iteritems(groups):
+            if not all(isinstance(x, _scalar_types + array_types)
+                       for item in items for x in item):
+                # e.g., weights given as variables
+                for value, weight in items:
+                    self._accumulate(value, weight)
+                continue
+
+            xp = device.xp
+            with chainer.using_device(device):
+                value = xp.stack([xp.asarray(value) for value, _ in items])
+                weights = [weight for _, weight in items]
+                if all(isinstance(w, _python_scalar_types) for w in weights):
+                    # Python scalars do not change the dtype of the values.
+                    if all(w == 1 for w in weights):
+                        weight = None
+                    else:
+                        weight = xp.asarray(
+                            weights, dtype=numpy.result_type(
+                                numpy.dtype(value.dtype.name), *weights))
+                    n = sum(weights)
+                else:
+                    weight = xp.stack([xp.asarray(w) for w in weights])
+                    n = weight.sum()
+
+                if weight is None:
+                    weighted = value
+                else:
+                    weighted = weight * value
+                self._x += weighted.sum()
+                self._x2 += (weighted * value).sum()
+                self._n += n
+
     def compute_mean(self):
         """Computes the mean."""
+        self._flush()
         x, n = self._x, self._n
         with chainer.using_device(backend.get_device_from_array(x)):
             return x / n
@@ -310,6 +394,7 @@ class Summary(object):
             tuple: Mean and standard deviation values.
 
         """
+        self._flush()
         x, n = self._x, self._n
         xp = backend.get_array_module(x)
         with chainer.using_device(backend.get_device_from_array(x)):
@@ -319,6 +404,7 @@ class Summary(object):
             return mean, std
 
     def serialize(self, serializer):
+        self._flush()
         try:
             self._x = serializer('_x', self._x)
             self._x2 = serializer('_x2', self._x2)
@@ -327,6 +413,10 @@ class Summary(object):
             warnings.warn('The previous statistics are not saved.')
 
 
+_python_scalar_types = six.integer_types + (float,)
+_scalar_types = _python_scalar_types + (numpy.generic,)
+
+
 class DictSummary(object):
 
     """Online summarization of a sequence of dictionaries.
@@ -335,10 +425,17 @@ class DictSummary(object):
     It only computes the statistics for scalar values and variables of scalar
     values in the dictionaries.
 
+    Args:
+        buffer_size (int): Number of values of each entry to buffer before
+            reducing them. See :class:`~chainer.Summary` for the details.
+
     """
 
-    def __init__(self):
-        self._summaries = collections.defaultdict(Summary)
+    def __init__(self, buffer_size=None):
+        if buffer_size is not None and buffer_size <= 0:
+            raise ValueError('buffer_size must be positive')
+        self._summaries = collections.defaultdict(
+            functools.partial(Summary, buffer_size=buffer_size))
 
     def add(self, d):
         """Adds a dictionary of scalars.
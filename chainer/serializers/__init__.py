@@ -2,6 +2,10 @@ from chainer.serializers.hdf5 import HDF5Deserializer  # NOQA
 from chainer.serializers.hdf5 import HDF5Serializer  # NOQA
 from chainer.serializers.hdf5 import load_hdf5  # NOQA
 from chainer.serializers.hdf5 import save_hdf5  # NOQA
+from chainer.serializers.mmap_file import load_mmap  # NOQA
+from chainer.serializers.mmap_file import MmapDeserializer  # NOQA
+from chainer.serializers.mmap_file import open_mmap  # NOQA
+from chainer.serializers.mmap_file import save_mmap  # NOQA
 from chainer.serializers.npz import DictionarySerializer  # NOQA
 from chainer.serializers.npz import load_npz  # NOQA
 from chainer.serializers.npz import NpzDeserializer  # NOQA
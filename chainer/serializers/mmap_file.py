@@ -0,0 +1,249 @@
+import json
+import mmap
+import struct
+
+import numpy
+import six
+
+from chainer import link as link_module
+from chainer.serializers import npz
+
+
+# File layout:
+#
+#   magic (8 bytes) | header size (8 bytes, little endian) | JSON header |
+#   padding | arrays
+#
+# The JSON header holds the format version and the index that maps each key
+# to the dtype, the shape and the offset of the array from the beginning of
+# the data section. The data section and each array in it are aligned to
+# ``_ALIGNMENT`` bytes so that the arrays can be mapped in place.
+_MAGIC = b'\x93CHNMMAP'
+_VERSION = 1
+_ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sQ')
+
+
+def _aligned(nbytes):
+    return (nbytes + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def save_mmap(file, obj):
+    """Saves an object to the file in the memory-mappable format.
+
+    The file is an uncompressed container of raw arrays with an index, each
+    of which is aligned so that :func:`load_mmap` can map it in place instead
+    of reading it. Any object that can be saved by
+    :func:`~chainer.serializers.save_npz` can be saved by this function
+    except for arrays of Python objects other than ``None``.
+
+    Args:
+        file (str or file-like): Target file to write to.
+        obj: Object to be serialized. It must support serialization protocol.
+            If it is a dictionary object, the serialization will be skipped.
+
+    .. seealso::
+        :func:`chainer.serializers.load_mmap`
+
+    """
+    if isinstance(file, six.string_types):
+        with open(file, 'wb') as f:
+            save_mmap(f, obj)
+        return
+
+    if isinstance(obj, dict):
+        target = obj
+    else:
+        target = npz.serialize(obj)
+
+    index = {}
+    arrays = []
+    offset = 0
+    for key in sorted(target):
+        array = numpy.asarray(target[key])
+        if array.dtype.hasobject:
+            if array.shape == () and array[()] is None:
+                index[key] = None
+                continue
+            raise TypeError(
+                'Cannot save an array of Python objects in the mmap format: '
+                '{}'.format(key))
+        index[key] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+        }
+        arrays.append(numpy.ascontiguousarray(array))
+        offset += _aligned(array.nbytes)
+
+    header = json.dumps(
+        {'version': _VERSION, 'index': index}, sort_keys=True).encode('utf-8')
+    header_end = _PREAMBLE.size + len(header)
+    file.write(_PREAMBLE.pack(_MAGIC, len(header)))
+    file.write(header)
+    file.write(b'\0' * (_aligned(header_end) - header_end))
+    for array in arrays:
+        file.write(array.tobytes())
+        file.write(b'\0' * (_aligned(array.nbytes) - array.nbytes))
+
+
+def open_mmap(file):
+    """Maps arrays in a file saved by :func:`save_mmap`.
+
+    Arrays are read-only views of the file mapped into memory. Their contents
+    are read from the disk on demand, and the pages are shared among all the
+    processes that map the same file.
+
+    Args:
+        file (str or file-like): File to be mapped. A file object must be
+            opened in the binary mode and have a file descriptor.
+
+    Returns:
+        dict: A dictionary that maps each key to a read-only
+        :class:`numpy.ndarray` or an array of ``None``.
+
+    """
+    if isinstance(file, six.string_types):
+        with open(file, 'rb') as f:
+            return open_mmap(f)
+
+    file.seek(0)
+    magic, header_size = _PREAMBLE.unpack(file.read(_PREAMBLE.size))
+    if magic != _MAGIC:
+        raise ValueError('The file is not in the mmap format.')
+    header = json.loads(file.read(header_size).decode('utf-8'))
+    if header['version'] != _VERSION:
+        raise ValueError(
+            'Unsupported mmap format version: {}'.format(header['version']))
+    data_offset = _aligned(_PREAMBLE.size + header_size)
+
+    buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    ret = {}
+    for key, entry in six.iteritems(header['index']):
+        if entry is None:
+            ret[key] = numpy.asarray(None)
+            continue
+        ret[key] = numpy.ndarray(
+            tuple(entry['shape']), numpy.dtype(entry['dtype']), buffer=buf,
+            offset=data_offset + entry['offset'])
+    return ret
+
+
+class MmapDeserializer(npz.NpzDeserializer):
+
+    """Deserializer for the memory-mappable format.
+
+    This deserializer reads an object saved by :func:`save_mmap` from the
+    dictionary returned by :func:`open_mmap`. It behaves like
+    :class:`~chainer.serializers.NpzDeserializer` except that, if ``copy`` is
+    ``False``, it returns the mapped arrays themselves instead of copying
+    them into NumPy arrays of the same shape and dtype. The returned arrays
+    are recorded in :attr:`mapped`, from which :func:`load_mmap` replaces the
+    parameters of links.
+
+    Args:
+        npz (dict): Dictionary returned by :func:`open_mmap`.
+        path: The base path that the deserialization starts from.
+        strict (bool): If ``True``, the deserializer raises an error when an
+            expected value is not found in the given file. Otherwise,
+            it ignores the value and skip deserialization.
+        ignore_names (string, callable or list of them):
+            If callable, it is a function that takes a name of a parameter
+            and a persistent and returns ``True`` when it needs to be skipped.
+            If string, this is a name of a parameter or persistent that are
+            going to be skipped.
+            This can also be a list of callables and strings that behave as
+            described above.
+        copy (bool): If ``True``, the values are copied as
+            :class:`~chainer.serializers.NpzDeserializer` does.
+
+    Attributes:
+        ~MmapDeserializer.mapped (dict): Dictionary that maps each key to the
+            mapped array returned in place of the value. It is shared with
+            the child deserializers.
+
+    """
+
+    def __init__(self, npz, path='', strict=True, ignore_names=None,
+                 copy=False, mapped=None):
+        super(MmapDeserializer, self).__init__(
+            npz, path=path, strict=strict, ignore_names=ignore_names)
+        self.copy = copy
+        self.mapped = {} if mapped is None else mapped
+
+    def __getitem__(self, key):
+        key = key.strip('/')
+        return MmapDeserializer(
+            self.npz, self.path + key + '/', strict=self.strict,
+            ignore_names=self.ignore_names, copy=self.copy,
+            mapped=self.mapped)
+
+    def __call__(self, key, value):
+        if self.copy:
+            ret = super(MmapDeserializer, self).__call__(key, value)
+            if value is None and isinstance(ret, numpy.ndarray):
+                ret = ret.copy()
+            return ret
+
+        full_key = self.path + key.lstrip('/')
+        dataset = self.npz.get(full_key)
+        if (dataset is not None and not dataset.dtype.hasobject
+                and not self._is_ignored(full_key)
+                and (value is None or (
+                    type(value) is numpy.ndarray
+                    and value.shape == dataset.shape
+                    and value.dtype == dataset.dtype))):
+            self.mapped[full_key] = dataset
+            return dataset
+        return super(MmapDeserializer, self).__call__(key, value)
+
+
+def load_mmap(file, obj, path='', strict=True, ignore_names=None, copy=False):
+    """Loads an object from the file in the memory-mappable format.
+
+    If ``obj`` is a :class:`~chainer.Link` and ``copy`` is ``False``,
+    parameters and persistent values held on CPU as NumPy arrays are replaced
+    with read-only arrays mapped from the file. Loading therefore finishes
+    without reading the arrays, and the processes loading the same file share
+    the physical memory of the parameters. The mapped arrays cannot be
+    updated in place, so the link loaded this way is suitable for inference.
+    Values on other devices and other objects like optimizers are copied from
+    the file as :func:`~chainer.serializers.load_npz` does.
+
+    Args:
+        file (str or file-like): File to be loaded.
+        obj: Object to be deserialized. It must support serialization protocol.
+        path (str): The path in the hierarchy of the serialized data under
+            which the data is to be loaded. The default behavior (blank) will
+            load all data under the root path.
+        strict (bool): If ``True``, the deserializer raises an error when an
+            expected value is not found in the given file. Otherwise,
+            it ignores the value and skip deserialization.
+        ignore_names (string, callable or list of them):
+            If callable, it is a function that takes a name of a parameter
+            and a persistent and returns ``True`` when it needs to be skipped.
+            If string, this is a name of a parameter or persistent that are
+            going to be skipped.
+            This can also be a list of callables and strings that behave as
+            described above.
+        copy (bool): If ``True``, the arrays are copied into the link
+            instead of being mapped.
+
+    .. seealso::
+        :func:`chainer.serializers.save_mmap`
+
+    """
+    copy = copy or not isinstance(obj, link_module.Link)
+    d = MmapDeserializer(
+        open_mmap(file), path=path, strict=strict, ignore_names=ignore_names,
+        copy=copy)
+    d.load(obj)
+
+    if copy:
+        return
+    for name, param in obj.namedparams():
+        array = d.mapped.get(path + name.lstrip('/'))
+        if (array is not None and type(param.array) is numpy.ndarray
+                and param.shape == array.shape
+                and param.dtype == array.dtype):
+            param.array = array
@@ -152,11 +152,7 @@ class NpzDeserializer(serializer.Deserializer):
             self.npz, self.path + key + '/', strict=self.strict,
             ignore_names=self.ignore_names)
 
-    def __call__(self, key, value):
-        key = self.path + key.lstrip('/')
-        if not self.strict and key not in self.npz:
-            return value
-
+    def _is_ignored(self, key):
         if isinstance(self.ignore_names, (tuple, list)):
             ignore_names = self.ignore_names
         else:
@@ -164,14 +160,22 @@ class NpzDeserializer(serializer.Deserializer):
         for ignore_name in ignore_names:
             if isinstance(ignore_name, str):
                 if key == ignore_name:
-                    return value
+                    return True
             elif callable(ignore_name):
                 if ignore_name(key):
-                    return value
+                    return True
             else:
                 raise ValueError(
                     'ignore_names needs to be a callable, string or '
                     'list of them.')
+        return False
+
+    def __call__(self, key, value):
+        key = self.path + key.lstrip('/')
+        if not self.strict and key not in self.npz:
+            return value
+        if self._is_ignored(key):
+            return value
 
         dataset = self.npz[key]
         if dataset[()] is None:
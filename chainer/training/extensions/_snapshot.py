@@ -229,7 +229,10 @@ n_retains=-1, autoload=False)
             automatically finds the latest snapshot and loads the data
             to the target.  Automatic loading only works when the
             filename is a string. It is assumed that snapshots are generated
-            by :func:`chainer.serializers.save_npz` .
+            by :func:`chainer.serializers.save_npz` , or by the writer if it
+            has ``load`` method (e.g.
+            :class:`~chainer.training.extensions.snapshot_writers.\
+IncrementalWriter`).
 
     Returns:
         Snapshot extension object.
@@ -276,6 +279,8 @@ trigger=(1, 'epoch'))
 ThreadQueueWriter`
         - :class:`chainer.training.extensions.snapshot_writers.\
 ProcessQueueWriter`
+        - :class:`chainer.training.extensions.snapshot_writers.\
+IncrementalWriter`
 
     .. seealso::
 
@@ -375,8 +380,10 @@ class _Snapshot(extension.Extension):
                 # snapshot files to be autoloaded must be saved by
                 # ``save_npz`` . In order to support general format,
                 # we nned to first reconstruct the design of savefun
-                # and loadfun.
-                npz.load_npz(snapshot_file, target)
+                # and loadfun. Writers that save in their own format
+                # provide ``load`` method.
+                loadfun = getattr(self.writer, 'load', npz.load_npz)
+                loadfun(snapshot_file, target)
                 if chainer.is_debug():
                     print('Snapshot loaded from', snapshot_file)
 
@@ -390,8 +397,22 @@ class _Snapshot(extension.Extension):
             # triggered right after creation of new snapshot file, is
             # injected here.
             def _cleanup():
-                files = _find_stale_snapshots(self.filename, outdir,
-                                              self.n_retains)
+                files = list(_find_stale_snapshots(self.filename, outdir,
+                                                   self.n_retains))
+                # Writers of snapshots that depend on others (e.g.
+                # IncrementalWriter) keep the files that the retained ones
+                # depend on.
+                get_dependencies = getattr(
+                    self.writer, '_get_dependencies', None)
+                if get_dependencies is not None and files:
+                    stale = set(files)
+                    retained = [
+                        file for _, file in _find_snapshot_files(
+                            self.filename, outdir)
+                        if file not in stale]
+                    dependencies = get_dependencies(outdir, retained)
+                    files = [
+                        file for file in files if file not in dependencies]
                 for file in files:
                     os.remove(os.path.join(outdir, file))
 
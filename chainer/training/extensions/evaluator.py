@@ -234,8 +234,12 @@ device=None, eval_hook=None, eval_func=None, *, progress_bar=False)
         for batch in it:
             observation = {}
             with reporter_module.report_scope(observation):
-                in_arrays = convert._call_converter(
-                    self.converter, batch, self.device)
+                if isinstance(it, iterators.PrefetchIterator):
+                    # The batch has already been converted in background.
+                    in_arrays = batch
+                else:
+                    in_arrays = convert._call_converter(
+                        self.converter, batch, self.device)
                 with function.no_backprop_mode():
                     if isinstance(in_arrays, tuple):
                         eval_func(*in_arrays)
@@ -16,7 +16,8 @@ from chainer.utils import argument
 class LogReport(extension.Extension):
 
     """__init__(\
-keys=None, trigger=(1, 'epoch'), postprocess=None, filename='log')
+keys=None, trigger=(1, 'epoch'), postprocess=None, filename='log', \
+summary_buffer_size=None)
 
     Trainer extension to output the accumulated results to a log file.
 
@@ -58,12 +59,18 @@ keys=None, trigger=(1, 'epoch'), postprocess=None, filename='log')
             does not output the log to any file.
             For historical reasons ``log_name`` is also accepted as an alias
             of this argument.
+        summary_buffer_size (int): Number of values of each entry that the
+            summary buffers before reducing them. If it is given, reported
+            values are not accumulated on every iteration but reduced at
+            once, which avoids switching devices and launching small kernels
+            in each iteration. See :class:`~chainer.Summary`.
 
     """
 
     def __init__(self, keys=None, trigger=(1, 'epoch'), postprocess=None,
-                 filename=None, **kwargs):
+                 filename=None, summary_buffer_size=None, **kwargs):
         self._keys = keys
+        self._summary_buffer_size = summary_buffer_size
         self._trigger = trigger_module.get_trigger(trigger)
         self._postprocess = postprocess
         self._log = []
@@ -144,4 +151,5 @@ keys=None, trigger=(1, 'epoch'), postprocess=None, filename='log')
             self._log = json.loads(log)
 
     def _init_summary(self):
-        self._summary = reporter.DictSummary()
+        self._summary = reporter.DictSummary(
+            buffer_size=self._summary_buffer_size)
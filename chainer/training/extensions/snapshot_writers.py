@@ -1,8 +1,11 @@
+import functools
 import multiprocessing
 import os
 import shutil
 import threading
 
+import numpy
+import six
 from six.moves import queue
 
 from chainer.serializers import npz
@@ -213,6 +216,196 @@ class ProcessWriter(StandardWriter):
             kwargs=self._kwds)
 
 
+_PARENT_KEY = '_incremental_snapshot_parent'
+
+
+class IncrementalWriter(StandardWriter):
+    """Snapshot writer that writes delta snapshots in a separate thread.
+
+    This writer copies the serialized arrays into a staging area in the
+    calling (i.e. training) thread and writes them into an NPZ file in a
+    separate thread, so that the training can continue while the file is
+    written. The staging buffers are reused across snapshots.
+
+    Every ``full_interval``-th snapshot (including the first one) is a *full*
+    snapshot containing all the arrays, which can also be loaded by
+    :func:`~chainer.serializers.load_npz`. The other snapshots are *delta*
+    snapshots that only contain the arrays changed since they were last
+    written, and the name of the preceding snapshot file. Use
+    :func:`load_incremental_snapshot` to load them; it follows the chain of
+    snapshots back to the last full snapshot. Automatic loading by
+    :func:`~chainer.training.extensions.snapshot` with ``autoload=True`` uses
+    it as well.
+
+    Stale snapshots are only removed (see ``n_retains`` option of
+    :func:`~chainer.training.extensions.snapshot`) right after a full
+    snapshot is written. The preceding snapshots that the retained delta
+    snapshots depend on are not removed even if they are stale, so that the
+    retained snapshots can always be loaded.
+
+    Args:
+        full_interval (int): Interval of full snapshots in the number of
+            snapshots.
+        threshold (float): An array of floating point numbers is regarded as
+            changed if the maximum absolute difference from the last written
+            values exceeds this value. Other arrays are regarded as changed if
+            any element differs.
+        compression (bool): If ``True``, compression in the resulting zip
+            file is enabled.
+
+    .. seealso::
+
+        - :meth:`chainer.training.extensions.snapshot`
+    """
+
+    def __init__(self, full_interval=10, threshold=0, compression=False):
+        if full_interval < 1:
+            raise ValueError('full_interval must be a positive integer.')
+        super(IncrementalWriter, self).__init__(
+            savefun=functools.partial(npz.save_npz, compression=compression))
+        self._full_interval = full_interval
+        self._threshold = threshold
+        self._staging = {}
+        # Arrays written last for each key
+        self._reference = {}
+        self._count = 0
+        self._last_filename = None
+        self._writing_full = False
+
+    def create_worker(self, filename, outdir, target, **kwds):
+        # Called after the previous worker finishes.
+        staging = self._staging
+        for key in list(staging):
+            if key not in target:
+                del staging[key]
+        for key, value in six.iteritems(target):
+            value = numpy.asarray(value)
+            buf = staging.get(key)
+            if (buf is None or buf.shape != value.shape
+                    or buf.dtype != value.dtype):
+                staging[key] = value.copy()
+            else:
+                numpy.copyto(buf, value)
+
+        full = self._count % self._full_interval == 0
+        self._count += 1
+        parent = None if full else self._last_filename
+        self._last_filename = filename
+        return threading.Thread(
+            target=self._write, args=(filename, outdir, parent))
+
+    def _is_changed(self, key, value):
+        ref = self._reference.get(key)
+        if (ref is None or ref.shape != value.shape
+                or ref.dtype != value.dtype):
+            return True
+        if (self._threshold > 0 and value.size > 0
+                and value.dtype.kind in 'fc'):
+            return bool(numpy.abs(value - ref).max() > self._threshold)
+        return not numpy.array_equal(value, ref)
+
+    def _write(self, filename, outdir, parent):
+        staging = self._staging
+        if parent is None:
+            arrays = dict(staging)
+        else:
+            arrays = {key: value for key, value in six.iteritems(staging)
+                      if self._is_changed(key, value)}
+            arrays[_PARENT_KEY] = numpy.asarray(parent)
+
+        self._writing_full = parent is None
+        self.save(filename, outdir, arrays, self._savefun)
+
+        reference = self._reference
+        if parent is None:
+            reference.clear()
+        for key, value in six.iteritems(arrays):
+            if key == _PARENT_KEY:
+                continue
+            ref = reference.get(key)
+            if (ref is None or ref.shape != value.shape
+                    or ref.dtype != value.dtype):
+                reference[key] = value.copy()
+            else:
+                numpy.copyto(ref, value)
+
+    def _post_save(self):
+        # Delta snapshots depend on the preceding ones.
+        if self._writing_full:
+            super(IncrementalWriter, self)._post_save()
+
+    def load(self, filename, target):
+        """Loads a snapshot written by this writer.
+
+        See :func:`load_incremental_snapshot` for details.
+
+        """
+        load_incremental_snapshot(filename, target)
+
+    def _get_dependencies(self, outdir, filenames):
+        # Returns the names of the files that the given snapshots depend on,
+        # which must not be removed by the cleanup.
+        dependencies = set()
+        for filename in filenames:
+            parent = _read_parent(os.path.join(outdir, filename))
+            while parent is not None and parent not in dependencies:
+                dependencies.add(parent)
+                parent = _read_parent(os.path.join(outdir, parent))
+        return dependencies
+
+
+def _read_parent(file):
+    # Returns the name of the preceding snapshot of a delta snapshot, or None
+    # for other snapshots.
+    if not os.path.exists(file):
+        return None
+    with numpy.load(file, **npz._allow_pickle_kwargs) as f:
+        if _PARENT_KEY not in f.files:
+            return None
+        return str(f[_PARENT_KEY])
+
+
+def load_incremental_snapshot(file, obj, path='', strict=True,
+                              ignore_names=None):
+    """Loads an object from a snapshot written by :class:`IncrementalWriter`.
+
+    The snapshot files preceding the given one are read back to the last full
+    snapshot, and the latest values of all arrays are loaded to the object.
+    The preceding files are looked up in the directory of the given file.
+    Snapshots written by :func:`~chainer.serializers.save_npz` can also be
+    loaded.
+
+    Args:
+        file (str): Path to the snapshot file.
+        obj: Object to be deserialized. It must support serialization protocol.
+        path (str): The path in the hierarchy of the serialized data under
+            which the data is to be loaded. The default behavior (blank) will
+            load all data under the root path.
+        strict (bool): If ``True``, the deserializer raises an error when an
+            expected value is not found in the snapshot. Otherwise, it ignores
+            the value and skip deserialization.
+        ignore_names (string, callable or list of them): Names of parameters
+            and persistents to be skipped. See
+            :func:`~chainer.serializers.load_npz` for details.
+
+    """
+    outdir = os.path.dirname(file)
+    chain = []
+    while file is not None:
+        with numpy.load(file, **npz._allow_pickle_kwargs) as f:
+            arrays = dict(f)
+        parent = arrays.pop(_PARENT_KEY, None)
+        chain.append(arrays)
+        file = None if parent is None else os.path.join(outdir, str(parent))
+
+    target = {}
+    for arrays in reversed(chain):
+        target.update(arrays)
+    d = npz.NpzDeserializer(
+        target, path=path, strict=strict, ignore_names=ignore_names)
+    d.load(obj)
+
+
 class QueueWriter(Writer):
     """Base class of queue snapshot writers.
 
@@ -7,6 +7,7 @@ import six
 import chainer
 from chainer.backends import cuda
 from chainer.dataset import convert
+from chainer.iterators import prefetch_iterator
 from chainer import reporter
 from chainer.training.updaters import standard_updater
 
@@ -142,6 +143,12 @@ class MultiprocessParallelUpdater(standard_updater.StandardUpdater):
         assert len(iterators) == len(devices)
         for iterator in iterators[1:]:
             assert len(iterator.dataset) == len(iterators[0].dataset)
+        if any(isinstance(iterator, prefetch_iterator.PrefetchIterator)
+               for iterator in iterators):
+            raise ValueError(
+                'MultiprocessParallelUpdater cannot use PrefetchIterator '
+                'because it converts the batch of each device in its own '
+                'process. Please pass the wrapped iterators instead.')
 
         # Correct optimizer parameters for new minibatch size
         optim = optimizer.__class__.__name__
@@ -5,6 +5,7 @@ import six
 import chainer
 from chainer.dataset import convert
 from chainer import function
+from chainer.iterators import prefetch_iterator
 from chainer.training.updaters import standard_updater
 
 
@@ -69,6 +70,13 @@ class ParallelUpdater(standard_updater.StandardUpdater):
             auto_new_epoch=auto_new_epoch,
         )
 
+        if isinstance(self.get_iterator('main'),
+                      prefetch_iterator.PrefetchIterator):
+            raise ValueError(
+                'ParallelUpdater cannot use PrefetchIterator because it '
+                'splits each batch between the devices before converting '
+                'it. Please pass the wrapped iterator instead.')
+
         if models is None:
             if devices is None:
                 raise ValueError('either models or devices must be specified')
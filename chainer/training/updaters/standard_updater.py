@@ -7,6 +7,7 @@ from chainer.backends import cuda
 from chainer.dataset import convert
 from chainer.dataset import iterator as iterator_module
 from chainer import device_resident
+from chainer.iterators import prefetch_iterator
 from chainer.training import _updater
 from chainer.utils import argument
 
@@ -39,7 +40,9 @@ loss_func=None, loss_scale=None, auto_new_epoch=True, *, input_device=None)
         converter: Converter function to build input arrays. Each batch
             extracted by the main iterator and the ``device`` option are passed
             to this function. :func:`chainer.dataset.concat_examples` is used
-            by default.
+            by default. It is not used if the main iterator is a
+            :class:`~chainer.iterators.PrefetchIterator`, which converts
+            batches by itself.
         device(device specifier): Device to which the model is sent.
             If ``None``, the device of the model will stay unchanged.
         loss_func: Loss function. The target link of the main optimizer is used
@@ -243,8 +246,12 @@ to a given device, specify the 'input_device' argument instead and leave the \
     def update_core(self):
         iterator = self._iterators['main']
         batch = iterator.next()
-        in_arrays = convert._call_converter(
-            self.converter, batch, self.input_device)
+        if isinstance(iterator, prefetch_iterator.PrefetchIterator):
+            # The batch has already been converted in background.
+            in_arrays = batch
+        else:
+            in_arrays = convert._call_converter(
+                self.converter, batch, self.input_device)
 
         optimizer = self._optimizers['main']
         loss_func = self.loss_func or optimizer.target
@@ -20,6 +20,7 @@ from chainer.utils.meta import final  # NOQA
 from chainer.utils.nondeterministic import nondeterministic  # NOQA
 from chainer.utils.sparse import CooMatrix  # NOQA
 from chainer.utils.sparse import get_order  # NOQA
+from chainer.utils.sparse import RowSparseGrad  # NOQA
 from chainer.utils.sparse import to_coo  # NOQA
 
 # The following alias has been moved to chainer/__init__.py in order to break
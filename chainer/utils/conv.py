@@ -62,9 +62,31 @@ def get_deconv_outsize(size, k, s, p, cover_all=False, d=1):
         return s * (size - 1) + dk - 2 * p
 
 
-def im2col_cpu(
+def _pad_cpu(img, pad_width, pval):
+    # Allocates the padded image and copies the original into it, which is
+    # faster than numpy.pad for the constant mode.
+    if all([before == 0 and after == 0 for before, after in pad_width]):
+        return img
+    shape = tuple([
+        d + before + after
+        for d, (before, after) in zip(img.shape, pad_width)])
+    padded = numpy.full(shape, pval, dtype=img.dtype)
+    padded[tuple([
+        slice(before, before + d)
+        for d, (before, _) in zip(img.shape, pad_width)])] = img
+    return padded
+
+
+def im2col_view_cpu(
         img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False, dy=1, dx=1,
         out_h=None, out_w=None):
+    """Returns a read-only strided view of the patches of an image.
+
+    The view has the same shape ``(n, c, kh, kw, out_h, out_w)`` as the
+    output of :func:`im2col_cpu`, but no patch is copied; each element refers
+    to the (padded) input image.
+
+    """
     n, c, h, w = img.shape
     if out_h is None:
         out_h = get_conv_outsize(h, kh, sy, ph, cover_all, dy)
@@ -73,20 +95,21 @@ def im2col_cpu(
         out_w = get_conv_outsize(w, kw, sx, pw, cover_all, dx)
     assert out_w > 0, 'Width in the output should be positive.'
 
-    img = numpy.pad(img,
-                    ((0, 0), (0, 0), (ph, ph + sy - 1), (pw, pw + sx - 1)),
-                    mode='constant', constant_values=(pval,))
-    col = numpy.ndarray((n, c, kh, kw, out_h, out_w), dtype=img.dtype)
+    img = _pad_cpu(
+        img, ((0, 0), (0, 0), (ph, ph + sy - 1), (pw, pw + sx - 1)), pval)
+    s0, s1, s2, s3 = img.strides
+    return numpy.lib.stride_tricks.as_strided(
+        img, (n, c, kh, kw, out_h, out_w),
+        (s0, s1, s2 * dy, s3 * dx, s2 * sy, s3 * sx), writeable=False)
 
-    for j in six.moves.range(kh):
-        jdy = j * dy
-        j_lim = jdy + sy * out_h
-        for i in six.moves.range(kw):
-            idx = i * dx
-            i_lim = idx + sx * out_w
-            col[:, :, j, i, :, :] = img[:, :, jdy:j_lim:sy, idx:i_lim:sx]
 
-    return col
+def im2col_cpu(
+        img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False, dy=1, dx=1,
+        out_h=None, out_w=None):
+    col = im2col_view_cpu(
+        img, kh, kw, sy, sx, ph, pw, pval=pval, cover_all=cover_all,
+        dy=dy, dx=dx, out_h=out_h, out_w=out_w)
+    return numpy.ascontiguousarray(col)
 
 
 def im2col_gpu(img, kh, kw, sy, sx, ph, pw, cover_all=False, dy=1, dx=1,
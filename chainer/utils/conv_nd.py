@@ -4,6 +4,8 @@ import numpy
 import six
 
 from chainer.backends import cuda
+from chainer import utils
+from chainer.utils import conv
 from chainer.utils.conv import get_conv_outsize
 from chainer.utils import conv_nd_kernel
 
@@ -15,7 +17,15 @@ def as_tuple(x, n):
     return (x,) * n
 
 
-def im2col_nd_cpu(img, ksize, stride, pad, pval=0, cover_all=False, dilate=1):
+def im2col_nd_view_cpu(
+        img, ksize, stride, pad, pval=0, cover_all=False, dilate=1):
+    """Returns a read-only strided view of the patches of an image.
+
+    The view has the same shape ``(n, c, k_1, ..., k_N, out_1, ..., out_N)``
+    as the output of :func:`im2col_nd_cpu`, but no patch is copied; each
+    element refers to the (padded) input image.
+
+    """
     n, c = img.shape[0:2]       # (n, c, d_1, d_2, ..., d_N)
     dims = img.shape[2:]
     ndim = len(dims)
@@ -29,28 +39,193 @@ def im2col_nd_cpu(img, ksize, stride, pad, pval=0, cover_all=False, dilate=1):
     # Pad around image.
     pad_width = ((0, 0), (0, 0)) + tuple(
         (p, p + s - 1) for (s, p) in zip(stride, pad))
-    img = numpy.pad(img, pad_width, mode='constant', constant_values=(pval,))
+    img = conv._pad_cpu(img, pad_width, pval)
 
-    # Make patch array with which we will compute correlation with filter.
     # shape: (n, c, k_1, k_2, ..., k_N, out_1, out_2, ..., out_N)
-    shape = (n, c) + ksize + outs
-    col = numpy.ndarray(shape, dtype=img.dtype)
+    shape = (n, c) + tuple(ksize) + outs
+    img_strides = img.strides[2:]
+    strides = img.strides[:2] + tuple(
+        st * di for (st, di) in zip(img_strides, dilate)) + tuple(
+        st * s for (st, s) in zip(img_strides, stride))
+    return numpy.lib.stride_tricks.as_strided(
+        img, shape, strides, writeable=False)
+
+
+def im2col_nd_cpu(img, ksize, stride, pad, pval=0, cover_all=False, dilate=1):
+    col = im2col_nd_view_cpu(
+        img, ksize, stride, pad, pval=pval, cover_all=cover_all,
+        dilate=dilate)
+    return numpy.ascontiguousarray(col)
+
+
+def _n_block_rows(n_rows, row_size, itemsize):
+    # Number of rows along the first spatial axis processed at once so that
+    # the materialized patches fit in ``_cpu_col_block_bytes``.
+    row_bytes = max(1, row_size * itemsize)
+    return max(1, min(n_rows, _cpu_col_block_bytes // row_bytes))
+
+
+# Upper bound of the size in bytes of the patch matrix materialized at once
+# by the blocked convolution routines on CPU.
+_cpu_col_block_bytes = 64 * 1024 * 1024
+
+
+def convolution_nd_cpu(x, W, stride, pad, cover_all=False, dilate=1):
+    """Computes N-dimensional convolution by tile-wise GEMM on CPU.
+
+    Patches are gathered from a strided view of the input for a block of
+    rows along the first spatial axis of the output at a time and multiplied
+    with the filter matrix, so that the memory for the patch matrix is
+    bounded regardless of the size of the input.
+
+    Args:
+        x (numpy.ndarray): Input of shape ``(n, c_I, d_1, ..., d_N)``.
+        W (numpy.ndarray): Filter of shape ``(c_O, c_I, k_1, ..., k_N)``.
+        stride (tuple of int): Stride.
+        pad (tuple of int): Padding.
+        cover_all (bool): Use ``cover_all`` option or not.
+        dilate (int or tuple of int): Dilation factor.
+
+    Returns:
+        numpy.ndarray: Output of shape ``(n, c_O, out_1, ..., out_N)`` and
+        the same dtype as ``x``.
+
+    """
+    n = x.shape[0]
+    out_c = W.shape[0]
+    ksize = W.shape[2:]
+    ndim = len(ksize)
+    col = im2col_nd_view_cpu(
+        x, ksize, stride, pad, cover_all=cover_all, dilate=dilate)
+    outs = col.shape[ndim + 2:]
+    k = col.shape[1] * utils.size_of_shape(ksize)
+    W_mat = W.reshape(out_c, k).T
+
+    # (out_1, n, out_2, ..., out_N, c_O)
+    y = numpy.empty(
+        (outs[0], n) + outs[1:] + (out_c,), dtype=x.dtype)
+    # (out_1, n, out_2, ..., out_N, c_I, k_1, ..., k_N)
+    col = col.transpose(
+        (ndim + 2, 0) + tuple(six.moves.range(ndim + 3, 2 * ndim + 2))
+        + tuple(six.moves.range(1, ndim + 2)))
+    row_size = n * utils.size_of_shape(outs[1:]) * k
+    rows = _n_block_rows(outs[0], row_size, x.dtype.itemsize)
+    use_out = W.dtype == x.dtype
+    for r0 in six.moves.range(0, outs[0], rows):
+        r1 = min(r0 + rows, outs[0])
+        col_block = col[r0:r1].reshape(-1, k)
+        if use_out:
+            numpy.dot(col_block, W_mat, out=y[r0:r1].reshape(-1, out_c))
+        else:
+            y[r0:r1] = col_block.dot(W_mat).reshape(y[r0:r1].shape)
+
+    # (n, c_O, out_1, ..., out_N)
+    return y.transpose(
+        (1, ndim + 1, 0) + tuple(six.moves.range(2, ndim + 1)))
+
+
+def convolution_nd_grad_w_cpu(x, gy, ksize, stride, pad, cover_all=False,
+                              dilate=1):
+    """Computes the gradient of a filter by tile-wise GEMM on CPU.
+
+    This is the counterpart of :func:`convolution_nd_cpu` computing the
+    gradient w.r.t. the filter.
 
-    # Fill the patch array.
+    Args:
+        x (numpy.ndarray): Input of shape ``(n, c_I, d_1, ..., d_N)``.
+        gy (numpy.ndarray): Gradient w.r.t. the output of shape
+            ``(n, c_O, out_1, ..., out_N)``.
+        ksize (tuple of int): Size of the filter.
+        stride (tuple of int): Stride.
+        pad (tuple of int): Padding.
+        cover_all (bool): Use ``cover_all`` option or not.
+        dilate (int or tuple of int): Dilation factor.
+
+    Returns:
+        numpy.ndarray: Gradient of shape ``(c_O, c_I, k_1, ..., k_N)``.
+
+    """
+    n, out_c = gy.shape[:2]
+    ndim = len(ksize)
+    col = im2col_nd_view_cpu(
+        x, ksize, stride, pad, cover_all=cover_all, dilate=dilate)
+    outs = col.shape[ndim + 2:]
+    k = col.shape[1] * utils.size_of_shape(ksize)
+    spatial = tuple(six.moves.range(ndim + 3, 2 * ndim + 2))
+    # (out_1, n, out_2, ..., out_N, c_I, k_1, ..., k_N)
+    col = col.transpose(
+        (ndim + 2, 0) + spatial + tuple(six.moves.range(1, ndim + 2)))
+    # (c_O, out_1, n, out_2, ..., out_N)
+    gy = gy.transpose((1, 2, 0) + tuple(six.moves.range(3, ndim + 2)))
+
+    gW = numpy.zeros((out_c, k), dtype=numpy.result_type(x, gy))
+    row_size = n * utils.size_of_shape(outs[1:]) * k
+    rows = _n_block_rows(outs[0], row_size, x.dtype.itemsize)
+    for r0 in six.moves.range(0, outs[0], rows):
+        r1 = min(r0 + rows, outs[0])
+        gW += gy[:, r0:r1].reshape(out_c, -1).dot(
+            col[r0:r1].reshape(-1, k))
+    return gW.reshape((out_c, col.shape[-ndim - 1]) + tuple(ksize))
+
+
+def deconvolution_nd_cpu(x, W, stride, pad, outs, dilate=1):
+    """Computes N-dimensional deconvolution by tile-wise GEMM on CPU.
+
+    The product of the filter and a block of rows along the first spatial
+    axis of the input is computed at a time and scattered into the output,
+    so that the memory for the column array is bounded regardless of the
+    size of the input.
+
+    Args:
+        x (numpy.ndarray): Input of shape ``(n, c_I, d_1, ..., d_N)``.
+        W (numpy.ndarray): Filter of shape ``(c_I, c_O, k_1, ..., k_N)``.
+        stride (tuple of int): Stride.
+        pad (tuple of int): Padding.
+        outs (tuple of int): Spatial size of the output.
+        dilate (int or tuple of int): Dilation factor.
+
+    Returns:
+        numpy.ndarray: Output of shape ``(n, c_O, out_1, ..., out_N)`` and
+        the same dtype as ``x``.
+
+    """
+    n, in_c = x.shape[:2]
+    dims = x.shape[2:]
+    out_c = W.shape[1]
+    ksize = W.shape[2:]
+    ndim = len(ksize)
+    dilate = as_tuple(dilate, ndim)
     colon = slice(None)
-    for kxs in itertools.product(*[six.moves.range(k) for k in ksize]):
-        # col[:, :, kx_1, kx_2, ..., kx_N, :, :, ..., :]
-        col_index = (colon, colon) + kxs + (colon,) * ndim
-        # img[:, :, kx_1:kx_lim_1:s_1, ..., kx_N:kx_lim_N:s_N]
-        kx_dilate = tuple(kx * di for (kx, di) in zip(kxs, dilate))
-        kx_lims = tuple(kx_di + s * out
-                        for (kx_di, s, out) in zip(kx_dilate, stride, outs))
-        img_index = (colon, colon) + tuple(
-            slice(kx_di, kx_lim, s)
-            for (kx_di, kx_lim, s) in zip(kx_dilate, kx_lims, stride))
-        col[col_index] = img[img_index]
 
-    return col
+    img_shape = (n, out_c) + tuple(
+        d + 2 * p + s - 1 for (d, p, s) in zip(outs, pad, stride))
+    img = numpy.zeros(img_shape, dtype=x.dtype)
+    # (c_I, c_O * k_1 * ... * k_N)
+    W_mat = W.reshape(in_c, -1).T
+    # (d_1, n, d_2, ..., d_N, c_I)
+    x = x.transpose((2, 0) + tuple(six.moves.range(3, ndim + 2)) + (1,))
+    row_size = (n * utils.size_of_shape(dims[1:])
+                * out_c * utils.size_of_shape(ksize))
+    rows = _n_block_rows(dims[0], row_size, x.dtype.itemsize)
+    for r0 in six.moves.range(0, dims[0], rows):
+        r1 = min(r0 + rows, dims[0])
+        # (c_O, k_1, ..., k_N, d_1', n, d_2, ..., d_N)
+        gcol = W_mat.dot(x[r0:r1].reshape(-1, in_c).T).astype(
+            img.dtype, copy=False)
+        gcol = gcol.reshape(
+            (out_c,) + tuple(ksize) + (r1 - r0, n) + dims[1:])
+        for kxs in itertools.product(*[six.moves.range(k) for k in ksize]):
+            img_index = (colon, colon) + tuple(
+                slice(kx * di + s * start, kx * di + s * stop, s)
+                for (kx, di, s, start, stop) in zip(
+                    kxs, dilate, stride, (r0,) + (0,) * (ndim - 1),
+                    (r1,) + dims[1:]))
+            # (c_O, d_1', n, d_2, ..., d_N) -> (n, c_O, d_1', d_2, ..., d_N)
+            img[img_index] += numpy.moveaxis(gcol[(colon,) + kxs], 2, 0)
+
+    img_index = (colon, colon) + tuple(
+        slice(p, out + p) for (p, out) in zip(pad, outs))
+    return img[img_index]
 
 
 def im2col_nd_gpu(img, ksize, stride, pad, cover_all=False, dilate=1):
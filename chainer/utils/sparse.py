@@ -1,5 +1,8 @@
+import numpy
+
 import chainer
 from chainer import backend
+from chainer.backends import cuda
 
 
 class CooMatrix(object):
@@ -71,6 +74,110 @@ class CooMatrix(object):
             return x
 
 
+class RowSparseGrad(object):
+
+    """Gradient of a parameter which is non-zero only in some of its rows.
+
+    Functions like :func:`~chainer.functions.embed_id` with
+    ``sparse_grad=True`` accumulate the gradient w.r.t. a parameter into this
+    object instead of a dense gradient array, and update rules update only
+    the rows it holds. It is available as
+    :attr:`~chainer.Parameter.sparse_grad`.
+
+    Rows are accumulated by :meth:`add`, possibly with duplicated indices.
+    They are summed up lazily on the first access to :attr:`indices` or
+    :attr:`values`. The coalesced :attr:`values` can be modified in place,
+    e.g., by optimizer hooks.
+
+    Args:
+        shape (tuple of int): Shape of the parameter.
+
+    """
+
+    def __init__(self, shape):
+        self.shape = tuple(shape)
+        self._chunks = []
+        self._coalesced = None
+
+    def add(self, indices, values):
+        """Accumulates rows of the gradient.
+
+        Args:
+            indices (:ref:`ndarray`): Integer array of the row indices. It
+                may contain duplicated indices.
+            values (:ref:`ndarray`): Gradient of the rows. Its shape must be
+                ``(len(indices),) + shape[1:]``.
+
+        """
+        if values.shape != (len(indices),) + self.shape[1:]:
+            raise ValueError(
+                'shape of values must be {}, but {} is given'.format(
+                    (len(indices),) + self.shape[1:], values.shape))
+        if self._coalesced is not None:
+            self._chunks = [self._coalesced]
+            self._coalesced = None
+        self._chunks.append((indices, values))
+
+    @property
+    def indices(self):
+        """Sorted unique indices of the non-zero rows."""
+        return self._coalesce()[0]
+
+    @property
+    def values(self):
+        """Gradient of the rows of :attr:`indices`."""
+        return self._coalesce()[1]
+
+    def _coalesce(self):
+        if self._coalesced is not None:
+            return self._coalesced
+        xp = backend.get_array_module(self._chunks[0][1])
+        if len(self._chunks) == 1:
+            indices, values = self._chunks[0]
+        else:
+            indices = xp.concatenate([c[0] for c in self._chunks])
+            values = xp.concatenate([c[1] for c in self._chunks])
+        indices = indices.astype(numpy.intp, copy=False)
+
+        if len(indices) == 0:
+            values = values.copy()
+        elif xp is numpy:
+            # It is equivalent to `numpy.add.at` on unique indices, but
+            # ufunc.at is too slow.
+            order = numpy.argsort(indices, kind='mergesort')
+            indices = indices[order]
+            starts = numpy.flatnonzero(numpy.concatenate(
+                ([True], indices[1:] != indices[:-1])))
+            values = numpy.add.reduceat(values[order], starts, axis=0)
+            indices = indices[starts]
+        else:
+            indices, inverse = xp.unique(indices, return_inverse=True)
+            summed = xp.zeros(
+                (len(indices),) + values.shape[1:], dtype=values.dtype)
+            cuda.cupyx.scatter_add(summed, inverse, values)
+            values = summed
+
+        self._coalesced = indices, values
+        self._chunks = []
+        return self._coalesced
+
+    def to_dense(self):
+        """Returns the gradient as a dense array."""
+        indices, values = self._coalesce()
+        xp = backend.get_array_module(values)
+        dense = xp.zeros(self.shape, dtype=values.dtype)
+        dense[indices] = values
+        return dense
+
+    def to_device(self, device):
+        """Returns a copy of the gradient on the given device."""
+        indices, values = self._coalesce()
+        device = chainer.get_device(device)
+        grad = RowSparseGrad(self.shape)
+        grad.add(device.send(indices), device.send(values))
+        return grad
+
+
 def to_coo(x, ldnz=None, requires_grad=False):
     """Returns a single or a batch of matrices in COO format.
 
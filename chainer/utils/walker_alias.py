@@ -16,13 +16,24 @@ class WalkerAlias(device_resident.DeviceResident):
     Args:
         probs (float list): Probabilities of entries. They are normalized with
                             `sum(probs)`.
+        buffer_size (int): If it is given, samples are drawn ahead by one
+                           vectorized call for at least this number of
+                           samples, and :meth:`sample` returns slices of
+                           them. It reduces the overhead of drawing a few
+                           samples at a time.
 
     See: `Wikipedia article <https://en.wikipedia.org/wiki/Alias_method>`_
 
     """
 
-    def __init__(self, probs):
+    _buffer = None
+    _buffer_position = 0
+
+    def __init__(self, probs, buffer_size=None):
         super(WalkerAlias, self).__init__()
+        if buffer_size is not None and buffer_size <= 0:
+            raise ValueError('buffer_size must be positive.')
+        self.buffer_size = buffer_size
 
         prob = numpy.array(probs, numpy.float32)
         prob /= numpy.sum(prob)
@@ -66,6 +77,7 @@ class WalkerAlias(device_resident.DeviceResident):
         super(WalkerAlias, self).device_resident_accept(visitor)
         self.threshold = visitor.visit_array(self.threshold)
         self.values = visitor.visit_array(self.values)
+        self._buffer = None
 
     def sample(self, shape):
         """Generates a random sample based on given probabilities.
@@ -79,6 +91,22 @@ class WalkerAlias(device_resident.DeviceResident):
             if it is in GPU mode the return value is a :class:`cupy.ndarray`
             object.
         """
+        if self.buffer_size is None:
+            return self._sample(shape)
+
+        if isinstance(shape, int):
+            shape = shape,
+        size = int(numpy.prod(shape))
+        position = self._buffer_position
+        if self._buffer is None or position + size > len(self._buffer):
+            # A new buffer is allocated instead of overwriting the old one,
+            # since the samples returned from it may still be in use.
+            self._buffer = self._sample((max(self.buffer_size, size),))
+            position = 0
+        self._buffer_position = position + size
+        return self._buffer[position:position + size].reshape(shape)
+
+    def _sample(self, shape):
         device = self.device
         xp = device.xp
         with chainer.using_device(device):
@@ -23,6 +23,7 @@ import chainerx
 
 
 _thread_local = threading.local()
+_sparse_grad_lock = threading.Lock()
 
 
 def _raise_grad_error(exc_type, func, msg):
@@ -1771,6 +1772,7 @@ class Parameter(Variable):
     initializer = None  # type: tp.Optional[tp.Union[tp.Optional[types.AbstractInitializer], types.NdArray]] # NOQA
     # TODO(okapies): fix the behavior when shape is None and remove NdArray
     _grad_initializer = None  # type: tp.Optional[types.AbstractInitializer]
+    _sparse_grad = None  # type: tp.Optional[chainer.utils.RowSparseGrad]
 
     def __init__(
             self,
@@ -1891,14 +1893,63 @@ class Parameter(Variable):
             self._has_chainerx_array = False
         self._initial_device = device
         super(Parameter, self)._to_device(device, allow_unchaining=True)
+        if self._sparse_grad is not None:
+            self._sparse_grad = self._sparse_grad.to_device(device)
+
+    @property
+    def sparse_grad(self):
+        """Row-sparse gradient accumulated by the backprop.
+
+        Functions that support row-sparse gradients (e.g.
+        :func:`~chainer.functions.embed_id` with ``sparse_grad=True``)
+        accumulate the gradient into this :class:`~chainer.utils.RowSparseGrad`
+        object instead of :attr:`grad`, so that update rules can update only
+        the rows in it. It is ``None`` if no such gradient is accumulated.
+        If both :attr:`grad` and this gradient are set, an update rule adds
+        this gradient to :attr:`grad` and makes a dense update.
+
+        """
+        return self._sparse_grad
+
+    def _add_sparse_grad(self, indices, values):
+        # Functions of the same rank may be backpropagated in parallel.
+        with _sparse_grad_lock:
+            if self._sparse_grad is None:
+                self._sparse_grad = chainer.utils.RowSparseGrad(self.shape)
+            self._sparse_grad.add(indices, values)
+
+    def _densify_sparse_grad(self):
+        # Merges the row-sparse gradient into the dense gradient.
+        sparse_grad = self._sparse_grad
+        if sparse_grad is None:
+            return
+        self._sparse_grad = None
+        grad = self.grad
+        if grad is None:
+            self.grad = sparse_grad.to_dense()
+        else:
+            grad[sparse_grad.indices] += sparse_grad.values
+
+    def addgrad(self, var):
+        sparse_grad = getattr(var, '_sparse_grad', None)
+        if sparse_grad is not None:
+            if self.array is None:
+                self.initialize(var.shape)
+            device = self.device
+            self._add_sparse_grad(
+                device.send(sparse_grad.indices),
+                device.send(sparse_grad.values))
+        super(Parameter, self).addgrad(var)
 
     def cleargrad(self):
         super(Parameter, self).cleargrad()
+        self._sparse_grad = None
         if not self.is_initialized:
             self._grad_initializer = None
 
     def zerograd(self):
         super(Parameter, self).zerograd()
+        self._sparse_grad = None
         if not self.is_initialized:
             dtype = getattr(self.initializer, 'dtype', None)
             self._grad_initializer = initializers.Zero(dtype)
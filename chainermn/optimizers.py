@@ -1,6 +1,10 @@
 import chainer
 import copy
 
+import numpy
+
+from chainer import _backprop
+
 
 class _MultiNodeOptimizer(object):
 
@@ -146,8 +150,198 @@ class _DoubleBufferingOptimizer(object):
         setattr(self.actual_optimizer, attr_name, value)
 
 
+class _Bucket(object):
+
+    def __init__(self, params):
+        self.params = params
+        self.dtype = params[0].dtype
+        # MPI cannot reduce float16 values, which are reduced in float32.
+        buffer_dtype = numpy.float32 \
+            if self.dtype == numpy.float16 else self.dtype
+        self.buffer = numpy.empty(
+            sum(param.size for param in params), dtype=buffer_dtype)
+        self.n_ready = 0
+        self.request = None
+
+    def pack(self):
+        offset = 0
+        for param in self.params:
+            size = param.size
+            if param.grad is None:
+                self.buffer[offset:offset + size] = 0
+            else:
+                self.buffer[offset:offset + size] = param.grad.ravel()
+            offset += size
+
+    def unpack(self, scale):
+        self.buffer *= scale
+        offset = 0
+        for param in self.params:
+            size = param.size
+            grad = self.buffer[offset:offset + size].reshape(param.shape)
+            if param.grad is None:
+                param.grad = grad.astype(self.dtype)
+            else:
+                param.grad[...] = grad
+            offset += size
+
+
+class _OverlappedOptimizer(object):
+
+    def __init__(self, actual_optimizer, communicator, bucket_size):
+        super(_OverlappedOptimizer, self).__setattr__(
+            'communicator', communicator)
+        super(_OverlappedOptimizer, self).__setattr__(
+            'actual_optimizer', actual_optimizer)
+        super(_OverlappedOptimizer, self).__setattr__(
+            'bucket_size', bucket_size)
+        super(_OverlappedOptimizer, self).__setattr__(
+            'target_params', [])
+        super(_OverlappedOptimizer, self).__setattr__(
+            'buckets', None)
+        super(_OverlappedOptimizer, self).__setattr__(
+            'param_to_bucket', {})
+        super(_OverlappedOptimizer, self).__setattr__(
+            'n_started', 0)
+
+    def update(self, lossfun=None, *args, **kwds):
+        target = self.target
+        if lossfun is None:
+            if self.is_changed(target):
+                self.communicator.bcast_data(target)
+                self.build_buckets(target)
+            else:
+                self.communicator.multi_node_mean_grad(target, True)
+                self.actual_optimizer.update(None, *args, **kwds)
+            return
+
+        use_cleargrads = getattr(self, '_use_cleargrads', True)
+        loss = lossfun(*args, **kwds)
+        if use_cleargrads:
+            target.cleargrads()
+        else:
+            target.zerograds()
+
+        # Parameters initialized by the forward computation are broadcast
+        # before the buckets are built, as _MultiNodeOptimizer does.
+        if self.is_changed(target):
+            loss.backward(loss_scale=self.actual_optimizer._loss_scale)
+            del loss
+            self.communicator.bcast_data(target)
+            self.build_buckets(target)
+            return
+
+        if self.buckets is None:
+            loss.backward(loss_scale=self.actual_optimizer._loss_scale)
+            del loss
+            self.communicator.multi_node_mean_grad(target, True)
+            self.actual_optimizer.update(None, *args, **kwds)
+            return
+
+        for bucket in self.buckets:
+            bucket.n_ready = 0
+            bucket.request = None
+        super(_OverlappedOptimizer, self).__setattr__('n_started', 0)
+        with _backprop.leaf_grad_callback(self.on_grad_ready):
+            loss.backward(loss_scale=self.actual_optimizer._loss_scale)
+        del loss
+
+        # Start the rest of the buckets, of which some parameters are unused.
+        self.start_buckets(flush=True)
+        import mpi4py.MPI
+        mpi4py.MPI.Request.Waitall([bucket.request for bucket in self.buckets])
+        scale = 1.0 / self.communicator.size
+        for bucket in self.buckets:
+            bucket.unpack(scale)
+        self.actual_optimizer.update(None, *args, **kwds)
+
+    def build_buckets(self, target):
+        # Buckets are made in the reversed order of the parameters, which
+        # roughly follows the order of backprop, and must be identical among
+        # processes.
+        params = [param for _, param in sorted(target.namedparams())
+                  if param.data is not None]
+        if not all(isinstance(param.array, numpy.ndarray)
+                   for param in params):
+            super(_OverlappedOptimizer, self).__setattr__('buckets', None)
+            super(_OverlappedOptimizer, self).__setattr__(
+                'param_to_bucket', {})
+            return
+
+        bucket_params = []
+        nbytes = 0
+        buckets = []
+        for param in reversed(params):
+            if bucket_params and (param.dtype != bucket_params[0].dtype
+                                  or nbytes >= self.bucket_size):
+                buckets.append(_Bucket(bucket_params))
+                bucket_params = []
+                nbytes = 0
+            bucket_params.append(param)
+            nbytes += param.array.nbytes
+        if bucket_params:
+            buckets.append(_Bucket(bucket_params))
+
+        param_to_bucket = {}
+        for bucket in buckets:
+            for param in bucket.params:
+                param_to_bucket[id(param)] = bucket
+        super(_OverlappedOptimizer, self).__setattr__('buckets', buckets)
+        super(_OverlappedOptimizer, self).__setattr__(
+            'param_to_bucket', param_to_bucket)
+
+    def on_grad_ready(self, var):
+        bucket = self.param_to_bucket.get(id(var))
+        if bucket is None:
+            return
+        bucket.n_ready += 1
+        self.start_buckets()
+        # Progress the outstanding communication.
+        import mpi4py.MPI
+        mpi4py.MPI.Request.Testall([
+            bucket.request for bucket in self.buckets[:self.n_started]])
+
+    def start_buckets(self, flush=False):
+        # Nonblocking collective operations must be started in the same order
+        # in all the processes, so the buckets are started in order as soon
+        # as the gradients of all their parameters are ready.
+        import mpi4py.MPI
+        from chainermn.communicators import _memory_utility
+
+        buckets = self.buckets
+        n_started = self.n_started
+        while n_started < len(buckets):
+            bucket = buckets[n_started]
+            if not flush and bucket.n_ready < len(bucket.params):
+                break
+            bucket.pack()
+            bucket.request = self.communicator.mpi_comm.Iallreduce(
+                mpi4py.MPI.IN_PLACE,
+                _memory_utility.array_to_buffer_object(bucket.buffer))
+            n_started += 1
+        super(_OverlappedOptimizer, self).__setattr__('n_started', n_started)
+
+    def is_changed(self, target):
+        previous_params = self.target_params
+        super(_OverlappedOptimizer, self).__setattr__(
+            'target_params', [(name, param.data is not None)
+                              for name, param in sorted(target.namedparams())])
+        return previous_params != self.target_params
+
+    def setup(self, link):
+        self.actual_optimizer.setup(link)
+        return self
+
+    def __getattr__(self, attr_name):
+        return getattr(self.actual_optimizer, attr_name)
+
+    def __setattr__(self, attr_name, value):
+        setattr(self.actual_optimizer, attr_name, value)
+
+
 def create_multi_node_optimizer(actual_optimizer, communicator,
-                                double_buffering=False, zero_fill=True):
+                                double_buffering=False, zero_fill=True,
+                                overlap=False, bucket_size=25 * 1024 * 1024):
     """Create a multi node optimizer from a Chainer optimizer.
 
     Args:
@@ -167,9 +361,36 @@ def create_multi_node_optimizer(actual_optimizer, communicator,
              performing all-reduce, which might be an array or None after
              backward computation. Gradients of uninitialized Link are skipped.
              If it is False, gradients of unused Link are just skipped.
+        overlap: If ``True``, all-reduce of gradients is overlapped with
+             backward computation. Parameters are grouped into buckets,
+             and each bucket starts to be all-reduced by a nonblocking MPI
+             operation as soon as the gradients of all its parameters have
+             been computed, while the rest of backward computation goes on.
+             This flag requires ``zero_fill=True`` and is supported by
+             MPI-based communicators for parameters on CPU. Otherwise,
+             gradients are all-reduced after backward computation by the
+             communicator.
+        bucket_size: Size of each bucket in bytes used when ``overlap`` is
+             ``True``. Smaller buckets start all-reduce earlier at the cost
+             of more MPI operations.
     Returns:
         The multi node optimizer based on ``actual_optimizer``.
     """
+    if overlap:
+        from chainermn.communicators import mpi_communicator_base
+        if double_buffering:
+            raise ValueError(
+                'overlap and double_buffering cannot be used together.')
+        if not zero_fill:
+            raise ValueError('overlap requires zero_fill=True.')
+        if not isinstance(communicator,
+                          mpi_communicator_base.MpiCommunicatorBase):
+            raise ValueError(
+                'This communicator does not support overlapped all-reduce.')
+        if bucket_size <= 0:
+            raise ValueError('bucket_size must be positive.')
+        return _OverlappedOptimizer(actual_optimizer, communicator,
+                                    bucket_size)
     if double_buffering:
         from chainermn.communicators.pure_nccl_communicator \
             import PureNcclCommunicator
@@ -0,0 +1 @@
+build_chainerx = False
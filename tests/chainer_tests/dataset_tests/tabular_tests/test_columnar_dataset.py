@@ -0,0 +1,143 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from chainer.dataset import tabular
+from chainer import testing
+from chainer_tests.dataset_tests.tabular_tests import dummy_dataset
+
+
+@testing.parameterize(*testing.product({
+    'mode': [tuple, dict, None],
+    'return_array': [True, False],
+    'batch_size': [3, 1024],
+}))
+class TestColumnarDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.source = dummy_dataset.DummyDataset(
+            mode=self.mode, return_array=self.return_array)
+        tabular.save_columnar(
+            self.dirname, self.source, batch_size=self.batch_size)
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def test_dataset(self):
+        dataset = tabular.ColumnarDataset(self.dirname)
+
+        self.assertEqual(len(dataset), len(self.source))
+        self.assertEqual(dataset.keys, self.source.keys)
+        self.assertEqual(dataset.mode, self.source.mode)
+        self.assertEqual(
+            sorted(os.listdir(self.dirname)),
+            sorted(['columns.json'] +
+                   ['{}.npy'.format(i) for i in range(len(dataset.keys))]))
+
+    def test_get_examples(self):
+        dataset = tabular.ColumnarDataset(self.dirname)
+
+        for indices in (None, slice(8, 1, -3), [3, 1, 3], np.array([4, 0])):
+            for key_indices in (None, (0,), ()):
+                output = dataset.get_examples(indices, key_indices)
+                data = self.source.data
+                if indices is not None:
+                    data = data[:, indices]
+                if key_indices is not None:
+                    data = data[list(key_indices)]
+
+                self.assertEqual(len(output), len(data))
+                for out, d in zip(output, data):
+                    self.assertIsInstance(out, np.ndarray)
+                    np.testing.assert_equal(out, d)
+
+    def test_slice(self):
+        dataset = tabular.ColumnarDataset(self.dirname)
+        indices = np.array([7, -1, 2])
+
+        output = dataset.slice[indices].slice[np.array([2, 0])].fetch()
+        expected = self.source.data[:, [2, 7]]
+        if self.mode is tuple:
+            np.testing.assert_equal(output, tuple(expected))
+        elif self.mode is dict:
+            np.testing.assert_equal(
+                output, dict(zip(self.source.keys, expected)))
+        else:
+            np.testing.assert_equal(output, expected[0])
+
+    def test_transform_batch(self):
+        dataset = tabular.ColumnarDataset(self.dirname)
+
+        def transform_batch(*args, **kwargs):
+            if kwargs:
+                args = tuple(kwargs[key] for key in dataset.keys)
+            self.assertTrue(all(isinstance(a, np.ndarray) for a in args))
+            return args[0] * 2
+
+        view = dataset.transform_batch('x', transform_batch)
+        output = view.slice[np.arange(10) % 3 == 0].fetch()
+        np.testing.assert_equal(output, self.source.data[0, ::3] * 2)
+
+    def test_mmap(self):
+        dataset = tabular.ColumnarDataset(self.dirname)
+        for column in dataset.get_examples(None, None):
+            self.assertIsInstance(column, np.memmap)
+            self.assertFalse(column.flags.writeable)
+
+        dataset = tabular.ColumnarDataset(self.dirname, mmap_mode=None)
+        for column in dataset.get_examples(None, None):
+            self.assertNotIsInstance(column, np.memmap)
+
+    def test_pickle(self):
+        dataset = tabular.ColumnarDataset(self.dirname)
+        dataset = pickle.loads(pickle.dumps(dataset))
+        for column in dataset.get_examples(None, None):
+            self.assertIsInstance(column, np.memmap)
+        np.testing.assert_equal(
+            dataset.get_examples([1, 2], None), self.source.data[:, [1, 2]])
+
+
+class TestSaveColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def test_shape(self):
+        source = tabular.from_data(
+            (('a', np.arange(12).reshape(4, 3)), ('b', [1.5, 2, 3, 4])))
+        tabular.save_columnar(self.dirname, source, batch_size=3)
+        dataset = tabular.ColumnarDataset(self.dirname)
+
+        a, b = dataset.fetch()
+        self.assertEqual(a.dtype, source.fetch()[0].dtype)
+        np.testing.assert_equal(a, np.arange(12).reshape(4, 3))
+        self.assertEqual(b.dtype, np.float64)
+        np.testing.assert_equal(b, [1.5, 2, 3, 4])
+
+    def test_shape_mismatch(self):
+        source = tabular.from_data(
+            [np.zeros(2), np.zeros(2), np.zeros(3)])
+        with self.assertRaises(ValueError):
+            tabular.save_columnar(self.dirname, source, batch_size=2)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.dirname, 'columns.json')))
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            tabular.save_columnar(self.dirname, tabular.from_data([]))
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            tabular.save_columnar(
+                self.dirname, tabular.from_data([1]), batch_size=0)
+
+
+testing.run_module(__name__, __file__)
@@ -168,6 +168,44 @@ class TestSlice(unittest.TestCase):
         self.assertEqual(view.convert(output), 'converted')
 
 
+@testing.parameterize(
+    {'indices': np.array([3, -2]), 'expected': [3, 8]},
+    {'indices': np.arange(10) % 4 == 1, 'expected': [1, 5, 9]},
+    {'indices': np.array([], dtype=np.int32), 'expected': []},
+    {'indices': np.array([11, 1]), 'index_exception': IndexError},
+    {'indices': np.array([-11]), 'index_exception': IndexError},
+    {'indices': np.ones(11, dtype=bool), 'index_exception': ValueError},
+)
+class TestSliceArray(unittest.TestCase):
+
+    def test_slice(self):
+        def callback(indices, key_indices):
+            self.assertIsInstance(indices, np.ndarray)
+
+        dataset = dummy_dataset.DummyDataset(
+            return_array=True, callback=callback)
+
+        if hasattr(self, 'index_exception'):
+            with self.assertRaises(self.index_exception):
+                dataset.slice[self.indices]
+            return
+
+        view = dataset.slice[self.indices]
+        self.assertEqual(len(view), len(self.expected))
+        for out, d in six.moves.zip_longest(
+                view.fetch(), dataset.data[:, self.expected]):
+            np.testing.assert_equal(out, d)
+
+        if len(self.expected) > 0:
+            for indices in (np.array([-1, 0]), slice(None, None, -1),
+                            [len(self.expected) - 1, 0]):
+                view = dataset.slice[self.indices].slice[indices]
+                expected = np.array(self.expected)[indices]
+                for out, d in six.moves.zip_longest(
+                        view.fetch(), dataset.data[:, expected]):
+                    np.testing.assert_equal(out, d)
+
+
 # Replace list of bool with ndarray of bool
 # since old numpy cannot handle list of bool.
 def _indices_for_numpy(indices):
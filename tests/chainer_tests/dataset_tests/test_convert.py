@@ -7,6 +7,7 @@ import pytest
 from chainer import backend
 from chainer.backends import cuda
 from chainer import dataset
+from chainer.dataset import _batch
 from chainer import testing
 from chainer.testing import attr
 import chainer.testing.backend  # NOQA
@@ -360,6 +361,197 @@ class TestConcatExamplesWithBuiltInTypes(unittest.TestCase):
             numpy.float64)
 
 
+@testing.parameterize(*testing.product({
+    'mode': [tuple, dict, None],
+    'padding': [None, -1],
+}))
+class TestConcatExamplesStackedBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(size=(4, 3)).astype(numpy.float32)
+        self.t = [0, 2, 1, 3]
+        self.seq = numpy.empty(4, dtype=object)
+        self.seq[:] = [numpy.arange(n) for n in (1, 3, 2, 2)]
+        columns = self.x, self.t, self.seq
+        keys = 'x', 't', 'seq'
+        if self.mode is None:
+            columns = columns[:1]
+        self.batch = _batch.StackedBatch(columns, self.mode, keys)
+
+    def test_examples(self):
+        self.assertIsInstance(self.batch, list)
+        self.assertEqual(len(self.batch), 4)
+        if self.mode is tuple:
+            x, t, seq = self.batch[1]
+        elif self.mode is dict:
+            x, t, seq = (self.batch[1][key] for key in ('x', 't', 'seq'))
+        else:
+            x = self.batch[1]
+        numpy.testing.assert_array_equal(x, self.x[1])
+        if self.mode is not None:
+            self.assertEqual(t, 2)
+            numpy.testing.assert_array_equal(seq, numpy.arange(3))
+
+    def test_concat_examples(self):
+        if self.padding is None and self.mode is not None:
+            # The sequences cannot be stacked without padding.
+            with self.assertRaises(ValueError):
+                dataset.concat_examples(self.batch, padding=self.padding)
+            return
+
+        actual = dataset.concat_examples(self.batch, padding=self.padding)
+        expected = dataset.concat_examples(
+            list(self.batch), padding=self.padding)
+        if self.mode is tuple:
+            self.assertIs(actual[0], self.x)
+            self.assertEqual(len(actual), len(expected))
+            for a, e in zip(actual, expected):
+                numpy.testing.assert_array_equal(a, e)
+                self.assertEqual(a.dtype, e.dtype)
+        elif self.mode is dict:
+            self.assertIs(actual['x'], self.x)
+            self.assertEqual(sorted(actual), sorted(expected))
+            for key in expected:
+                numpy.testing.assert_array_equal(actual[key], expected[key])
+                self.assertEqual(actual[key].dtype, expected[key].dtype)
+        else:
+            self.assertIs(actual, self.x)
+            numpy.testing.assert_array_equal(actual, expected)
+
+    def test_modified(self):
+        self.batch.reverse()
+        self.assertIsNone(self.batch.columns)
+        x = numpy.zeros(3, dtype=numpy.float32)
+        if self.mode is tuple:
+            self.batch[0] = x, 5, numpy.arange(2)
+        elif self.mode is dict:
+            self.batch[0] = {'x': x, 't': 5, 'seq': numpy.arange(2)}
+        else:
+            self.batch[0] = x
+        padding = -1 if self.mode is not None else self.padding
+        actual = dataset.concat_examples(self.batch, padding=padding)
+        if self.mode is tuple:
+            actual_x, actual_t = actual[:2]
+        elif self.mode is dict:
+            actual_x, actual_t = actual['x'], actual['t']
+        else:
+            actual_x = actual
+        numpy.testing.assert_array_equal(actual_x[0], x)
+        numpy.testing.assert_array_equal(actual_x[1:], self.x[2::-1])
+        if self.mode is not None:
+            numpy.testing.assert_array_equal(actual_t, [5, 1, 2, 0])
+
+    def test_mutators(self):
+        for mutate in (
+                lambda batch: batch.append(batch[0]),
+                lambda batch: batch.extend(batch[:1]),
+                lambda batch: batch.insert(0, batch[0]),
+                lambda batch: batch.pop(),
+                lambda batch: batch.remove(batch[0]),
+                lambda batch: batch.__delitem__(0),
+                lambda batch: batch.__iadd__(batch[:1]),
+                lambda batch: batch.sort(key=id)):
+            batch = _batch.StackedBatch(
+                self.batch.columns, self.mode, self.batch.keys)
+            mutate(batch)
+            self.assertIsNone(batch.columns)
+
+
+@testing.parameterize(*testing.product({
+    'example_type': ['tuple', 'dict', 'array'],
+    'padding': [None, 0],
+}))
+class TestConcatWithBuffers(unittest.TestCase):
+
+    def make_batch(self, xp, length):
+        batch = []
+        for i in range(3):
+            x = xp.random.uniform(size=(2, 3)).astype(numpy.float32)
+            y = xp.arange(length if self.padding is None else length - i)
+            if self.example_type == 'tuple':
+                batch.append((x, y))
+            elif self.example_type == 'dict':
+                batch.append({'x': x, 'y': y})
+            else:
+                batch.append(y)
+        return batch
+
+    def check_equal(self, actual, expected):
+        if self.example_type == 'tuple':
+            self.assertEqual(len(actual), len(expected))
+            pairs = zip(actual, expected)
+        elif self.example_type == 'dict':
+            self.assertEqual(sorted(actual), sorted(expected))
+            pairs = ((actual[key], expected[key]) for key in expected)
+        else:
+            pairs = (actual, expected),
+        for a, e in pairs:
+            self.assertEqual(type(a), type(e))
+            self.assertEqual(a.dtype, e.dtype)
+            testing.assert_allclose(a, e, atol=0, rtol=0)
+
+    def check_reuse(self, xp, device):
+        converter = dataset.ConcatWithBuffers()
+        batches = [self.make_batch(xp, 4) for _ in range(3)]
+        results = [converter(batch, device, self.padding)
+                   for batch in batches]
+
+        n_columns = 1 if self.example_type == 'array' else 2
+        self.assertEqual(converter.n_allocations, 2 * n_columns)
+        self.assertEqual(converter.n_reuses, n_columns)
+        # The previous batch is still valid.
+        for batch, result in zip(batches[1:], results[1:]):
+            self.check_equal(result, dataset.concat_examples(
+                batch, device, self.padding))
+
+        # A longer batch needs a larger buffer.
+        batch = self.make_batch(xp, 6)
+        result = converter(batch, device, self.padding)
+        self.check_equal(
+            result, dataset.concat_examples(batch, device, self.padding))
+        self.assertEqual(converter.n_allocations, 2 * n_columns + 1)
+        self.assertGreater(converter.total_bytes, 0)
+
+        converter.free_buffers()
+        self.assertEqual(converter.total_bytes, 0)
+
+    def test_reuse_cpu(self):
+        self.check_reuse(numpy, None)
+
+    @attr.gpu
+    def test_reuse_gpu(self):
+        self.check_reuse(cuda.cupy, None)
+
+    @attr.gpu
+    def test_reuse_cpu_to_gpu(self):
+        self.check_reuse(numpy, 0)
+
+    def test_shape_mismatch(self):
+        if self.padding is not None:
+            return
+        converter = dataset.ConcatWithBuffers()
+        with self.assertRaises(ValueError):
+            converter([numpy.zeros(2), numpy.zeros(3)])
+
+    def test_stacked_batch(self):
+        converter = dataset.ConcatWithBuffers()
+        x = numpy.arange(6).reshape(3, 2)
+        batch = _batch.StackedBatch((x,), None)
+        self.assertIs(converter(batch, padding=self.padding), x)
+        self.assertEqual(converter.n_allocations, 0)
+
+
+class TestConcatWithBuffersInvalid(unittest.TestCase):
+
+    def test_n_buffers(self):
+        with self.assertRaises(ValueError):
+            dataset.ConcatWithBuffers(n_buffers=0)
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            dataset.ConcatWithBuffers()([])
+
+
 def get_xp(gpu):
     if gpu:
         return cuda.cupy
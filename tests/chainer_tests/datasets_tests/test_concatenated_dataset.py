@@ -1,8 +1,10 @@
 import unittest
 
+import mock
 import numpy as np
 import six
 
+from chainer.dataset import _batch
 from chainer.datasets import ConcatenatedDataset
 from chainer import testing
 
@@ -60,5 +62,55 @@ class TestConcatenatedDataset(unittest.TestCase):
                 concatenated_slice, expected_slice):
             np.testing.assert_equal(concatenated, expected)
 
+    def test_concatenated_dataset_indices(self):
+        n = len(self.expected_dataset)
+        for indices in (list(range(n))[::-1], np.arange(n) % 4 * (n // 4),
+                        []):
+            concatenated = self.concatenated_dataset[indices]
+            self.assertIsInstance(concatenated, list)
+            self.assertEqual(len(concatenated), len(indices))
+            for concatenated, i in six.moves.zip(concatenated, indices):
+                np.testing.assert_equal(
+                    concatenated, self.expected_dataset[i])
+
+    def test_concatenated_dataset_overrun(self):
+        n = len(self.expected_dataset)
+        for index in (n, [0, n], -1, [-1]):
+            with self.assertRaises(IndexError):
+                self.concatenated_dataset[index]
+
+
+class TestConcatenatedDatasetBatch(unittest.TestCase):
+
+    def test_batch(self):
+        datasets = [list(range(i * 10, i * 10 + 10)) for i in range(5)]
+        concatenated = ConcatenatedDataset(*datasets)
+        indices = [41, 3, 40, 5, 12, 49]
+        with mock.patch.object(
+                _batch, 'get_examples', wraps=_batch.get_examples) as m:
+            self.assertEqual(concatenated[indices], indices)
+        # The single index of the third dataset is fetched directly.
+        fetched = [call[0][0] for call in m.call_args_list]
+        self.assertEqual(
+            [sum(d is f for f in fetched) for d in datasets],
+            [1, 0, 0, 0, 1])
+
+    def test_nested(self):
+        concatenated = ConcatenatedDataset(
+            ConcatenatedDataset([0, 1], [2]), [], [3, 4, 5])
+        self.assertEqual(len(concatenated), 6)
+        self.assertEqual(concatenated[::-1], [5, 4, 3, 2, 1, 0])
+        self.assertEqual(concatenated[2], 2)
+
+    def test_overridden_get_example(self):
+        class Dataset(ConcatenatedDataset):
+            def get_example(self, i):
+                return super(Dataset, self).get_example(i) * 10
+
+        concatenated = Dataset([0, 1], [2, 3])
+        self.assertEqual(concatenated[2], 20)
+        self.assertEqual(concatenated[[3, 0, 2]], [30, 0, 20])
+        self.assertEqual(concatenated[1:3], [10, 20])
+
 
 testing.run_module(__name__, __file__)
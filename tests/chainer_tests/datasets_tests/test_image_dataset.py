@@ -1,7 +1,10 @@
 import os
 import pickle
+import shutil
+import tempfile
 import unittest
 
+import mock
 import numpy
 
 from chainer import datasets
@@ -171,4 +174,130 @@ class TestLabeledZippedImageDataset(unittest.TestCase):
         self.assertEqual(label, 1)
 
 
+@testing.parameterize(*testing.product({
+    'labeled': [False, True],
+    'size': [None, (20, 30)],
+    'memory_cache_size': [0, 1],
+}))
+@unittest.skipUnless(image_dataset.available, 'image_dataset is not available')
+class TestCachedImageDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.root, 'cache')
+        src = os.path.join(
+            os.path.dirname(__file__), 'image_dataset', 'chainer.png')
+        self.paths = ['a.png', 'b.png', 'c.png']
+        for path in self.paths:
+            shutil.copy(src, os.path.join(self.root, path))
+        if self.labeled:
+            self.original = datasets.LabeledImageDataset(
+                [(path, i) for i, path in enumerate(self.paths)],
+                root=self.root)
+        else:
+            self.original = datasets.ImageDataset(self.paths, root=self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def make_dataset(self):
+        return datasets.CachedImageDataset(
+            self.original, self.cache_dir, size=self.size,
+            memory_cache_size=self.memory_cache_size)
+
+    def expected(self, i):
+        image = image_dataset._postprocess_image(
+            image_dataset._read_image_as_array(
+                os.path.join(self.root, self.paths[i]), numpy.float32,
+                self.size))
+        if self.labeled:
+            return image, numpy.array(i, numpy.int32)
+        return image
+
+    def check_example(self, actual, i):
+        expected = self.expected(i)
+        if self.labeled:
+            actual, label = actual
+            expected, expected_label = expected
+            assert label.dtype == expected_label.dtype
+            assert label == expected_label
+        assert actual.dtype == expected.dtype
+        if self.size is None:
+            assert actual.shape == (4, 300, 300)
+        else:
+            assert actual.shape == (4,) + self.size
+        numpy.testing.assert_array_equal(actual, expected)
+
+    def count_reads(self, dataset, indices):
+        with mock.patch.object(
+                image_dataset, '_read_image_as_array',
+                side_effect=image_dataset._read_image_as_array) as read:
+            examples = [dataset[i] for i in indices]
+        for i, example in zip(indices, examples):
+            self.check_example(example, i)
+        return read.call_count
+
+    def test_len(self):
+        assert len(self.make_dataset()) == 3
+
+    def test_get(self):
+        dataset = self.make_dataset()
+        assert self.count_reads(dataset, [1, 2, 0, 1, 2, 0]) == 2
+
+    def test_reuse_cache_file(self):
+        self.count_reads(self.make_dataset(), [0, 1, 2])
+        assert self.count_reads(self.make_dataset(), [0, 1, 2]) == 0
+
+    def test_modified(self):
+        dataset = self.make_dataset()
+        self.count_reads(dataset, [0, 1, 2])
+        path = os.path.join(self.root, self.paths[1])
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert self.count_reads(dataset, [0, 1, 2, 1]) == 1
+
+    def test_returns_copy(self):
+        dataset = self.make_dataset()
+        example = dataset[0]
+        image = example[0] if self.labeled else example
+        image[...] = -1
+        self.check_example(dataset[0], 0)
+
+    def test_pickle(self):
+        dataset = self.make_dataset()
+        self.count_reads(dataset, [0])
+        dataset = pickle.loads(pickle.dumps(dataset))
+        assert self.count_reads(dataset, [0, 1]) == 1
+
+
+@unittest.skipUnless(image_dataset.available, 'image_dataset is not available')
+class TestCachedImageDatasetInvalid(unittest.TestCase):
+
+    def setUp(self):
+        self.root = os.path.join(os.path.dirname(__file__), 'image_dataset')
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_shape_mismatch(self):
+        original = datasets.ImageDataset(
+            ['chainer.png', 'chainer_grey.png'], root=self.root)
+        dataset = datasets.CachedImageDataset(original, self.cache_dir)
+        dataset[0]
+        with self.assertRaises(ValueError):
+            dataset[1]
+
+    def test_incompatible_cache_file(self):
+        original = datasets.ImageDataset(['chainer.png'], root=self.root)
+        datasets.CachedImageDataset(original, self.cache_dir)
+        dataset = datasets.CachedImageDataset(
+            original, self.cache_dir, size=(10, 10))
+        assert dataset[0].shape == (4, 10, 10)
+
+    def test_invalid_dataset(self):
+        with self.assertRaises(TypeError):
+            datasets.CachedImageDataset([], self.cache_dir)
+
+
 testing.run_module(__name__, __file__)
@@ -3,9 +3,11 @@ import io
 import multiprocessing
 import os
 import sys
+import threading
 import unittest
 
 import mock
+import numpy
 
 from chainer import datasets
 from chainer.datasets import pickle_dataset
@@ -78,6 +80,83 @@ class TestPickleDataset(unittest.TestCase):
         # Touch to suppress "unused variable' warning
         del dataset
 
+    def test_negative_index(self):
+        writer = datasets.PickleDatasetWriter(self.io)
+        writer.write(1)
+        writer.write(2)
+        writer.flush()
+
+        dataset = datasets.PickleDataset(self.io)
+        assert dataset[-1] == 2
+        with self.assertRaises(IndexError):
+            dataset[2]
+        with self.assertRaises(IndexError):
+            dataset[-3]
+
+
+@testing.parameterize(*testing.product({
+    'compression': [None, 'zlib', 'bz2', 'lzma'],
+}))
+class TestPickleDatasetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.io = io.BytesIO()
+        self.index = io.BytesIO()
+        # Keep the contents after the writer closes them.
+        self.io.close = lambda: None
+        self.index.close = lambda: None
+
+    def _write(self):
+        with datasets.PickleDatasetWriter(
+                self.io, index_writer=self.index,
+                compression=self.compression) as writer:
+            writer.write(1)
+            writer.write('hello')
+            writer.write(numpy.arange(5))
+        self.index.seek(0)
+
+    def test_write_read(self):
+        self._write()
+
+        with mock.patch('six.moves.cPickle.load') as load:
+            dataset = datasets.PickleDataset(self.io, index=self.index)
+        load.assert_not_called()
+        assert len(dataset) == 3
+        assert dataset[1] == 'hello'
+        assert dataset[0] == 1
+        numpy.testing.assert_array_equal(dataset[2], numpy.arange(5))
+
+        if self.compression is None:
+            # The data is readable without the index.
+            dataset = datasets.PickleDataset(self.io)
+            assert len(dataset) == 3
+            assert dataset[1] == 'hello'
+
+    def test_data_mismatch(self):
+        self._write()
+        self.io.write(b'extra')
+        with self.assertRaises(ValueError):
+            datasets.PickleDataset(self.io, index=self.index)
+
+
+class TestPickleDatasetIndexInvalid(unittest.TestCase):
+
+    def test_invalid_compression(self):
+        with self.assertRaises(ValueError):
+            datasets.PickleDatasetWriter(
+                io.BytesIO(), index_writer=io.BytesIO(), compression='gzip')
+
+    def test_compression_without_index(self):
+        with self.assertRaises(ValueError):
+            datasets.PickleDatasetWriter(io.BytesIO(), compression='zlib')
+
+    def test_invalid_index(self):
+        index = io.BytesIO()
+        numpy.save(index, numpy.zeros(5, dtype=numpy.int64))
+        index.seek(0)
+        with self.assertRaises(ValueError):
+            datasets.PickleDataset(io.BytesIO(), index=index)
+
 
 class TestPickleDatasetHelper(unittest.TestCase):
 
@@ -96,6 +175,111 @@ class TestPickleDatasetHelper(unittest.TestCase):
         with datasets.open_pickle_dataset(self.path) as dataset:
             assert dataset[0] == 1
 
+    def test_index(self):
+        with datasets.open_pickle_dataset_writer(
+                self.path, compression='zlib') as writer:
+            for i in range(100):
+                writer.write(('example', i))
+        assert os.path.exists(self.path + '.index')
+
+        with datasets.open_pickle_dataset(self.path) as dataset:
+            assert len(dataset) == 100
+            results = [None] * 4
+
+            def read(k):
+                results[k] = [dataset[i] for i in range(k, 100, 4)]
+
+            threads = [threading.Thread(target=read, args=(k,))
+                       for k in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            for k in range(4):
+                assert results[k] == [('example', i)
+                                      for i in range(k, 100, 4)]
+
+    def test_without_index(self):
+        with datasets.open_pickle_dataset_writer(self.path) as writer:
+            writer.write(1)
+            writer.write(2)
+        os.remove(self.path + '.index')
+
+        with datasets.open_pickle_dataset(self.path) as dataset:
+            assert len(dataset) == 2
+            assert dataset[1] == 2
+
+    def test_writer_not_closed(self):
+        writer = datasets.open_pickle_dataset_writer(self.path)
+        for i in range(3):
+            writer.write(i)
+        writer.flush()
+        # Simulates a crash of the writer.
+        writer._writer.close()
+        writer._index_writer._fp.close()
+        assert not os.path.exists(self.path + '.index')
+
+        with datasets.open_pickle_dataset(self.path) as dataset:
+            assert len(dataset) == 3
+            assert dataset[2] == 2
+
+    def test_writer_removes_index(self):
+        with datasets.open_pickle_dataset_writer(self.path) as writer:
+            writer.write(1)
+        writer = datasets.open_pickle_dataset_writer(self.path)
+        assert not os.path.exists(self.path + '.index')
+        writer.close()
+        assert os.path.exists(self.path + '.index')
+
+    def write_with_stale_index(self, compression=None):
+        with datasets.open_pickle_dataset_writer(
+                self.path, compression=compression) as writer:
+            writer.write(1)
+        with open(self.path + '.index', 'rb') as f:
+            index = f.read()
+        with datasets.open_pickle_dataset_writer(
+                self.path, compression=compression) as writer:
+            writer.write(1)
+            writer.write(2)
+        with open(self.path + '.index', 'wb') as f:
+            f.write(index)
+
+    def test_stale_index(self):
+        self.write_with_stale_index()
+        with testing.assert_warns(UserWarning):
+            dataset = datasets.open_pickle_dataset(self.path)
+        with dataset:
+            assert len(dataset) == 2
+            assert dataset[1] == 2
+
+    def test_stale_index_compressed(self):
+        self.write_with_stale_index('zlib')
+        with self.assertRaises(ValueError):
+            datasets.open_pickle_dataset(self.path)
+
+    def test_empty_index(self):
+        with datasets.open_pickle_dataset_writer(self.path) as writer:
+            writer.write(1)
+            writer.write(2)
+        open(self.path + '.index', 'wb').close()
+
+        with testing.assert_warns(UserWarning):
+            dataset = datasets.open_pickle_dataset(self.path)
+        with dataset:
+            assert len(dataset) == 2
+            assert dataset[1] == 2
+
+    @unittest.skipUnless(hasattr(os, 'pread'), 'os.pread is not available')
+    def test_pread(self):
+        with datasets.open_pickle_dataset_writer(self.path) as writer:
+            writer.write(1)
+            writer.write(2)
+
+        with datasets.open_pickle_dataset(self.path) as dataset:
+            with mock.patch.object(dataset, '_lock') as lock:
+                assert dataset[1] == 2
+            lock.__enter__.assert_not_called()
+
     def test_file_reader_after_fork(self):
         m = mock.mock_open()
         with mock.patch('chainer.datasets.pickle_dataset.open', m):
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy
+
 from chainer import datasets
 from chainer import testing
 
@@ -28,11 +30,39 @@ class TestSubDataset(unittest.TestCase):
         self.assertEqual(subset[1], 4)
         self.assertEqual(subset[2], 2)
 
+    def test_sub_dataset_indices(self):
+        original = [1, 2, 3, 4, 5]
+        subset = datasets.SubDataset(original, 1, 4)
+        self.assertEqual(subset[:], [2, 3, 4])
+        self.assertEqual(subset[[2, -3, 0]], [4, 2, 2])
+        self.assertEqual(subset[numpy.array([], dtype=numpy.int32)], [])
+        with self.assertRaises(IndexError):
+            subset[[0, 3]]
+        with self.assertRaises(IndexError):
+            subset[[-4]]
+
+    def test_permuted_sub_dataset_indices(self):
+        original = [1, 2, 3, 4, 5]
+        for order in ([2, 0, 3, 1, 4], numpy.array([2, 0, 3, 1, 4])):
+            subset = datasets.SubDataset(original, 1, 4, order)
+            self.assertEqual(subset[::-1], [2, 4, 1])
+            self.assertEqual(subset[numpy.array([-1, 0])], [2, 1])
+
     def test_permuted_sub_dataset_len_mismatch(self):
         original = [1, 2, 3, 4, 5]
         with self.assertRaises(ValueError):
             datasets.SubDataset(original, 1, 4, [2, 0, 3, 1])
 
+    def test_overridden_get_example(self):
+        class Dataset(datasets.SubDataset):
+            def get_example(self, i):
+                return super(Dataset, self).get_example(i) * 10
+
+        subset = Dataset([1, 2, 3, 4], 1, 4)
+        self.assertEqual(subset[0], 20)
+        self.assertEqual(subset[[2, 0]], [40, 20])
+        self.assertEqual(subset[::2], [20, 40])
+
 
 class TestSplitDataset(unittest.TestCase):
 
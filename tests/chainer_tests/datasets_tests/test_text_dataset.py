@@ -2,10 +2,14 @@
 
 from __future__ import unicode_literals
 
+import io
 import os
 import pickle
+import shutil
+import tempfile
 import unittest
 
+import numpy
 import six
 
 from chainer import datasets
@@ -124,6 +128,17 @@ class TestTextDataset(unittest.TestCase):
         assert ds[1] == 'テスト2\r\n'
         assert ds[2] == 'Test3\r\n'
 
+    def test_get_overridden_get_example(self):
+        class Dataset(datasets.TextDataset):
+            def get_example(self, idx):
+                return super(Dataset, self).get_example(idx).upper()
+
+        ds = Dataset(os.path.join(self.root, 'ascii_1.txt'))
+        assert ds[0] == 'HELLO\n'
+        assert ds[[2, 0]] == ['TEST\n', 'HELLO\n']
+        assert ds[1:] == ['WORLD\n', 'TEST\n']
+        ds.close()
+
     def test_filter(self):
         def _filter(line):
             return line != 'world\n'
@@ -140,6 +155,23 @@ class TestTextDataset(unittest.TestCase):
         assert ds[0] == ('hello\n', 'test file\n')
         assert ds[1] == ('test\n', 'world test\n')
 
+    def test_get_slice(self):
+        ds = self._dataset(['utf8_1.txt', 'utf8_2.txt'], encoding='utf-8')
+        assert ds[1:] == [('テスト2\n', 'テスト2\n'), ('Test3\n', 'テスト3\n')]
+        assert ds[[2, 0]] == [('Test3\n', 'テスト3\n'), ('テスト1\n', 'Test1\n')]
+        assert ds[numpy.array([], dtype=numpy.int32)] == []
+
+    def test_get_examples(self):
+        def _filter(line):
+            return line != 'world\n'
+        ds = self._dataset(['ascii_1.txt'], filter_func=_filter)
+        assert ds.get_examples([1, 0, 1]) == ['test\n', 'hello\n', 'test\n']
+        assert ds[::-1] == ['test\n', 'hello\n']
+        with self.assertRaises(IndexError):
+            ds.get_examples([0, 2])
+        with self.assertRaises(IndexError):
+            ds.get_examples(numpy.array([-1]))
+
     def test_pickle_unpickle(self):
         ds1 = self._dataset(['utf8_1.txt', 'utf8_2.txt'], encoding='utf-8')
         assert ds1[0] == ('テスト1\n', 'Test1\n')
@@ -148,4 +180,83 @@ class TestTextDataset(unittest.TestCase):
         assert ds2[1] == ('テスト2\n', 'テスト2\n')
 
 
+@testing.parameterize(*testing.product({
+    'newline': [None, '', '\n', '\r', '\r\n'],
+    'encoding': ['utf-8', 'utf-16'],
+}))
+class TestTextDatasetNewline(unittest.TestCase):
+
+    # Lines are compared with those read by a text file object.
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'text.txt')
+        with io.open(self.path, 'w', encoding=self.encoding, newline='') as f:
+            f.write('a\nテスト\r\nc\rd\r\r\n\ne\r')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_get(self):
+        with io.open(self.path, encoding=self.encoding,
+                     newline=self.newline) as f:
+            expected = f.readlines()
+        ds = datasets.TextDataset(
+            self.path, encoding=self.encoding, newline=self.newline)
+        assert len(ds) == len(expected)
+        assert [ds[i] for i in six.moves.range(len(ds))] == expected
+        assert ds[:] == expected
+        ds.close()
+
+
+class TestTextDatasetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        self.path = os.path.join(self.temp_dir, 'text.txt')
+        self._write('hello\nworld\n', 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, text, mtime):
+        with io.open(self.path, 'w', encoding='ascii') as f:
+            f.write(text)
+        os.utime(self.path, (mtime, mtime))
+
+    def _dataset(self):
+        return datasets.TextDataset(
+            self.path, encoding='ascii', cache_dir=self.cache_dir)
+
+    def test_cache(self):
+        ds = self._dataset()
+        assert ds[:] == ['hello\n', 'world\n']
+        ds.close()
+        index_files = os.listdir(self.cache_dir)
+        assert len(index_files) == 1
+        index_path = os.path.join(self.cache_dir, index_files[0])
+        mtime = os.stat(index_path).st_mtime_ns
+
+        # The index is reused.
+        ds = self._dataset()
+        assert ds[:] == ['hello\n', 'world\n']
+        ds.close()
+        assert os.stat(index_path).st_mtime_ns == mtime
+
+        # The index is rebuilt when the file is modified.
+        self._write('hello\nnew\nworld\n', 1)
+        ds = self._dataset()
+        assert ds[:] == ['hello\n', 'new\n', 'world\n']
+        ds.close()
+        assert os.listdir(self.cache_dir) == index_files
+
+    def test_pickle_unpickle(self):
+        ds1 = self._dataset()
+        ds2 = pickle.loads(pickle.dumps(ds1))
+        assert ds2[1] == 'world\n'
+        ds1.close()
+        ds2.close()
+
+
 testing.run_module(__name__, __file__)
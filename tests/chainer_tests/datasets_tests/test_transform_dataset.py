@@ -39,10 +39,33 @@ class TestTransformDataset(unittest.TestCase):
                 numpy.testing.assert_array_equal(
                     example, self.transform(self.dataset[i]))
 
+    def test_transform_dataset_indices(self):
+        td = datasets.TransformDataset(self.dataset, self.transform)
+        for index in (slice(None, None, -1), [1, 0, 1], numpy.array([1])):
+            examples = td[index]
+            expected = [td[i] for i in range(len(td))[index]] \
+                if isinstance(index, slice) else [td[i] for i in index]
+            self.assertEqual(len(examples), len(expected))
+            for example, e in zip(examples, expected):
+                numpy.testing.assert_equal(example, e)
+
     def test_transform_dataset_overrun(self):
         td = datasets.TransformDataset(self.dataset, self.transform)
         with self.assertRaises(IndexError):
             td[len(td) + 1]
 
 
+class TestTransformDatasetOverriddenGetExample(unittest.TestCase):
+
+    def test_indices(self):
+        class Dataset(datasets.TransformDataset):
+            def get_example(self, i):
+                return super(Dataset, self).get_example(i) * 10
+
+        td = Dataset([1, 2, 3], lambda in_data: in_data + 1)
+        self.assertEqual(td[1], 30)
+        self.assertEqual(td[[2, 0]], [40, 20])
+        self.assertEqual(td[::-1], [40, 30, 20])
+
+
 testing.run_module(__name__, __file__)
@@ -0,0 +1,202 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+import chainer
+from chainer import function_hooks
+from chainer import functions
+from chainer import links
+from chainer import testing
+
+
+class MLP(chainer.Chain):
+
+    def __init__(self):
+        super(MLP, self).__init__()
+        with self.init_scope():
+            self.l1 = links.Linear(5, 4)
+            self.l2 = links.Linear(4, 3)
+
+    def forward(self, x):
+        return self.l2(functions.relu(self.l1(x)))
+
+
+class TestTraceHook(unittest.TestCase):
+
+    def setUp(self):
+        self.model = MLP()
+        self.x = numpy.random.uniform(-1, 1, (2, 5)).astype(numpy.float32)
+
+    def step(self):
+        y = self.model(self.x)
+        functions.sum(y).backward()
+
+    def events(self, hook):
+        return hook.chrome_trace()['traceEvents']
+
+    def test_name(self):
+        assert function_hooks.TraceHook().name == 'TraceHook'
+
+    def test_trace(self):
+        hook = function_hooks.TraceHook()
+        with hook:
+            self.step()
+        events = self.events(hook)
+        assert hook.n_events == len(events)
+        assert hook.n_dropped == 0
+
+        names = [(e['cat'], e['name']) for e in events]
+        assert names.count(('forward', 'LinearFunction')) == 2
+        assert names.count(('backward', 'LinearFunction')) == 2
+        assert names.count(('link', 'Linear')) == 2
+        assert names.count(('link', 'MLP')) == 1
+        assert ('forward', 'ReLU') in names
+        assert ('backward', 'Sum') in names
+
+        for e in events:
+            assert e['ph'] == 'X'
+            assert e['dur'] >= 0
+            if e['cat'] == 'link':
+                assert e['args']['link'].startswith('/MLP')
+
+        forward = [e for e in events
+                   if e['cat'] == 'forward' and e['name'] == 'LinearFunction']
+        assert forward[0]['args'] == {
+            'inputs': 'float32[2, 5], float32[4, 5], float32[4]',
+            'link': '/MLP/l1'}
+        assert forward[1]['args']['link'] == '/MLP/l2'
+
+        # Backward computations are attributed to the links of the forward
+        # computations.
+        backward = [e for e in events
+                    if e['cat'] == 'backward' and e['name'] == 'ReLU']
+        assert backward[0]['args']['link'] == '/MLP'
+
+        # Spans of links contain those of the functions called in them.
+        link = [e for e in events if e['args'].get('link') == '/MLP/l1'
+                and e['cat'] == 'link'][0]
+        assert link['ts'] <= forward[0]['ts']
+        assert (forward[0]['ts'] + forward[0]['dur']
+                <= link['ts'] + link['dur'])
+
+    def test_error(self):
+        class Fail(chainer.FunctionNode):
+            def forward(self, inputs):
+                raise RuntimeError
+
+        hook = function_hooks.TraceHook()
+        with hook:
+            with self.assertRaises(RuntimeError):
+                Fail().apply((self.x,))
+            # The type check of the first linear function fails.
+            with self.assertRaises(Exception):
+                self.model(self.x[:, :4])
+        # Spans left by the exceptions are discarded on exit.
+        assert hook._stack == []
+        assert hook._link_paths == []
+
+        with hook:
+            self.step()
+        self.check_links(hook)
+
+    def test_error_in_link(self):
+        model = self.model
+
+        class Catch(chainer.Chain):
+            def forward(self, x):
+                try:
+                    model(x[:, :4])
+                except Exception:
+                    pass
+                return x
+
+        catch = Catch()
+        hook = function_hooks.TraceHook()
+        with hook:
+            catch(self.x)
+            # Spans left by the exception are discarded when the span of
+            # the link that catches it ends.
+            assert hook._stack == []
+            assert hook._link_paths == []
+            hook.clear()
+            self.step()
+        self.check_links(hook)
+
+    def check_links(self, hook):
+        events = self.events(hook)
+        links = set(e['args'].get('link') for e in events)
+        assert links == {'/MLP', '/MLP/l1', '/MLP/l2', None}
+        forward = [e for e in events
+                   if e['cat'] == 'forward' and e['name'] == 'LinearFunction']
+        assert [e['args']['link'] for e in forward] == ['/MLP/l1', '/MLP/l2']
+
+    def test_without_links(self):
+        hook = function_hooks.TraceHook(trace_links=False)
+        with hook:
+            self.step()
+        events = self.events(hook)
+        assert all(e['cat'] != 'link' for e in events)
+        assert all('link' not in e['args'] for e in events)
+
+    def test_add_hook(self):
+        hook = function_hooks.TraceHook()
+        f = functions.math.basic_math.Mul()
+        f.add_hook(hook)
+        f.apply((self.x, self.x))
+        events = self.events(hook)
+        assert [(e['cat'], e['name']) for e in events] == [('forward', 'Mul')]
+
+    def test_max_events(self):
+        hook = function_hooks.TraceHook(max_events=3)
+        with hook:
+            for _ in range(5):
+                functions.exp(self.x)
+                functions.tanh(self.x)
+        events = self.events(hook)
+        assert [e['name'] for e in events] == ['Tanh', 'Exp', 'Tanh']
+        assert hook.n_events == 10
+        assert hook.n_dropped == 7
+        assert events[0]['ts'] <= events[1]['ts'] <= events[2]['ts']
+
+        hook.clear()
+        assert hook.n_events == 0
+        assert self.events(hook) == []
+
+    def test_sampling(self):
+        hook = function_hooks.TraceHook(sampling_rate=0.5, seed=0)
+        with hook:
+            for _ in range(20):
+                self.model(self.x)
+        events = self.events(hook)
+        n_sampled = sum(e['name'] == 'MLP' for e in events)
+        assert 0 < n_sampled < 20
+        # Spans are sampled together with the spans in them.
+        assert len(events) == n_sampled * 6
+
+    def test_save_chrome_trace(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            hook = function_hooks.TraceHook()
+            with hook:
+                self.step()
+            path = os.path.join(temp_dir, 'trace.json')
+            hook.save_chrome_trace(path)
+            with open(path) as f:
+                assert json.load(f) == hook.chrome_trace()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            function_hooks.TraceHook(max_events=0)
+        with self.assertRaises(ValueError):
+            function_hooks.TraceHook(sampling_rate=0)
+        with self.assertRaises(ValueError):
+            function_hooks.TraceHook(sampling_rate=1.5)
+
+
+testing.run_module(__name__, __file__)
@@ -115,4 +115,93 @@ class TestEmbedIdGrad(unittest.TestCase):
             cuda.to_gpu(self.x), cuda.to_gpu(self.gy), cuda.to_gpu(self.ggW))
 
 
+@testing.parameterize(
+    {'x_data': [0, 1, 0], 'ignore_label': None},
+    {'x_data': [[0, 1, 0], [1, 0, 1]], 'ignore_label': None},
+    {'x_data': [[0, 1, -1], [-1, 0, 3]], 'ignore_label': -1},
+    {'x_data': [[0, 1, 0], [1, 0, 1]], 'ignore_label': 1},
+)
+class TestEmbedIDSparseGrad(unittest.TestCase):
+
+    w_shape = (4, 2)
+
+    def setUp(self):
+        self.x = numpy.array(self.x_data, dtype='i')
+        self.W = numpy.random.uniform(-1, 1, self.w_shape).astype('f')
+        self.gy = numpy.random.uniform(
+            -1, 1, self.x.shape + (2,)).astype('f')
+
+    def check_sparse_grad(self, x, W, gy):
+        W_dense = chainer.Variable(W.copy())
+        y = chainer.functions.embed_id(x, W_dense, self.ignore_label)
+        y.grad = gy
+        y.backward()
+
+        W_sparse = chainer.Parameter(W.copy())
+        W_sparse.cleargrad()
+        for _ in range(2):
+            y = chainer.functions.embed_id(
+                x, W_sparse, self.ignore_label, sparse_grad=True)
+            y.grad = gy
+            y.backward()
+        self.assertIsNone(W_sparse.grad)
+        testing.assert_allclose(
+            W_sparse.sparse_grad.to_dense(), W_dense.grad * 2)
+
+    def test_sparse_grad_cpu(self):
+        self.check_sparse_grad(self.x, self.W, self.gy)
+
+    @attr.gpu
+    def test_sparse_grad_gpu(self):
+        self.check_sparse_grad(
+            cuda.to_gpu(self.x), cuda.to_gpu(self.W), cuda.to_gpu(self.gy))
+
+    def test_not_parameter(self):
+        # The gradient w.r.t. a variable which is not a parameter is dense.
+        W = chainer.Variable(self.W)
+        y = chainer.functions.embed_id(
+            self.x, W, self.ignore_label, sparse_grad=True)
+        y.grad = self.gy
+        y.backward()
+        self.assertIsNotNone(W.grad)
+
+    def test_grad_other_inputs(self):
+        # chainer.grad must not accumulate gradients into W unless requested.
+        W = chainer.Parameter(self.W)
+        W.cleargrad()
+        h = chainer.Variable(numpy.ones(self.x.shape + (2,), 'f'))
+        y = chainer.functions.embed_id(
+            self.x, W, self.ignore_label, sparse_grad=True) * h
+        gh, = chainer.grad([y], [h], grad_outputs=[self.gy])
+        self.assertIsNotNone(gh)
+        self.assertIsNone(W.grad)
+        self.assertIsNone(W.sparse_grad)
+
+    def test_grad_w(self):
+        # chainer.grad returns the dense gradient w.r.t. W.
+        W_dense = chainer.Variable(self.W.copy())
+        y = chainer.functions.embed_id(self.x, W_dense, self.ignore_label)
+        y.grad = self.gy
+        y.backward()
+
+        W = chainer.Parameter(self.W)
+        W.cleargrad()
+        y = chainer.functions.embed_id(
+            self.x, W, self.ignore_label, sparse_grad=True)
+        gW, = chainer.grad([y], [W], grad_outputs=[self.gy])
+        testing.assert_allclose(gW.array, W_dense.grad)
+        self.assertIsNone(W.grad)
+        self.assertIsNone(W.sparse_grad)
+
+    def test_cleargrad(self):
+        W = chainer.Parameter(self.W)
+        y = chainer.functions.embed_id(
+            self.x, W, self.ignore_label, sparse_grad=True)
+        y.grad = self.gy
+        y.backward()
+        self.assertIsNotNone(W.sparse_grad)
+        W.cleargrad()
+        self.assertIsNone(W.sparse_grad)
+
+
 testing.run_module(__name__, __file__)
@@ -154,4 +154,151 @@ class TestCRF1d(unittest.TestCase):
             [cuda.to_gpu(y) for y in self.ys])
 
 
+@testing.parameterize(*testing.product({
+    'lengths': [[3, 3], [1, 4, 2], [2, 1, 3, 1], [1]],
+    'reduce': ['mean', 'no'],
+    'dtype': [numpy.float32, numpy.float64],
+}))
+class TestPaddedCRF1d(unittest.TestCase):
+    n_label = 3
+
+    def setUp(self):
+        n_batch = len(self.lengths)
+        length = max(self.lengths)
+        self.cost = numpy.random.uniform(
+            -1, 1, (self.n_label, self.n_label)).astype(self.dtype)
+        self.x = numpy.random.uniform(
+            -1, 1, (n_batch, length, self.n_label)).astype(self.dtype)
+        self.y = numpy.random.randint(
+            0, self.n_label, (n_batch, length)).astype(numpy.int32)
+        self.length_array = numpy.array(self.lengths, numpy.int32)
+        self.mask = numpy.arange(length) < self.length_array[:, None]
+        self.y[~self.mask] = -1
+        if self.reduce == 'mean':
+            self.g = numpy.random.uniform(-1, 1, ()).astype(self.dtype)
+        else:
+            self.g = numpy.random.uniform(-1, 1, n_batch).astype(self.dtype)
+        self.ggcost = numpy.random.uniform(
+            -1, 1, self.cost.shape).astype(self.dtype)
+        self.ggx = numpy.random.uniform(-1, 1, self.x.shape).astype(self.dtype)
+
+    def transposed(self, *arrays):
+        # Converts padded arrays into the input format of crf1d.
+        order = numpy.argsort(-self.length_array, kind='mergesort')
+        lengths = self.length_array[order]
+        results = []
+        for a in arrays:
+            results.append([a[order[:(lengths > t).sum()], t]
+                            for t in range(lengths[0])])
+        return order, results
+
+    def check_forward(self, cost, x, y, lengths):
+        actual = functions.padded_crf1d(
+            cost, x, y, lengths, reduce=self.reduce)
+        self.assertEqual(actual.dtype, self.dtype)
+
+        order, (xs, ys) = self.transposed(self.x, self.y)
+        expect = functions.crf1d(self.cost, xs, ys, reduce=self.reduce).array
+        if self.reduce == 'no':
+            expect = expect[numpy.argsort(order)]
+        testing.assert_allclose(actual.array, expect, atol=1e-5, rtol=1e-5)
+
+    def test_forward_cpu(self):
+        self.check_forward(self.cost, self.x, self.y, self.length_array)
+
+    @attr.gpu
+    def test_forward_gpu(self):
+        self.check_forward(
+            cuda.to_gpu(self.cost), cuda.to_gpu(self.x), cuda.to_gpu(self.y),
+            cuda.to_gpu(self.length_array))
+
+    def check_backward(self, cost, x, y, lengths, g):
+        def f(cost, x):
+            return functions.padded_crf1d(
+                cost, x, y, lengths, reduce=self.reduce)
+
+        gradient_check.check_backward(
+            f, (cost, x), g, dtype=numpy.float64, rtol=1e-4, atol=1e-4)
+
+    def test_backward_cpu(self):
+        self.check_backward(
+            self.cost, self.x, self.y, self.length_array, self.g)
+
+    @attr.gpu
+    def test_backward_gpu(self):
+        self.check_backward(
+            cuda.to_gpu(self.cost), cuda.to_gpu(self.x), cuda.to_gpu(self.y),
+            cuda.to_gpu(self.length_array), cuda.to_gpu(self.g))
+
+    def check_double_backward(self, cost, x, y, lengths, g, ggcost, ggx):
+        def f(cost, x):
+            return functions.padded_crf1d(
+                cost, x, y, lengths, reduce=self.reduce)
+
+        gradient_check.check_double_backward(
+            f, (cost, x), g, (ggcost, ggx), dtype=numpy.float64,
+            rtol=1e-3, atol=1e-3)
+
+    def test_double_backward_cpu(self):
+        self.check_double_backward(
+            self.cost, self.x, self.y, self.length_array, self.g,
+            self.ggcost, self.ggx)
+
+    @attr.gpu
+    def test_double_backward_gpu(self):
+        self.check_double_backward(
+            cuda.to_gpu(self.cost), cuda.to_gpu(self.x), cuda.to_gpu(self.y),
+            cuda.to_gpu(self.length_array), cuda.to_gpu(self.g),
+            cuda.to_gpu(self.ggcost), cuda.to_gpu(self.ggx))
+
+    def test_backward_ignores_padding(self):
+        x = chainer.Variable(self.x)
+        loss = functions.padded_crf1d(
+            self.cost, x, self.y, self.length_array, reduce=self.reduce)
+        loss.grad = self.g
+        loss.backward()
+        numpy.testing.assert_array_equal(x.grad[~self.mask], 0)
+
+    def check_argmax(self, cost, x, lengths):
+        s, path = functions.argmax_padded_crf1d(cost, x, lengths)
+        self.assertIsInstance(s, chainer.Variable)
+        self.assertEqual(s.shape, (len(self.lengths),))
+        self.assertEqual(path.shape, self.y.shape)
+        self.assertEqual(path.dtype, numpy.int32)
+        path = cuda.to_cpu(path)
+
+        order, (xs,) = self.transposed(self.x)
+        expect_s, expect_path = functions.argmax_crf1d(self.cost, xs)
+        inv = numpy.argsort(order)
+        testing.assert_allclose(
+            cuda.to_cpu(s.array), expect_s.array[inv], atol=1e-5, rtol=1e-5)
+        expect = numpy.full(self.y.shape, -1, numpy.int32)
+        for t, p in enumerate(expect_path):
+            expect[order[:len(p)], t] = p
+        numpy.testing.assert_array_equal(path, expect)
+
+    def test_argmax_cpu(self):
+        self.check_argmax(self.cost, self.x, self.length_array)
+
+    @attr.gpu
+    def test_argmax_gpu(self):
+        self.check_argmax(
+            cuda.to_gpu(self.cost), cuda.to_gpu(self.x),
+            cuda.to_gpu(self.length_array))
+
+    def test_argmax_backward(self):
+        cost = chainer.Variable(self.cost)
+        x = chainer.Variable(self.x)
+        s, path = functions.argmax_padded_crf1d(cost, x, self.length_array)
+        functions.sum(s).backward()
+        numpy.testing.assert_array_equal(x.grad[~self.mask], 0)
+        self.assertEqual(x.grad[self.mask].sum(), sum(self.lengths))
+
+    def test_invalid_option(self):
+        with self.assertRaises(ValueError):
+            functions.padded_crf1d(
+                self.cost, self.x, self.y, self.length_array,
+                'invalid_option')
+
+
 testing.run_module(__name__, __file__)
@@ -229,6 +229,47 @@ class TestCTCBlankSymbol(unittest.TestCase, CTCTestBase):
         self.blank_symbol = 3
 
 
+@testing.parameterize(*testing.product({
+    'dtype': [numpy.float16, numpy.float32, numpy.float64],
+}))
+class TestCTCVariableLength(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-2, 2, (30, 5, 4)).astype(self.dtype)
+        self.t = numpy.random.randint(0, 3, (5, 6)).astype(numpy.int32)
+        self.x_length = numpy.array([20, 30, 12, 30, 25], numpy.int32)
+        self.l_length = numpy.array([3, 6, 1, 4, 6], numpy.int32)
+        if self.dtype == numpy.float16:
+            self.check_options = {'atol': 1e-2, 'rtol': 1e-2}
+        else:
+            self.check_options = {}
+
+    def forward_backward(self, x, t, x_length, l_length):
+        x = [chainer.Variable(x_i) for x_i in x]
+        loss = functions.connectionist_temporal_classification(
+            x, t, 3, x_length, l_length, reduce='no')
+        chainer.functions.sum(loss).backward()
+        return loss.array, numpy.stack([x_i.grad for x_i in x])
+
+    def test_batch(self):
+        loss, gx = self.forward_backward(
+            self.x, self.t, self.x_length, self.l_length)
+        self.assertEqual(loss.dtype, self.dtype)
+        self.assertEqual(gx.dtype, self.dtype)
+        self.assertTrue(numpy.isfinite(gx).all())
+        for b in range(len(self.t)):
+            x_length = self.x_length[b]
+            expect_loss, expect_gx = self.forward_backward(
+                self.x[:x_length, b:b + 1], self.t[b:b + 1],
+                self.x_length[b:b + 1], self.l_length[b:b + 1])
+            testing.assert_allclose(
+                loss[b], expect_loss[0], **self.check_options)
+            testing.assert_allclose(
+                gx[:x_length, b], expect_gx[:, 0], **self.check_options)
+            testing.assert_allclose(
+                gx[x_length:, b], numpy.zeros_like(gx[x_length:, b]))
+
+
 class TestCTCUseNoBackpropMode(unittest.TestCase):
 
     def test_no_backprop_mode(self):
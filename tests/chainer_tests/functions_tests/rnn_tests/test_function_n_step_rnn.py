@@ -1,6 +1,12 @@
+import unittest
+
 import numpy
 
+import chainer
 import chainer.functions as F
+from chainer.functions.rnn import n_step_gru
+from chainer.functions.rnn import n_step_lstm
+from chainer.functions.rnn import n_step_rnn
 from chainer import testing
 from chainer.testing import backend
 
@@ -306,4 +312,123 @@ class TestNStepBiRNN(testing.FunctionTestCase):
         return tuple(rets)
 
 
+def _rnn_cell(activation):
+    def f(x, h, c, w, b):
+        h = F.linear(x, w[0], b[0]) + F.linear(h, w[1], b[1])
+        return activation(h), None
+    return f
+
+
+_cells = {
+    'rnn_tanh': (2, _rnn_cell(F.tanh)),
+    'rnn_relu': (2, _rnn_cell(F.relu)),
+    'gru': (6, n_step_gru._gru),
+    'lstm': (8, n_step_lstm._lstm),
+}
+
+
+@testing.parameterize(*testing.product({
+    'rnn_mode': ['rnn_tanh', 'rnn_relu', 'gru', 'lstm'],
+    'use_bi_direction': [False, True],
+    'batches': [(4, 4, 2, 1), (3,)],
+}))
+class TestNStepRNNCPU(unittest.TestCase):
+
+    n_layers = 2
+    in_size = 3
+    out_size = 4
+
+    def setUp(self):
+        n_weights, self.cell = _cells[self.rnn_mode]
+        directions = 2 if self.use_bi_direction else 1
+        n_states = self.n_layers * directions
+        self.xs = [array((batch, self.in_size), numpy.float64)
+                   for batch in self.batches]
+        h_shape = (n_states, self.batches[0], self.out_size)
+        self.hx = array(h_shape, numpy.float64)
+        self.cx = array(h_shape, numpy.float64) \
+            if self.rnn_mode == 'lstm' else None
+        self.ws = []
+        self.bs = []
+        for i in range(n_states):
+            in_size = self.in_size if i < directions \
+                else self.out_size * directions
+            self.ws.append([
+                array((self.out_size, in_size if j < n_weights // 2
+                       else self.out_size), numpy.float64)
+                for j in range(n_weights)])
+            self.bs.append([array((self.out_size,), numpy.float64)
+                            for _ in range(n_weights)])
+
+    def forward(self, fused):
+        xs = [chainer.Variable(x) for x in self.xs]
+        hx = chainer.Variable(self.hx)
+        cx = None if self.cx is None else chainer.Variable(self.cx)
+        ws = [[chainer.Variable(w) for w in ws] for ws in self.ws]
+        bs = [[chainer.Variable(b) for b in bs] for bs in self.bs]
+        if fused:
+            hy, cy, ys = n_step_rnn.n_step_rnn_cpu(
+                self.rnn_mode, self.n_layers, 0.0, hx, cx, ws, bs, xs,
+                self.use_bi_direction)
+        else:
+            hy, cy, ys = n_step_rnn.n_step_rnn_impl(
+                self.cell, self.n_layers, 0.0, hx, cx, ws, bs, xs,
+                self.use_bi_direction)
+        outputs = [hy] + list(ys)
+        if cy is not None:
+            outputs.append(cy)
+        loss = sum(F.sum(y * numpy.arange(y.size).reshape(y.shape))
+                   for y in outputs)
+
+        leaves = [hx] + xs + sum(ws, []) + sum(bs, [])
+        if cx is not None:
+            leaves.append(cx)
+        return outputs, loss, leaves
+
+    def forward_backward(self, fused):
+        outputs, loss, leaves = self.forward(fused)
+        loss.backward()
+        return ([y.array for y in outputs], [v.grad for v in leaves])
+
+    def double_backward(self, fused):
+        _, loss, leaves = self.forward(fused)
+        grads = chainer.grad([loss], leaves, enable_double_backprop=True)
+        loss = sum(F.sum(g * g) for g in grads)
+        loss.backward()
+        return [numpy.zeros_like(v.array) if v.grad is None else v.grad
+                for v in leaves]
+
+    def test_forward_backward(self):
+        outputs, grads = self.forward_backward(True)
+        expected_outputs, expected_grads = self.forward_backward(False)
+        for y, expected in zip(outputs, expected_outputs):
+            testing.assert_allclose(y, expected)
+        for g, expected in zip(grads, expected_grads):
+            testing.assert_allclose(g, expected)
+
+    def test_double_backward(self):
+        grads = self.double_backward(True)
+        expected_grads = self.double_backward(False)
+        for g, expected in zip(grads, expected_grads):
+            testing.assert_allclose(g, expected)
+
+    def test_graph(self):
+        hy, _, ys = n_step_rnn.n_step_rnn_cpu(
+            self.rnn_mode, self.n_layers, 0.0, self.hx, self.cx, self.ws,
+            self.bs, self.xs, self.use_bi_direction)
+        n_funcs = 0
+        funcs = [hy.creator_node]
+        seen = set()
+        while funcs:
+            func = funcs.pop()
+            if func is None or func in seen:
+                continue
+            seen.add(func)
+            if isinstance(func, n_step_rnn.OneDirectionalRNNCPU):
+                n_funcs += 1
+            funcs.extend(x.creator_node for x in func.inputs)
+        directions = 2 if self.use_bi_direction else 1
+        assert n_funcs == self.n_layers * directions
+
+
 testing.run_module(__name__, __file__)
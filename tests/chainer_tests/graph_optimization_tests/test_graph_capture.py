@@ -0,0 +1,199 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer.backends import cuda
+import chainer.functions as F
+from chainer.graph_optimizations import graph_capture
+import chainer.links as L
+from chainer import testing
+from chainer.testing import attr
+
+
+class Net(chainer.Chain):
+
+    def __init__(self, dtype):
+        super(Net, self).__init__()
+        initializer = chainer.initializers.Normal(1, dtype)
+        with self.init_scope():
+            self.l1 = L.Linear(
+                3, 4, initialW=initializer, initial_bias=initializer)
+            self.bn = L.BatchNormalization(4, dtype=dtype)
+            self.l2 = L.Linear(
+                4, 2, initialW=initializer, initial_bias=initializer)
+        self.n_calls = 0
+
+    def dynamic_call(self, x, t):
+        self.n_calls += 1
+        h = F.relu(self.bn(self.l1(x)))
+        h1, h2 = F.split_axis(h, 2, axis=1)
+        y = self.l2(h) + h1 * 2 + x[:, :2]
+        return F.mean_squared_error(y, t), y
+
+    @chainer.capture_graph
+    def static_call(self, x, t):
+        return self.dynamic_call(x, t)
+
+
+@testing.parameterize(*testing.product({
+    'dtype': [numpy.float32, numpy.float64],
+    'train': [True, False],
+}))
+class TestCaptureGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (5, 3)).astype(self.dtype)
+        self.t = numpy.random.uniform(-1, 1, (5, 2)).astype(self.dtype)
+        self.dynamic_net = Net(self.dtype)
+        self.static_net = self.dynamic_net.copy(mode='copy')
+
+    def check(self, x_data, t=None):
+        if t is None:
+            t = self.t
+        x1 = chainer.Variable(x_data)
+        x2 = chainer.Variable(x_data.copy())
+        self.dynamic_net.cleargrads()
+        self.static_net.cleargrads()
+        with chainer.using_config('train', self.train):
+            loss1, y1 = self.dynamic_net.dynamic_call(x1, t)
+            loss2, y2 = self.static_net.static_call(x2, t)
+        loss1.backward()
+        loss2.backward()
+
+        testing.assert_allclose(loss1.array, loss2.array)
+        testing.assert_allclose(y1.array, y2.array)
+        testing.assert_allclose(x1.grad, x2.grad)
+        for (_, p1), (_, p2) in zip(
+                sorted(self.dynamic_net.namedparams()),
+                sorted(self.static_net.namedparams())):
+            testing.assert_allclose(p1.grad, p2.grad)
+        testing.assert_allclose(
+            self.dynamic_net.bn.avg_mean, self.static_net.bn.avg_mean)
+        return loss2
+
+    def test_replay(self):
+        assert self.check(self.x).creator.label != 'GraphReplay'
+        for i in range(3):
+            loss = self.check(self.x * (i + 2))
+            assert loss.creator.label == 'GraphReplay'
+            del loss
+        assert self.static_net.n_calls == 1
+
+        graphs = self.static_net.captured_graphs
+        assert len(graphs) == 1
+        entry, = graphs.values()
+        assert len(entry['graphs']) == 1
+
+    def test_replay_while_in_use(self):
+        loss1 = self.check(self.x)
+        loss2 = self.check(self.x)
+        loss3 = self.check(self.x)
+        assert loss2.creator.label == 'GraphReplay'
+        assert loss3.creator.label != 'GraphReplay'
+        entry, = self.static_net.captured_graphs.values()
+        assert len(entry['graphs']) == 2
+        del loss1, loss2, loss3
+
+    def test_new_signature(self):
+        self.check(self.x)
+        self.check(self.x[:2], self.t[:2])
+        assert len(self.static_net.captured_graphs) == 2
+        assert self.static_net.n_calls == 2
+
+    def test_no_backprop_mode(self):
+        self.check(self.x)
+        with chainer.no_backprop_mode(), \
+                chainer.using_config('train', self.train):
+            loss, y = self.static_net.static_call(self.x, self.t)
+            loss_expect, y_expect = self.dynamic_net.dynamic_call(
+                self.x, self.t)
+        assert loss.creator is None
+        testing.assert_allclose(loss.array, loss_expect.array)
+        testing.assert_allclose(y.array, y_expect.array)
+
+    def test_disabled(self):
+        with chainer.using_config('use_static_graph', False):
+            self.check(self.x)
+            self.check(self.x)
+        assert not hasattr(self.static_net, 'captured_graphs')
+        assert self.static_net.n_calls == 2
+
+    @attr.gpu
+    def test_gpu_fallback(self):
+        self.dynamic_net.to_device(cuda.Device())
+        self.static_net.to_device(cuda.Device())
+        self.check(cuda.to_gpu(self.x))
+        assert not hasattr(self.static_net, 'captured_graphs')
+
+
+class TestCaptureGraphSteps(unittest.TestCase):
+
+    def test_steps(self):
+        net = Net(numpy.float32)
+        x = numpy.ones((5, 3), numpy.float32)
+        t = numpy.ones((5, 2), numpy.float32)
+        net.static_call(x, t)
+        entry, = net.captured_graphs.values()
+        graph, = entry['graphs']
+        assert isinstance(graph, graph_capture.CapturedGraph)
+        labels = [step.func.label for step in graph.steps]
+        assert labels[0] == 'LinearFunction'
+        assert 'MeanSquaredError' == labels[-1]
+        assert graph.n_slots > len(labels)
+
+
+class TestCaptureGraphDropout(unittest.TestCase):
+
+    def test_mask_per_replay(self):
+        class Net(chainer.Chain):
+
+            @chainer.capture_graph
+            def forward(self, x):
+                return F.dropout(x * 1, 0.5)
+
+        net = Net()
+        ys = []
+        for _ in range(4):
+            x = chainer.Variable(numpy.ones((100,), numpy.float32))
+            y = net(x)
+            y.grad = numpy.ones((100,), numpy.float32)
+            y.backward()
+            # The gradient must be computed with the mask of this call.
+            testing.assert_allclose(x.grad, y.array)
+            ys.append(y.array)
+            del y
+        entry, = net.captured_graphs.values()
+        assert len(entry['graphs']) == 1
+        for y in ys[1:]:
+            assert not numpy.array_equal(ys[0], y)
+
+
+class TestCaptureGraphMaxGraphs(unittest.TestCase):
+
+    def test_max_graphs(self):
+        class Net(chainer.Chain):
+
+            @chainer.capture_graph(max_graphs=1)
+            def forward(self, x):
+                return x * 2
+
+        net = Net()
+        x = chainer.Variable(numpy.ones((2,), numpy.float32))
+        y1 = net(x)
+        y2 = net(x)
+        y3 = net(x)
+        assert y2.creator.label == 'GraphReplay'
+        assert y3.creator.label != 'GraphReplay'
+        y3.grad = numpy.ones((2,), numpy.float32)
+        y2.grad = numpy.ones((2,), numpy.float32)
+        y2.backward()
+        testing.assert_allclose(x.grad, numpy.full((2,), 2, numpy.float32))
+        del y1
+
+    def test_invalid_keyword(self):
+        with self.assertRaises(TypeError):
+            chainer.capture_graph(foo=1)
+
+
+testing.run_module(__name__, __file__)
@@ -0,0 +1,189 @@
+from __future__ import division
+import unittest
+
+import numpy
+
+from chainer import iterators
+from chainer import serializers
+from chainer import testing
+
+
+def _make_dataset(n, seed=0):
+    random = numpy.random.RandomState(seed)
+    return [numpy.arange(length) for length in random.randint(1, 20, n)]
+
+
+class TestBucketIterator(unittest.TestCase):
+
+    def test_iterator_not_shuffled(self):
+        dataset = [[0] * 3, [0] * 1, [0] * 2, [0] * 1, [0] * 3]
+        it = iterators.BucketIterator(dataset, 2, shuffle=False)
+        for i in range(2):
+            self.assertEqual(it.epoch, i)
+            self.assertAlmostEqual(it.epoch_detail, i + 0 / 5)
+            self.assertEqual(it.next(), [dataset[1], dataset[3]])
+            self.assertFalse(it.is_new_epoch)
+            self.assertAlmostEqual(it.epoch_detail, i + 2 / 5)
+            self.assertAlmostEqual(it.previous_epoch_detail, i + 0 / 5)
+            self.assertEqual(it.next(), [dataset[2], dataset[0]])
+            self.assertFalse(it.is_new_epoch)
+            self.assertAlmostEqual(it.epoch_detail, i + 4 / 5)
+            self.assertEqual(it.next(), [dataset[4]])
+            self.assertTrue(it.is_new_epoch)
+            self.assertAlmostEqual(it.epoch_detail, i + 5 / 5)
+            self.assertAlmostEqual(it.previous_epoch_detail, i + 4 / 5)
+
+    def test_iterator_not_repeat(self):
+        dataset = _make_dataset(20)
+        it = iterators.BucketIterator(dataset, 3, repeat=False)
+        self.assertIsNone(it.previous_epoch_detail)
+        batches = list(it)
+        self.assertEqual(it.epoch, 1)
+        self.assertTrue(it.is_new_epoch)
+        self.assertAlmostEqual(it.epoch_detail, 1)
+        self.assertEqual(
+            sorted(id(x) for batch in batches for x in batch),
+            sorted(id(x) for x in dataset))
+        with self.assertRaises(StopIteration):
+            it.next()
+
+    def test_lengths(self):
+        dataset = ['a', 'b', 'c', 'd']
+        it = iterators.BucketIterator(
+            dataset, 2, lengths=[2, 1, 2, 1], shuffle=False)
+        self.assertEqual(it.next(), ['b', 'd'])
+        self.assertEqual(it.next(), ['a', 'c'])
+
+    def test_lengths_callable(self):
+        dataset = [(0, [0] * 2), (1, [0] * 1), (2, [0] * 2), (3, [0] * 1)]
+        it = iterators.BucketIterator(
+            dataset, 2, lengths=lambda x: len(x[1]), shuffle=False)
+        self.assertEqual([x[0] for x in it.next()], [1, 3])
+
+    def test_default_lengths_tuple(self):
+        dataset = [([0] * 3, [0]), ([0], [0] * 2), ([0], [0])]
+        it = iterators.BucketIterator(dataset, 1, shuffle=False)
+        self.assertEqual(
+            [it.next()[0] for _ in range(3)],
+            [dataset[2], dataset[1], dataset[0]])
+
+    def test_default_lengths_scalar_labels(self):
+        dataset = [(numpy.arange(3), 0), (numpy.arange(2), numpy.int32(1)),
+                   (numpy.arange(1), numpy.array(2))]
+        it = iterators.BucketIterator(dataset, 1, shuffle=False)
+        self.assertEqual([int(it.next()[0][1]) for _ in range(3)], [2, 1, 0])
+
+    def test_default_lengths_no_sequence(self):
+        with self.assertRaises(TypeError):
+            iterators.BucketIterator([(0, 1)], 1)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            iterators.BucketIterator([[0]])
+        with self.assertRaises(ValueError):
+            iterators.BucketIterator([[0]], 1, bucket_width=0)
+        with self.assertRaises(ValueError):
+            iterators.BucketIterator([[0]], 1, lengths=[1, 2])
+
+    def test_empty(self):
+        it = iterators.BucketIterator([], 2)
+        with self.assertRaises(ValueError):
+            it.next()
+
+
+@testing.parameterize(*testing.product({
+    'batch_size': [None, 4],
+    'max_tokens': [None, 30],
+    'bucket_width': [1, 5],
+    'shuffle': [True, False],
+}))
+class TestBucketIteratorBatches(unittest.TestCase):
+
+    def setUp(self):
+        if self.batch_size is None and self.max_tokens is None:
+            self.batch_size = 3
+        self.dataset = _make_dataset(50)
+
+    def make_iterator(self, seed=0):
+        return iterators.BucketIterator(
+            self.dataset, self.batch_size, max_tokens=self.max_tokens,
+            bucket_width=self.bucket_width, shuffle=self.shuffle,
+            random_state=numpy.random.RandomState(seed))
+
+    def test_batches(self):
+        it = self.make_iterator()
+        for epoch in range(3):
+            lengths = []
+            while True:
+                batch = it.next()
+                self.assertGreater(len(batch), 0)
+                lengths.extend(len(x) for x in batch)
+                if self.batch_size is not None:
+                    self.assertLessEqual(len(batch), self.batch_size)
+                if self.max_tokens is not None and len(batch) > 1:
+                    self.assertLessEqual(
+                        max(len(x) for x in batch) * len(batch),
+                        self.max_tokens)
+                buckets = [len(x) // self.bucket_width for x in batch]
+                self.assertEqual(buckets, sorted(buckets))
+                if it.is_new_epoch:
+                    break
+            self.assertEqual(it.epoch, epoch + 1)
+            if not self.shuffle:
+                buckets = [length // self.bucket_width for length in lengths]
+                self.assertEqual(buckets, sorted(buckets))
+            self.assertEqual(
+                sorted(lengths), sorted(len(x) for x in self.dataset))
+
+    def test_serialize(self):
+        it = self.make_iterator()
+        for _ in range(5):
+            it.next()
+        epoch_detail = it.epoch_detail
+        previous_epoch_detail = it.previous_epoch_detail
+
+        target = {}
+        it.serialize(serializers.DictionarySerializer(target))
+        expected = [it.next() for _ in range(30)]
+
+        it = self.make_iterator(seed=1)
+        it.serialize(serializers.NpzDeserializer(target))
+        self.assertAlmostEqual(it.epoch_detail, epoch_detail)
+        self.assertAlmostEqual(it.previous_epoch_detail, previous_epoch_detail)
+        # The batches until the end of the epoch do not depend on the seed.
+        for batch, expected_batch in zip(it, expected):
+            self.assertEqual(
+                [id(x) for x in batch], [id(x) for x in expected_batch])
+            if it.is_new_epoch:
+                break
+
+    def test_reset(self):
+        it = self.make_iterator()
+        for _ in range(5):
+            it.next()
+        it.reset()
+        self.assertEqual(it.epoch, 0)
+        self.assertAlmostEqual(it.epoch_detail, 0)
+        self.assertIsNone(it.previous_epoch_detail)
+
+
+class TestBucketIteratorPadding(unittest.TestCase):
+
+    def test_padding(self):
+        dataset = _make_dataset(1000)
+
+        def padding(it):
+            n_padding = 0
+            while True:
+                batch = it.next()
+                max_length = max(len(x) for x in batch)
+                n_padding += sum(max_length - len(x) for x in batch)
+                if it.is_new_epoch:
+                    return n_padding
+
+        serial = padding(iterators.SerialIterator(dataset, 16))
+        bucket = padding(iterators.BucketIterator(dataset, 16))
+        self.assertLess(bucket * 10, serial)
+
+
+testing.run_module(__name__, __file__)
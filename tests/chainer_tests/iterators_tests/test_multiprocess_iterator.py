@@ -11,11 +11,19 @@ import tempfile
 import threading
 import time
 import unittest
+import warnings
 
+import mock
 import numpy
 import six
 
+from chainer import dataset
+from chainer.dataset import _batch
+from chainer.dataset import tabular
+from chainer import datasets
 from chainer import iterators
+from chainer.iterators import _shared_memory
+from chainer.iterators import multiprocess_iterator
 from chainer import serializers
 from chainer import testing
 from chainer.testing import attr
@@ -339,6 +347,118 @@ class TestMultiprocessIteratorSlow(
     pass
 
 
+@testing.parameterize(*testing.product({
+    'n_prefetch': [1, 2],
+    'shared_mem': [None, 1000000],
+    'zero_copy': [False, True],
+}))
+class TestMultiprocessIteratorSharedMemory(unittest.TestCase):
+
+    def setUp(self):
+        self.options = {'n_processes': 2,
+                        'n_prefetch': self.n_prefetch,
+                        'shared_mem': self.shared_mem,
+                        'zero_copy': self.zero_copy}
+
+    def make_example(self, i):
+        n = i % 4 + 1
+        return (numpy.full((n, 2), i, numpy.float32),
+                {'a': numpy.arange(n * 3, dtype=numpy.int32),
+                 'b': [numpy.float64(i), i, numpy.empty((0,))]})
+
+    def check_example(self, actual, i):
+        expect = self.make_example(i)
+        self.assertIsInstance(actual, tuple)
+        numpy.testing.assert_array_equal(actual[0], expect[0])
+        self.assertEqual(actual[0].dtype, numpy.float32)
+        self.assertIsInstance(actual[1], dict)
+        numpy.testing.assert_array_equal(actual[1]['a'], expect[1]['a'])
+        self.assertIsInstance(actual[1]['b'], list)
+        self.assertEqual(actual[1]['b'][:2], expect[1]['b'][:2])
+        self.assertEqual(actual[1]['b'][2].shape, (0,))
+
+    def test_nested_variable_length(self):
+        dataset = [self.make_example(i) for i in range(10)]
+        it = iterators.MultiprocessIterator(
+            dataset, 3, repeat=False, shuffle=False, **self.options)
+        indices = []
+        for batch in it:
+            for example in batch:
+                i = int(example[1]['b'][1])
+                self.check_example(example, i)
+                indices.append(i)
+        self.assertEqual(indices, list(range(10)))
+        it.finalize()
+
+    def test_zero_copy(self):
+        dataset = [self.make_example(i) for i in range(10)]
+        it = iterators.MultiprocessIterator(
+            dataset, 2, shuffle=False, **self.options)
+        it.next()
+        batch = it.next()
+        owndata = [example[0].flags.owndata for example in batch]
+        if self.zero_copy:
+            self.assertFalse(any(owndata))
+        else:
+            self.assertTrue(all(owndata))
+        for i, example in enumerate(batch):
+            self.check_example(example, i + 2)
+        it.finalize()
+
+    def test_ring_size(self):
+        dataset = [self.make_example(i) for i in range(10)]
+        it = iterators.MultiprocessIterator(
+            dataset, 2, shuffle=False, **self.options)
+        it.next()
+        ring = it._prefetch_loop.ring
+        if self.zero_copy:
+            self.assertEqual(ring.n_slots, self.n_prefetch + 2)
+        else:
+            self.assertEqual(ring.n_slots, 1)
+        if self.shared_mem is None:
+            mem_size = max(
+                _shared_memory.measure(example) for example in dataset[:2])
+            if self.zero_copy:
+                mem_size *= 2
+            self.assertEqual(it._prefetch_loop.mem_size, mem_size)
+        it.finalize()
+
+    def test_reset_releases_memory(self):
+        dataset = [self.make_example(i) for i in range(10)]
+        it = iterators.MultiprocessIterator(
+            dataset, 2, shuffle=False, **self.options)
+        for _ in range(self.n_prefetch + 3):
+            batch = it.next()
+            time.sleep(0.05)
+            it.reset()
+        for i in range(5):
+            batch = it.next()
+            for j, example in enumerate(batch):
+                self.check_example(example, i * 2 + j)
+        it.finalize()
+
+
+class TestMultiprocessIteratorTooSmallSharedMemory(unittest.TestCase):
+
+    def test_warning(self):
+        ring = _shared_memory.SharedRingBuffer(1, 32)
+        slot = ring.acquire()
+        data = numpy.arange(48, dtype=numpy.int8)
+        with mock.patch.multiple(
+                multiprocess_iterator, _fetch_ring=ring, _fetch_mem_size=16):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                packed = multiprocess_iterator._pack(data, slot, 1)
+        numpy.testing.assert_array_equal(ring.unpack(packed), data)
+        self.assertEqual(len(w), 1)
+        message = str(w[0].message)
+        self.assertIn(
+            'Expect shared memory size: 48 bytes per example.', message)
+        self.assertIn(
+            'Actual shared memory size: 16 bytes per example '
+            '(32 bytes per batch).', message)
+
+
 # Pickle does not allow to use lambdas or pure functions
 # when serializing the iterator
 # work is needed to wrap samplers in classes instead of
@@ -553,6 +673,48 @@ class TestMultiprocessIteratorOrderSamplerEpochSize(unittest.TestCase):
                 sorted(batch1 + batch2 + batch3), [1, 1, 2, 2, 3, 3])
 
 
+@testing.parameterize(*testing.product({
+    'dataset_type': ['tuple', 'dict', 'tabular'],
+    'shared_mem': [None, 1000000],
+}))
+class TestMultiprocessIteratorBatchFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(size=(10, 3)).astype(numpy.float32)
+        self.t = numpy.arange(10, dtype=numpy.int32)
+        if self.dataset_type == 'tuple':
+            self.dataset = datasets.TupleDataset(self.x, self.t)
+        elif self.dataset_type == 'dict':
+            self.dataset = datasets.DictDataset(x=self.x, t=self.t)
+        else:
+            self.dataset = tabular.from_data((self.x, self.t))
+
+    def test_iterator(self):
+        it = iterators.MultiprocessIterator(
+            self.dataset, 4, repeat=False, shuffle=True,
+            n_processes=2, shared_mem=self.shared_mem)
+        ts = []
+        for batch in it:
+            self.assertIsInstance(batch, _batch.StackedBatch)
+            for example in batch:
+                if isinstance(example, dict):
+                    x, t = example['x'], example['t']
+                else:
+                    x, t = example
+                numpy.testing.assert_array_equal(x, self.x[t])
+                ts.append(int(t))
+
+            arrays = dataset.concat_examples(batch)
+            if isinstance(arrays, dict):
+                x, t = arrays['x'], arrays['t']
+            else:
+                x, t = arrays
+            numpy.testing.assert_array_equal(x, self.x[t])
+            self.assertEqual(t.dtype, numpy.int32)
+        self.assertEqual(sorted(ts), list(range(10)))
+        it.finalize()
+
+
 class _NoSameIndicesOrderSampler(object):
 
     def __init__(self, batchsize):
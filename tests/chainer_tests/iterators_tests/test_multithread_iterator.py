@@ -1,10 +1,16 @@
 from __future__ import division
 import copy
+import threading
+import time
 import unittest
 
 import numpy
 import six
 
+from chainer import dataset
+from chainer.dataset import _batch
+from chainer.dataset import tabular
+from chainer import datasets
 from chainer import iterators
 from chainer import serializers
 from chainer import testing
@@ -340,6 +346,67 @@ class TestMultithreadIteratorOrderSamplerEpochSize(unittest.TestCase):
                 sorted(batch1 + batch2 + batch3), [1, 1, 2, 2, 3, 3])
 
 
+@testing.parameterize(*testing.product({
+    'dataset_type': ['tuple', 'dict', 'tabular'],
+}))
+class TestMultithreadIteratorBatchFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(size=(10, 3)).astype(numpy.float32)
+        self.t = numpy.arange(10, dtype=numpy.int32)
+        if self.dataset_type == 'tuple':
+            self.dataset = datasets.TupleDataset(self.x, self.t)
+        elif self.dataset_type == 'dict':
+            self.dataset = datasets.DictDataset(x=self.x, t=self.t)
+        else:
+            self.dataset = tabular.from_data((self.x, self.t))
+
+    def test_iterator(self):
+        it = iterators.MultithreadIterator(
+            self.dataset, 4, repeat=False, shuffle=True, n_threads=2)
+        ts = []
+        for batch in it:
+            self.assertIsInstance(batch, _batch.StackedBatch)
+            for example in batch:
+                if isinstance(example, dict):
+                    x, t = example['x'], example['t']
+                else:
+                    x, t = example
+                numpy.testing.assert_array_equal(x, self.x[t])
+                ts.append(int(t))
+
+            arrays = dataset.concat_examples(batch)
+            if isinstance(arrays, dict):
+                x, t = arrays['x'], arrays['t']
+            else:
+                x, t = arrays
+            numpy.testing.assert_array_equal(x, self.x[t])
+            self.assertEqual(t.dtype, numpy.int32)
+        self.assertEqual(sorted(ts), list(range(10)))
+        it.finalize()
+
+
+class TestMultithreadIteratorBatchFetchThreads(unittest.TestCase):
+
+    def test_threads(self):
+        threads = set()
+
+        def transform(x):
+            threads.add(threading.current_thread())
+            time.sleep(0.01)
+            return x * 2,
+
+        x = numpy.arange(8, dtype=numpy.float32)
+        dataset = tabular.from_data(x).transform(('x',), transform)
+        it = iterators.MultithreadIterator(
+            dataset, 8, shuffle=False, n_threads=4)
+        batch = it.next()
+        it.finalize()
+        self.assertIsInstance(batch, _batch.StackedBatch)
+        numpy.testing.assert_array_equal(batch.columns[0], x * 2)
+        self.assertGreater(len(threads), 1)
+
+
 class NoSameIndicesOrderSampler(object):
 
     def __init__(self, batchsize):
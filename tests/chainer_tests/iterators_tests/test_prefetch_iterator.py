@@ -0,0 +1,237 @@
+from __future__ import division
+import unittest
+
+import numpy
+
+import chainer
+from chainer import dataset
+from chainer import iterators
+from chainer import serializers
+from chainer import testing
+from chainer import training
+
+
+def _make_dataset(n):
+    return [(numpy.full(3, i, dtype=numpy.float32), numpy.int32(i))
+            for i in range(n)]
+
+
+class _ListIterator(chainer.dataset.Iterator):
+
+    # Iterator that keeps its state only in plain attributes.
+
+    def __init__(self, dataset, batch_size):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.reset()
+
+    def __next__(self):
+        i = self.current_position
+        self.previous_epoch_detail = self.epoch_detail
+        self.current_position += self.batch_size
+        if self.current_position >= len(self.dataset):
+            self.current_position -= len(self.dataset)
+            self.epoch += 1
+            self.is_new_epoch = True
+        else:
+            self.is_new_epoch = False
+        return [self.dataset[j % len(self.dataset)]
+                for j in range(i, i + self.batch_size)]
+
+    next = __next__
+
+    @property
+    def epoch_detail(self):
+        return self.epoch + self.current_position / len(self.dataset)
+
+    def serialize(self, serializer):
+        self.current_position = serializer(
+            'current_position', self.current_position)
+        self.epoch = serializer('epoch', self.epoch)
+        self.is_new_epoch = serializer('is_new_epoch', self.is_new_epoch)
+
+    def reset(self):
+        self.current_position = 0
+        self.epoch = 0
+        self.is_new_epoch = False
+        self.previous_epoch_detail = None
+
+
+@testing.parameterize(*testing.product({
+    'iterator_type': ['serial', 'multithread', 'multiprocess', 'list'],
+}))
+class TestPrefetchIterator(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = _make_dataset(10)
+
+    def make_iterator(self):
+        if self.iterator_type == 'serial':
+            return iterators.SerialIterator(self.dataset, 4, shuffle=False)
+        elif self.iterator_type == 'multithread':
+            return iterators.MultithreadIterator(
+                self.dataset, 4, shuffle=False)
+        elif self.iterator_type == 'multiprocess':
+            return iterators.MultiprocessIterator(
+                self.dataset, 4, n_processes=2,
+                order_sampler=lambda order, _: order)
+        else:
+            return _ListIterator(self.dataset, 4)
+
+    def check_batch(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for a, e in zip(actual, expected):
+            numpy.testing.assert_array_equal(a, e)
+
+    def test_next(self):
+        expected_it = self.make_iterator()
+        it = iterators.PrefetchIterator(self.make_iterator())
+        self.assertEqual(it.batch_size, 4)
+        self.assertEqual(it.epoch, 0)
+        self.assertIsNone(it.previous_epoch_detail)
+
+        for _ in range(7):
+            expected = dataset.concat_examples(expected_it.next())
+            self.check_batch(it.next(), expected)
+            self.assertEqual(it.epoch, expected_it.epoch)
+            self.assertAlmostEqual(it.epoch_detail, expected_it.epoch_detail)
+            self.assertAlmostEqual(
+                it.previous_epoch_detail, expected_it.previous_epoch_detail)
+            self.assertEqual(it.is_new_epoch, expected_it.is_new_epoch)
+
+        it.finalize()
+        expected_it.finalize()
+
+    def test_serialize(self):
+        it = iterators.PrefetchIterator(self.make_iterator())
+        for _ in range(3):
+            it.next()
+        epoch_detail = it.epoch_detail
+
+        target = {}
+        it.serialize(serializers.DictionarySerializer(target))
+        self.assertAlmostEqual(it.epoch_detail, epoch_detail)
+        expected = [it.next() for _ in range(4)]
+
+        # The state is compatible with the wrapped iterator.
+        plain_it = self.make_iterator()
+        plain_it.serialize(serializers.NpzDeserializer(target))
+        self.assertAlmostEqual(plain_it.epoch_detail, epoch_detail)
+        for batch in expected:
+            self.check_batch(
+                batch, dataset.concat_examples(plain_it.next()))
+
+        new_it = iterators.PrefetchIterator(self.make_iterator())
+        new_it.next()
+        new_it.serialize(serializers.NpzDeserializer(target))
+        self.assertAlmostEqual(new_it.epoch_detail, epoch_detail)
+        for batch in expected:
+            self.check_batch(new_it.next(), batch)
+
+        for iterator in (it, plain_it, new_it):
+            iterator.finalize()
+
+    def test_reset(self):
+        it = iterators.PrefetchIterator(self.make_iterator())
+        first = it.next()
+        it.next()
+        it.reset()
+        self.assertEqual(it.epoch, 0)
+        self.check_batch(it.next(), first)
+        it.finalize()
+
+
+class TestPrefetchIteratorNotRepeat(unittest.TestCase):
+
+    def test_stop_iteration(self):
+        base = iterators.SerialIterator(
+            _make_dataset(5), 2, repeat=False, shuffle=False)
+        it = iterators.PrefetchIterator(base)
+        batches = list(it)
+        self.assertEqual([len(x) for x, _ in batches], [2, 2, 1])
+        self.assertEqual(it.epoch, 1)
+        self.assertTrue(it.is_new_epoch)
+        with self.assertRaises(StopIteration):
+            it.next()
+        it.finalize()
+
+    def test_converter_error(self):
+        def converter(batch, device):
+            raise ValueError
+
+        it = iterators.PrefetchIterator(
+            iterators.SerialIterator(_make_dataset(5), 2), converter)
+        with self.assertRaises(ValueError):
+            it.next()
+        it.finalize()
+
+    def test_config(self):
+        values = []
+
+        def converter(batch, device):
+            values.append(chainer.config.train)
+            return dataset.concat_examples(batch, device)
+
+        it = iterators.PrefetchIterator(
+            iterators.SerialIterator(_make_dataset(5), 2), converter)
+        with chainer.using_config('train', False):
+            it.next()
+        it.serialize(serializers.DictionarySerializer({}))
+        it.next()
+        it.finalize()
+        self.assertEqual(values[0], False)
+        self.assertEqual(values[-1], True)
+
+
+class TestPrefetchIteratorUpdater(unittest.TestCase):
+
+    def test_update(self):
+        model = chainer.links.Classifier(chainer.links.Linear(3, 10))
+        optimizer = chainer.optimizers.SGD()
+        optimizer.setup(model)
+
+        def converter(batch, device):
+            raise AssertionError('the batch must not be converted again')
+
+        it = iterators.PrefetchIterator(
+            iterators.SerialIterator(_make_dataset(10), 4))
+        updater = training.updaters.StandardUpdater(
+            it, optimizer, converter=converter)
+        for _ in range(5):
+            updater.update()
+        self.assertEqual(updater.iteration, 5)
+        self.assertEqual(updater.epoch, 2)
+        self.assertTrue(updater.is_new_epoch)
+        updater.finalize()
+
+    def test_evaluator(self):
+        model = chainer.links.Classifier(chainer.links.Linear(3, 10))
+
+        def converter(batch, device):
+            raise AssertionError('the batch must not be converted again')
+
+        it = iterators.PrefetchIterator(
+            iterators.SerialIterator(_make_dataset(10), 4, repeat=False,
+                                     shuffle=False))
+        evaluator = training.extensions.Evaluator(
+            it, model, converter=converter)
+        reporter = chainer.Reporter()
+        reporter.add_observer('main', model)
+        with reporter:
+            result = evaluator.evaluate()
+        self.assertIn('main/loss', result)
+        it.finalize()
+
+    def test_parallel_updater(self):
+        model = chainer.links.Classifier(chainer.links.Linear(3, 10))
+        optimizer = chainer.optimizers.SGD()
+        optimizer.setup(model)
+
+        it = iterators.PrefetchIterator(
+            iterators.SerialIterator(_make_dataset(10), 4))
+        with self.assertRaises(ValueError):
+            training.updaters.ParallelUpdater(
+                it, optimizer, devices={'main': '@numpy'})
+
+
+testing.run_module(__name__, __file__)
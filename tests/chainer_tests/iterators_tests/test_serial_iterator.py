@@ -3,6 +3,10 @@ import unittest
 
 import numpy
 
+from chainer import dataset
+from chainer.dataset import _batch
+from chainer.dataset import tabular
+from chainer import datasets
 from chainer import iterators
 from chainer import serializers
 from chainer import testing
@@ -336,6 +340,45 @@ class TestSerialIteratorOrderSamplerEpochSize(unittest.TestCase):
                 sorted(batch1 + batch2 + batch3), [1, 1, 2, 2, 3, 3])
 
 
+@testing.parameterize(*testing.product({
+    'dataset_type': ['tuple', 'dict', 'tabular'],
+}))
+class TestSerialIteratorBatchFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(size=(10, 3)).astype(numpy.float32)
+        self.t = numpy.arange(10, dtype=numpy.int32)
+        if self.dataset_type == 'tuple':
+            self.dataset = datasets.TupleDataset(self.x, self.t)
+        elif self.dataset_type == 'dict':
+            self.dataset = datasets.DictDataset(x=self.x, t=self.t)
+        else:
+            self.dataset = tabular.from_data((self.x, self.t))
+
+    def test_iterator(self):
+        it = iterators.SerialIterator(
+            self.dataset, 4, repeat=False, shuffle=True)
+        ts = []
+        for batch in it:
+            self.assertIsInstance(batch, _batch.StackedBatch)
+            for example in batch:
+                if isinstance(example, dict):
+                    x, t = example['x'], example['t']
+                else:
+                    x, t = example
+                numpy.testing.assert_array_equal(x, self.x[t])
+                ts.append(int(t))
+
+            arrays = dataset.concat_examples(batch)
+            if isinstance(arrays, dict):
+                x, t = arrays['x'], arrays['t']
+            else:
+                x, t = arrays
+            numpy.testing.assert_array_equal(x, self.x[t])
+            self.assertEqual(t.dtype, numpy.int32)
+        self.assertEqual(sorted(ts), list(range(10)))
+
+
 class NoSameIndicesOrderSampler(object):
 
     def __init__(self, batchsize):
@@ -363,6 +406,28 @@ class TestNoSameIndicesOrderSampler(unittest.TestCase):
             self.assertEqual(len(numpy.unique(batch)), batchsize)
 
 
+class IntIndexedDataset(dataset.DatasetMixin):
+
+    # Dataset that overrides __getitem__ for integer indices only.
+
+    def __len__(self):
+        return 6
+
+    def __getitem__(self, i):
+        return numpy.float32(i) * numpy.ones(2, numpy.float32)
+
+
+class TestSerialIteratorOverriddenGetitem(unittest.TestCase):
+
+    def test_overridden_getitem(self):
+        it = iterators.SerialIterator(IntIndexedDataset(), 4, shuffle=False)
+        batch = it.next()
+        self.assertEqual(len(batch), 4)
+        for i, example in enumerate(batch):
+            numpy.testing.assert_array_equal(
+                example, numpy.full(2, i, numpy.float32))
+
+
 class InvalidOrderSampler(object):
 
     def __init__(self):
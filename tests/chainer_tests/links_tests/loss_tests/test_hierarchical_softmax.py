@@ -7,6 +7,7 @@ import chainer
 from chainer.backends import cuda
 from chainer import gradient_check
 from chainer import links
+from chainer.links.loss import hierarchical_softmax
 from chainer import testing
 from chainer.testing import attr
 from chainer.testing import condition
@@ -139,4 +140,46 @@ class TestBinaryHierarchicalSoftmax(unittest.TestCase):
         self.assertTrue((f.codes == g.codes).all())
 
 
+@testing.parameterize(*testing.product({
+    'dtype': [numpy.float32, numpy.float64],
+}))
+class TestBinaryHierarchicalSoftmaxBatch(unittest.TestCase):
+
+    def setUp(self):
+        counts = {i: i + 1 for i in range(20)}
+        self.tree = links.BinaryHierarchicalSoftmax.create_huffman_tree(
+            counts)
+        self.x = numpy.random.uniform(-1, 1, (30, 4)).astype(self.dtype)
+        # Targets include duplicates, which share the nodes in their paths.
+        self.t = numpy.random.randint(0, 20, 30).astype(numpy.int32)
+        self.W = numpy.random.uniform(-1, 1, (19, 4)).astype(self.dtype)
+        self.gy = numpy.array(0.5, self.dtype)
+
+    def forward_backward(self, x, t):
+        func = hierarchical_softmax.BinaryHierarchicalSoftmaxFunction(
+            self.tree, self.dtype)
+        inputs = x, t, self.W
+        loss, = func.forward_cpu(inputs)
+        gx, _, gW = func.backward_cpu(inputs, (self.gy,))
+        return loss, gx, gW
+
+    def test_batch(self):
+        loss, gx, gW = self.forward_backward(self.x, self.t)
+        self.assertEqual(loss.dtype, self.dtype)
+        self.assertEqual(loss.shape, ())
+        self.assertEqual(gx.dtype, self.dtype)
+        self.assertEqual(gW.dtype, self.dtype)
+
+        expect_loss = 0
+        expect_gW = numpy.zeros_like(self.W)
+        for i in range(len(self.t)):
+            loss_i, gx_i, gW_i = self.forward_backward(
+                self.x[i:i + 1], self.t[i:i + 1])
+            expect_loss += loss_i
+            expect_gW += gW_i
+            testing.assert_allclose(gx[i], gx_i[0])
+        testing.assert_allclose(loss, expect_loss)
+        testing.assert_allclose(gW, expect_gW)
+
+
 testing.run_module(__name__, __file__)
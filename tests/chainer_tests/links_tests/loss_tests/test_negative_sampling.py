@@ -199,4 +199,33 @@ class TestNegativeSampling(unittest.TestCase):
         testing.assert_allclose(gw_cpu, gw_gpu, **self.test_backward_options)
 
 
+class TestNegativeSamplingSampler(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (4, 3)).astype(numpy.float32)
+        self.t = numpy.array([0, 2, 1, 4], numpy.int32)
+
+    def test_sample_buffer(self):
+        link = links.NegativeSampling(
+            3, [10, 5, 2, 5, 2], 2, sample_buffer_size=100)
+        self.assertEqual(link.sampler.buffer_size, 100)
+        for _ in range(30):
+            _, samples = link(self.x, self.t, return_samples=True)
+            self.assertEqual(samples.shape, (4, 3))
+            numpy.testing.assert_array_equal(samples[:, 0], self.t)
+            self.assertTrue(((0 <= samples) & (samples < 5)).all())
+
+    def test_report_throughput(self):
+        link = links.NegativeSampling(3, [10, 5, 2, 5, 2], 2)
+        self.assertIsNone(link.sampler_throughput)
+        reporter = chainer.Reporter()
+        reporter.add_observer('ns', link)
+        observation = {}
+        with reporter.scope(observation):
+            link(self.x, self.t)
+        self.assertEqual(link._n_samples, 12)
+        if link._sample_time > 0:
+            self.assertGreater(observation['ns/sampler_throughput'], 0)
+
+
 testing.run_module(__name__, __file__)
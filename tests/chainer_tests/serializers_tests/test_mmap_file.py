@@ -0,0 +1,217 @@
+import io
+import mmap
+import os
+import tempfile
+import unittest
+
+import numpy
+
+import chainer
+from chainer.backends import cuda
+from chainer import links
+from chainer import optimizers
+from chainer.serializers import mmap_file
+from chainer import testing
+from chainer.testing import attr
+
+
+class Model(chainer.Chain):
+
+    def __init__(self):
+        super(Model, self).__init__()
+        with self.init_scope():
+            self.l1 = links.Linear(3, 4)
+            self.bn = links.BatchNormalization(4)
+            self.l2 = links.Linear(None, 2)
+
+    def forward(self, x):
+        return self.l2(self.bn(self.l1(x)))
+
+
+def _make_model():
+    model = Model()
+    model.l2(numpy.zeros((1, 4), numpy.float32))
+    for param in model.params():
+        param.array[...] = numpy.random.uniform(-1, 1, param.shape)
+    model.bn.avg_mean[...] = numpy.random.uniform(-1, 1, 4)
+    model.bn.N = 3
+    return model
+
+
+class TestSaveMmap(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.temp_file_path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        if hasattr(self, 'temp_file_path'):
+            os.remove(self.temp_file_path)
+
+    def test_layout(self):
+        target = {
+            'a': numpy.arange(6, dtype=numpy.float32).reshape(2, 3),
+            'b': numpy.asarray(None),
+            'c': numpy.asarray(3, numpy.int64),
+            'd': numpy.zeros((0, 3), numpy.float16),
+            'e': numpy.asarray('abc'),
+        }
+        mmap_file.save_mmap(self.temp_file_path, target)
+        mapped = mmap_file.open_mmap(self.temp_file_path)
+
+        assert sorted(mapped) == sorted(target)
+        assert mapped['b'][()] is None
+        for key in 'acde':
+            assert isinstance(mapped[key], numpy.ndarray)
+            assert mapped[key].dtype == target[key].dtype
+            assert mapped[key].shape == target[key].shape
+            assert not mapped[key].flags.writeable
+            numpy.testing.assert_array_equal(mapped[key], target[key])
+        assert mapped['a'].ctypes.data % mmap_file._ALIGNMENT == 0
+        assert mapped['c'].ctypes.data % mmap_file._ALIGNMENT == 0
+
+    def test_file_object(self):
+        target = {'a': numpy.arange(3, dtype=numpy.float32)}
+        with open(self.temp_file_path, 'wb') as f:
+            mmap_file.save_mmap(f, target)
+        with open(self.temp_file_path, 'rb') as f:
+            mapped = mmap_file.open_mmap(f)
+        numpy.testing.assert_array_equal(mapped['a'], target['a'])
+
+    def test_object_array(self):
+        target = {'a': numpy.asarray([None, 1], dtype=object)}
+        with self.assertRaises(TypeError):
+            mmap_file.save_mmap(io.BytesIO(), target)
+
+    def test_invalid_file(self):
+        with open(self.temp_file_path, 'wb') as f:
+            numpy.savez(f, a=numpy.zeros(3))
+        with self.assertRaises(ValueError):
+            mmap_file.open_mmap(self.temp_file_path)
+
+
+@testing.parameterize(*testing.product({
+    'copy': [False, True],
+}))
+class TestLoadMmap(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.temp_file_path = tempfile.mkstemp()
+        os.close(fd)
+        self.source = _make_model()
+        mmap_file.save_mmap(self.temp_file_path, self.source)
+
+    def tearDown(self):
+        if hasattr(self, 'temp_file_path'):
+            os.remove(self.temp_file_path)
+
+    def check_loaded(self, model):
+        source_params = dict(self.source.namedparams())
+        for name, param in model.namedparams():
+            numpy.testing.assert_array_equal(
+                param.array, source_params[name].array)
+            assert param.array.flags.writeable == self.copy
+        numpy.testing.assert_array_equal(
+            model.bn.avg_mean, self.source.bn.avg_mean)
+        assert model.bn.avg_mean.flags.writeable == self.copy
+        assert model.bn.N == 3
+
+    def test_load(self):
+        model = Model()
+        mmap_file.load_mmap(self.temp_file_path, model, copy=self.copy)
+        self.check_loaded(model)
+
+        x = numpy.random.uniform(-1, 1, (2, 3)).astype(numpy.float32)
+        with chainer.using_config('train', False):
+            y = model(x)
+            y_expect = self.source(x)
+        numpy.testing.assert_array_equal(y.array, y_expect.array)
+
+    def test_load_mapped(self):
+        model = Model()
+        mmap_file.load_mmap(self.temp_file_path, model, copy=self.copy)
+        for array in (model.l1.W.array, model.l2.W.array, model.bn.avg_mean):
+            assert isinstance(array.base, mmap.mmap) != self.copy
+
+    def test_backward(self):
+        model = Model()
+        mmap_file.load_mmap(self.temp_file_path, model, copy=self.copy)
+        x = numpy.random.uniform(-1, 1, (2, 3)).astype(numpy.float32)
+        with chainer.using_config('train', False):
+            chainer.functions.sum(model(x)).backward()
+        for param in model.params():
+            assert param.grad is not None
+
+    def test_ignore_names(self):
+        model = Model()
+        initial_W = model.l1.W.array.copy()
+        mmap_file.load_mmap(
+            self.temp_file_path, model, ignore_names='l1/W', copy=self.copy)
+        numpy.testing.assert_array_equal(model.l1.W.array, initial_W)
+        assert model.l1.W.array.flags.writeable
+        numpy.testing.assert_array_equal(
+            model.l1.b.array, self.source.l1.b.array)
+
+    def test_path(self):
+        linear = links.Linear(3, 4)
+        mmap_file.load_mmap(
+            self.temp_file_path, linear, path='l1/', copy=self.copy)
+        numpy.testing.assert_array_equal(
+            linear.W.array, self.source.l1.W.array)
+        assert linear.W.array.flags.writeable == self.copy
+
+    def test_strict(self):
+        model = links.Linear(3, 4)
+        with self.assertRaises(KeyError):
+            mmap_file.load_mmap(self.temp_file_path, model, copy=self.copy)
+        mmap_file.load_mmap(
+            self.temp_file_path, model, strict=False, copy=self.copy)
+
+    def test_shape_mismatch(self):
+        linear = links.Linear(3, 5)
+        with self.assertRaises(ValueError):
+            mmap_file.load_mmap(
+                self.temp_file_path, linear, path='l1/', copy=self.copy)
+
+    @attr.gpu
+    def test_load_gpu(self):
+        model = Model()
+        model.to_gpu()
+        mmap_file.load_mmap(self.temp_file_path, model, copy=self.copy)
+        assert isinstance(model.l1.W.array, cuda.ndarray)
+        numpy.testing.assert_array_equal(
+            cuda.to_cpu(model.l1.W.array), self.source.l1.W.array)
+
+
+class TestLoadMmapOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.temp_file_path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        if hasattr(self, 'temp_file_path'):
+            os.remove(self.temp_file_path)
+
+    def test_optimizer(self):
+        model = _make_model()
+        optimizer = optimizers.Adam()
+        optimizer.setup(model)
+        model.cleargrads()
+        chainer.functions.sum(
+            model(numpy.ones((2, 3), numpy.float32))).backward()
+        optimizer.update()
+        mmap_file.save_mmap(self.temp_file_path, optimizer)
+
+        model2 = Model()
+        optimizer2 = optimizers.Adam()
+        optimizer2.setup(model2)
+        mmap_file.load_mmap(self.temp_file_path, optimizer2)
+        assert optimizer2.t == 1
+        state = optimizer2.target.l1.W.update_rule.state
+        numpy.testing.assert_array_equal(
+            state['m'], model.l1.W.update_rule.state['m'])
+        assert state['m'].flags.writeable
+
+
+testing.run_module(__name__, __file__)
@@ -153,4 +153,176 @@ class TestBackwardValueCheck(unittest.TestCase):
         chainer.backward([y], [gy])
 
 
+class Branches(chainer.Chain):
+
+    def __init__(self):
+        super(Branches, self).__init__()
+        with self.init_scope():
+            self.l0 = chainer.links.Linear(3, 4)
+            self.l1 = chainer.links.Linear(3, 4)
+            self.l2 = chainer.links.Linear(3, 4)
+
+    def forward(self, x):
+        h0 = chainer.functions.tanh(self.l0(x))
+        h1 = chainer.functions.sigmoid(self.l1(x))
+        h2 = self.l2(x) ** 2
+        h = h0 * h1 + h2 + x[:, :1]
+        return chainer.functions.sum(h), h
+
+
+class AccumulateIdentity(chainer.FunctionNode):
+
+    def __init__(self, received):
+        self.received = received
+
+    def forward(self, inputs):
+        return inputs[0].copy(),
+
+    def backward_accumulate(self, target_input_indexes, grad_outputs,
+                            grad_inputs):
+        self.received.append(grad_inputs[0])
+        gx = grad_outputs[0]
+        if grad_inputs[0] is not None:
+            gx = gx + grad_inputs[0]
+        return gx,
+
+
+@testing.parameterize(*testing.product({
+    'lazy_grad_sum': [False, True],
+    'retain_grad': [False, True],
+}))
+class TestBackwardParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Branches()
+        self.x = np.random.uniform(-1, 1, (5, 3)).astype(np.float32)
+
+    def forward_backward(self, n_threads):
+        self.model.cleargrads()
+        x = chainer.Variable(self.x)
+        with chainer.using_config('lazy_grad_sum', self.lazy_grad_sum), \
+                chainer.using_config('backward_num_threads', n_threads):
+            loss, h = self.model(x)
+            loss.backward(retain_grad=self.retain_grad)
+        grads = [x.grad] + [p.grad for _, p in
+                            sorted(self.model.namedparams())]
+        if self.retain_grad:
+            grads.append(h.grad)
+        return grads
+
+    def test_backward(self):
+        expected = self.forward_backward(1)
+        actual = self.forward_backward(4)
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            np.testing.assert_array_equal(a, e)
+
+    def test_accumulate(self):
+        def accumulate(n_threads):
+            x = chainer.Variable(self.x)
+            x.grad = np.ones_like(self.x)
+            with chainer.using_config('backward_num_threads', n_threads):
+                self.model(x)[0].backward()
+            return x.grad
+
+        np.testing.assert_array_equal(accumulate(4), accumulate(1))
+
+    def test_backward_accumulate(self):
+        def accumulate(n_threads):
+            received = []
+            x = chainer.Variable(self.x)
+            x.grad = np.ones_like(self.x)
+            y0, = AccumulateIdentity(received).apply((x,))
+            y1, = AccumulateIdentity(received).apply((x,))
+            with chainer.using_config('lazy_grad_sum', self.lazy_grad_sum), \
+                    chainer.using_config('backward_num_threads', n_threads):
+                chainer.functions.sum(y0 * 2 + y1 * 3).backward()
+            return [g.array for g in received], x.grad
+
+        received, gx = accumulate(4)
+        expected_received, expected_gx = accumulate(1)
+        assert len(received) == len(expected_received) == 2
+        for a, e in zip(received, expected_received):
+            np.testing.assert_array_equal(a, e)
+        np.testing.assert_array_equal(gx, expected_gx)
+
+    def test_function_hook(self):
+        expected = self.forward_backward(1)
+        with chainer.using_config('backward_num_threads', 4), \
+                chainer.function_hooks.TimerHook() as timer:
+            actual = self.forward_backward(4)
+        assert len(timer.call_history) > 0
+        for a, e in zip(actual, expected):
+            np.testing.assert_array_equal(a, e)
+
+    def test_grad(self):
+        x = chainer.Variable(self.x)
+        params = [p for _, p in sorted(self.model.namedparams())]
+        loss, _ = self.model(x)
+        expected = chainer.grad([loss], [x] + params)
+        with chainer.using_config('backward_num_threads', 4):
+            actual = chainer.grad([loss], [x] + params)
+        for a, e in zip(actual, expected):
+            np.testing.assert_array_equal(a.array, e.array)
+
+    def test_double_backprop(self):
+        def grad_norm(n_threads):
+            x = chainer.Variable(self.x)
+            with chainer.using_config('backward_num_threads', n_threads):
+                gx, = chainer.grad(
+                    [self.model(x)[0]], [x], enable_double_backprop=True)
+                chainer.functions.sum(gx * gx).backward()
+            return x.grad
+
+        np.testing.assert_array_equal(grad_norm(4), grad_norm(1))
+
+
+@testing.parameterize(*testing.product({
+    'n_threads': [1, 4],
+}))
+class TestLeafGradCallback(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Branches()
+        self.x = np.random.uniform(-1, 1, (5, 3)).astype(np.float32)
+
+    def test_callback(self):
+        x = chainer.Variable(self.x)
+        called = []
+
+        def callback(var):
+            called.append((var, var.grad.copy(), x.grad is None))
+
+        with chainer.using_config('backward_num_threads', self.n_threads), \
+                chainer._backprop.leaf_grad_callback(callback):
+            self.model(x)[0].backward()
+
+        expected = [x] + list(self.model.params())
+        assert len(called) == len(expected)
+        assert set(id(var) for var, _, _ in called) == set(map(id, expected))
+        # The gradients of the parameters are passed before that of the input,
+        # which is the last to be computed.
+        assert called[0][2]
+        for var, grad, _ in called:
+            np.testing.assert_array_equal(grad, var.grad)
+
+    def test_leaf_not_requiring_grad(self):
+        x = chainer.Variable(self.x)
+        w = chainer.Variable(np.ones((5, 3), np.float32), requires_grad=False)
+        called = []
+        with chainer._backprop.leaf_grad_callback(called.append):
+            chainer.functions.sum(x * w * 2).backward()
+        assert called == [x]
+        assert w.grad is None
+        np.testing.assert_array_equal(x.grad, np.full((5, 3), 2, np.float32))
+
+    def test_no_callback(self):
+        x = chainer.Variable(self.x)
+        with chainer._backprop.leaf_grad_callback(lambda var: None):
+            pass
+        self.model(x)[0].backward()
+        assert x.grad is not None
+        assert chainer._backprop._thread_local.leaf_grad_callback is None
+
+
 testing.run_module(__name__, __file__)
@@ -833,4 +833,255 @@ class TestUpdateRuleUseFp32Update(unittest.TestCase):
                 param.dtype
 
 
+class ForeachLink(chainer.Chain):
+
+    def __init__(self):
+        super(ForeachLink, self).__init__()
+        with self.init_scope():
+            self.l1 = chainer.links.Linear(3, 4, nobias=True)
+            self.bn = chainer.links.BatchNormalization(4)
+            self.l2 = chainer.links.Linear(4, 2)
+
+    def forward(self, x):
+        h = chainer.functions.relu(self.bn(self.l1(x)))
+        return chainer.functions.sum(self.l2(h) ** 2)
+
+
+@testing.backend.inject_backend_tests(None, _backend_params[:1] + [
+    {'use_cuda': True, 'cuda_device': 0}])
+@testing.parameterize(*testing.product({
+    'optimizer': ['AdaGrad', 'Adam', 'MomentumSGD', 'RMSprop', 'SGD'],
+}))
+class TestGradientMethodForeachUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.random.uniform(-1, 1, (3, 5, 3)).astype(np.float32)
+        self.link = ForeachLink()
+
+    def setup_optimizer(self, link, foreach):
+        opt = getattr(optimizers, self.optimizer)()
+        opt.setup(link)
+        opt.add_hook(chainer.optimizer_hooks.WeightDecay(1e-2))
+        opt.add_hook(chainer.optimizer_hooks.GradientClipping(0.1))
+        if foreach:
+            opt.use_foreach_update()
+        return opt
+
+    def check_update(self, backend_config, customize=None):
+        device = backend_config.device
+        link1 = self.link
+        link1.to_device(device)
+        link2 = link1.copy(mode='copy')
+        opt1 = self.setup_optimizer(link1, False)
+        opt2 = self.setup_optimizer(link2, True)
+        if customize is not None:
+            customize(link1)
+            customize(link2)
+        for x in self.x:
+            x = device.send(x)
+            opt1.update(link1, x)
+            opt2.update(link2, x)
+
+        assert opt2.t == opt1.t
+        for (_, p1), (_, p2) in zip(
+                sorted(link1.namedparams()), sorted(link2.namedparams())):
+            testing.assert_allclose(p1.array, p2.array, atol=1e-6)
+            testing.assert_allclose(p1.grad, p2.grad, atol=1e-6)
+            assert p1.update_rule.t == p2.update_rule.t
+            for key, value in (p1.update_rule.state or {}).items():
+                testing.assert_allclose(
+                    value, p2.update_rule.state[key], atol=1e-6)
+        return opt2, link2
+
+    def test_update(self, backend_config):
+        opt, link = self.check_update(backend_config)
+        group, = opt._foreach_groups
+        assert len(group.params) == len(list(link.params()))
+        assert link.l1.W.array.base is not None
+
+    def test_update_rule_with_own_hyperparameter(self, backend_config):
+        def customize(link):
+            link.l2.b.update_rule.hyperparam.lr = 0.5
+
+        opt, link = self.check_update(backend_config, customize)
+        for group in opt._foreach_groups:
+            assert all([p is not link.l2.b for p in group.params])
+
+    def test_disabled_update_rule(self, backend_config):
+        def customize(link):
+            link.bn.gamma.update_rule.enabled = False
+
+        opt, link = self.check_update(backend_config, customize)
+        for group in opt._foreach_groups:
+            assert all([p is not link.bn.gamma for p in group.params])
+
+    def test_replace_array(self, backend_config):
+        opt, link = self.check_update(backend_config)
+        device = backend_config.device
+        link.l1.W.array = link.l1.W.array.copy()
+        opt.update(link, device.send(self.x[0]))
+        group, = opt._foreach_groups
+        assert any([p is link.l1.W for p in group.params])
+        assert link.l1.W.array.base is not None
+
+    def test_serialize(self, backend_config):
+        opt1, link1 = self.check_update(backend_config)
+        link2 = link1.copy(mode='copy')
+        opt2 = self.setup_optimizer(link2, False)
+        target = {}
+        opt1.serialize(DictionarySerializer(target))
+        opt2.serialize(DictionaryDeserializer(target))
+        assert opt2.t == opt1.t
+        for (_, p1), (_, p2) in zip(
+                sorted(link1.namedparams()), sorted(link2.namedparams())):
+            assert p1.update_rule.t == p2.update_rule.t
+            for key, value in p1.update_rule.state.items():
+                testing.assert_allclose(value, p2.update_rule.state[key])
+
+
+class SparseEmbedLink(chainer.Chain):
+
+    def __init__(self, sparse_grad):
+        super(SparseEmbedLink, self).__init__()
+        with self.init_scope():
+            self.embed = chainer.links.EmbedID(
+                10, 3, ignore_label=-1, sparse_grad=sparse_grad)
+            self.l = chainer.links.Linear(3, 2)
+
+    def forward(self, x):
+        return chainer.functions.sum(
+            self.l(self.embed(x), n_batch_axes=2) ** 2)
+
+
+@testing.backend.inject_backend_tests(None, _backend_params[:1] + [
+    {'use_cuda': True, 'cuda_device': 0}])
+@testing.parameterize(*testing.product({
+    'optimizer': ['AdaGrad', 'Adam', 'MomentumSGD', 'SGD'],
+    'foreach': [False, True],
+}))
+class TestGradientMethodRowSparseUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.array([[1, 4, 1, -1], [4, 6, -1, -1]], np.int32)
+
+    def setup_optimizer(self, link):
+        opt = getattr(optimizers, self.optimizer)()
+        opt.setup(link)
+        opt.add_hook(chainer.optimizer_hooks.GradientClipping(0.1))
+        if self.foreach:
+            opt.use_foreach_update()
+        return opt
+
+    def check_update(self, backend_config, n_updates, customize=None):
+        device = backend_config.device
+        link1 = SparseEmbedLink(False)
+        link1.to_device(device)
+        link2 = SparseEmbedLink(True)
+        link2.copyparams(link1)
+        link2.to_device(device)
+        opt1 = self.setup_optimizer(link1)
+        opt2 = self.setup_optimizer(link2)
+        if customize is not None:
+            customize(opt1)
+            customize(opt2)
+        x = device.send(self.x)
+        for _ in range(n_updates):
+            opt1.update(link1, x)
+            opt2.update(link2, x)
+        return link1, link2
+
+    def test_first_update(self, backend_config):
+        # The first update of the touched rows does not depend on the
+        # laziness of the update.
+        link1, link2 = self.check_update(backend_config, 1)
+        W = link2.embed.W
+        assert W.grad is None
+        testing.assert_allclose(
+            link1.embed.W.grad[W.sparse_grad.indices], W.sparse_grad.values)
+        for (_, p1), (_, p2) in zip(
+                sorted(link1.namedparams()), sorted(link2.namedparams())):
+            testing.assert_allclose(p1.array, p2.array, atol=1e-6)
+            for key, value in p1.update_rule.state.items():
+                testing.assert_allclose(
+                    value, p2.update_rule.state[key], atol=1e-6)
+
+    def test_untouched_rows(self, backend_config):
+        link1, link2 = self.check_update(backend_config, 3)
+        untouched = [0, 2, 3, 5, 7, 8, 9]
+        testing.assert_allclose(
+            link2.embed.W.array[untouched], link1.embed.W.array[untouched])
+        for value in link2.embed.W.update_rule.state.values():
+            assert not value[untouched].any()
+
+    def test_weight_decay(self, backend_config):
+        def customize(opt):
+            opt.add_hook(chainer.optimizer_hooks.WeightDecay(1e-2))
+
+        link1, link2 = self.check_update(backend_config, 1, customize)
+        touched = [1, 4, 6]
+        testing.assert_allclose(
+            link2.embed.W.array[touched], link1.embed.W.array[touched],
+            atol=1e-6)
+
+    def test_loss_scale(self, backend_config):
+        def customize(opt):
+            opt.loss_scaling(scale=8.0)
+
+        link1, link2 = self.check_update(backend_config, 1, customize)
+        assert link2.embed.W._loss_scale == 8.0
+        for (_, p1), (_, p2) in zip(
+                sorted(link1.namedparams()), sorted(link2.namedparams())):
+            testing.assert_allclose(p1.array, p2.array, atol=1e-6)
+
+    def test_dynamic_loss_scale(self, backend_config):
+        def customize(opt):
+            opt.loss_scaling(interval=1)
+
+        link1, link2 = self.check_update(backend_config, 3, customize)
+        touched = [1, 4, 6]
+        testing.assert_allclose(
+            link2.embed.W.array[touched], link1.embed.W.array[touched],
+            atol=1e-6)
+
+    def test_mixed_dense_and_sparse_grads(self, backend_config):
+        link1, link2 = self.check_update(backend_config, 1)
+        device = backend_config.device
+        W = link2.embed.W
+        W.cleargrad()
+        loss = chainer.functions.sum(link2.embed(device.send(self.x)))
+        loss += chainer.functions.sum(W * W)
+        loss.backward()
+        assert W.grad is not None and W.sparse_grad is not None
+        opt = self.setup_optimizer(link2)
+        opt.update()
+        assert W.sparse_grad is None
+
+
+class DictionarySerializer(serializer.Serializer):
+
+    def __init__(self, target, path=''):
+        self.target = target
+        self.path = path
+
+    def __getitem__(self, key):
+        return DictionarySerializer(self.target, self.path + key + '/')
+
+    def __call__(self, key, value):
+        self.target[self.path + key] = backend.CpuDevice().send(value)
+        return value
+
+
+class DictionaryDeserializer(serializer.Deserializer):
+
+    def __init__(self, target, path=''):
+        self.target = target
+        self.path = path
+
+    def __getitem__(self, key):
+        return DictionaryDeserializer(self.target, self.path + key + '/')
+
+    def __call__(self, key, value):
+        return self.target[self.path + key]
+
+
 testing.run_module(__name__, __file__)
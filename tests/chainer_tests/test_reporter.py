@@ -196,13 +196,16 @@ class TestReport(unittest.TestCase):
         self.assertNotIn('x', reporter.observation)
 
 
+@testing.parameterize(*testing.product({
+    'buffer_size': [None, 1, 2],
+}))
 @backend.inject_backend_tests(
     ['test_basic', 'test_serialize_array_float', 'test_serialize_array_int'],
     [{}, {'use_cuda': True}])
 class TestSummary(unittest.TestCase):
 
     def setUp(self):
-        self.summary = chainer.reporter.Summary()
+        self.summary = chainer.reporter.Summary(buffer_size=self.buffer_size)
 
     def test_basic(self, backend_config):
         self.summary.add(backend_config.get_array(numpy.array(1, 'f')))
@@ -307,11 +310,58 @@ class TestSummary(unittest.TestCase):
         testing.assert_allclose(mean, 2.5)
         testing.assert_allclose(std, 0.5)
 
+    def test_weight_array(self):
+        self.summary.add(numpy.array(1, 'f'), numpy.array(0.5, 'f'))
+        self.summary.add(numpy.array(2, 'f'), 2)
+        self.summary.add(numpy.array(3, 'f'), numpy.array(0.25, 'f'))
 
+        mean = self.summary.compute_mean()
+        val = (1 * 0.5 + 2 * 2 + 3 * 0.25) / (0.5 + 2 + 0.25)
+        testing.assert_allclose(mean, val)
+
+    def test_dtype(self):
+        # The dtypes do not depend on the buffering.
+        expected = chainer.reporter.Summary()
+        for summary in (self.summary, expected):
+            summary.add(numpy.array(1, 'f'))
+            summary.add(numpy.array(2, 'f'), 2)
+            summary.add(numpy.array(3, 'f'))
+
+        mean, std = self.summary.make_statistics()
+        expected_mean, expected_std = expected.make_statistics()
+        self.assertEqual(mean.dtype, expected_mean.dtype)
+        self.assertEqual(std.dtype, expected_std.dtype)
+        testing.assert_allclose(mean, 2.)
+
+
+class TestSummaryBuffer(unittest.TestCase):
+
+    def test_lazy(self):
+        summary = chainer.reporter.Summary(buffer_size=3)
+        summary.add(1.)
+        summary.add(2.)
+        self.assertEqual(summary._n, 0)
+        summary.add(3.)
+        self.assertEqual(summary._n, 3)
+        summary.add(4.)
+        testing.assert_allclose(summary.compute_mean(), 2.5)
+        self.assertEqual(summary._n, 4)
+
+    def test_invalid_buffer_size(self):
+        with self.assertRaises(ValueError):
+            chainer.reporter.Summary(buffer_size=0)
+        with self.assertRaises(ValueError):
+            chainer.reporter.DictSummary(buffer_size=0)
+
+
+@testing.parameterize(*testing.product({
+    'buffer_size': [None, 3],
+}))
 class TestDictSummary(unittest.TestCase):
 
     def setUp(self):
-        self.summary = chainer.reporter.DictSummary()
+        self.summary = chainer.reporter.DictSummary(
+            buffer_size=self.buffer_size)
 
     def check(self, summary, data):
         mean = summary.compute_mean()
@@ -1,10 +1,16 @@
 import multiprocessing
+import os
 import threading
+import time
 import unittest
 
 import mock
+import numpy
 
+import chainer
+from chainer.serializers import npz
 from chainer import testing
+from chainer.training import extensions
 from chainer.training.extensions import snapshot_writers
 from chainer import utils
 
@@ -99,4 +105,142 @@ class TestQueueWriter(unittest.TestCase):
                 assert q.task_done.call_count == 3
 
 
+class IncrementalLink(chainer.Link):
+
+    def __init__(self):
+        super(IncrementalLink, self).__init__()
+        with self.init_scope():
+            self.p = chainer.Parameter(numpy.zeros((2, 3), numpy.float32))
+            self.q = chainer.Parameter(numpy.zeros((4,), numpy.float32))
+        self.add_persistent('count', 0)
+
+
+class TestIncrementalWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.link = IncrementalLink()
+
+    def snapshot(self, writer, outdir, i):
+        writer('snapshot_{}'.format(i), outdir, npz.serialize(self.link))
+
+    def test_write_and_load(self):
+        w = snapshot_writers.IncrementalWriter(full_interval=3)
+        expected = []
+        with utils.tempdir() as tempd:
+            for i in range(5):
+                self.link.p.array += 1
+                if i % 2 == 0:
+                    self.link.q.array += 1
+                self.link.count += 1
+                self.snapshot(w, tempd, i)
+                expected.append(self.link.copy(mode='copy'))
+            w.finalize()
+
+            for i, expect in enumerate(expected):
+                link = IncrementalLink()
+                snapshot_writers.load_incremental_snapshot(
+                    os.path.join(tempd, 'snapshot_{}'.format(i)), link)
+                numpy.testing.assert_array_equal(
+                    link.p.array, expect.p.array)
+                numpy.testing.assert_array_equal(
+                    link.q.array, expect.q.array)
+                assert link.count == expect.count
+
+            with numpy.load(os.path.join(tempd, 'snapshot_0')) as f:
+                assert set(f.keys()) == {'p', 'q', 'count'}
+            with numpy.load(os.path.join(tempd, 'snapshot_1')) as f:
+                assert set(f.keys()) == {
+                    'p', 'count', '_incremental_snapshot_parent'}
+                assert str(f['_incremental_snapshot_parent']) == 'snapshot_0'
+            with numpy.load(os.path.join(tempd, 'snapshot_3')) as f:
+                assert set(f.keys()) == {'p', 'q', 'count'}
+
+            # Full snapshots can be loaded by load_npz
+            link = IncrementalLink()
+            npz.load_npz(os.path.join(tempd, 'snapshot_3'), link)
+            numpy.testing.assert_array_equal(link.p.array, 4)
+
+    def test_threshold(self):
+        w = snapshot_writers.IncrementalWriter(threshold=0.1)
+        with utils.tempdir() as tempd:
+            self.snapshot(w, tempd, 0)
+            self.link.p.array += 0.05
+            self.link.q.array += 0.2
+            self.snapshot(w, tempd, 1)
+            w.finalize()
+            with numpy.load(os.path.join(tempd, 'snapshot_1')) as f:
+                assert 'p' not in f
+                assert 'q' in f
+
+            link = IncrementalLink()
+            snapshot_writers.load_incremental_snapshot(
+                os.path.join(tempd, 'snapshot_1'), link)
+            numpy.testing.assert_array_equal(link.p.array, 0)
+            numpy.testing.assert_allclose(link.q.array, 0.2)
+
+    def test_staging(self):
+        w = snapshot_writers.IncrementalWriter()
+        with utils.tempdir() as tempd:
+            event = threading.Event()
+            save = w.save
+
+            def wait_and_save(*args, **kwargs):
+                event.wait()
+                save(*args, **kwargs)
+
+            with mock.patch.object(w, 'save', side_effect=wait_and_save):
+                self.snapshot(w, tempd, 0)
+                # The array is modified while the snapshot is being written.
+                self.link.p.array += 1
+                event.set()
+                w.finalize()
+
+            link = IncrementalLink()
+            npz.load_npz(os.path.join(tempd, 'snapshot_0'), link)
+            numpy.testing.assert_array_equal(link.p.array, 0)
+
+    def test_cleanup_after_full_snapshot(self):
+        w = snapshot_writers.IncrementalWriter(full_interval=2)
+        hook = mock.MagicMock()
+        w._add_cleanup_hook(hook)
+        with utils.tempdir() as tempd:
+            for i in range(4):
+                self.snapshot(w, tempd, i)
+            w.finalize()
+        assert hook.call_count == 2
+
+    def test_cleanup_keeps_dependencies(self):
+        w = snapshot_writers.IncrementalWriter(full_interval=3)
+        snapshot = extensions.snapshot(
+            writer=w, filename='snapshot_{.updater.iteration}', n_retains=2)
+        t = time.time() - 100
+        with utils.tempdir() as tempd:
+            trainer = mock.MagicMock()
+            trainer.out = tempd
+            snapshot.initialize(trainer)
+            expected = []
+            for i in range(8):
+                self.link.p.array += 1
+                self.snapshot(w, tempd, i)
+                w._worker.join()
+                # For filesystems that does low timestamp precision
+                os.utime(os.path.join(tempd, 'snapshot_{}'.format(i)),
+                         (t + i, t + i))
+                expected.append(self.link.p.array.copy())
+
+            # snapshot_6 is the last full snapshot, and the retained
+            # snapshot_5 depends on snapshot_3 and snapshot_4.
+            assert sorted(os.listdir(tempd)) == [
+                'snapshot_{}'.format(i) for i in range(3, 8)]
+            for i in range(3, 8):
+                link = IncrementalLink()
+                snapshot_writers.load_incremental_snapshot(
+                    os.path.join(tempd, 'snapshot_{}'.format(i)), link)
+                numpy.testing.assert_array_equal(link.p.array, expected[i])
+
+    def test_invalid_full_interval(self):
+        with self.assertRaises(ValueError):
+            snapshot_writers.IncrementalWriter(full_interval=0)
+
+
 testing.run_module(__name__, __file__)
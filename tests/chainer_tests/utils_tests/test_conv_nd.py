@@ -1,12 +1,14 @@
 import itertools
 import unittest
 
+import mock
 import numpy
 from six import moves
 
 from chainer.backends import cuda
 from chainer import testing
 from chainer.testing import attr
+from chainer.utils import conv
 from chainer.utils import conv_nd
 
 
@@ -302,4 +304,96 @@ class TestCol2ImNDParameterRanks(unittest.TestCase):
             conv_nd.col2im_nd_gpu(col_gpu, self.stride, self.pad, (4,))
 
 
+@testing.parameterize(*testing.product({
+    'dims': [(7,), (7, 6), (5, 4, 3)],
+    'stride': [1, 2],
+    'pad': [0, 1],
+    'dilate': [1, 2],
+    'cover_all': [True, False],
+    'block_bytes': [None, 1],
+}))
+class TestConvolutionNDCPU(unittest.TestCase):
+
+    def setUp(self):
+        ndim = len(self.dims)
+        self.ksize = (2,) * ndim
+        self.strides = (self.stride,) * ndim
+        self.pads = (self.pad,) * ndim
+        self.x = numpy.random.uniform(
+            -1, 1, (2, 3) + self.dims).astype(numpy.float32)
+        self.W = numpy.random.uniform(
+            -1, 1, (4, 3) + self.ksize).astype(numpy.float32)
+        if self.block_bytes is None:
+            self.block_bytes = conv_nd._cpu_col_block_bytes
+
+    def test_forward(self):
+        ndim = len(self.dims)
+        col = conv_nd.im2col_nd_cpu(
+            self.x, self.ksize, self.strides, self.pads,
+            cover_all=self.cover_all, dilate=self.dilate)
+        axes = tuple(moves.range(1, ndim + 2))
+        expected = numpy.rollaxis(
+            numpy.tensordot(col, self.W, (axes, axes)), ndim + 1, 1)
+
+        with mock.patch.object(
+                conv_nd, '_cpu_col_block_bytes', self.block_bytes):
+            y = conv_nd.convolution_nd_cpu(
+                self.x, self.W, self.strides, self.pads,
+                cover_all=self.cover_all, dilate=self.dilate)
+        self.assertEqual(y.dtype, self.x.dtype)
+        testing.assert_allclose(y, expected, atol=1e-5, rtol=1e-5)
+
+    def test_grad_w(self):
+        ndim = len(self.dims)
+        col = conv_nd.im2col_nd_cpu(
+            self.x, self.ksize, self.strides, self.pads,
+            cover_all=self.cover_all, dilate=self.dilate)
+        gy = numpy.random.uniform(
+            -1, 1, (2, 4) + col.shape[ndim + 2:]).astype(numpy.float32)
+        out_axes = (0,) + tuple(moves.range(2, ndim + 2))
+        col_axes = (0,) + tuple(moves.range(ndim + 2, ndim * 2 + 2))
+        expected = numpy.tensordot(gy, col, (out_axes, col_axes))
+
+        with mock.patch.object(
+                conv_nd, '_cpu_col_block_bytes', self.block_bytes):
+            gW = conv_nd.convolution_nd_grad_w_cpu(
+                self.x, gy, self.ksize, self.strides, self.pads,
+                cover_all=self.cover_all, dilate=self.dilate)
+        testing.assert_allclose(gW, expected, atol=1e-5, rtol=1e-5)
+
+    def test_deconvolution(self):
+        ndim = len(self.dims)
+        W = self.W.transpose((1, 0) + tuple(moves.range(2, ndim + 2)))
+        outs = tuple(
+            conv.get_deconv_outsize(d, k, s, p, d=self.dilate)
+            for (d, k, s, p) in zip(
+                self.dims, self.ksize, self.strides, self.pads))
+        gcol = numpy.rollaxis(
+            numpy.tensordot(W, self.x, (0, 1)), ndim + 1)
+        expected = conv_nd.col2im_nd_cpu(
+            gcol, self.strides, self.pads, outs, dilate=self.dilate)
+
+        with mock.patch.object(
+                conv_nd, '_cpu_col_block_bytes', self.block_bytes):
+            y = conv_nd.deconvolution_nd_cpu(
+                self.x, W, self.strides, self.pads, outs,
+                dilate=self.dilate)
+        testing.assert_allclose(y, expected, atol=1e-5, rtol=1e-5)
+
+
+class TestIm2ColNDView(unittest.TestCase):
+
+    def test_view(self):
+        img = numpy.random.uniform(-1, 1, (2, 3, 6, 5)).astype(numpy.float32)
+        view = conv_nd.im2col_nd_view_cpu(img, (3, 2), (2, 1), (1, 0))
+        expected = conv_nd.im2col_nd_cpu(img, (3, 2), (2, 1), (1, 0))
+        self.assertFalse(view.flags.writeable)
+        numpy.testing.assert_array_equal(view, expected)
+
+    def test_no_pad_shares_memory(self):
+        img = numpy.random.uniform(-1, 1, (2, 3, 6, 5)).astype(numpy.float32)
+        view = conv_nd.im2col_nd_view_cpu(img, (3, 2), (1, 1), (0, 0))
+        self.assertTrue(numpy.shares_memory(view, img))
+
+
 testing.run_module(__name__, __file__)
@@ -2,7 +2,9 @@ import unittest
 
 import numpy
 
+from chainer.backends import cuda
 from chainer import testing
+from chainer.testing import attr
 from chainer import utils
 
 
@@ -108,4 +110,52 @@ class TestGetOrder2(unittest.TestCase):
             utils.get_order(row, col)
 
 
+class TestRowSparseGrad(unittest.TestCase):
+
+    def setUp(self):
+        self.values = numpy.random.uniform(-1, 1, (5, 3)).astype('f')
+
+    def check_grad(self, grad):
+        expect = numpy.zeros((6, 3), 'f')
+        expect[3] = self.values[0] + self.values[4]
+        expect[1] = self.values[1] + self.values[3]
+        expect[0] = self.values[2]
+        numpy.testing.assert_array_equal(
+            cuda.to_cpu(grad.indices), [0, 1, 3])
+        testing.assert_allclose(grad.values, expect[[0, 1, 3]])
+        testing.assert_allclose(grad.to_dense(), expect)
+
+    def check_add(self, indices, values):
+        grad = utils.RowSparseGrad((6, 3))
+        grad.add(indices[:2], values[:2])
+        grad.add(indices[2:], values[2:])
+        self.check_grad(grad)
+
+        # Adds rows after coalescing.
+        grad = utils.RowSparseGrad((6, 3))
+        grad.add(indices[:3], values[:3])
+        grad.values
+        grad.add(indices[3:], values[3:])
+        self.check_grad(grad)
+
+    def test_add_cpu(self):
+        self.check_add(numpy.array([3, 1, 0, 1, 3]), self.values)
+
+    @attr.gpu
+    def test_add_gpu(self):
+        self.check_add(
+            cuda.cupy.array([3, 1, 0, 1, 3]), cuda.to_gpu(self.values))
+
+    def test_empty(self):
+        grad = utils.RowSparseGrad((6, 3))
+        grad.add(numpy.zeros((0,), 'i'), numpy.zeros((0, 3), 'f'))
+        self.assertEqual(grad.values.shape, (0, 3))
+        numpy.testing.assert_array_equal(grad.to_dense(), 0)
+
+    def test_invalid_shape(self):
+        grad = utils.RowSparseGrad((6, 3))
+        with self.assertRaises(ValueError):
+            grad.add(numpy.array([0, 1]), numpy.zeros((2, 4), 'f'))
+
+
 testing.run_module(__name__, __file__)
@@ -48,4 +48,42 @@ class TestWalkerAlias(unittest.TestCase):
         self.check_sample()
 
 
+class TestWalkerAliasBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.ps = numpy.array([5, 3, 4, 1, 2], dtype=numpy.int32)
+        self.sampler = utils.WalkerAlias(self.ps, buffer_size=100)
+
+    def check_sample(self):
+        counts = numpy.zeros(len(self.ps), numpy.float32)
+        for _ in range(1000):
+            vs = self.sampler.sample((4, 3))
+            assert vs.shape == (4, 3)
+            assert (vs >= 0).all()
+            numpy.add.at(counts, cuda.to_cpu(vs), 1)
+            # Modifying the returned samples does not affect the others.
+            vs[...] = -1
+        counts /= (1000 * 12)
+        counts *= sum(self.ps)
+        testing.assert_allclose(self.ps, counts, atol=0.1, rtol=0.1)
+
+    def test_sample_cpu(self):
+        self.check_sample()
+
+    @attr.gpu
+    def test_sample_gpu(self):
+        self.sampler.to_device(cuda.Device())
+        self.check_sample()
+
+    def test_sample_larger_than_buffer(self):
+        vs = self.sampler.sample((30, 5))
+        assert vs.shape == (30, 5)
+        vs = self.sampler.sample(3)
+        assert vs.shape == (3,)
+
+    def test_invalid_buffer_size(self):
+        with self.assertRaises(ValueError):
+            utils.WalkerAlias(self.ps, buffer_size=0)
+
+
 testing.run_module(__name__, __file__)
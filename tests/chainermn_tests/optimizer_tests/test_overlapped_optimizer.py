@@ -0,0 +1,99 @@
+import chainer
+import chainer.functions as F
+import chainer.testing
+import chainermn
+import numpy as np
+import pytest
+
+
+class ExampleModel(chainer.Chain):
+    def __init__(self):
+        super(ExampleModel, self).__init__()
+        with self.init_scope():
+            self.a = chainer.links.Linear(2, 3)
+            self.b = chainer.links.Linear(3, 4)
+            self.c = chainer.links.Linear(4, 5)
+            self.unused = chainer.links.Linear(2, 2)
+
+    def forward(self, x):
+        return F.sum(self.c(F.relu(self.b(F.relu(self.a(x))))))
+
+
+class TestOverlappedOptimizer(object):
+
+    def setup(self):
+        self.comm = chainermn.create_communicator('naive')
+        self.x = np.random.RandomState(self.comm.rank).uniform(
+            -1, 1, (5, 2)).astype(np.float32)
+
+    def make_optimizer(self, **kwargs):
+        target = ExampleModel()
+        for param in target.params():
+            param.array[...] = self.comm.rank
+        optimizer = chainermn.create_multi_node_optimizer(
+            chainer.optimizers.SGD(), self.comm, **kwargs)
+        optimizer.setup(target)
+        return optimizer
+
+    @pytest.mark.parametrize('bucket_size', [1, 64, 25 * 1024 * 1024])
+    def test_update(self, bucket_size):
+        self.setup()
+        expected = self.make_optimizer()
+        actual = self.make_optimizer(overlap=True, bucket_size=bucket_size)
+
+        for _ in range(3):
+            expected.update(expected.target, self.x)
+            actual.update(actual.target, self.x)
+
+        assert actual.t == expected.t == 2
+        expected_params = dict(expected.target.namedparams())
+        for name, param in actual.target.namedparams():
+            chainer.testing.assert_allclose(
+                param.array, expected_params[name].array)
+            chainer.testing.assert_allclose(
+                param.grad, expected_params[name].grad)
+        chainer.testing.assert_allclose(
+            actual.target.unused.W.grad, np.zeros((2, 2)))
+
+    def test_buckets(self):
+        self.setup()
+        optimizer = self.make_optimizer(overlap=True, bucket_size=64)
+        optimizer.update(optimizer.target, self.x)
+        # Each bucket has parameters of at least the bucket size except
+        # for the last one.
+        for bucket in optimizer.buckets[:-1]:
+            assert bucket.buffer.nbytes >= 64
+        params = [param for bucket in optimizer.buckets
+                  for param in bucket.params]
+        assert ([id(param) for param in params] ==
+                [id(param) for _, param in
+                 reversed(sorted(optimizer.target.namedparams()))])
+
+    def test_update_without_lossfun(self):
+        self.setup()
+        optimizer = self.make_optimizer(overlap=True)
+        optimizer.update()
+        assert optimizer.t == 0
+        for param in optimizer.target.params():
+            param.grad[...] = self.comm.rank
+        optimizer.update()
+        assert optimizer.t == 1
+        base = (self.comm.size - 1.0) / 2
+        for param in optimizer.target.params():
+            chainer.testing.assert_allclose(
+                param.grad, base * np.ones(param.shape))
+
+    def test_invalid_arguments(self):
+        self.setup()
+        with pytest.raises(ValueError):
+            chainermn.create_multi_node_optimizer(
+                chainer.optimizers.SGD(), self.comm, overlap=True,
+                zero_fill=False)
+        with pytest.raises(ValueError):
+            chainermn.create_multi_node_optimizer(
+                chainer.optimizers.SGD(), self.comm, overlap=True,
+                double_buffering=True)
+        with pytest.raises(ValueError):
+            chainermn.create_multi_node_optimizer(
+                chainer.optimizers.SGD(), self.comm, overlap=True,
+                bucket_size=0)